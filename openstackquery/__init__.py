@@ -9,6 +9,17 @@ from openstackquery.api.query_objects import (
     HypervisorQuery,
     AggregateQuery,
 )
+from openstackquery.api.inventory_session import InventorySession
+from openstackquery.api.materialised_view import MaterialisedView
+from openstackquery.notification_consumer import (
+    FileNotificationSource,
+    NotificationConsumer,
+    QueueNotificationSource,
+)
+from openstackquery.query_blocks.snapshot_file import SnapshotFile
+from openstackquery.runners.runner_cache import RunnerCache
+from openstackquery.capacity_planner import CapacityPlanner
+from openstackquery.usage_history import UsageHistory
 
 # Create logger
 openstack_query_loggers = logging.getLogger(__name__)
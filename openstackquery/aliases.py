@@ -44,6 +44,10 @@ ServerSideFilter = Dict[str, PropValue]
 # each set of filters create a separate queries - results of which are aggregated together
 ServerSideFilters = List[ServerSideFilter]
 
+# A type alias for mapping property enums to the sort key the openstack API uses to sort by that property
+#   - passed to openstacksdk as 'sort_key' so that results are returned already sorted
+ServerSideSortMappings = Dict[PropEnum, str]
+
 # A type alias for a function that:
 # - takes a set of filter params as input
 # - returns kwargs to pass to openstacksdk to apply filter
@@ -0,0 +1,342 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from openstackquery.aliases import OpenstackResourceObj
+from openstackquery.enums.query_types import QueryTypes
+from openstackquery.openstack_connection import OpenstackConnection
+from openstackquery.runners.runner_cache import RunnerCache
+from openstackquery.runners.runner_wrapper import RunnerWrapper
+
+logger = logging.getLogger(__name__)
+
+
+# pylint: disable=too-many-instance-attributes
+class InventorySession:
+    """
+    Context manager which holds a point-in-time snapshot of resources in a cloud. Each resource type is listed
+    the first time it is needed (or up-front and concurrently with load()) - and every query run on the same
+    cloud inside the session runs against the snapshot (like from_subset) instead of querying openstack again.
+    This makes many queries in a script both faster and consistent with each other.
+    Snapshots of resource types which can be listed by changes-since (servers) can be refreshed incrementally -
+    listing only resources changed since they were loaded
+
+    with InventorySession("prod") as session:
+        session.load("server", "flavor", "project", as_admin=True, all_projects=True)
+        ServerQuery().where(...).run("prod", as_admin=True, all_projects=True)
+    """
+
+    # sessions entered and not yet exited - innermost last
+    _active: List["InventorySession"] = []
+    _active_lock = threading.Lock()
+
+    def __init__(
+        self,
+        cloud_account: str,
+        max_workers: int = 4,
+        connection_cls=OpenstackConnection,
+    ):
+        """
+        :param cloud_account: A string for the account from the clouds configuration to use
+        :param max_workers: maximum number of resource types to list at the same time
+        :param connection_cls: class used to connect to openstack
+        """
+        self._cloud_account = cloud_account
+        self._max_workers = max_workers
+        self._connection_cls = connection_cls
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # (runner class, meta-params) -> listing (being) loaded
+        self._snapshots: Dict[Tuple[Type[RunnerWrapper], Hashable], Future] = {}
+        # (runner class, meta-params) -> runner and meta-params each listing was loaded with
+        self._sources: Dict[Tuple[Type[RunnerWrapper], Hashable], Tuple] = {}
+        # (runner class, meta-params) -> timestamp each listing is up-to-date as of
+        self._high_water_marks: Dict[Tuple[Type[RunnerWrapper], Hashable], str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cloud_account(self) -> str:
+        """
+        a getter method which returns the cloud account resources are listed from
+        """
+        return self._cloud_account
+
+    def __enter__(self) -> "InventorySession":
+        with self._active_lock:
+            self._active.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        with self._active_lock:
+            self._active.remove(self)
+        self.close()
+
+    def close(self):
+        """
+        method which waits for any listings being loaded and releases the threads used to load them
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown(wait=True)
+
+    @classmethod
+    def get_active(cls, cloud_account: Optional[str]) -> Optional["InventorySession"]:
+        """
+        method which returns the innermost session entered for a cloud account. Returns None if no such session
+        has been entered, or if no cloud account is given - a session is only used for queries run on its cloud
+        :param cloud_account: name of cloud account to find session for
+        """
+        if not cloud_account:
+            return None
+        with cls._active_lock:
+            for session in reversed(cls._active):
+                if session.cloud_account == cloud_account:
+                    return session
+        return None
+
+    @staticmethod
+    def _get_runner(query_type: Union[str, QueryTypes]) -> RunnerWrapper:
+        """
+        Helper method which returns a runner for a query type
+        :param query_type: query type enum or string alias - i.e. "server"
+        """
+        if isinstance(query_type, str):
+            query_type = QueryTypes.from_string(query_type)
+        mapping = query_type.value
+        return mapping.get_runner_mapping()(
+            mapping.get_prop_mapping().get_marker_prop_func()
+        )
+
+    def _list(
+        self, runner: RunnerWrapper, key: Tuple, **kwargs
+    ) -> List[OpenstackResourceObj]:
+        """
+        Helper method which lists every resource of a runner's type - run in a worker thread, each with its own
+        connection
+        :param runner: runner to list resources with
+        :param key: key of the snapshot being listed
+        :param kwargs: meta params to list resources with - i.e. all_projects
+        """
+        start = time.time()
+        self._set_high_water_mark(runner, key)
+        with self._connection_cls(self._cloud_account) as conn:
+            meta_params = runner.parse_meta_params(conn, **kwargs)
+            resources = runner.run_cached_query(
+                conn, self._cloud_account, None, **meta_params
+            )
+        logger.info(
+            "loaded %s %s resources into session in %0.4f seconds",
+            len(resources),
+            runner.resource_name,
+            time.time() - start,
+        )
+        return resources
+
+    def _set_high_water_mark(self, runner: RunnerWrapper, key: Tuple):
+        """
+        Helper method which records the time a snapshot is listed (or refreshed) from - if it can be refreshed
+        incrementally
+        :param runner: runner listing resources
+        :param key: key of the snapshot being listed
+        """
+        if runner.supports_changes_since(None):
+            with self._lock:
+                self._high_water_marks[key] = runner.get_high_water_mark()
+
+    def _list_changes(
+        self,
+        runner: RunnerWrapper,
+        key: Tuple,
+        resources: List[OpenstackResourceObj],
+        **kwargs,
+    ) -> List[OpenstackResourceObj]:
+        """
+        Helper method which refreshes a snapshot incrementally - listing resources changed since it was listed
+        and merging them in by marker prop (i.e. id). Run in a worker thread
+        :param runner: runner to list changes with
+        :param key: key of the snapshot being refreshed
+        :param resources: resources in the snapshot
+        :param kwargs: meta params the snapshot was listed with
+        """
+        with self._lock:
+            since = self._high_water_marks[key]
+        self._set_high_water_mark(runner, key)
+        with self._connection_cls(self._cloud_account) as conn:
+            meta_params = runner.parse_meta_params(conn, **kwargs)
+            resources = runner.refresh_query(
+                conn, resources, since, None, **meta_params
+            )
+        logger.info(
+            "refreshed %s %s resources in session since %s",
+            len(resources),
+            runner.resource_name,
+            since,
+        )
+        return resources
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """
+        Helper method which returns the threads listings are loaded in - creating them the first time.
+        Must be called holding the lock
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="inventory-session",
+            )
+        return self._pool
+
+    def _get_snapshot(self, runner: RunnerWrapper, **kwargs) -> Future:
+        """
+        Helper method which returns the snapshot of resources of a runner's type - starting to list them if
+        they haven't been listed
+        :param runner: runner to list resources with
+        :param kwargs: meta params to list resources with - i.e. all_projects
+        """
+        key = (type(runner), RunnerCache.freeze(kwargs))
+        with self._lock:
+            future = self._snapshots.get(key)
+            # listings that failed are listed again
+            if future is None or (future.done() and future.exception()):
+                future = self._get_pool().submit(self._list, runner, key, **kwargs)
+                self._snapshots[key] = future
+                self._sources[key] = (runner, kwargs)
+        return future
+
+    def load(
+        self, *query_types: Union[str, QueryTypes], **kwargs
+    ) -> "InventorySession":
+        """
+        method which starts listing resources of each given query type concurrently, and waits for them to be
+        listed. Resource types already loaded are not listed again
+        :param query_types: query type enums or string aliases - i.e. "server", "flavor"
+        :param kwargs: meta params to list resources with - these must match the kwargs that queries are run
+        with to use the snapshot (i.e. as_admin=True, all_projects=True)
+        """
+        futures = [
+            self._get_snapshot(self._get_runner(query_type), **kwargs)
+            for query_type in query_types
+        ]
+        for future in futures:
+            future.result()
+        return self
+
+    def get_resources(
+        self, runner: RunnerWrapper, **kwargs
+    ) -> List[OpenstackResourceObj]:
+        """
+        method which returns resources of a runner's type from the snapshot - listing them the first time
+        :param runner: runner of the query to get resources for
+        :param kwargs: meta params the query was run with
+        """
+        return list(self._get_snapshot(runner, **kwargs).result())
+
+    def refresh(self, *query_types: Union[str, QueryTypes], incremental: bool = False):
+        """
+        method which drops resources of given query types from the snapshot (or all resources if none given)
+        so they are listed again the next time they are needed.
+        If incremental is set, snapshots which can be refreshed incrementally (servers) instead start listing only
+        resources changed since they were listed - including deleted resources - and merge them in by id
+        :param query_types: query type enums or string aliases - i.e. "server"
+        :param incremental: if True, refresh snapshots incrementally where possible
+        """
+        runner_types = {
+            type(self._get_runner(query_type)) for query_type in query_types
+        }
+        with self._lock:
+            for key in list(self._snapshots):
+                if runner_types and key[0] not in runner_types:
+                    continue
+                future = self._snapshots[key]
+                runner, kwargs = self._sources[key]
+                if (
+                    incremental
+                    and key in self._high_water_marks
+                    and future.done()
+                    and not future.exception()
+                ):
+                    self._snapshots[key] = self._get_pool().submit(
+                        self._list_changes, runner, key, future.result(), **kwargs
+                    )
+                    continue
+                del self._snapshots[key]
+                self._high_water_marks.pop(key, None)
+
+    def _get_keys(self, cloud_account: Optional[str], resource_type: str) -> List:
+        """
+        Helper method which returns keys of snapshots of a resource type - or none if the session is for a
+        different cloud account. Must be called holding the lock
+        :param cloud_account: an optional cloud account - matches any if not given
+        :param resource_type: resource type of snapshots - i.e. "server"
+        """
+        if cloud_account is not None and cloud_account != self._cloud_account:
+            return []
+        return [
+            key
+            for key, (runner, _) in self._sources.items()
+            if key in self._snapshots and runner.resource_name == resource_type
+        ]
+
+    def expire(self, cloud_account: Optional[str], resource_type: str) -> int:
+        """
+        method which refreshes snapshots of a resource type - incrementally where possible. Returns the number
+        of snapshots refreshed. Takes the same arguments as RunnerCache.expire so notifications can keep
+        sessions fresh (see NotificationConsumer)
+        :param cloud_account: an optional cloud account - snapshots are only refreshed if it is the session's
+        :param resource_type: resource type of snapshots to refresh - i.e. "server"
+        """
+        with self._lock:
+            count = len(self._get_keys(cloud_account, resource_type))
+        if count:
+            self.refresh(resource_type, incremental=True)
+        return count
+
+    def remove_resources(
+        self,
+        resource_type: str,
+        markers: Iterable[Hashable],
+        marker_func: Callable[[OpenstackResourceObj], Hashable],
+        cloud_account: Optional[str] = None,
+    ) -> int:
+        """
+        method which patches loaded snapshots of a resource type - removing resources with the given markers
+        (i.e. ids). Returns the number of resources removed. Takes the same arguments as
+        RunnerCache.remove_resources
+        :param resource_type: resource type of snapshots to patch - i.e. "server"
+        :param markers: markers of resources to remove
+        :param marker_func: function which returns the marker of a resource
+        :param cloud_account: an optional cloud account - snapshots are only patched if it is the session's
+        """
+        markers = set(markers)
+        removed = 0
+        with self._lock:
+            for key in self._get_keys(cloud_account, resource_type):
+                future = self._snapshots[key]
+                # snapshots still being listed are left as they are
+                if not future.done() or future.exception():
+                    continue
+                resources = future.result()
+                kept = [
+                    resource
+                    for resource in resources
+                    if marker_func(resource) not in markers
+                ]
+                if len(kept) == len(resources):
+                    continue
+                removed += len(resources) - len(kept)
+                patched = Future()
+                patched.set_result(kept)
+                self._snapshots[key] = patched
+        return removed
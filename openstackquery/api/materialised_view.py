@@ -0,0 +1,269 @@
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Hashable, Iterable, List, Optional
+
+from openstackquery.aliases import OpenstackResourceObj, PropValue
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.incremental_grouper import (
+    GroupPath,
+    IncrementalGrouper,
+)
+
+if TYPE_CHECKING:
+    from openstackquery.api.query_api import QueryAPI
+
+logger = logging.getLogger(__name__)
+
+
+# pylint: disable=too-many-instance-attributes
+class MaterialisedView:
+    """
+    Class which holds a named query and the summary (count and aggregated values) of each group of its results -
+    refreshed by a background thread every interval seconds. Dashboards read summaries from the view instead of
+    running the query each time - reads never wait for a refresh, they return summaries as of the last refresh.
+    Where openstack supports it (servers without server-side filters), refreshes after the first only list
+    resources changed since the last refresh - and only groups holding changed resources are re-computed
+
+    view = MaterialisedView(
+        "servers-by-status",
+        ServerQuery().group_by("project_id").subgroup_by("status"),
+        "prod",
+        interval=60,
+        as_admin=True,
+        all_projects=True,
+    ).start()
+    MaterialisedView.get("servers-by-status").get_summaries()
+    """
+
+    # views started and not yet stopped - by name
+    _views: Dict[str, "MaterialisedView"] = {}
+    _views_lock = threading.Lock()
+
+    def __init__(
+        self,
+        name: str,
+        query: "QueryAPI",
+        cloud_account: str,
+        interval: float = 300,
+        **kwargs,
+    ):
+        """
+        :param name: name of the view
+        :param query: query to run - with grouping and aggregations set. Sorting, limit and offset are ignored
+        :param cloud_account: A string for the account from the clouds configuration to use
+        :param interval: seconds to wait between refreshes
+        :param kwargs: keyword args to run the query with - i.e. as_admin=True
+        """
+        self._name = name
+        self._query = query
+        self._cloud_account = cloud_account
+        self._interval = interval
+        self._kwargs = kwargs
+        self._grouper: Optional[IncrementalGrouper] = None
+        # timestamp to list changes since at the next refresh - None if the view can't be refreshed incrementally
+        self._since: Optional[str] = None
+        self._summaries: Dict[GroupPath, Dict[str, PropValue]] = {}
+        self._refresh_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshed_at: Optional[float] = None
+        self.last_refresh: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        """
+        a getter method which returns the name of the view
+        """
+        return self._name
+
+    @property
+    def incremental(self) -> bool:
+        """
+        a getter method which returns True if the view can be refreshed with only resources changed since the
+        last refresh
+        """
+        return not any(
+            self._query.builder.server_side_filters or []
+        ) and self._query.executor.runner.supports_changes_since(None)
+
+    @classmethod
+    def get(cls, name: str) -> Optional["MaterialisedView"]:
+        """
+        method which returns a view that has been started by name - or None if no such view is running
+        :param name: name of view
+        """
+        with cls._views_lock:
+            return cls._views.get(name)
+
+    @classmethod
+    def get_names(cls) -> List[str]:
+        """
+        method which returns names of every view that has been started
+        """
+        with cls._views_lock:
+            return list(cls._views)
+
+    def get_summaries(self) -> Dict[GroupPath, Dict[str, PropValue]]:
+        """
+        method which returns the summary (count and aggregated values) of each group as of the last refresh -
+        keyed by path of group names, or by () if results aren't grouped. Empty until the view is first refreshed
+        """
+        return {path: dict(summary) for path, summary in self._summaries.items()}
+
+    def get_summary(self, *path: PropValue) -> Optional[Dict[str, PropValue]]:
+        """
+        method which returns the summary of one group as of the last refresh - or None if there is no such group
+        :param path: names of the group (and its parent groups) - none if results aren't grouped
+        """
+        summary = self._summaries.get(tuple(path))
+        return dict(summary) if summary is not None else None
+
+    def _get_key(self, item) -> Hashable:
+        """
+        Helper method which returns the marker (i.e. id) of a result
+        :param item: result to get marker of
+        """
+        return self._query.executor.runner.marker_prop_func(item.as_object())
+
+    def refresh(self, full: bool = False) -> "MaterialisedView":
+        """
+        method which refreshes the view now - incrementally where possible. Reads aren't blocked while
+        refreshing - only other refreshes are
+        :param full: if True, run the query in full even if the view can be refreshed incrementally
+        """
+        with self._refresh_lock:
+            start = time.time()
+            if full or self._grouper is None or self._since is None:
+                self._refresh_full()
+                self.last_refresh = "full"
+            else:
+                self._refresh_changes()
+                self.last_refresh = "incremental"
+            self.refreshed_at = time.time()
+            logger.info(
+                "refreshed view %s (%s) in %0.4f seconds",
+                self._name,
+                self.last_refresh,
+                self.refreshed_at - start,
+            )
+        return self
+
+    def _refresh_full(self):
+        """
+        Helper method which runs the query in full (without any limit or offset set) and re-computes every group
+        """
+        runner = self._query.executor.runner
+        since = runner.get_high_water_mark() if self.incremental else None
+        parser = self._query.parser
+        limit, offset = parser.limit, parser.offset
+        parser.parse_limit(None)
+        try:
+            self._query.run(self._cloud_account, **self._kwargs)
+        finally:
+            parser.parse_limit(limit, offset)
+        grouper = IncrementalGrouper(self._query.parser, self._get_key)
+        grouper.reset(self._query.results_container.iter_results())
+        self._grouper, self._since = grouper, since
+        self._summaries = grouper.summaries
+
+    def _refresh_changes(self):
+        """
+        Helper method which lists resources changed since the last refresh and re-computes groups holding them
+        """
+        runner = self._query.executor.runner
+        since = runner.get_high_water_mark()
+        changes = self._query.executor.run_changes_with_openstacksdk(
+            self._cloud_account, self._since, **self._kwargs
+        )
+        self._apply(
+            [change for change in changes if not runner.is_deleted(change)],
+            [runner.marker_prop_func(change) for change in changes],
+        )
+        self._since = since
+
+    def _apply(self, resources: List[OpenstackResourceObj], markers: List[Hashable]):
+        """
+        Helper method which runs the query's filters on resources changed and updates groups holding them.
+        Must be called holding the refresh lock
+        :param resources: openstack resources added or changed
+        :param markers: markers of every resource added, changed or removed
+        """
+        builder = self._query.builder
+        results = self._query.executor.get_subset_results(
+            resources, builder.client_side_filters + builder.server_filter_fallback
+        )
+        changed = self._grouper.update(results.iter_results(), markers)
+        self._summaries = self._grouper.summaries
+        logger.debug("updated %s groups of view %s", changed, self._name)
+
+    def apply_changes(
+        self,
+        resources: List[OpenstackResourceObj],
+        deleted_markers: Iterable[Hashable] = (),
+    ):
+        """
+        method which updates the view from changes found elsewhere (i.e. from notifications) - without running
+        the query. Only groups holding changed resources are re-computed
+        :param resources: openstack resources added or changed
+        :param deleted_markers: markers (i.e. ids) of resources deleted
+        """
+        marker_func = self._query.executor.runner.marker_prop_func
+        with self._refresh_lock:
+            if self._grouper is None:
+                raise ParseQueryError(
+                    f"view {self._name} must be refreshed before changes can be applied"
+                )
+            self._apply(
+                resources,
+                [*(marker_func(resource) for resource in resources), *deleted_markers],
+            )
+
+    def _run(self):
+        """
+        Helper method run by the background thread - refreshes the view every interval seconds until stopped
+        """
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            # a failed refresh leaves the last summaries readable - and is tried again next interval
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("failed to refresh view %s", self._name)
+            self._stopped.wait(self._interval)
+
+    def start(self) -> "MaterialisedView":
+        """
+        method which starts refreshing the view in a background thread - and makes it available by name
+        with get(). The first refresh starts straight away
+        """
+        with self._views_lock:
+            if self._views.get(self._name) not in (None, self):
+                raise ParseQueryError(f"a view named {self._name} is already running")
+            self._views[self._name] = self
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"view-{self._name}", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        method which stops refreshing the view and removes it from views available by name. Summaries of the
+        last refresh can still be read
+        :param timeout: an optional number of seconds to wait for a refresh in progress to finish
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._views_lock:
+            if self._views.get(self._name) is self:
+                del self._views[self._name]
+
+    def __enter__(self) -> "MaterialisedView":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -1,12 +1,34 @@
+from datetime import timedelta
 import logging
+import os
+import sqlite3
+import time
 from copy import deepcopy
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
-from openstackquery.aliases import OpenstackResourceObj, PropValue
+from openstackquery.aliases import OpenstackResourceObj, PropValue, ServerSideFilters
+from openstackquery.api.inventory_session import InventorySession
+from openstackquery.api.materialised_view import MaterialisedView
+from openstackquery.enums.aggregate_func import AggregateFunc
 from openstackquery.enums.props.prop_enum import PropEnum
 from openstackquery.enums.query_presets import QueryPresets
 from openstackquery.enums.sort_order import SortOrder
 from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.query_watcher import QueryWatcher
+from openstackquery.query_blocks.results_container import ResultsContainer
+from openstackquery.query_blocks.results_diff import ResultsDiff
+from openstackquery.structs.change_event import ChangeEvent
 
 if TYPE_CHECKING:
     from openstackquery.structs.query_components import QueryComponents
@@ -14,6 +36,7 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+# pylint: disable=too-many-public-methods
 class QueryAPI:
     """
     Interface for Query Classes. This class exposes all public methods for query api.
@@ -85,20 +108,80 @@ class QueryAPI:
 
     def group_by(
         self,
-        group_by: Union[PropEnum, str],
+        group_by: Union[PropEnum, str, Tuple[Union[PropEnum, str], ...]],
         group_ranges: Optional[Dict[str, List[PropValue]]] = None,
         include_ungrouped_results: bool = False,
+        bucket: Optional[Union[str, timedelta]] = None,
     ):
         """
         Public method used to configure how to group results.
-        :param group_by: Enum or string alias of the property to group by
+        :param group_by: Enum or string alias of the property to group by - or a tuple of them to group by
+        several properties at once
         :param group_ranges: a set of optional group mappings - group name to list of values of
         selected group by property to be included in each group
         :param include_ungrouped_results: an optional flag to include a "ungrouped" group to the
         output of values found that were
         not specified in group mappings - ignored if group ranges not given
+        :param bucket: an optional time bucket for grouping by a timestamp property - "day", "week", "month"
+        or a timedelta. Groups are named by the start of each bucket
         """
-        self.parser.parse_group_by(group_by, group_ranges, include_ungrouped_results)
+        self.parser.parse_group_by(
+            group_by, group_ranges, include_ungrouped_results, bucket
+        )
+        return self
+
+    def subgroup_by(
+        self,
+        group_by: Union[PropEnum, str, Tuple[Union[PropEnum, str], ...]],
+        group_ranges: Optional[Dict[str, List[PropValue]]] = None,
+        include_ungrouped_results: bool = False,
+        bucket: Optional[Union[str, timedelta]] = None,
+    ):
+        """
+        Public method used to split each group into nested groups - i.e. group by project, then by status.
+        Can be called more than once to add more levels. group_by must be called first
+        All levels are grouped in one pass over the results - and each group holds a summary of its count
+        (and aggregated values if aggregate is set)
+        Takes the same parameters as group_by
+        :param group_by: Enum or string alias of the property to group by - or a tuple of them to group by
+        several properties at once
+        :param group_ranges: a set of optional group mappings - group name to list of values of
+        selected group by property to be included in each group
+        :param include_ungrouped_results: an optional flag to include a "ungrouped" group to the
+        output of values found that were not specified in group mappings - ignored if group ranges not given
+        :param bucket: an optional time bucket for grouping by a timestamp property - "day", "week", "month"
+        or a timedelta
+        """
+        self.parser.parse_subgroup_by(
+            group_by, group_ranges, include_ungrouped_results, bucket
+        )
+        return self
+
+    def aggregate(
+        self,
+        *aggregations: Union[
+            str, AggregateFunc, Tuple[Union[AggregateFunc, str], Union[PropEnum, str]]
+        ],
+    ):
+        """
+        Public method used to summarise results - output methods will return one row of aggregated values
+        (one row per group if group_by is set) instead of one row per result
+        :param aggregations: one or more tuples of aggregate function and property to aggregate
+            - i.e. (AggregateFunc.SUM, HypervisorProperties.VCPUS_USED)
+            - or just AggregateFunc.COUNT to count results
+        """
+        self.parser.parse_aggregate(*aggregations)
+        return self
+
+    def limit(self, limit: int, offset: int = 0):
+        """
+        Public method used to limit the number of results to output.
+        If results are not sorted or grouped, the query will stop listing resources as soon as enough
+        results are found when run() is called
+        :param limit: maximum number of results to output (per group if results are grouped)
+        :param offset: (optional) number of results to skip before outputting
+        """
+        self.parser.parse_limit(limit, offset)
         return self
 
     def run(
@@ -114,25 +197,229 @@ class QueryAPI:
         :param kwargs: keyword args that can be used to configure details of how query is run
             - valid kwargs specific to resource
         """
-        if not cloud_account and not from_subset:
+        return self._run(cloud_account, from_subset, stop_at_first=False, **kwargs)
+
+    def first(
+        self,
+        cloud_account: str = None,
+        from_subset: Optional[List[OpenstackResourceObj]] = None,
+        **kwargs,
+    ) -> Optional[Dict[str, PropValue]]:
+        """
+        Public method that runs the query and returns the selected properties of the first result found
+        (after any sorting and offset set) - or None if nothing was found.
+        Only the results needed are found - limit set and results from the last run() are left as they were
+        :param cloud_account: A String for the clouds configuration to use
+        :param from_subset: A subset of openstack resources to run query on instead of querying openstacksdk
+        :param kwargs: keyword args that can be used to configure details of how query is run
+            - valid kwargs specific to resource
+        """
+        limit, offset = self.parser.limit, self.parser.offset
+        previous_results = self.results_container
+        self.parser.parse_limit(1, offset)
+        try:
+            self.run(cloud_account, from_subset, **kwargs)
+            results = self.to_props()
+        finally:
+            self.parser.parse_limit(limit, offset)
+            self.results_container = previous_results
+        if isinstance(results, dict):
+            raise ParseQueryError(
+                "first() cannot be used when grouping results - use limit(1) instead"
+            )
+        return results[0] if results else None
+
+    def exists(
+        self,
+        cloud_account: str = None,
+        from_subset: Optional[List[OpenstackResourceObj]] = None,
+        **kwargs,
+    ) -> bool:
+        """
+        Public method that runs the query and returns True if at least one result is found.
+        Stops listing resources as soon as one result is found - ignoring any sorting, grouping or limit set.
+        Results from the last run() are left as they were
+        :param cloud_account: A String for the clouds configuration to use
+        :param from_subset: A subset of openstack resources to run query on instead of querying openstacksdk
+        :param kwargs: keyword args that can be used to configure details of how query is run
+            - valid kwargs specific to resource
+        """
+        previous_results = self.results_container
+        try:
+            self._run(cloud_account, from_subset, stop_at_first=True, **kwargs)
+            return bool(self.results_container.to_objects())
+        finally:
+            self.results_container = previous_results
+
+    def count(
+        self,
+        cloud_account: str = None,
+        from_subset: Optional[List[OpenstackResourceObj]] = None,
+        **kwargs,
+    ) -> int:
+        """
+        Public method that runs the query and returns the number of results found.
+        Resources are counted as they are listed - results are not stored, so output methods are not affected.
+        Any sorting, grouping or limit set is ignored
+        :param cloud_account: A String for the clouds configuration to use
+        :param from_subset: A subset of openstack resources to run query on instead of querying openstacksdk
+        :param kwargs: keyword args that can be used to configure details of how query is run
+            - valid kwargs specific to resource
+        """
+        return self._count(cloud_account, from_subset, None, **kwargs)
+
+    def count_by(
+        self,
+        prop: Union[str, PropEnum],
+        cloud_account: str = None,
+        from_subset: Optional[List[OpenstackResourceObj]] = None,
+        use_aggregate_source: bool = False,
+        **kwargs,
+    ) -> Dict[PropValue, int]:
+        """
+        Public method that runs the query and returns the number of results found for each value of a property.
+        Like count(), results are not stored and any sorting, grouping or limit set is ignored
+        :param prop: Enum or string alias of the property to count results by
+        :param cloud_account: A String for the clouds configuration to use
+        :param from_subset: A subset of openstack resources to run query on instead of querying openstacksdk
+        :param use_aggregate_source: If True, get counts from a cheaper aggregate source that openstack provides
+        instead of listing resources (i.e. compute limits for servers per project).
+            - cannot be used with where() or from_subset
+            - raises an error if no aggregate source exists for the property
+        :param kwargs: keyword args that can be used to configure details of how query is run
+            - valid kwargs specific to resource
+        """
+        if not use_aggregate_source:
+            return self._count(cloud_account, from_subset, prop, **kwargs)
+
+        if (
+            from_subset
+            or self.builder.client_side_filters
+            or self.builder.server_side_filters
+        ):
+            raise ParseQueryError(
+                "use_aggregate_source cannot be used with from_subset or with where() conditions set"
+            )
+        if not cloud_account:
+            raise ParseQueryError(
+                "please provide cloud_account to use aggregate source"
+            )
+
+        counts = self.executor.count_with_aggregate_source(
+            cloud_account, prop, **kwargs
+        )
+        if counts is None:
+            raise ParseQueryError(
+                f"no aggregate source exists to count by property {prop} - run without use_aggregate_source"
+            )
+        return counts
+
+    def _count(
+        self,
+        cloud_account: Optional[str],
+        from_subset: Optional[List[OpenstackResourceObj]],
+        count_by: Optional[Union[str, PropEnum]],
+        **kwargs,
+    ) -> Union[int, Dict[PropValue, int]]:
+        """
+        Helper method that runs the query and counts results
+        :param cloud_account: A String for the clouds configuration to use
+        :param from_subset: A subset of openstack resources to run query on instead of querying openstacksdk
+        :param count_by: An optional property to count results by
+        :param kwargs: keyword args that can be used to configure details of how query is run
+        """
+        from_subset = self._get_subset(cloud_account, from_subset, **kwargs)
+        if not cloud_account and from_subset is None:
             raise ParseQueryError(
                 "please provide as a parameter, one of:"
                 "\n\tcloud_account - a cloud domain to run query using openstacksdk"
                 "\n\tfrom_subset - a set of openstack objects"
             )
 
+        if from_subset is not None:
+            return self.executor.count_with_subset(
+                subset=from_subset,
+                client_side_filters=self.builder.client_side_filters
+                + self.builder.server_filter_fallback,
+                count_by=count_by,
+            )
+        return self.executor.count_with_openstacksdk(
+            cloud_account=cloud_account,
+            client_side_filters=self.builder.client_side_filters,
+            server_side_filters=self.builder.server_side_filters,
+            count_by=count_by,
+            **kwargs,
+        )
+
+    def _get_subset(
+        self,
+        cloud_account: Optional[str],
+        from_subset: Optional[List[OpenstackResourceObj]],
+        **kwargs,
+    ) -> Optional[List[OpenstackResourceObj]]:
+        """
+        Helper method which returns the subset of resources to run the query on - the subset given, else resources
+        from the snapshot of an InventorySession entered for the cloud account. Returns None if the query should
+        be run using openstacksdk
+        :param cloud_account: A String for the clouds configuration to use
+        :param from_subset: A subset of openstack resources given to run query on
+        :param kwargs: keyword args the query is run with - resources are listed into the session with them
+        """
         if from_subset:
+            return from_subset
+        session = InventorySession.get_active(cloud_account)
+        if session is None:
+            return None
+        logger.debug("running query on inventory session snapshot")
+        return session.get_resources(self.executor.runner, **kwargs)
+
+    def _run(
+        self,
+        cloud_account: Optional[str],
+        from_subset: Optional[List[OpenstackResourceObj]],
+        stop_at_first: bool,
+        **kwargs,
+    ):
+        """
+        Helper method that runs the query
+        :param cloud_account: A String for the clouds configuration to use
+        :param from_subset: A subset of openstack resources to run query on instead of querying openstacksdk
+        :param stop_at_first: if True, stop as soon as one result is found - ignoring limit set
+        :param kwargs: keyword args that can be used to configure details of how query is run
+        """
+        from_subset = self._get_subset(cloud_account, from_subset, **kwargs)
+        if not cloud_account and from_subset is None:
+            raise ParseQueryError(
+                "please provide as a parameter, one of:"
+                "\n\tcloud_account - a cloud domain to run query using openstacksdk"
+                "\n\tfrom_subset - a set of openstack objects"
+            )
+
+        if from_subset is not None:
             filters = (
                 self.builder.client_side_filters + self.builder.server_filter_fallback
             )
             self.executor.run_with_subset(
-                subset=from_subset, client_side_filters=filters
+                subset=from_subset,
+                client_side_filters=filters,
+                limit=1 if stop_at_first else self.parser.get_fetch_limit(),
             )
         else:
+            server_side_filters, merge_key = self.builder.server_side_filters, None
+            if not stop_at_first:
+                server_side_filters, merge_key = self._push_down_sort(
+                    server_side_filters
+                )
+            fetch_limit = self.parser.get_fetch_limit(
+                sort_pushed_down=merge_key is not None
+            )
+
             self.executor.run_with_openstacksdk(
                 cloud_account=cloud_account,
                 client_side_filters=self.builder.client_side_filters,
-                server_side_filters=self.builder.server_side_filters,
+                server_side_filters=server_side_filters,
+                limit=1 if stop_at_first else fetch_limit,
+                merge_key=merge_key,
                 **kwargs,
             )
 
@@ -146,6 +433,27 @@ class QueryAPI:
         self.results_container = self.executor.results_container
         return self
 
+    def _push_down_sort(
+        self, server_side_filters: ServerSideFilters
+    ) -> Tuple[ServerSideFilters, Optional[Callable]]:
+        """
+        Helper method which adds sort kwargs onto server-side filters if the openstack API can sort by all
+        sort_by properties set. Returns server-side filters to use and a sort key function to merge the sorted
+        listings by - or None if sort could not be pushed down
+        :param server_side_filters: server-side filters set by where() calls
+        """
+        server_side_sort = self.builder.get_server_side_sort(self.parser.sort_by)
+        if not server_side_sort:
+            return server_side_filters, None
+
+        # openstack returns each listing already sorted - so we merge listings rather than sort everything after
+        # results are still sorted client-side after, which is cheap on sorted input
+        logger.info("sorting results using openstack API")
+        return [
+            {**(server_filter or {}), **server_side_sort}
+            for server_filter in (server_side_filters or [None])
+        ], self.parser.sorter.get_object_key_func()
+
     def to_objects(
         self, groups: Optional[List[str]] = None
     ) -> Union[Dict[str, List], List]:
@@ -160,21 +468,49 @@ class QueryAPI:
                 "Use to_props() instead if you want to include these properties"
             )
 
-        self.results_container.parse_results(self.parser.run_parser)
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
         return self.output.to_objects(self.results_container, groups)
 
     def to_props(
-        self, flatten: bool = False, groups: Optional[List[str]] = None
+        self,
+        flatten: bool = False,
+        groups: Optional[List[str]] = None,
+        include_group_summaries: bool = False,
     ) -> Union[Dict[str, List], List]:
         """
         Public method to return results as openstack properties.
         This is either returned as a list if no groups are specified, or as a dict if they grouping was requested
         :param flatten: boolean which will flatten results if true
         :param groups: a list of group keys to limit output by
+        :param include_group_summaries: if results are in nested groups (see subgroup_by), output each
+        group as a dict with its "summary" (count and aggregated values) and its "groups" or "results"
         """
-        self.results_container.parse_results(self.parser.run_parser)
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        if include_group_summaries:
+            return self.output.to_props(
+                self.results_container, flatten, groups, include_group_summaries=True
+            )
         return self.output.to_props(self.results_container, flatten, groups)
 
+    def to_rows(
+        self, groups: Optional[List[str]] = None, named: bool = False
+    ) -> Tuple[Tuple[str, ...], Union[Dict[str, List[Tuple]], List[Tuple]]]:
+        """
+        Public method to return results as rows of property values - a more compact alternative to to_props().
+        Returns a header tuple holding the name of each property, and a tuple of values per result - as a list,
+        or as a dict if grouping was requested
+        :param groups: a list of group keys to limit output by
+        :param named: if True, each row is a namedtuple - so values can also be accessed by property name
+        """
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        return self.output.to_rows(self.results_container, groups, named)
+
     def to_string(
         self,
         title: Optional[str] = None,
@@ -187,9 +523,12 @@ class QueryAPI:
         :param title: an optional title for the table(s)
         :param groups: a list group to limit output by
         :param include_group_titles: include group name as subtitle when printing groups
-        :param kwargs: kwargs to pass to generate table
+        :param kwargs: kwargs to pass to generate table - i.e. backend, max_rows, page, max_col_width
+            or kwargs to pass to tabulate
         """
-        self.results_container.parse_results(self.parser.run_parser)
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
         return self.output.to_string(
             self.results_container, title, groups, include_group_titles, **kwargs
         )
@@ -206,9 +545,12 @@ class QueryAPI:
         :param title: an optional title for the table(s) - will be converted to html automatically
         :param groups: a list group to limit output by
         :param include_group_titles: include group name as subtitle when printing groups
-        :param kwargs: kwargs to pass to generate table
+        :param kwargs: kwargs to pass to generate table - i.e. backend, max_rows, page, max_col_width
+            or kwargs to pass to tabulate
         """
-        self.results_container.parse_results(self.parser.run_parser)
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
         return self.output.to_html(
             self.results_container, title, groups, include_group_titles, **kwargs
         )
@@ -223,7 +565,9 @@ class QueryAPI:
         :param groups: a list of groups to limit output by
         :param flatten_groups: If True, grouped data is merged into a single CSV with a 'group' column.
         """
-        self.results_container.parse_results(self.parser.run_parser)
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
         return self.output.to_csv(self.results_container, groups, flatten_groups)
 
     def to_json(
@@ -231,18 +575,382 @@ class QueryAPI:
         groups: Optional[List[str]] = None,
         flatten_groups: bool = False,
         pretty: bool = False,
+        include_group_summaries: bool = False,
     ) -> str:
         """
         Public method to return results as a json string.
         :param groups: optional list of group keys to limit output by.
         :param flatten_groups: if True and results are grouped, merge all groups into a single list with group info.
         :param pretty: if True, return pretty-printed JSON.
+        :param include_group_summaries: if results are in nested groups (see subgroup_by), output each
+        group with its "summary" (count and aggregated values)
         """
-        self.results_container.parse_results(self.parser.run_parser)
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        if include_group_summaries:
+            return self.output.to_json(
+                self.results_container,
+                groups,
+                flatten_groups,
+                pretty,
+                include_group_summaries=True,
+            )
         return self.output.to_json(
             self.results_container, groups, flatten_groups, pretty
         )
 
+    def write_csv(
+        self,
+        fp: Union[str, os.PathLike, IO],
+        groups: Optional[List[str]] = None,
+        flatten_groups: bool = False,
+        compress: bool = False,
+    ):
+        """
+        Public method to write results as csv to a file path or file object - rows are written one at a time
+        rather than built up in memory first
+        :param fp: a file path - or a file object opened in text mode (binary mode if compress is set)
+        :param groups: a list of group keys to limit output by
+        :param flatten_groups: If True, grouped data is merged into a single CSV with a 'group' column.
+        :param compress: If True, gzip compress output
+        """
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        self.output.write_csv(
+            self.results_container, fp, groups, flatten_groups, compress
+        )
+
+    def write_json(
+        self,
+        fp: Union[str, os.PathLike, IO],
+        groups: Optional[List[str]] = None,
+        flatten_groups: bool = False,
+        compress: bool = False,
+    ):
+        """
+        Public method to write results as json to a file path or file object - rows are written one at a time
+        rather than built up in memory first
+        :param fp: a file path - or a file object opened in text mode (binary mode if compress is set)
+        :param groups: optional list of group keys to limit output by.
+        :param flatten_groups: if True and results are grouped, merge all groups into a single list with group info.
+        :param compress: If True, gzip compress output
+        """
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        self.output.write_json(
+            self.results_container, fp, groups, flatten_groups, compress
+        )
+
+    def write_ndjson(
+        self,
+        fp: Union[str, os.PathLike, IO],
+        groups: Optional[List[str]] = None,
+        compress: bool = False,
+    ):
+        """
+        Public method to write results as newline-delimited json (one json object per line) to a file path or
+        file object. If results are grouped, each row includes a "group" field
+        :param fp: a file path - or a file object opened in text mode (binary mode if compress is set)
+        :param groups: optional list of group keys to limit output by.
+        :param compress: If True, gzip compress output
+        """
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        self.output.write_ndjson(self.results_container, fp, groups, compress)
+
+    def to_arrow(
+        self, groups: Optional[List[str]] = None, dictionary_threshold: float = 0.5
+    ):
+        """
+        Public method to return results as a pyarrow Table with a typed column per selected property -
+        integers, booleans and timestamps keep their types and low-cardinality strings (i.e. status) are
+        dictionary encoded. If results are grouped, a "group" column holds each row's group.
+        Requires pyarrow - install with 'pip install openstackquery[arrow]'
+        :param groups: optional list of group keys to limit output by.
+        :param dictionary_threshold: string columns with at most this ratio of distinct values to rows are
+            dictionary encoded - set to 0 to disable
+        """
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        return self.output.to_arrow(
+            self.results_container, groups, dictionary_threshold
+        )
+
+    def to_pandas(
+        self, groups: Optional[List[str]] = None, dictionary_threshold: float = 0.5
+    ):
+        """
+        Public method to return results as a pandas DataFrame - converted from to_arrow().
+        Requires pyarrow and pandas - install with 'pip install openstackquery[pandas]'
+        :param groups: optional list of group keys to limit output by.
+        :param dictionary_threshold: see to_arrow() - dictionary encoded columns become categoricals
+        """
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        return self.output.to_pandas(
+            self.results_container, groups, dictionary_threshold
+        )
+
+    def to_polars(
+        self, groups: Optional[List[str]] = None, dictionary_threshold: float = 0.5
+    ):
+        """
+        Public method to return results as a polars DataFrame - converted from to_arrow().
+        Requires pyarrow and polars - install with 'pip install openstackquery[polars]'
+        :param groups: optional list of group keys to limit output by.
+        :param dictionary_threshold: see to_arrow() - dictionary encoded columns become categoricals
+        """
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        return self.output.to_polars(
+            self.results_container, groups, dictionary_threshold
+        )
+
+    def write_parquet(
+        self,
+        fp: Union[str, os.PathLike, IO],
+        groups: Optional[List[str]] = None,
+        compression: str = "snappy",
+    ):
+        """
+        Public method to write results to a parquet file path or file object.
+        Requires pyarrow - install with 'pip install openstackquery[arrow]'
+        :param fp: a file path - or a file object opened in binary mode
+        :param groups: optional list of group keys to limit output by.
+        :param compression: compression codec to use - i.e. "snappy", "zstd", "gzip" or "none"
+        """
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        self.output.write_parquet(self.results_container, fp, groups, compression)
+
+    def to_sqlite(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        groups: Optional[List[str]] = None,
+        if_exists: str = "fail",
+    ):
+        """
+        Public method to bulk-load results into a SQLite table - with a typed column per selected property
+        and an index on each selected property that can be used to chain queries (i.e. project_id, user_id).
+        Load several queries into the same connection to join them with SQL
+        :param conn: sqlite3 connection to load results into - i.e. sqlite3.connect(":memory:")
+        :param table: name of table to create
+        :param groups: optional list of group keys to limit output by.
+        :param if_exists: what to do if the table already exists - "fail" (raise an error), "replace" the table
+            or "append" rows to it
+        """
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        self.output.to_sqlite(
+            self.results_container,
+            conn,
+            table,
+            groups=groups,
+            index_props=self.chainer.get_chaining_props(),
+            if_exists=if_exists,
+        )
+
+    def write_snapshot(
+        self,
+        fp: Union[str, os.PathLike, IO],
+        groups: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Public method to write result objects to a compact columnar snapshot file. Other processes can open it
+        with SnapshotFile - which memory-maps the file - and run queries on it with from_subset, without
+        querying openstack or deserialising every object. Returns the number of bytes written
+        :param fp: a file path - or a file object opened in binary mode
+        :param groups: optional list of group keys to limit output by.
+        """
+        if self.executor.has_forwarded_results:
+            logger.warning(
+                "This Query has properties from previous queries. Running write_snapshot WILL IGNORE THIS"
+            )
+        self.results_container.parse_results(
+            self.parser.run_parser, self.parser.fingerprint
+        )
+        return self.output.write_snapshot(
+            self.results_container, fp, self.executor.runner.resource_name, groups
+        )
+
+    def watch(
+        self,
+        cloud_account: str,
+        interval: float = 60,
+        callback: Optional[Callable[[ChangeEvent], None]] = None,
+        max_polls: Optional[int] = None,
+        include_initial: bool = False,
+        **kwargs,
+    ) -> Optional[Iterator[ChangeEvent]]:
+        """
+        Public method that runs the query every interval seconds and reports results added, changed or removed
+        since the last run - as ChangeEvents keyed by marker prop (i.e. id), with the selected properties that
+        changed. Returns an iterator of events - or if callback is given, calls it with each event instead and
+        returns once done polling.
+        Where openstack supports it (servers without server-side filters), each poll after the first only lists
+        resources changed since the last - otherwise the query is run in full and rows are compared by hash.
+        Any sorting, grouping or limit set is ignored. After each poll, output methods output results of that poll
+        :param cloud_account: A String for the clouds configuration to use
+        :param interval: seconds to wait between polls
+        :param callback: (optional) function to call with each event
+        :param max_polls: (optional) number of times to run the query before stopping - polls forever by default
+        :param include_initial: if True, report every result of the first poll as "added"
+        :param kwargs: keyword args that can be used to configure details of how query is run
+            - valid kwargs specific to resource
+        """
+        if not cloud_account:
+            raise ParseQueryError("please provide cloud_account to watch query")
+        events = self._iter_watch(
+            cloud_account, interval, max_polls, include_initial, **kwargs
+        )
+        if callback is None:
+            return events
+        for event in events:
+            callback(event)
+        return None
+
+    def _iter_watch(
+        self,
+        cloud_account: str,
+        interval: float,
+        max_polls: Optional[int],
+        include_initial: bool,
+        **kwargs,
+    ) -> Iterator[ChangeEvent]:
+        """
+        Helper generator which polls the query and yields events for each poll
+        :param cloud_account: A String for the clouds configuration to use
+        :param interval: seconds to wait between polls
+        :param max_polls: number of times to run the query before stopping - or None to poll forever
+        :param include_initial: if True, yield events for every result of the first poll
+        :param kwargs: keyword args that can be used to configure details of how query is run
+        """
+        runner = self.executor.runner
+        incremental = not any(
+            self.builder.server_side_filters or []
+        ) and runner.supports_changes_since(None)
+        watcher = QueryWatcher()
+        since = None
+        polls = 0
+        while True:
+            high_water_mark = runner.get_high_water_mark() if incremental else None
+            keys = self._poll(cloud_account, since, **kwargs)
+            since = high_water_mark
+            events = watcher.update(
+                self.executor.get_keyed_props(
+                    self.results_container, self.output.selected_props
+                ),
+                keys,
+            )
+            if polls or include_initial:
+                yield from events
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                return
+            time.sleep(interval)
+
+    def _poll(
+        self, cloud_account: str, since: Optional[str], **kwargs
+    ) -> Optional[List[Hashable]]:
+        """
+        Helper method which runs the query for one poll of watch(). Returns None if the query was run in full -
+        else the markers of every resource changed since the timestamp given, which the query was run on
+        :param cloud_account: A String for the clouds configuration to use
+        :param since: timestamp to list changes since - or None to run the query in full
+        :param kwargs: keyword args that can be used to configure details of how query is run
+        """
+        if since is None:
+            self._run(cloud_account, None, stop_at_first=False, **kwargs)
+            return None
+
+        runner = self.executor.runner
+        changes = self.executor.run_changes_with_openstacksdk(
+            cloud_account, since, **kwargs
+        )
+        self.executor.run_with_subset(
+            subset=[change for change in changes if not runner.is_deleted(change)],
+            client_side_filters=self.builder.client_side_filters
+            + self.builder.server_filter_fallback,
+        )
+        link_prop, forwarded_vals = self.chainer.forwarded_info
+        if forwarded_vals:
+            self.executor.apply_forwarded_results(link_prop, deepcopy(forwarded_vals))
+        self.results_container = self.executor.results_container
+        return [runner.marker_prop_func(change) for change in changes]
+
+    def materialise(
+        self, name: str, cloud_account: str, interval: float = 300, **kwargs
+    ) -> MaterialisedView:
+        """
+        Public method that stores this query as a named materialised view - the summary (count and aggregated
+        values) of each group of results, refreshed in a background thread every interval seconds.
+        Returns the view, which has been started - it can also be found with MaterialisedView.get(name).
+        The query should not be changed or run once materialised
+        :param name: name of the view
+        :param cloud_account: A String for the clouds configuration to use
+        :param interval: seconds to wait between refreshes
+        :param kwargs: keyword args that can be used to configure details of how query is run
+            - valid kwargs specific to resource
+        """
+        return MaterialisedView(name, self, cloud_account, interval, **kwargs).start()
+
+    def diff(
+        self,
+        old: Union["QueryAPI", ResultsContainer, List[OpenstackResourceObj]],
+        new: Optional[
+            Union["QueryAPI", ResultsContainer, List[OpenstackResourceObj]]
+        ] = None,
+        key: Optional[Union[str, PropEnum]] = None,
+    ) -> ResultsDiff:
+        """
+        Public method that compares two sets of results by selected properties - i.e. yesterday's and today's -
+        and returns results added, removed and changed. Results are keyed by marker property (i.e. id) or by
+        the property given, and hashed in one pass over each side.
+        Each side can be a query that has been run, a results container, or a snapshot (or list) of openstack
+        objects to run this query's filters on
+        :param old: results before
+        :param new: results after - this query's results if not given
+        :param key: (optional) Enum or string alias of the property to key results by
+        """
+        return self.executor.diff_results(
+            self._get_diff_results(old),
+            self._get_diff_results(self if new is None else new),
+            self.output.selected_props,
+            key,
+            self.output,
+        )
+
+    def _get_diff_results(
+        self, results: Union["QueryAPI", ResultsContainer, List[OpenstackResourceObj]]
+    ) -> ResultsContainer:
+        """
+        Helper method which returns a container of results to compare with diff()
+        :param results: a query that has been run, a results container, or openstack objects to run this query's
+        filters on
+        """
+        if isinstance(results, QueryAPI):
+            if results.results_container is None:
+                raise ParseQueryError(
+                    "query must be run before its results can be used"
+                )
+            return results.results_container
+        if isinstance(results, ResultsContainer):
+            return results
+        return self.executor.get_subset_results(
+            results,
+            self.builder.client_side_filters + self.builder.server_filter_fallback,
+        )
+
     def then(
         self, query_type: Union[str, "QueryTypes"], keep_previous_results: bool = True
     ):
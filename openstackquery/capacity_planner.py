@@ -0,0 +1,198 @@
+import logging
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Union
+
+from openstackquery.aliases import OpenstackResourceObj
+from openstackquery.enums.props.flavor_properties import FlavorProperties
+from openstackquery.enums.props.hypervisor_properties import HypervisorProperties
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.columnar_output import ColumnarOutput
+from openstackquery.usage_history import (
+    get_query_resources,
+    get_service_host,
+    match_hosts,
+)
+
+if TYPE_CHECKING:
+    from openstackquery.api.query_api import QueryAPI
+
+logger = logging.getLogger(__name__)
+
+# resources available on each hypervisor - in the same order as the flavor sizes they are compared with
+AVAILABLE_PROPS = (
+    HypervisorProperties.VCPUS_AVAIL,
+    HypervisorProperties.MEMORY_MB_AVAIL,
+    HypervisorProperties.DISK_GB_AVAIL,
+)
+SIZE_PROPS = (
+    FlavorProperties.FLAVOR_VCPU,
+    FlavorProperties.FLAVOR_RAM,
+    FlavorProperties.FLAVOR_DISK,
+)
+
+
+class CapacityPlanner:
+    """
+    Class which works out how many more servers of each flavor fit on each hypervisor - from vcpus, memory and disk
+    available on hypervisors and the size of each flavor. The hypervisor x flavor matrix is computed by numpy
+    broadcasting (one step per resource), so the matrix for a whole cloud takes milliseconds - requires the numpy extra
+
+    planner = CapacityPlanner(
+        HypervisorQuery().run("prod"),
+        FlavorQuery().run("prod"),
+    )
+    planner.rollup(UsageHistory.get_aggregate_hosts(AggregateQuery().run("prod").to_objects()))
+    """
+
+    def __init__(
+        self,
+        hypervisors: Union["QueryAPI", Iterable[OpenstackResourceObj]],
+        flavors: Union["QueryAPI", Iterable[OpenstackResourceObj]],
+    ):
+        """
+        :param hypervisors: a HypervisorQuery that has been run, or hypervisor objects - servers are only placed on
+            these hypervisors
+        :param flavors: a FlavorQuery that has been run, or flavor objects
+        """
+        self._np = ColumnarOutput.import_optional("numpy", "numpy")
+        hypervisors = list(get_query_resources(hypervisors, "hypervisor"))
+        # compute service host of each hypervisor - to match hosts in aggregates with
+        self._service_hosts = [
+            get_service_host(hypervisor) for hypervisor in hypervisors
+        ]
+        self._hypervisor_names, self._available = self._read(
+            hypervisors,
+            HypervisorProperties.get_prop_mapping(HypervisorProperties.HYPERVISOR_NAME),
+            [HypervisorProperties.get_prop_mapping(prop) for prop in AVAILABLE_PROPS],
+        )
+        self._flavor_names, self._sizes = self._read(
+            get_query_resources(flavors, "flavor"),
+            FlavorProperties.get_prop_mapping(FlavorProperties.FLAVOR_NAME),
+            [FlavorProperties.get_prop_mapping(prop) for prop in SIZE_PROPS],
+        )
+        self._matrix = None
+
+    def _read(self, resources: Iterable[OpenstackResourceObj], name_func, funcs):
+        """
+        Helper method which returns the name of each resource and an array holding a row of values for each
+        resource - missing values are read as 0
+        :param resources: openstack objects to read
+        :param name_func: function which returns the name of a resource
+        :param funcs: functions which return each value of a resource
+        """
+        names, rows = [], []
+        for resource in resources:
+            names.append(name_func(resource))
+            rows.append([func(resource) or 0 for func in funcs])
+        values = self._np.array(rows, dtype=self._np.int64).reshape(-1, len(funcs))
+        return names, values
+
+    @property
+    def hypervisor_names(self) -> List[str]:
+        """
+        a getter method which returns names of hypervisors - in the order of rows of the fit matrix
+        """
+        return list(self._hypervisor_names)
+
+    @property
+    def flavor_names(self) -> List[str]:
+        """
+        a getter method which returns names of flavors - in the order of columns of the fit matrix
+        """
+        return list(self._flavor_names)
+
+    def get_fit_matrix(self):
+        """
+        method which returns an array of shape (hypervisors, flavors) holding how many more servers of each flavor
+        fit on each hypervisor - the smallest number that fit by vcpus, memory and disk. Resources a flavor doesn't
+        use (i.e. 0 disk for flavors booted from volume) are ignored - flavors which use no resources fit nowhere.
+        Computed once and re-used
+        """
+        if self._matrix is None:
+            np = self._np
+            available = np.clip(self._available, 0, None).astype(np.float64)
+            fits = np.full((len(available), len(self._sizes)), np.inf)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for resource in range(len(AVAILABLE_PROPS)):
+                    sizes = self._sizes[:, resource]
+                    # (hypervisors, 1) broadcast against (flavors,) - resources a flavor doesn't use don't limit it
+                    np.minimum(
+                        fits,
+                        np.where(
+                            sizes > 0,
+                            available[:, resource, np.newaxis] / sizes,
+                            np.inf,
+                        ),
+                        out=fits,
+                    )
+            fits[np.isinf(fits)] = 0
+            self._matrix = np.floor(fits).astype(np.int64)
+            logger.debug(
+                "computed fits of %s flavors on %s hypervisors",
+                len(self._flavor_names),
+                len(self._hypervisor_names),
+            )
+        return self._matrix
+
+    def _get_column(self, flavor: str) -> int:
+        """
+        Helper method which returns the column of a flavor in the fit matrix
+        :param flavor: name of flavor
+        """
+        try:
+            return self._flavor_names.index(flavor)
+        except ValueError as exp:
+            raise ParseQueryError(f"flavor {flavor} not found") from exp
+
+    def get_fits(self, flavor: str) -> Dict[str, int]:
+        """
+        method which returns how many more servers of a flavor fit on each hypervisor - by hypervisor name
+        :param flavor: name of flavor - i.e. "m1.xlarge"
+        """
+        column = self.get_fit_matrix()[:, self._get_column(flavor)]
+        return dict(zip(self._hypervisor_names, column.tolist()))
+
+    def get_totals(self, flavors: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        method which returns how many more servers of each flavor fit on all hypervisors - each flavor counted
+        on its own, as if no servers of other flavors are placed
+        :param flavors: an optional list of flavor names - every flavor if not given
+        """
+        totals = self.get_fit_matrix().sum(axis=0).tolist()
+        counts = dict(zip(self._flavor_names, totals))
+        if flavors is None:
+            return counts
+        return {flavor: totals[self._get_column(flavor)] for flavor in flavors}
+
+    def rollup(
+        self,
+        groups: Dict[str, Iterable[str]],
+        flavors: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        method which returns how many more servers of each flavor fit on hypervisors in each group (i.e. aggregate)
+        - totalled with one matrix multiplication. Hosts are matched to hypervisors by service host, hypervisor
+        name or short name - hosts which aren't hypervisors given are logged as a warning and ignored
+        :param groups: host names in each group - see UsageHistory.get_aggregate_hosts()
+        :param flavors: an optional list of flavor names - every flavor if not given
+        """
+        np = self._np
+        rows = {name: i for i, name in enumerate(self._hypervisor_names)}
+        groups = match_hosts(
+            groups, dict(zip(self._hypervisor_names, self._service_hosts))
+        )
+        membership = np.zeros((len(groups), len(rows)), dtype=np.int64)
+        for i, names in enumerate(groups.values()):
+            membership[i, [rows[name] for name in names]] = 1
+
+        totals = membership @ self.get_fit_matrix()
+        columns = (
+            list(range(len(self._flavor_names)))
+            if flavors is None
+            else [self._get_column(flavor) for flavor in flavors]
+        )
+        return {
+            group: {
+                self._flavor_names[column]: int(total[column]) for column in columns
+            }
+            for group, total in zip(groups, totals)
+        }
@@ -0,0 +1,29 @@
+from enum import auto
+from typing import Dict
+from openstackquery.enums.enum_with_aliases import EnumWithAliases
+
+# pylint: disable=too-few-public-methods
+
+
+class AggregateFunc(EnumWithAliases):
+    """
+    Enum class which holds enums for aggregate functions. Used to specify how to summarise
+    query results when using aggregate
+    """
+
+    COUNT = auto()
+    COUNT_DISTINCT = auto()
+    SUM = auto()
+    AVG = auto()
+    MIN = auto()
+    MAX = auto()
+
+    @staticmethod
+    def _get_aliases() -> Dict:
+        return {
+            AggregateFunc.COUNT_DISTINCT: ["distinct", "distinct_count", "nunique"],
+            AggregateFunc.SUM: ["total"],
+            AggregateFunc.AVG: ["average", "mean"],
+            AggregateFunc.MIN: ["minimum"],
+            AggregateFunc.MAX: ["maximum"],
+        }
@@ -0,0 +1,509 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - windows has no fcntl, entries aren't locked
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# header added to responses returned from the cache - "hit" or "revalidated"
+CACHE_HEADER = "X-Openstackquery-Cache"
+
+
+@dataclass
+class CachedResponse:
+    """
+    A response body stored in a DiskResponseCache - with the headers needed to revalidate it
+    """
+
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float
+    reason: str = "OK"
+
+    @property
+    def etag(self) -> Optional[str]:
+        """
+        a getter method which returns the ETag openstack sent with the response - if any
+        """
+        return self.get_header("ETag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        """
+        a getter method which returns the Last-Modified header openstack sent with the response - if any
+        """
+        return self.get_header("Last-Modified")
+
+    def get_header(self, name: str) -> Optional[str]:
+        """
+        method which returns a header openstack sent with the response - ignoring case
+        :param name: name of header
+        """
+        for key, value in self.headers.items():
+            if key.lower() == name.lower():
+                return value
+        return None
+
+    def is_fresh(self, ttl: float, now: float) -> bool:
+        """
+        method which returns True if the response was stored less than ttl seconds ago
+        :param ttl: seconds responses are used for without revalidating them
+        :param now: current time in seconds
+        """
+        return now - self.stored_at < ttl
+
+
+class DiskResponseCache:
+    """
+    Cache which stores openstack API responses as compressed files in a directory - so scripts that run again
+    and again (i.e. cron jobs) reuse listings fetched by earlier (or concurrent) processes.
+    Each entry is stored in its own file - written atomically and locked while it is being fetched so
+    concurrent processes wait for one fetch instead of all querying openstack
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = 300,
+        compress_level: int = 6,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        :param directory: directory to store responses in - created if it doesn't exist
+        :param ttl: seconds responses are used for before they are revalidated with openstack
+        :param compress_level: zlib compression level (1-9) to store responses with
+        :param clock: function which returns the current time in seconds
+        """
+        self._directory = os.path.expanduser(directory)
+        self._ttl = ttl
+        self._compress_level = compress_level
+        self._clock = clock
+        os.makedirs(self._directory, exist_ok=True)
+
+    @property
+    def ttl(self) -> float:
+        """
+        a getter method which returns seconds responses are used for without revalidating them
+        """
+        return self._ttl
+
+    def now(self) -> float:
+        """
+        method which returns the current time in seconds
+        """
+        return self._clock()
+
+    @staticmethod
+    def make_scope(cloud_name: str, auth: Optional[Dict] = None) -> str:
+        """
+        method which returns a hash identifying who responses were fetched as - so responses fetched with
+        different clouds, projects or users aren't shared. Passwords, secrets and tokens are not included
+        :param cloud_name: name of the cloud in clouds.yaml
+        :param auth: auth section of the cloud's configuration
+        """
+        scope = {
+            key: str(value)
+            for key, value in (auth or {}).items()
+            if not any(word in key for word in ("password", "secret", "token"))
+        }
+        scope["cloud"] = cloud_name
+        return hashlib.sha256(json.dumps(scope, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def normalise_url(url: str) -> str:
+        """
+        method which returns a url with its query params sorted - so the same listing always has the same key
+        :param url: url to normalise
+        """
+        parts = urlsplit(url)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ""))
+
+    def make_key(
+        self, scope: str, method: str, url: str, vary: Optional[Dict] = None
+    ) -> str:
+        """
+        method which returns the key a response is stored under
+        :param scope: hash from make_scope()
+        :param method: HTTP method of the request
+        :param url: url requested
+        :param vary: request headers which change the response - i.e. the API microversion
+        """
+        data = json.dumps(
+            [
+                scope,
+                method.upper(),
+                self.normalise_url(url),
+                sorted((vary or {}).items()),
+            ]
+        )
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        """
+        Helper method which returns the path an entry is stored at
+        :param key: key from make_key()
+        """
+        return os.path.join(self._directory, key[:2], key)
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        context manager which holds an exclusive lock on an entry across processes - other processes wait
+        for the lock before fetching the same response
+        :param key: key from make_key()
+        """
+        path = self._get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", "a", encoding="utf-8") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        method which returns a stored response - fresh or not - or None if none is stored or it can't be read
+        :param key: key from make_key()
+        """
+        try:
+            with open(self._get_path(key), "rb") as file:
+                data = zlib.decompress(file.read())
+            meta, body = data.split(b"\n", 1)
+            return CachedResponse(body=body, **json.loads(meta))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, zlib.error) as exp:
+            logger.warning("ignoring unreadable cached response %s: %s", key, exp)
+            return None
+
+    def set(self, key: str, response: CachedResponse):
+        """
+        method which stores a response - replacing any stored under the same key. The file is written
+        to a temporary file first so other processes never read a partly written entry
+        :param key: key from make_key()
+        :param response: response to store
+        """
+        meta = {
+            "url": response.url,
+            "status": response.status,
+            "headers": response.headers,
+            "stored_at": response.stored_at,
+            "reason": response.reason,
+        }
+        data = zlib.compress(
+            json.dumps(meta).encode() + b"\n" + response.body, self._compress_level
+        )
+        path = self._get_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def clear(self) -> int:
+        """
+        method which removes every stored response. Returns the number of responses removed
+        """
+        removed = 0
+        for root, _, files in os.walk(self._directory):
+            for name in files:
+                if not name.endswith((".lock", ".tmp")):
+                    removed += 1
+                os.unlink(os.path.join(root, name))
+        return removed
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """
+    requests transport adapter which answers GET requests for listings (collection endpoints) from a
+    DiskResponseCache - requests for single resources are always sent to openstack.
+    Fresh responses are returned without contacting openstack. Stale responses are revalidated - server
+    listings by fetching only servers changed since they were stored (using changes-since) and merging them in,
+    other responses with If-None-Match/If-Modified-Since using the ETag or Last-Modified openstack sent
+    """
+
+    # request headers which select a different response for the same url
+    VARY_HEADERS = ("Accept", "OpenStack-API-Version", "X-OpenStack-Nova-API-Version")
+
+    # response headers which no longer apply once a body has been decoded and stored
+    DROP_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+    # listing urls (path suffix -> key of resources in body) revalidated with changes-since
+    CHANGES_SINCE_LISTINGS = {"/servers/detail": "servers"}
+
+    # query params a listing can have and still be revalidated with changes-since - params which filter or
+    # sort listings can't be, as changed resources are merged in by id regardless of filters and order
+    CHANGES_SINCE_PARAMS = ("limit", "all_tenants")
+
+    # path segments which are the id of a single resource
+    ID_SEGMENT = re.compile(
+        r"^(\d+|[0-9a-f]{32}|[0-9a-f]{8}(-[0-9a-f]{4}){3}-[0-9a-f]{12})$", re.IGNORECASE
+    )
+    # path segments which are an API version - i.e. v2.1
+    VERSION_SEGMENT = re.compile(r"^v\d+(\.\d+)?$", re.IGNORECASE)
+
+    def __init__(
+        self, cache: DiskResponseCache, scope: str, clock_skew: float = 60, **kwargs
+    ):
+        """
+        :param cache: cache to store responses in
+        :param scope: hash from DiskResponseCache.make_scope() for the cloud responses are fetched from
+        :param clock_skew: seconds subtracted from changes-since timestamps - to allow for clocks on
+        different openstack hosts disagreeing
+        :param kwargs: passed to HTTPAdapter
+        """
+        super().__init__(**kwargs)
+        self._cache = cache
+        self._scope = scope
+        self._clock_skew = clock_skew
+
+    # pylint: disable=arguments-differ
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        """
+        method which returns a response for a request - from the cache if possible
+        :param request: request to send
+        :param kwargs: passed to HTTPAdapter.send
+        """
+        if request.method != "GET" or not self.is_listing(request.url):
+            return super().send(request, **kwargs)
+
+        vary = {
+            name: request.headers[name]
+            for name in self.VARY_HEADERS
+            if name in request.headers
+        }
+        key = self._cache.make_key(self._scope, request.method, request.url, vary)
+        with self._cache.lock(key):
+            cached = self._cache.get(key)
+            if cached and cached.is_fresh(self._cache.ttl, self._cache.now()):
+                logger.debug("using cached response for %s", request.url)
+                return self._build_cached_response(request, cached, "hit")
+
+            if cached:
+                revalidated = self._revalidate(request, cached, **kwargs)
+                if revalidated:
+                    self._cache.set(key, revalidated)
+                    return self._build_cached_response(
+                        request, revalidated, "revalidated"
+                    )
+
+            response = super().send(request, **kwargs)
+            if response.status_code == 200:
+                self._cache.set(key, self._to_cached(response))
+            return response
+
+    @classmethod
+    def is_listing(cls, url: str) -> bool:
+        """
+        method which returns True if a url lists a collection of resources (i.e. /servers/detail or /v3/projects)
+        - rather than getting a single resource, a resource's sub-resources or an API version document
+        :param url: url requested
+        """
+        segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+        if not segments:
+            return False
+        if segments[-1] == "detail":
+            return True
+        if cls.ID_SEGMENT.match(segments[-1]) or cls.VERSION_SEGMENT.match(
+            segments[-1]
+        ):
+            return False
+        # sub-resources of a single resource (i.e. /resource_providers/<id>/usages) aren't listings
+        return len(segments) < 2 or not cls.ID_SEGMENT.match(segments[-2])
+
+    def _to_cached(self, response: requests.Response) -> CachedResponse:
+        """
+        Helper method which converts a response from openstack into a CachedResponse
+        :param response: response to convert
+        """
+        return CachedResponse(
+            url=response.url,
+            status=response.status_code,
+            headers={
+                key: value
+                for key, value in response.headers.items()
+                if key.lower() not in self.DROP_HEADERS
+            },
+            body=response.content,
+            stored_at=self._cache.now(),
+            reason=response.reason or "OK",
+        )
+
+    def _build_cached_response(
+        self, request: requests.PreparedRequest, cached: CachedResponse, state: str
+    ) -> requests.Response:
+        """
+        Helper method which builds a response as if it came from openstack from a stored response
+        :param request: request being answered
+        :param cached: stored response
+        :param state: value of CACHE_HEADER - "hit" or "revalidated"
+        """
+        raw = HTTPResponse(
+            body=io.BytesIO(cached.body),
+            headers={**cached.headers, CACHE_HEADER: state},
+            status=cached.status,
+            reason=cached.reason,
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+    def _revalidate(
+        self, request: requests.PreparedRequest, cached: CachedResponse, **kwargs
+    ) -> Optional[CachedResponse]:
+        """
+        Helper method which checks a stale response with openstack - returning the up-to-date response to
+        store, or None if it must be fetched again in full
+        :param request: request being answered
+        :param cached: stale stored response
+        :param kwargs: passed to HTTPAdapter.send
+        """
+        resource_key = self._get_changes_since_key(request.url)
+        if resource_key:
+            return self._revalidate_changes_since(
+                request, cached, resource_key, **kwargs
+            )
+        if not cached.etag and not cached.last_modified:
+            return None
+
+        conditional = request.copy()
+        if cached.etag:
+            conditional.headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            conditional.headers["If-Modified-Since"] = cached.last_modified
+        response = super().send(conditional, **kwargs)
+        if response.status_code == 304:
+            response.close()
+            cached.stored_at = self._cache.now()
+            return cached
+        if response.status_code == 200:
+            return self._to_cached(response)
+        return None
+
+    def _get_changes_since_key(self, url: str) -> Optional[str]:
+        """
+        Helper method which returns the key of resources in the body of a listing that can be revalidated
+        with changes-since - or None if the url can't be. Only unfiltered, unsorted first pages can be - pages
+        after the first (marker), listings already using changes-since and filtered or sorted listings are
+        revalidated with ETag/Last-Modified or fetched again
+        :param url: url requested
+        """
+        parts = urlsplit(url)
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        if any(param not in self.CHANGES_SINCE_PARAMS for param in params):
+            return None
+        for suffix, resource_key in self.CHANGES_SINCE_LISTINGS.items():
+            if parts.path.rstrip("/").endswith(suffix):
+                return resource_key
+        return None
+
+    def _get_since(self, cached: CachedResponse) -> str:
+        """
+        Helper method which returns the time a stored response was fetched as an ISO-8601 timestamp - by
+        openstack's clock (the Date header) where available, less the allowed clock skew
+        :param cached: stored response
+        """
+        fetched_at = cached.stored_at
+        date = cached.get_header("Date")
+        if date:
+            try:
+                fetched_at = parsedate_to_datetime(date).timestamp()
+            except (TypeError, ValueError):
+                pass
+        return time.strftime(
+            "%Y-%m-%dT%H:%M:%SZ", time.gmtime(fetched_at - self._clock_skew)
+        )
+
+    def _revalidate_changes_since(
+        self,
+        request: requests.PreparedRequest,
+        cached: CachedResponse,
+        resource_key: str,
+        **kwargs,
+    ) -> Optional[CachedResponse]:
+        """
+        Helper method which fetches only the resources changed since a listing was stored - including
+        deleted ones - and merges them into the stored listing by id
+        :param request: request being answered
+        :param cached: stale stored listing
+        :param resource_key: key of resources in the body - i.e. "servers"
+        :param kwargs: passed to HTTPAdapter.send
+        """
+        try:
+            listing = json.loads(cached.body)
+        except ValueError:
+            return None
+        # listings spanning more than one page can't be merged into
+        if f"{resource_key}_links" in listing or resource_key not in listing:
+            return None
+
+        started_at = self._cache.now()
+        delta_request = request.copy()
+        parts = urlsplit(request.url)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        params.append(("changes-since", self._get_since(cached)))
+        delta_request.url = urlunsplit(parts._replace(query=urlencode(params)))
+
+        response = super().send(delta_request, **kwargs)
+        if response.status_code != 200:
+            return None
+        changes = response.json()
+        if f"{resource_key}_links" in changes:
+            return None
+
+        merged = {resource["id"]: resource for resource in listing[resource_key]}
+        for resource in changes.get(resource_key, []):
+            if str(resource.get("status", "")).upper() == "DELETED":
+                merged.pop(resource["id"], None)
+            else:
+                merged[resource["id"]] = resource
+        logger.debug(
+            "merged %s changed %s into cached listing",
+            len(changes.get(resource_key, [])),
+            resource_key,
+        )
+        listing[resource_key] = list(merged.values())
+        headers = {
+            key: value for key, value in cached.headers.items() if key.lower() != "date"
+        }
+        # the next changes-since is from when these changes were fetched
+        headers["Date"] = response.headers.get("Date") or formatdate(
+            started_at, usegmt=True
+        )
+        return CachedResponse(
+            url=cached.url,
+            status=cached.status,
+            headers=headers,
+            body=json.dumps(listing).encode(),
+            stored_at=started_at,
+            reason=cached.reason,
+        )
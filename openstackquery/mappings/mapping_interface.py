@@ -1,7 +1,7 @@
 from typing import Type
 from abc import ABC, abstractmethod
 
-from openstackquery.aliases import QueryChainMappings
+from openstackquery.aliases import QueryChainMappings, ServerSideSortMappings
 from openstackquery.enums.props.prop_enum import PropEnum
 from openstackquery.runners.runner_wrapper import RunnerWrapper
 
@@ -52,3 +52,12 @@ class MappingInterface(ABC):
         """
         Returns a mapping to associated Runner class for the Query
         """
+
+    @staticmethod
+    def get_server_side_sort_mappings() -> ServerSideSortMappings:
+        """
+        Should return a dictionary mapping properties to the sort key that the openstack API can sort by.
+        Used to push sort_by down to the openstack API - properties not mapped are only sorted client-side.
+        By default, no properties can be sorted server-side
+        """
+        return {}
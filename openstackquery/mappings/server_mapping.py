@@ -1,6 +1,6 @@
 from typing import Type
 
-from openstackquery.aliases import QueryChainMappings
+from openstackquery.aliases import QueryChainMappings, ServerSideSortMappings
 from openstackquery.enums.props.flavor_properties import FlavorProperties
 from openstackquery.enums.props.hypervisor_properties import HypervisorProperties
 from openstackquery.enums.props.image_properties import ImageProperties
@@ -120,6 +120,25 @@ class ServerMapping(MappingInterface):
             }
         )
 
+    @staticmethod
+    def get_server_side_sort_mappings() -> ServerSideSortMappings:
+        """
+        Return a dictionary mapping properties to the sort keys that conn.compute.servers() can sort by.
+        Only keys which are never null and which openstack orders the same way results are sorted client-side
+        are mapped - names, descriptions and hosts are sorted with database collation (i.e. case-insensitive) and
+        null values first, so listings sorted by them can't be merged and cut by limit()
+
+        valid sort keys documented here:
+            https://docs.openstack.org/api-ref/compute/?expanded=list-servers-detail#list-servers
+        """
+        return {
+            ServerProperties.SERVER_ID: "uuid",
+            ServerProperties.SERVER_CREATION_DATE: "created_at",
+            ServerProperties.SERVER_LAST_UPDATED_DATE: "updated_at",
+            ServerProperties.USER_ID: "user_id",
+            ServerProperties.PROJECT_ID: "project_id",
+        }
+
     @staticmethod
     def get_client_side_handler() -> ClientSideHandler:
         """
@@ -0,0 +1,415 @@
+import json
+import logging
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from openstackquery.enums.query_types import QueryTypes
+from openstackquery.runners.runner_wrapper import RunnerWrapper
+from openstackquery.structs.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+# a raw notification read from a source - a json string or decoded dict
+RawNotification = Union[str, bytes, Dict[str, Any]]
+
+
+class NotificationSource(ABC):
+    """
+    Interface for sources of openstack notifications - i.e. an oslo.messaging notification queue.
+    Subclass this to consume notifications from a message bus - iterating a source yields raw notifications
+    (json strings or dicts) until the source is exhausted or closed
+    """
+
+    def __init__(self):
+        self._closed = threading.Event()
+
+    @property
+    def closed(self) -> bool:
+        """
+        a getter method which returns True if the source has been closed
+        """
+        return self._closed.is_set()
+
+    def close(self):
+        """
+        method which stops the source yielding notifications
+        """
+        self._closed.set()
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[RawNotification]:
+        """
+        method which yields raw notifications
+        """
+
+
+class FileNotificationSource(NotificationSource):
+    """
+    Source which reads notifications from a file with one json notification per line - i.e. notifications
+    recorded with oslo.messaging's log driver. Useful for testing and replaying notifications
+    """
+
+    def __init__(
+        self, fp: Union[str, IO], follow: bool = False, poll_interval: float = 1
+    ):
+        """
+        :param fp: a file path - or a file object opened in text mode
+        :param follow: if True, keep waiting for lines written to the file (like tail -f) until closed
+        :param poll_interval: seconds to wait for new lines when following
+        """
+        super().__init__()
+        self._fp = fp
+        self._follow = follow
+        self._poll_interval = poll_interval
+
+    def _iter_lines(self, file: IO) -> Iterator[str]:
+        """
+        Helper method which yields lines of a file - waiting for new lines if following
+        :param file: file object to read
+        """
+        while not self.closed:
+            line = file.readline()
+            if line:
+                if line.strip():
+                    yield line
+                continue
+            if not self._follow:
+                return
+            self._closed.wait(self._poll_interval)
+
+    def __iter__(self) -> Iterator[RawNotification]:
+        if not isinstance(self._fp, str):
+            yield from self._iter_lines(self._fp)
+            return
+        with open(self._fp, "r", encoding="utf-8") as file:
+            yield from self._iter_lines(file)
+
+
+class QueueNotificationSource(NotificationSource):
+    """
+    Source which reads notifications from a queue - i.e. one filled by a message bus listener in another thread.
+    Stops when None is put on the queue, once notifications put before it was closed are read, or if timeout is set,
+    when no notification arrives in time
+    """
+
+    def __init__(
+        self, notifications: Optional[queue.Queue] = None, timeout: float = None
+    ):
+        """
+        :param notifications: queue to read from - a new queue is made if not given
+        :param timeout: an optional number of seconds to wait for each notification
+        """
+        super().__init__()
+        self.queue = notifications if notifications is not None else queue.Queue()
+        self._timeout = timeout
+
+    def put(self, notification: RawNotification):
+        """
+        method which adds a notification to the queue
+        :param notification: raw notification to add
+        """
+        self.queue.put(notification)
+
+    def close(self):
+        super().close()
+        # wake up a consumer waiting for the next notification
+        self.queue.put(None)
+
+    def __iter__(self) -> Iterator[RawNotification]:
+        # notifications put before the source is closed are still yielded
+        while True:
+            try:
+                notification = self.queue.get(timeout=self._timeout)
+            except queue.Empty:
+                return
+            if notification is None:
+                return
+            yield notification
+
+
+# a function which takes a consumer and a notification, and updates cached listings for it
+NotificationHandler = Callable[["NotificationConsumer", Notification], None]
+
+
+class NotificationConsumer:
+    """
+    Class which keeps cached listings fresh from openstack notifications - so listings can be cached with long
+    TTLs. Each notification is mapped by event type to a resource type - resources deleted are removed from
+    cached listings by marker (i.e. id), and listings of resources created or changed are expired (listings of
+    servers are refreshed incrementally using changes-since).
+    Listings are kept in the runner cache (see RunnerWrapper.set_cache) and in any InventorySessions given.
+    Handlers for other event types can be added with register()
+
+    consumer = NotificationConsumer("prod")
+    consumer.start(FileNotificationSource("notifications.log", follow=True))
+    """
+
+    # event type prefix -> (resource type, payload keys the resource's marker (i.e. id) may be under)
+    DEFAULT_RULES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+        "compute.instance.": ("server", ("instance_id", "uuid")),
+        "instance.": ("server", ("uuid", "instance_id")),
+        "identity.project.": ("project", ("resource_info", "id")),
+        "identity.user.": ("user", ("resource_info", "id")),
+        "flavor.": ("flavor", ("flavorid", "flavor_id", "id")),
+        "image.": ("image", ("id",)),
+        "aggregate.": ("aggregate", ("aggregate_id", "id")),
+    }
+
+    # resource types whose listings also change when resources of a type change - i.e. hypervisor usage
+    RELATED_RESOURCE_TYPES: Dict[str, Tuple[str, ...]] = {
+        "server": ("hypervisor",),
+    }
+
+    def __init__(
+        self,
+        cloud_account: Optional[str] = None,
+        sessions: Optional[List] = None,
+        use_default_rules: bool = True,
+    ):
+        """
+        :param cloud_account: cloud account notifications are from - if not given, listings of every cloud
+            account are updated
+        :param sessions: an optional list of InventorySessions to keep fresh as well as the runner cache
+        :param use_default_rules: if True, handle notifications of event types in DEFAULT_RULES
+        """
+        self._cloud_account = cloud_account
+        self._sessions = list(sessions or [])
+        self._handlers: Dict[str, NotificationHandler] = {}
+        if use_default_rules:
+            for prefix, (resource_type, marker_keys) in self.DEFAULT_RULES.items():
+                self.register(prefix, self.make_handler(resource_type, marker_keys))
+        self._thread: Optional[threading.Thread] = None
+        self._source: Optional[NotificationSource] = None
+        self.handled = 0
+        self.ignored = 0
+
+    def register(self, prefix: str, handler: NotificationHandler):
+        """
+        method which adds (or replaces) the handler for notifications with event types starting with a prefix.
+        The handler with the longest matching prefix handles each notification
+        :param prefix: event type prefix - i.e. "compute.instance."
+        :param handler: function which takes the consumer and a notification - and updates cached listings
+            with the consumer's expire() and remove_resources() methods
+        """
+        self._handlers[prefix] = handler
+
+    @classmethod
+    def make_handler(
+        cls, resource_type: str, marker_keys: Tuple[str, ...]
+    ) -> NotificationHandler:
+        """
+        method which returns a handler which removes resources of a type from listings when they are deleted,
+        and expires listings when resources are created or changed
+        :param resource_type: resource type notifications are about - i.e. "server"
+        :param marker_keys: payload keys the resource's marker (i.e. id) may be under - the first found is used
+        """
+
+        def _handler(consumer: "NotificationConsumer", notification: Notification):
+            marker = cls.get_marker(notification.payload, marker_keys)
+            if marker is not None and cls.is_delete(notification.event_type):
+                consumer.remove_resources(resource_type, [marker])
+            else:
+                consumer.expire(resource_type)
+            for related_type in cls.RELATED_RESOURCE_TYPES.get(resource_type, ()):
+                consumer.expire(related_type)
+
+        return _handler
+
+    @staticmethod
+    def get_marker(payload: Dict[str, Any], marker_keys: Tuple[str, ...]) -> Any:
+        """
+        method which returns the marker (i.e. id) of the resource a notification is about - or None if not found
+        :param payload: notification payload
+        :param marker_keys: payload keys the marker may be under
+        """
+        for key in marker_keys:
+            if payload.get(key) is not None:
+                return payload[key]
+        return None
+
+    @staticmethod
+    def is_delete(event_type: str) -> bool:
+        """
+        method which returns True if a notification is about a resource being deleted
+        :param event_type: event type of notification - i.e. "compute.instance.delete.end"
+        """
+        return any(
+            part in ("delete", "deleted", "soft_delete")
+            for part in event_type.split(".")
+        )
+
+    @staticmethod
+    def is_in_progress(event_type: str) -> bool:
+        """
+        method which returns True if a notification is sent at the start of an action - the resource has not
+        changed yet, so these notifications are ignored
+        :param event_type: event type of notification - i.e. "compute.instance.create.start"
+        """
+        return event_type.endswith(".start")
+
+    @staticmethod
+    def parse(message: RawNotification) -> Optional[Notification]:
+        """
+        method which parses a raw notification - unwrapping oslo.messaging envelopes and versioned notification
+        payloads. Returns None if the message is not a notification
+        :param message: a json string or decoded dict
+        """
+        try:
+            if isinstance(message, (str, bytes)):
+                message = json.loads(message)
+            # oslo.messaging wraps notifications sent over the bus in an envelope
+            if "oslo.message" in message:
+                message = json.loads(message["oslo.message"])
+        except (TypeError, ValueError):
+            logger.warning("could not decode notification: %s", message)
+            return None
+        if not isinstance(message, dict) or not message.get("event_type"):
+            return None
+
+        payload = message.get("payload") or {}
+        # versioned notifications hold their payload in a versioned object
+        if isinstance(payload, dict) and "nova_object.data" in payload:
+            payload = payload["nova_object.data"]
+        return Notification(
+            event_type=message["event_type"],
+            payload=payload if isinstance(payload, dict) else {},
+            publisher_id=message.get("publisher_id"),
+            timestamp=message.get("timestamp"),
+            message_id=message.get("message_id"),
+        )
+
+    def get_handler(self, event_type: str) -> Optional[NotificationHandler]:
+        """
+        method which returns the handler for notifications of an event type - or None if there isn't one
+        :param event_type: event type of notification - i.e. "compute.instance.update"
+        """
+        prefixes = [
+            prefix for prefix in self._handlers if event_type.startswith(prefix)
+        ]
+        if not prefixes:
+            return None
+        return self._handlers[max(prefixes, key=len)]
+
+    def handle(self, message: Union[RawNotification, Notification]) -> bool:
+        """
+        method which updates cached listings for a notification. Returns True if the notification was handled
+        :param message: a notification - or a raw notification to parse
+        """
+        notification = (
+            message if isinstance(message, Notification) else self.parse(message)
+        )
+        handler = None
+        if notification and not self.is_in_progress(notification.event_type):
+            handler = self.get_handler(notification.event_type)
+        if handler is None:
+            self.ignored += 1
+            return False
+        logger.debug("handling %s notification", notification.event_type)
+        handler(self, notification)
+        self.handled += 1
+        return True
+
+    def _get_targets(self) -> List:
+        """
+        Helper method which returns the runner cache (if set) and sessions holding listings to update
+        """
+        cache = RunnerWrapper.get_cache()
+        return ([cache] if cache is not None else []) + self._sessions
+
+    def expire(self, resource_type: str) -> int:
+        """
+        method which expires listings of a resource type - so they are listed (or refreshed) again the next
+        time they are needed. Returns the number of listings expired
+        :param resource_type: resource type - i.e. "server"
+        """
+        return sum(
+            target.expire(self._cloud_account, resource_type)
+            for target in self._get_targets()
+        )
+
+    def remove_resources(self, resource_type: str, markers: List[Hashable]) -> int:
+        """
+        method which removes resources from listings of a resource type by marker (i.e. id) - using the same
+        marker property runners use. Returns the number of resources removed
+        :param resource_type: resource type - i.e. "server"
+        :param markers: markers of resources to remove
+        """
+        marker_func = (
+            QueryTypes.from_string(resource_type)
+            .value.get_prop_mapping()
+            .get_marker_prop_func()
+        )
+        return sum(
+            target.remove_resources(
+                resource_type, markers, marker_func, self._cloud_account
+            )
+            for target in self._get_targets()
+        )
+
+    def consume(
+        self, source: Iterator[RawNotification], max_notifications: Optional[int] = None
+    ) -> int:
+        """
+        method which handles notifications from a source until it is exhausted. Returns the number of
+        notifications handled
+        :param source: a NotificationSource - or any iterable of raw notifications
+        :param max_notifications: an optional number of notifications to read before returning
+        """
+        start, handled = time.time(), self.handled
+        for count, message in enumerate(source, start=1):
+            try:
+                self.handle(message)
+            # a bad notification shouldn't stop listings being kept fresh
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("failed to handle notification: %s", message)
+            if max_notifications is not None and count >= max_notifications:
+                break
+        logger.debug(
+            "handled %s notifications in %0.4f seconds",
+            self.handled - handled,
+            time.time() - start,
+        )
+        return self.handled - handled
+
+    def start(self, source: NotificationSource) -> "NotificationConsumer":
+        """
+        method which starts handling notifications from a source in a background thread
+        :param source: source of notifications
+        """
+        if self._thread is not None and self._thread.is_alive():
+            raise RuntimeError("notification consumer is already running")
+        self._source = source
+        self._thread = threading.Thread(
+            target=self.consume,
+            args=(source,),
+            name="notification-consumer",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        method which closes the source notifications are handled from and waits for the background thread to
+        stop
+        :param timeout: an optional number of seconds to wait for
+        """
+        if self._source is not None:
+            self._source.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = self._source = None
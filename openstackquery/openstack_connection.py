@@ -1,6 +1,10 @@
+from typing import Optional
+
 from openstack.connection import Connection
 from openstack import connect
 
+from openstackquery.http_cache import CachingHTTPAdapter, DiskResponseCache
+
 
 class OpenstackConnection:
     """
@@ -10,6 +14,9 @@ class OpenstackConnection:
             name.<openstack_api>.method()
     """
 
+    # on-disk cache GET responses from all connections are kept in - None if responses aren't cached
+    _http_cache: Optional[DiskResponseCache] = None
+
     def __init__(self, cloud_name: str):
         """
         Starts a connection with the Openstack API when used in a context manager
@@ -18,12 +25,45 @@ class OpenstackConnection:
         self._cloud_name = cloud_name.strip() if cloud_name else None
         self._connection = None
 
+    @staticmethod
+    def set_http_cache(cache: Optional[DiskResponseCache]):
+        """
+        Sets the on-disk cache responses to GET requests from all connections are kept in -
+        or disables caching if None
+        :param cache: a DiskResponseCache object to use
+        """
+        OpenstackConnection._http_cache = cache
+
+    @staticmethod
+    def get_http_cache() -> Optional[DiskResponseCache]:
+        """
+        Returns the on-disk cache responses are kept in - None if caching is disabled
+        """
+        return OpenstackConnection._http_cache
+
+    def _mount_http_cache(self, cache: DiskResponseCache):
+        """
+        Helper method which routes requests made by the connection through the on-disk cache.
+        Responses are scoped to the cloud and the auth details (without secrets) used to fetch them
+        :param cache: cache to keep responses in
+        """
+        auth = self._connection.config.config.get("auth", {})
+        adapter = CachingHTTPAdapter(
+            cache, DiskResponseCache.make_scope(self._cloud_name, auth)
+        )
+        session = self._connection.session.session
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
     def __enter__(self) -> Connection:
         if not self._cloud_name:
             # If we don't provide a cloud name (or an empty one), Openstack will
             # default to env vars, which may be a security problem if they are incorrectly set
             raise RuntimeError("A cloud name is required but was not provided.")
         self._connection = connect(cloud=self._cloud_name)
+        cache = self.get_http_cache()
+        if cache is not None:
+            self._mount_http_cache(cache)
         return self._connection
 
     def __exit__(self, exc_type, exc_val, exc_tb):
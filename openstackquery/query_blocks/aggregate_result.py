@@ -0,0 +1,25 @@
+from typing import Dict
+from openstackquery.aliases import PropValue
+from openstackquery.enums.props.prop_enum import PropEnum
+
+
+class AggregateResult:
+    """
+    Class that holds a single row of aggregated values - i.e. the sum/avg/count etc of a set of results.
+    It outputs like a Result so that aggregated results can be outputted using any output method
+    """
+
+    def __init__(self, values: Dict[str, PropValue]):
+        self._values = values
+
+    def as_object(self) -> Dict[str, PropValue]:
+        """
+        return aggregated values - there is no openstack object for an aggregated row
+        """
+        return dict(self._values)
+
+    def as_props(self, *_: PropEnum) -> Dict[str, PropValue]:
+        """
+        return aggregated values - selected properties are ignored since aggregated values are always outputted
+        """
+        return dict(self._values)
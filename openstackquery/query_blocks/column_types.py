@@ -0,0 +1,121 @@
+import json
+from datetime import datetime, timezone
+from enum import Enum, auto
+from typing import Any, Iterable, List
+
+# pylint: disable=too-few-public-methods
+
+# format openstack timestamps are returned in
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+class ColumnType(Enum):
+    """
+    Enum class which holds the types a column of property values can be exported as - used by typed
+    (columnar or database) outputs. Property enums hold no type information, so column types are inferred
+    from the values in each column
+    """
+
+    INTEGER = auto()
+    FLOAT = auto()
+    BOOLEAN = auto()
+    TIMESTAMP = auto()
+    STRING = auto()
+
+    @staticmethod
+    def is_missing(value: Any, missing_value: Any = None) -> bool:
+        """
+        method which returns True if a value represents a missing property
+        :param value: value to check
+        :param missing_value: value outputted when a property is not found - i.e. "Not Found"
+        """
+        return value is None or (
+            missing_value is not None
+            and isinstance(value, str)
+            and value == missing_value
+        )
+
+    @staticmethod
+    def _get_value_type(value: Any) -> "ColumnType":
+        """
+        Helper method which returns the column type of a single (non-missing) value
+        :param value: value to check
+        """
+        if isinstance(value, bool):
+            return ColumnType.BOOLEAN
+        if isinstance(value, int):
+            return ColumnType.INTEGER
+        if isinstance(value, float):
+            return ColumnType.FLOAT
+        if isinstance(value, str):
+            try:
+                datetime.strptime(value, TIMESTAMP_FORMAT)
+                return ColumnType.TIMESTAMP
+            except ValueError:
+                return ColumnType.STRING
+        return ColumnType.STRING
+
+    @classmethod
+    def infer(cls, values: Iterable[Any], missing_value: Any = None) -> "ColumnType":
+        """
+        method which finds the type of a column from its values - missing values are ignored.
+        Columns holding integers and floats are FLOAT, columns holding any other mix of types are STRING
+        :param values: values in the column
+        :param missing_value: value outputted when a property is not found - i.e. "Not Found"
+        """
+        found = set()
+        for value in values:
+            if cls.is_missing(value, missing_value):
+                continue
+            found.add(cls._get_value_type(value))
+            if len(found) > 2:
+                return ColumnType.STRING
+
+        if len(found) == 1:
+            return found.pop()
+        if found == {ColumnType.INTEGER, ColumnType.FLOAT}:
+            return ColumnType.FLOAT
+        return ColumnType.STRING
+
+    def convert(self, values: Iterable[Any], missing_value: Any = None) -> List[Any]:
+        """
+        method which converts values in a column to this type - missing values are converted to None,
+        timestamps to timezone-aware datetimes and lists or dicts to json strings
+        :param values: values in the column
+        :param missing_value: value outputted when a property is not found - i.e. "Not Found"
+        """
+        is_missing = self.is_missing
+        if self == ColumnType.TIMESTAMP:
+            return [
+                (
+                    None
+                    if is_missing(value, missing_value)
+                    else datetime.strptime(value, TIMESTAMP_FORMAT).replace(
+                        tzinfo=timezone.utc
+                    )
+                )
+                for value in values
+            ]
+        if self == ColumnType.FLOAT:
+            return [
+                None if is_missing(value, missing_value) else float(value)
+                for value in values
+            ]
+        if self == ColumnType.STRING:
+            return [
+                None if is_missing(value, missing_value) else self._to_str(value)
+                for value in values
+            ]
+        return [None if is_missing(value, missing_value) else value for value in values]
+
+    @staticmethod
+    def _to_str(value: Any) -> str:
+        """
+        Helper method to convert a value into a string - lists and dicts are converted to json
+        :param value: value to convert
+        """
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (list, dict, tuple)):
+            return json.dumps(value, default=str)
+        return str(value)
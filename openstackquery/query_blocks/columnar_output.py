@@ -0,0 +1,121 @@
+import importlib
+import os
+from typing import IO, Any, List, Optional, Tuple, Union
+
+from openstackquery.aliases import PropValue
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.column_types import ColumnType
+
+
+class ColumnarOutput:
+    """
+    Helper class for exporting columns of query results to Apache Arrow - and from there to pandas, polars
+    or parquet. These libraries are optional - they are imported only when needed and can be installed with
+    the "arrow", "pandas" or "polars" extras (i.e. pip install openstackquery[pandas])
+    """
+
+    def __init__(self, missing_value: Any = None, dictionary_threshold: float = 0.5):
+        """
+        :param missing_value: value outputted when a property is not found - exported as null
+        :param dictionary_threshold: string columns with at most this ratio of distinct values to rows are
+        dictionary encoded (i.e. status) - set to 0 to disable dictionary encoding
+        """
+        if not 0 <= dictionary_threshold <= 1:
+            raise ParseQueryError(
+                f"Error: dictionary_threshold ({dictionary_threshold}) must be between 0 and 1"
+            )
+        self._missing_value = missing_value
+        self._dictionary_threshold = dictionary_threshold
+
+    @staticmethod
+    def import_optional(module_name: str, extra: str):
+        """
+        method which imports an optional library - raising an ImportError naming the extra to install
+        if it is not installed
+        :param module_name: name of module to import
+        :param extra: name of the openstackquery extra that installs the module
+        """
+        try:
+            return importlib.import_module(module_name)
+        except ImportError as exp:
+            raise ImportError(
+                f"{module_name} is required for this output - "
+                f"install it with 'pip install openstackquery[{extra}]'"
+            ) from exp
+
+    def _to_array(self, pa, values: List[PropValue]):
+        """
+        Helper method which converts a column of values into a typed arrow array
+        :param pa: pyarrow module
+        :param values: values in the column
+        """
+        column_type = ColumnType.infer(values, self._missing_value)
+        converted = column_type.convert(values, self._missing_value)
+        arrow_types = {
+            ColumnType.INTEGER: pa.int64(),
+            ColumnType.FLOAT: pa.float64(),
+            ColumnType.BOOLEAN: pa.bool_(),
+            ColumnType.TIMESTAMP: pa.timestamp("s", tz="UTC"),
+            ColumnType.STRING: pa.string(),
+        }
+        array = pa.array(converted, type=arrow_types[column_type])
+        if column_type == ColumnType.STRING and self._is_low_cardinality(converted):
+            return array.dictionary_encode()
+        return array
+
+    def _is_low_cardinality(self, values: List[Optional[str]]) -> bool:
+        """
+        Helper method which returns True if a string column should be dictionary encoded
+        :param values: values in the column
+        """
+        if not values or not self._dictionary_threshold:
+            return False
+        return len(set(values)) <= len(values) * self._dictionary_threshold
+
+    def to_arrow(
+        self,
+        header: Tuple[str, ...],
+        columns: List[List[PropValue]],
+        group_labels: Optional[List[str]] = None,
+    ):
+        """
+        method which builds an arrow table one column at a time
+        :param header: name of each column
+        :param columns: values of each column
+        :param group_labels: an optional group name for each row - added as a "group" column
+        """
+        pa = self.import_optional("pyarrow", "arrow")
+        names = list(header)
+        arrays = [self._to_array(pa, column) for column in columns]
+        if group_labels is not None:
+            names.append("group")
+            arrays.append(self._to_array(pa, group_labels))
+        return pa.Table.from_arrays(arrays, names=names)
+
+    def to_pandas(self, table):
+        """
+        method which converts an arrow table into a pandas DataFrame
+        :param table: arrow table to convert
+        """
+        self.import_optional("pandas", "pandas")
+        return table.to_pandas()
+
+    def to_polars(self, table):
+        """
+        method which converts an arrow table into a polars DataFrame - without copying where possible
+        :param table: arrow table to convert
+        """
+        pl = self.import_optional("polars", "polars")
+        return pl.from_arrow(table)
+
+    def write_parquet(
+        self, table, fp: Union[str, os.PathLike, IO], compression: str = "snappy"
+    ):
+        """
+        method which writes an arrow table to a parquet file
+        :param table: arrow table to write
+        :param fp: a file path - or a file object opened in binary mode
+        :param compression: compression codec to use - i.e. "snappy", "zstd", "gzip" or "none"
+        """
+        pq = self.import_optional("pyarrow.parquet", "arrow")
+        pq.write_table(table, fp, compression=compression)
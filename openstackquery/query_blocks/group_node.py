@@ -0,0 +1,114 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from openstackquery.aliases import PropValue
+
+
+class GroupNode:
+    """
+    Class that holds one group in a tree of nested groups (i.e. project -> status -> flavor).
+    Inner nodes hold child groups, leaf nodes hold the results in the group. Every node keeps a count of
+    results in it, a set of aggregate accumulators (if results are aggregated) and a summary of both
+    """
+
+    __slots__ = (
+        "children",
+        "results",
+        "count",
+        "accumulators",
+        "summary",
+        "_levels",
+        "_new_accumulators",
+    )
+
+    def __init__(
+        self,
+        levels: List[List[PropValue]],
+        new_accumulators: Optional[Callable[[], List]] = None,
+    ):
+        """
+        :param levels: for each level of groups below this node - names of groups that must always be created
+        (i.e. user-defined group ranges). An empty list means this node is a leaf
+        :param new_accumulators: an optional function that returns a new set of aggregate accumulators
+        """
+        self._levels = levels
+        self._new_accumulators = new_accumulators
+        self.count = 0
+        self.accumulators = new_accumulators() if new_accumulators else None
+        self.summary: Dict[str, PropValue] = {}
+        self.children: Optional[Dict[PropValue, "GroupNode"]] = None
+        self.results: Optional[List] = None
+        if not levels:
+            self.results = []
+            return
+
+        self.children = {}
+        for name in levels[0]:
+            self.get_child(name)
+
+    def __bool__(self) -> bool:
+        """
+        a node is empty if it holds no child groups or results
+        """
+        return bool(self.children if self.results is None else self.results)
+
+    @property
+    def is_leaf(self) -> bool:
+        """
+        a getter method which returns True if this node holds results instead of child groups
+        """
+        return self.results is not None
+
+    def get_child(self, name: PropValue) -> "GroupNode":
+        """
+        method which returns child group with given name - creating it if it doesn't exist
+        :param name: name of child group
+        """
+        child = self.children.get(name)
+        if child is None:
+            child = self.children[name] = GroupNode(
+                self._levels[1:], self._new_accumulators
+            )
+        return child
+
+    def walk(
+        self, path: Tuple[PropValue, ...] = ()
+    ) -> Iterator[Tuple[Tuple[PropValue, ...], "GroupNode"]]:
+        """
+        method which yields each node in the tree (depth-first, parent before children) along with the path of
+        group names to reach it. Child groups are read after the parent has been yielded - so they can be
+        re-ordered by the caller
+        :param path: path of group names to this node
+        """
+        yield path, self
+        if self.children:
+            for name, child in self.children.items():
+                yield from child.walk((*path, name))
+
+    def to_dict(
+        self, leaf_func: Callable[[List], Any], include_summaries: bool = False
+    ) -> Dict:
+        """
+        method which returns the tree as nested dictionaries of group name to child groups - with each leaf group
+        converted using leaf_func.
+        :param leaf_func: function which takes a list of results in a leaf group and returns its output
+        :param include_summaries: if True, each group is outputted as a dictionary holding its "summary"
+        (count and aggregated values) and either its child "groups" or "results"
+        """
+        res = {}
+        for name, child in self.children.items():
+            if child.is_leaf:
+                out = leaf_func(child.results)
+                key = "results"
+            else:
+                out = child.to_dict(leaf_func, include_summaries)
+                key = "groups"
+            res[name] = (
+                {"summary": dict(child.summary), key: out} if include_summaries else out
+            )
+        return res
+
+    def get_summaries(self) -> Dict[Tuple[PropValue, ...], Dict[str, PropValue]]:
+        """
+        method which returns the summary of each group in the tree - keyed by path of group names
+        """
+        return {path: dict(node.summary) for path, node in self.walk() if path}
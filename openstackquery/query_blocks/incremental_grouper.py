@@ -0,0 +1,198 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from openstackquery.aliases import PropValue
+from openstackquery.enums.aggregate_func import AggregateFunc
+from openstackquery.enums.props.prop_enum import PropEnum
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.query_aggregator import QueryAggregator
+from openstackquery.query_blocks.query_parser import QueryParser
+from openstackquery.query_blocks.result import Result
+
+# path of group names to a group - () if results aren't grouped
+GroupPath = Tuple[PropValue, ...]
+
+
+# pylint: disable=too-many-instance-attributes
+class IncrementalGrouper:
+    """
+    Helper class which keeps the summary (count and aggregated values) of each group of a query's results
+    up-to-date as results are added, changed or removed - so only groups holding results that changed are
+    re-computed. Results are grouped and aggregated as set by group_by(), subgroup_by() and aggregate().
+    Summaries are keyed by path of group names - like ResultsContainer.get_group_summaries() - or by () if
+    results aren't grouped
+    """
+
+    def __init__(self, parser: QueryParser, key_func: Callable[[Result], Hashable]):
+        """
+        :param parser: parser holding grouping and aggregations set on the query
+        :param key_func: function which returns the key of a result (i.e. its id)
+        """
+        groupers = parser.groupers
+        self._group_names_funcs = [
+            grouper.get_group_names_func() for grouper in groupers
+        ]
+        # groups always outputted - even when empty
+        self._initial_paths = (
+            [(name,) for name in groupers[0].initial_group_names] if groupers else [()]
+        )
+        aggregator = parser.aggregator if parser.has_aggregations else None
+        self._aggregations: List[Tuple[AggregateFunc, Optional[PropEnum]]] = (
+            aggregator.aggregations if aggregator else []
+        )
+        self._get_values = aggregator.get_values_func() if aggregator else None
+        # aggregator reads each unique property once - in the order they were first aggregated
+        props = list(
+            dict.fromkeys(prop for _, prop in self._aggregations if prop is not None)
+        )
+        self._value_indexes = [
+            None if prop is None else props.index(prop)
+            for _, prop in self._aggregations
+        ]
+        self._key_func = key_func
+
+        # key -> (paths of groups the result is in, aggregated values)
+        self._members: Dict[Hashable, Tuple[Tuple[GroupPath, ...], List[Any]]] = {}
+        # path -> [count, accumulators]
+        self._groups: Dict[GroupPath, List] = {}
+        self._summaries: Dict[GroupPath, Dict[str, PropValue]] = {}
+        self.reset([])
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    @property
+    def summaries(self) -> Dict[GroupPath, Dict[str, PropValue]]:
+        """
+        a getter method which returns the summary of each group - keyed by path of group names.
+        A new dictionary is made each time results change, so the dictionary returned is never changed
+        """
+        return self._summaries
+
+    def _get_paths(self, item: Result) -> Tuple[GroupPath, ...]:
+        """
+        Helper method which returns the path of each group (and parent group) a result is in
+        :param item: result to get paths for
+        """
+        if not self._group_names_funcs:
+            return ((),)
+        paths, all_paths = [()], []
+        for group_names_func in self._group_names_funcs:
+            paths = [
+                path + (name,) for path in paths for name in group_names_func(item)
+            ]
+            all_paths.extend(paths)
+        return tuple(dict.fromkeys(all_paths))
+
+    def _new_group(self) -> List:
+        """
+        Helper method which returns a group holding no results
+        """
+        return [
+            0,
+            [
+                QueryAggregator.REVERSIBLE_ACCUMULATORS[func]()
+                for func, _ in self._aggregations
+            ],
+        ]
+
+    def _iter_values(self, values: List[Any]):
+        """
+        Helper method which yields each accumulator's index, value and property for a result's values.
+        Missing values (None) are skipped
+        :param values: values of each aggregated property for a result
+        """
+        for i, (index, (_, prop)) in enumerate(
+            zip(self._value_indexes, self._aggregations)
+        ):
+            value = True if index is None else values[index]
+            if value is not None:
+                yield i, value, prop
+
+    def _add(self, item: Result) -> Tuple[GroupPath, ...]:
+        """
+        Helper method which adds a result to the groups it is in. Returns paths of groups changed
+        :param item: result to add
+        """
+        paths = self._get_paths(item)
+        values = self._get_values(item) if self._get_values else []
+        for path in paths:
+            group = self._groups.get(path)
+            if group is None:
+                group = self._groups[path] = self._new_group()
+            group[0] += 1
+            for i, value, prop in self._iter_values(values):
+                try:
+                    group[1][i].add(value)
+                except TypeError as exp:
+                    raise ParseQueryError(
+                        f"Error: cannot aggregate {prop.name} value {value} - "
+                        f"use count or count_distinct for non-numeric properties"
+                    ) from exp
+        self._members[self._key_func(item)] = (paths, values)
+        return paths
+
+    def _remove(self, key: Hashable) -> Tuple[GroupPath, ...]:
+        """
+        Helper method which removes a result from the groups it is in - groups left empty are removed unless
+        they are always outputted. Returns paths of groups changed
+        :param key: key of result to remove
+        """
+        member = self._members.pop(key, None)
+        if member is None:
+            return ()
+        paths, values = member
+        for path in paths:
+            group = self._groups[path]
+            group[0] -= 1
+            for i, value, _ in self._iter_values(values):
+                group[1][i].remove(value)
+            if group[0] <= 0 and path not in self._initial_paths:
+                del self._groups[path]
+        return paths
+
+    def _get_summary(self, path: GroupPath) -> Dict[str, PropValue]:
+        """
+        Helper method which returns the summary of a group
+        :param path: path of group names to the group
+        """
+        count, accumulators = self._groups[path]
+        summary = {"count": count}
+        for (func, prop), accumulator in zip(self._aggregations, accumulators):
+            summary[QueryAggregator.get_output_name(func, prop)] = accumulator.result()
+        return summary
+
+    def reset(self, items: Iterable[Result]):
+        """
+        method which replaces every result held - re-computing every group
+        :param items: results to hold
+        """
+        self._members = {}
+        self._groups = {path: self._new_group() for path in self._initial_paths}
+        for item in items:
+            self._remove(self._key_func(item))
+            self._add(item)
+        self._summaries = {path: self._get_summary(path) for path in self._groups}
+
+    def update(self, items: Iterable[Result], keys: Iterable[Hashable]) -> int:
+        """
+        method which updates results held - only groups holding results that changed are re-computed.
+        Returns the number of groups changed
+        :param items: results added or changed
+        :param keys: keys of every result added, changed or removed - results held with these keys which
+            aren't in items are removed
+        """
+        changed = {}
+        for key in keys:
+            changed.update(dict.fromkeys(self._remove(key)))
+        for item in items:
+            changed.update(dict.fromkeys(self._remove(self._key_func(item))))
+            changed.update(dict.fromkeys(self._add(item)))
+
+        summaries = dict(self._summaries)
+        for path in changed:
+            if path in self._groups:
+                summaries[path] = self._get_summary(path)
+            else:
+                summaries.pop(path, None)
+        self._summaries = summaries
+        return len(changed)
@@ -0,0 +1,406 @@
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import logging
+
+from openstackquery.aliases import PropValue
+from openstackquery.enums.aggregate_func import AggregateFunc
+from openstackquery.enums.props.prop_enum import PropEnum
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.aggregate_result import AggregateResult
+from openstackquery.query_blocks.result import Result
+
+logger = logging.getLogger(__name__)
+
+# pylint: disable=too-few-public-methods
+
+
+def _get_distinct_key(value):
+    """
+    Helper function which returns the key a value is told apart from other values by - unhashable values
+    (i.e. lists) are compared by their string representation
+    :param value: value to get key of
+    """
+    try:
+        hash(value)
+    except TypeError:
+        return str(value)
+    return value
+
+
+class _Count:
+    """accumulator counting values seen"""
+
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, _):
+        self.count += 1
+
+    def remove(self, _):
+        self.count -= 1
+
+    def result(self):
+        return self.count
+
+
+class _CountDistinct:
+    """accumulator counting distinct values seen"""
+
+    __slots__ = ("seen",)
+
+    def __init__(self):
+        self.seen = set()
+
+    def add(self, value):
+        self.seen.add(_get_distinct_key(value))
+
+    def result(self):
+        return len(self.seen)
+
+
+class _Sum:
+    """accumulator summing values seen"""
+
+    __slots__ = ("total",)
+
+    def __init__(self):
+        self.total = 0
+
+    def add(self, value):
+        self.total += value
+
+    def remove(self, value):
+        self.total -= value
+
+    def result(self):
+        return self.total
+
+
+class _Avg:
+    """accumulator averaging values seen"""
+
+    __slots__ = ("total", "count")
+
+    def __init__(self):
+        self.total = 0
+        self.count = 0
+
+    def add(self, value):
+        self.total += value
+        self.count += 1
+
+    def remove(self, value):
+        self.total -= value
+        self.count -= 1
+
+    def result(self):
+        return self.total / self.count if self.count else None
+
+
+class _Min:
+    """accumulator finding smallest value seen"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = None
+
+    def add(self, value):
+        if self.value is None or value < self.value:
+            self.value = value
+
+    def result(self):
+        return self.value
+
+
+class _Max:
+    """accumulator finding largest value seen"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = None
+
+    def add(self, value):
+        if self.value is None or value > self.value:
+            self.value = value
+
+    def result(self):
+        return self.value
+
+
+class _HeldValues:
+    """accumulator holding how many times each distinct value is held - so values can be removed. Base for
+    reversible accumulators which can't be reversed from a running total"""
+
+    __slots__ = ("counts", "values")
+
+    def __init__(self):
+        self.counts = Counter()
+        # a value held for each distinct key
+        self.values = {}
+
+    def add(self, value):
+        key = _get_distinct_key(value)
+        self.counts[key] += 1
+        self.values.setdefault(key, value)
+
+    def remove(self, value) -> bool:
+        """returns True if no value equal to the value removed is held any more"""
+        key = _get_distinct_key(value)
+        self.counts[key] -= 1
+        if self.counts[key] > 0:
+            return False
+        del self.counts[key]
+        del self.values[key]
+        return True
+
+
+class _ReversibleCountDistinct(_HeldValues):
+    """accumulator counting distinct values held"""
+
+    __slots__ = ()
+
+    def result(self):
+        return len(self.counts)
+
+
+class _ReversibleMin(_HeldValues):
+    """accumulator finding smallest value held - compared the same way as _Min"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        super().__init__()
+        self.value = None
+
+    def add(self, value):
+        if self.value is None or value < self.value:
+            self.value = value
+        super().add(value)
+
+    def remove(self, value) -> bool:
+        removed = super().remove(value)
+        if removed and _get_distinct_key(value) == _get_distinct_key(self.value):
+            self.value = min(self.values.values(), default=None)
+        return removed
+
+    def result(self):
+        return self.value
+
+
+class _ReversibleMax(_HeldValues):
+    """accumulator finding largest value held - compared the same way as _Max"""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        super().__init__()
+        self.value = None
+
+    def add(self, value):
+        if self.value is None or value > self.value:
+            self.value = value
+        super().add(value)
+
+    def remove(self, value) -> bool:
+        removed = super().remove(value)
+        if removed and _get_distinct_key(value) == _get_distinct_key(self.value):
+            self.value = max(self.values.values(), default=None)
+        return removed
+
+    def result(self):
+        return self.value
+
+
+class QueryAggregator:
+    """
+    Helper class for implementing aggregation (sum/avg/min/max/count/distinct count) on query outputs
+    """
+
+    ACCUMULATORS = {
+        AggregateFunc.COUNT: _Count,
+        AggregateFunc.COUNT_DISTINCT: _CountDistinct,
+        AggregateFunc.SUM: _Sum,
+        AggregateFunc.AVG: _Avg,
+        AggregateFunc.MIN: _Min,
+        AggregateFunc.MAX: _Max,
+    }
+    # accumulators which values can also be removed from - used to keep aggregated values up-to-date as
+    # results change
+    REVERSIBLE_ACCUMULATORS = {
+        **ACCUMULATORS,
+        AggregateFunc.COUNT_DISTINCT: _ReversibleCountDistinct,
+        AggregateFunc.MIN: _ReversibleMin,
+        AggregateFunc.MAX: _ReversibleMax,
+    }
+
+    def __init__(self, prop_enum_cls):
+        self._prop_enum_cls = prop_enum_cls
+        self._aggregations: List[Tuple[AggregateFunc, Optional[PropEnum]]] = []
+        # each unique property aggregated, and index of each aggregation's property in it
+        self._props: List[PropEnum] = []
+        self._value_indexes: List[Optional[int]] = []
+
+    @property
+    def aggregations(self) -> List[Tuple[AggregateFunc, Optional[PropEnum]]]:
+        """
+        a getter method to return aggregations set - as a list of aggregate function and property pairs
+        property is None when counting all results
+        """
+        return list(self._aggregations)
+
+    @staticmethod
+    def get_output_name(func: AggregateFunc, prop: Optional[PropEnum]) -> str:
+        """
+        method which returns the name an aggregated value is outputted as - i.e. "sum_vcpus_used"
+        :param func: aggregate function enum
+        :param prop: property enum aggregated - or None if counting all results
+        """
+        if prop is None:
+            return func.name.lower()
+        return f"{func.name.lower()}_{prop.name.lower()}"
+
+    def _parse_aggregate_inputs(
+        self,
+        aggregation: Union[
+            str, AggregateFunc, Tuple[Union[str, AggregateFunc], Union[str, PropEnum]]
+        ],
+    ) -> Tuple[AggregateFunc, Optional[PropEnum]]:
+        """
+        Converts aggregate() user input into a tuple of enums, any string aliases will be converted into Enums
+        :param aggregation: an aggregate function - or a tuple of aggregate function and property to aggregate
+        """
+        func, prop = (
+            aggregation if isinstance(aggregation, tuple) else (aggregation, None)
+        )
+        if isinstance(func, str):
+            func = AggregateFunc.from_string(func)
+        if isinstance(prop, str):
+            prop = self._prop_enum_cls.from_string(prop)
+        return func, prop
+
+    def parse_aggregate(
+        self,
+        *aggregations: Union[
+            str, AggregateFunc, Tuple[Union[str, AggregateFunc], Union[str, PropEnum]]
+        ],
+    ):
+        """
+        Public method used to configure aggregating results. Replaces any aggregations already set
+        :param aggregations: one or more tuples of aggregate function and property to aggregate,
+        or just AggregateFunc.COUNT to count all results
+        """
+        parsed = []
+        for aggregation in aggregations:
+            func, prop = self._parse_aggregate_inputs(aggregation)
+            if prop is None and func != AggregateFunc.COUNT:
+                raise ParseQueryError(
+                    f"Error: aggregate function {func.name} requires a property to aggregate"
+                )
+            if prop is not None and prop not in self._prop_enum_cls:
+                raise ParseQueryError(
+                    f"Error: Given property to aggregate: {prop.name} is not supported by query"
+                )
+            logger.debug("adding aggregation: %s", self.get_output_name(func, prop))
+            parsed.append((func, prop))
+        self._aggregations = parsed
+        self._props = list(
+            dict.fromkeys(prop for _, prop in parsed if prop is not None)
+        )
+        self._value_indexes = [
+            None if prop is None else self._props.index(prop) for _, prop in parsed
+        ]
+
+    def new_accumulators(self, reversible: bool = False) -> List:
+        """
+        method which returns a fresh set of accumulators - one per aggregation set - to aggregate a set of
+        results into. Used with get_values_func(), accumulate() and get_result()
+        :param reversible: if True, values can also be removed from accumulators with remove()
+        """
+        accumulators = self.REVERSIBLE_ACCUMULATORS if reversible else self.ACCUMULATORS
+        return [accumulators[func]() for func, _ in self._aggregations]
+
+    def get_values_func(self) -> Callable[[Result], List[Any]]:
+        """
+        method which returns a function that takes a result and returns the value of each aggregated property.
+        Values are read once per result even when a result is aggregated into more than one set of
+        accumulators (i.e. nested groups)
+        """
+        prop_funcs = [
+            self._prop_enum_cls.get_prop_mapping(prop) for prop in self._props
+        ]
+        get_value = self._get_value
+
+        def _get_values(item: Result) -> List[Any]:
+            obj = item.as_object()
+            return [get_value(prop_func, obj) for prop_func in prop_funcs]
+
+        return _get_values
+
+    def accumulate(self, accumulators: List, values: List[Any]):
+        """
+        method which adds a result's values (from get_values_func()) into a set of accumulators.
+        Values of None (missing properties) are skipped
+        :param accumulators: accumulators to add to - from new_accumulators()
+        :param values: values of each aggregated property for a result
+        """
+        for accumulator, index, (_, prop) in zip(
+            accumulators, self._value_indexes, self._aggregations
+        ):
+            self._add(accumulator, True if index is None else values[index], prop)
+
+    def get_result(self, accumulators: List) -> Dict[str, PropValue]:
+        """
+        method which returns aggregated values held by a set of accumulators
+        :param accumulators: accumulators to get values from
+        """
+        return {
+            self.get_output_name(func, prop): accumulator.result()
+            for (func, prop), accumulator in zip(self._aggregations, accumulators)
+        }
+
+    def run_aggregate(self, obj_list: List[Result]) -> AggregateResult:
+        """
+        method to compute all aggregations set over a list of results in a single pass.
+        Each property is read once per result - even if it is used by more than one aggregation.
+        Results missing a property (or with a value of None) are skipped for aggregations on that property
+        :param obj_list: a list of Result objects containing query results to aggregate
+        """
+        get_values = self.get_values_func()
+        accumulators = self.new_accumulators()
+        for item in obj_list:
+            self.accumulate(accumulators, get_values(item))
+        return AggregateResult(self.get_result(accumulators))
+
+    @staticmethod
+    def _add(accumulator, value: Any, prop: Optional[PropEnum]):
+        """
+        Helper method which adds a value to an accumulator - skipping missing values
+        :param accumulator: accumulator to add to
+        :param value: value to add
+        :param prop: property the value belongs to (None if counting results)
+        """
+        if value is None:
+            return
+        try:
+            accumulator.add(value)
+        except TypeError as exp:
+            raise ParseQueryError(
+                f"Error: cannot aggregate {prop.name} value {value} - "
+                f"use count or count_distinct for non-numeric properties"
+            ) from exp
+
+    @staticmethod
+    def _get_value(prop_func, obj) -> Any:
+        """
+        Helper method which returns the value of a property for an openstack object - or None if not found
+        :param prop_func: property function to get value with
+        :param obj: openstack object to get value for
+        """
+        try:
+            return prop_func(obj)
+        except (AttributeError, KeyError):
+            return None
@@ -15,13 +15,16 @@ from openstackquery.exceptions.query_property_mapping_error import (
 from openstackquery.aliases import (
     ClientSideFilterFunc,
     ClientSideFilters,
+    ServerSideFilter,
     ServerSideFilters,
+    ServerSideSortMappings,
 )
 
 
 logger = logging.getLogger(__name__)
 
 
+# pylint: disable=too-many-instance-attributes
 class QueryBuilder:
     """
     Helper class to handle setting and validating query parameters - primarily parsing 'where()' arguments to get
@@ -33,10 +36,12 @@ class QueryBuilder:
         prop_enum_cls: Type[PropEnum],
         client_side_handler: ClientSideHandler,
         server_side_handler: Optional[ServerSideHandler],
+        server_side_sort_mappings: Optional[ServerSideSortMappings] = None,
     ):
         self._client_side_handler = client_side_handler
         self._prop_enum_cls = prop_enum_cls
         self._server_side_handler = server_side_handler
+        self._server_side_sort_mappings = server_side_sort_mappings or {}
 
         self._client_side_filters = []
         self._server_side_filters = []
@@ -90,6 +95,28 @@ class QueryBuilder:
         """
         self._server_filter_fallback = fallback_filters
 
+    def get_server_side_sort(
+        self, sort_by: Dict[PropEnum, bool]
+    ) -> Optional[ServerSideFilter]:
+        """
+        method which returns sort kwargs to pass to openstacksdk so that results are returned already sorted.
+        Returns None if sort_by is empty or any property in sort_by cannot be sorted by the openstack API
+        :param sort_by: a dictionary of property enums mapped to True if sorting in descending order
+        """
+        if not sort_by or any(
+            prop not in self._server_side_sort_mappings for prop in sort_by
+        ):
+            return None
+
+        sort_keys = [self._server_side_sort_mappings[prop] for prop in sort_by]
+        sort_dirs = ["desc" if reverse else "asc" for reverse in sort_by.values()]
+        logger.debug(
+            "pushing sort down to openstack API - sort_key=%s, sort_dir=%s",
+            sort_keys,
+            sort_dirs,
+        )
+        return {"sort_key": sort_keys, "sort_dir": sort_dirs}
+
     def _parse_where_inputs(self, preset, prop):
         """
         method converts where() 'preset' and 'prop' user inputs into Enums, any string aliases will
@@ -96,6 +96,12 @@ class QueryChainer:
                 f"Query Chaining Error: Could not find a way to chain current query into {query_type}"
             )
 
+        if current_query.parser.has_aggregations:
+            raise QueryChainingError(
+                "Query Chaining Error: Cannot chain a query that aggregates results - "
+                "chain the query first and then call aggregate() on the new query"
+            )
+
         if not current_query.to_props():
             raise QueryChainingError(
                 "Query Chaining Error: No values found after running this query - aborting. "
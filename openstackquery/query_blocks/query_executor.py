@@ -1,9 +1,23 @@
+import heapq
 import logging
 import time
-from typing import Optional, Dict, List, Type
+from collections import Counter
+from itertools import chain, islice
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Type,
+    Union,
+)
 from openstackquery.openstack_connection import OpenstackConnection
 
 from openstackquery.query_blocks.results_container import ResultsContainer
+from openstackquery.query_blocks.results_diff import ResultsDiff
 from openstackquery.runners.runner_wrapper import RunnerWrapper
 from openstackquery.runners.runner_utils import RunnerUtils
 
@@ -11,6 +25,7 @@ from openstackquery.enums.props.prop_enum import PropEnum
 from openstackquery.aliases import (
     ServerSideFilters,
     ClientSideFilters,
+    OpenstackResourceObj,
     PropValue,
 )
 
@@ -28,6 +43,7 @@ class QueryExecutor:
         runner_cls: Type[RunnerWrapper],
         connection_cls=OpenstackConnection,
     ):
+        self._prop_enum_cls = prop_enum_cls
         self._results_container = ResultsContainer(prop_enum_cls)
         self._connection_cls = connection_cls
         self.runner = runner_cls(prop_enum_cls.get_marker_prop_func())
@@ -56,6 +72,8 @@ class QueryExecutor:
         cloud_account: str,
         client_side_filters: Optional[ClientSideFilters] = None,
         server_side_filters: Optional[ServerSideFilters] = None,
+        limit: Optional[int] = None,
+        merge_key: Optional[Callable] = None,
         **kwargs,
     ):
         """
@@ -65,6 +83,10 @@ class QueryExecutor:
         :param client_side_filters: An Optional list of filter functions to run locally that we can use to limit the
         results after querying openstacksdk
         :param server_side_filters: An Optional list of filter kwargs to limit the results by when querying openstacksdk
+        :param limit: An Optional maximum number of results to find. If given, resources are streamed from the
+        runner and listing stops as soon as enough resources pass the client-side filters
+        :param merge_key: An Optional sort key function - if given, server-side filters are expected to make
+        openstack return resources already sorted, and the sorted listings (i.e. one per project) are merged
         :param kwargs: An extra set of kwargs to pass to internal _run_query method that changes what/how the
         openstacksdk query is run
             - valid kwargs to _run_query is specific to the runner object - see docstrings for _run_query() on the
@@ -72,6 +94,7 @@ class QueryExecutor:
         """
         if not server_side_filters:
             server_side_filters = [None]
+        streamed = limit is not None or merge_key is not None
 
         start = time.time()
         resource_objects = []
@@ -81,13 +104,26 @@ class QueryExecutor:
                 cloud_account,
             )
             meta_params = self.runner.parse_meta_params(conn, **kwargs)
-            for i, query_filters in enumerate(server_side_filters, 1):
-                logger.debug("running query %s / %s", i, len(server_side_filters))
-                resource_objects.extend(
-                    self.runner.run_query(conn, query_filters, **meta_params)
+            if streamed:
+                resource_objects = self._run_streamed(
+                    conn,
+                    server_side_filters,
+                    meta_params,
+                    cloud_account=cloud_account,
+                    client_side_filters=client_side_filters,
+                    limit=limit,
+                    merge_key=merge_key,
                 )
+            else:
+                for i, query_filters in enumerate(server_side_filters, 1):
+                    logger.debug("running query %s / %s", i, len(server_side_filters))
+                    resource_objects.extend(
+                        self.runner.run_cached_query(
+                            conn, cloud_account, query_filters, **meta_params
+                        )
+                    )
 
-        if client_side_filters:
+        if client_side_filters and not streamed:
             resource_objects = RunnerUtils.apply_client_side_filters(
                 resource_objects, client_side_filters
             )
@@ -99,21 +135,125 @@ class QueryExecutor:
 
         self.results_container.store_query_results(resource_objects)
 
-    def run_with_subset(self, subset: List, client_side_filters: ClientSideFilters):
+    def _run_streamed(
+        self,
+        conn,
+        server_side_filters: ServerSideFilters,
+        meta_params: Dict,
+        *,
+        cloud_account: Optional[str] = None,
+        client_side_filters: Optional[ClientSideFilters] = None,
+        limit: Optional[int] = None,
+        merge_key: Optional[Callable] = None,
+    ) -> List:
+        """
+        Helper method which streams resources from the runner for each set of server-side filters.
+        If merge_key is given, each stream is expected to be already sorted by openstack and streams are merged
+        using a k-way merge so resources are found in sorted order.
+        Listing (pages and projects) stops once 'limit' resources have passed all client-side filters
+        :param conn: An open openstack connection
+        :param server_side_filters: A list of filter kwargs to pass to the runner
+        :param meta_params: parsed meta params to pass to the runner
+        :param cloud_account: An Optional name of the cloud account conn is connected to - used to find
+        listings held in the runner cache
+        :param client_side_filters: An Optional list of filter functions to run locally
+        :param limit: An Optional maximum number of resources to return
+        :param merge_key: An Optional function that takes an openstack resource and returns its sort key
+        """
+        logger.debug(
+            "streaming query with limit %s (merging sorted streams: %s)",
+            limit,
+            merge_key is not None,
+        )
+        resources = self._iter_streamed(
+            conn,
+            server_side_filters,
+            meta_params,
+            cloud_account=cloud_account,
+            client_side_filters=client_side_filters,
+            merge_key=merge_key,
+        )
+        return list(islice(resources, limit))
+
+    def _iter_streamed(
+        self,
+        conn,
+        server_side_filters: ServerSideFilters,
+        meta_params: Dict,
+        *,
+        cloud_account: Optional[str] = None,
+        client_side_filters: Optional[ClientSideFilters] = None,
+        merge_key: Optional[Callable] = None,
+    ) -> Iterator[OpenstackResourceObj]:
+        """
+        Helper method which returns a lazy iterator over resources from the runner for each set of server-side
+        filters that pass all client-side filters. Listings held in the runner cache are used instead of
+        streaming from openstack
+        :param conn: An open openstack connection
+        :param server_side_filters: A list of filter kwargs to pass to the runner
+        :param meta_params: parsed meta params to pass to the runner
+        :param cloud_account: An Optional name of the cloud account conn is connected to - see _run_streamed
+        :param client_side_filters: An Optional list of filter functions to run locally
+        :param merge_key: An Optional function that takes an openstack resource and returns its sort key
+        """
+        streams = []
+        for query_filters in server_side_filters:
+            cached = None
+            if cloud_account is not None:
+                cached = self.runner.get_cached_query(
+                    cloud_account, query_filters, **meta_params
+                )
+            if cached is not None:
+                # a cached listing is not sorted per stream - so it is sorted as a whole before merging
+                streams.append(
+                    iter(sorted(cached, key=merge_key) if merge_key else cached)
+                )
+                continue
+            streams.extend(
+                self.runner.iter_query_streams(conn, query_filters, **meta_params)
+            )
+        logger.debug("streaming %s separate listings", len(streams))
+
+        if merge_key:
+            resources = heapq.merge(*streams, key=merge_key)
+        else:
+            resources = chain.from_iterable(streams)
+
+        if client_side_filters:
+            resources = RunnerUtils.iter_client_side_filters(
+                resources, client_side_filters
+            )
+        return resources
+
+    def run_with_subset(
+        self,
+        subset: List,
+        client_side_filters: ClientSideFilters,
+        limit: Optional[int] = None,
+    ):
         """
         Public method that runs the query when provided a subset. This will apply client-side filter functions
         on the subset without needing to query using the sdk
         :param subset: A subset of openstack resources to run query on instead of querying openstacksdk
         :param client_side_filters: A list of filter functions to apply
+        :param limit: An Optional maximum number of results to find - filtering stops once reached
         """
         logger.info("'from_subset' meta param given - running query on subset")
         start = time.time()
 
         subset = self.runner.parse_subset(subset)
 
-        resource_objects = RunnerUtils.apply_client_side_filters(
-            subset, client_side_filters
-        )
+        if limit is not None:
+            resource_objects = list(
+                islice(
+                    RunnerUtils.iter_client_side_filters(subset, client_side_filters),
+                    limit,
+                )
+            )
+        else:
+            resource_objects = RunnerUtils.apply_client_side_filters(
+                subset, client_side_filters
+            )
 
         logger.info(
             "Query Complete! Found %s items. Time elapsed: %0.4f seconds",
@@ -121,3 +261,186 @@ class QueryExecutor:
             time.time() - start,
         )
         self.results_container.store_query_results(resource_objects)
+
+    def get_subset_results(
+        self, subset: List, client_side_filters: ClientSideFilters
+    ) -> ResultsContainer:
+        """
+        Public method that applies client-side filter functions on a subset and returns the results in a new
+        container - leaving results stored by the executor as they are
+        :param subset: A subset of openstack resources (or a snapshot) to run query on
+        :param client_side_filters: A list of filter functions to apply
+        """
+        results_container = ResultsContainer(self._prop_enum_cls)
+        results_container.store_query_results(
+            RunnerUtils.apply_client_side_filters(
+                self.runner.parse_subset(subset), client_side_filters
+            )
+        )
+        return results_container
+
+    def get_keyed_props(
+        self,
+        results_container: ResultsContainer,
+        props: List[PropEnum],
+        key: Optional[Union[str, PropEnum]] = None,
+    ) -> Dict[Hashable, Dict[str, PropValue]]:
+        """
+        Public method that outputs selected properties of each result in a container - keyed by the value of a
+        property, or by marker property (i.e. id) if not given
+        :param results_container: container of results to output
+        :param props: properties to output
+        :param key: An Optional property to key results by
+        """
+        if key is None:
+            marker_prop_func = self.runner.marker_prop_func
+            return results_container.to_keyed_props(
+                lambda result: marker_prop_func(result.as_object()), *props
+            )
+        key = self._parse_prop(key)
+        return results_container.to_keyed_props(
+            lambda result: result.get_prop(key), *props
+        )
+
+    def diff_results(
+        self,
+        old: ResultsContainer,
+        new: ResultsContainer,
+        props: List[PropEnum],
+        key: Optional[Union[str, PropEnum]] = None,
+        output=None,
+    ) -> ResultsDiff:
+        """
+        Public method that compares two containers of results by selected properties - keyed by the value of a
+        property, or by marker property (i.e. id) if not given
+        :param old: container of results before
+        :param new: container of results after
+        :param props: properties to compare
+        :param key: An Optional property to key results by
+        :param output: QueryOutput used to output differences
+        """
+        key_name = "id" if key is None else self._parse_prop(key).name.lower()
+        return ResultsDiff.compute(
+            self.get_keyed_props(old, props, key),
+            self.get_keyed_props(new, props, key),
+            key_name,
+            output,
+        )
+
+    def run_changes_with_openstacksdk(
+        self, cloud_account: str, since: str, **kwargs
+    ) -> List[OpenstackResourceObj]:
+        """
+        Public method that lists resources changed (including deleted) since a timestamp - without applying
+        any filters. Only works if the runner supports changes-since
+        :param cloud_account: An string for the account from the clouds configuration file to use
+        :param since: timestamp to list changes since - i.e. "2024-01-01T00:00:00Z"
+        :param kwargs: meta params to list resources with
+        """
+        with self._connection_cls(cloud_account) as conn:
+            meta_params = self.runner.parse_meta_params(conn, **kwargs)
+            return self.runner.run_changes_query(conn, since, None, **meta_params)
+
+    def count_with_openstacksdk(
+        self,
+        cloud_account: str,
+        client_side_filters: Optional[ClientSideFilters] = None,
+        server_side_filters: Optional[ServerSideFilters] = None,
+        count_by: Optional[Union[str, PropEnum]] = None,
+        **kwargs,
+    ) -> Union[int, Dict[PropValue, int]]:
+        """
+        public method that counts resources matching the query by streaming them from openstacksdk.
+        Resources are counted as they are listed - results are not stored and no Result objects are created
+        :param cloud_account: A string for the account from the clouds configuration to use
+        :param client_side_filters: An Optional list of filter functions to run locally
+        :param server_side_filters: An Optional list of filter kwargs to limit the results by when querying openstacksdk
+        :param count_by: An Optional property - if given, returns a dictionary of property value to number of
+        resources with that value, instead of a total count
+        :param kwargs: An extra set of meta params to pass to the runner - see run_with_openstacksdk
+        """
+        start = time.time()
+        with self._connection_cls(cloud_account) as conn:
+            meta_params = self.runner.parse_meta_params(conn, **kwargs)
+            resources = self._iter_streamed(
+                conn,
+                server_side_filters or [None],
+                meta_params,
+                cloud_account=cloud_account,
+                client_side_filters=client_side_filters,
+            )
+            counts = self._count(resources, count_by)
+
+        logger.info("Count Complete! Time elapsed: %0.4f seconds", time.time() - start)
+        return counts
+
+    def count_with_subset(
+        self,
+        subset: List,
+        client_side_filters: ClientSideFilters,
+        count_by: Optional[Union[str, PropEnum]] = None,
+    ) -> Union[int, Dict[PropValue, int]]:
+        """
+        Public method that counts resources in a subset which pass the client-side filter functions
+        :param subset: A subset of openstack resources to count instead of querying openstacksdk
+        :param client_side_filters: A list of filter functions to apply
+        :param count_by: An Optional property - if given, returns a dictionary of property value to number of
+        resources with that value, instead of a total count
+        """
+        subset = self.runner.parse_subset(subset)
+        return self._count(
+            RunnerUtils.iter_client_side_filters(subset, client_side_filters),
+            count_by,
+        )
+
+    def count_with_aggregate_source(
+        self,
+        cloud_account: str,
+        count_by: Union[str, PropEnum],
+        **kwargs,
+    ) -> Optional[Dict[PropValue, int]]:
+        """
+        Public method that gets counts per property value from an aggregate source openstack provides
+        (i.e. compute limits) instead of listing resources. Returns None if the runner has no aggregate source
+        for the given property
+        :param cloud_account: A string for the account from the clouds configuration to use
+        :param count_by: property to count resources by
+        :param kwargs: An extra set of meta params to pass to the runner - see run_with_openstacksdk
+        """
+        count_by = self._parse_prop(count_by)
+        with self._connection_cls(cloud_account) as conn:
+            meta_params = self.runner.parse_meta_params(conn, **kwargs)
+            return self.runner.run_aggregate_count(conn, count_by, **meta_params)
+
+    def _parse_prop(self, prop: Union[str, PropEnum]) -> PropEnum:
+        """
+        Helper method which converts a string alias into a prop enum
+        :param prop: prop enum or string alias to convert
+        """
+        if isinstance(prop, str):
+            prop = self._prop_enum_cls.from_string(prop)
+        return prop
+
+    def _count(
+        self,
+        resources: Iterable[OpenstackResourceObj],
+        count_by: Optional[Union[str, PropEnum]] = None,
+    ) -> Union[int, Dict[PropValue, int]]:
+        """
+        Helper method which consumes an iterable of openstack resources and counts them
+        :param resources: iterable of openstack resources to count
+        :param count_by: An Optional property to count resources by
+        """
+        if count_by is None:
+            return sum(1 for _ in resources)
+
+        prop_func = self._prop_enum_cls.get_prop_mapping(self._parse_prop(count_by))
+        default_out = self.results_container.DEFAULT_OUT
+
+        def _get_value(obj):
+            try:
+                return prop_func(obj)
+            except (AttributeError, KeyError):
+                return default_out
+
+        return dict(Counter(map(_get_value, resources)))
@@ -1,138 +1,353 @@
-from typing import List, Dict, Optional, Union
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Dict, Optional, Tuple, Union
 import logging
-from collections import OrderedDict
 
 from openstackquery.query_blocks.result import Result
 from openstackquery.enums.props.prop_enum import PropEnum
-from openstackquery.aliases import GroupMappings, GroupRanges, PropValue
+from openstackquery.aliases import GroupRanges, PropValue
 from openstackquery.exceptions.parse_query_error import ParseQueryError
 
 logger = logging.getLogger(__name__)
 
+SECONDS_IN_DAY = 86400
+
+
+# pylint: disable=too-few-public-methods
+class TimeBucketer:
+    """
+    Helper class which maps timestamps (i.e. "2024-05-01T12:00:00Z") onto the time bucket they fall into.
+    Each timestamp is parsed once into integer days and seconds, buckets are found using integer arithmetic
+    and each bucket's name is only built once
+    """
+
+    BUCKETS = ("day", "week", "month")
+
+    def __init__(self, bucket: Union[str, timedelta]):
+        if isinstance(bucket, timedelta):
+            if bucket.total_seconds() < 1:
+                raise ParseQueryError(
+                    f"Error: time bucket {bucket} must be at least one second"
+                )
+            self._step = int(bucket.total_seconds())
+            self._bucket = None
+        elif isinstance(bucket, str) and bucket.lower() in self.BUCKETS:
+            self._step = None
+            self._bucket = bucket.lower()
+        else:
+            raise ParseQueryError(
+                f"Error: time bucket {bucket} not supported - "
+                f"use one of {', '.join(self.BUCKETS)} or a timedelta"
+            )
+        self._names: Dict[int, str] = {}
+
+    @staticmethod
+    def _parse_timestamp(timestamp: str) -> Tuple[int, int, int, int]:
+        """
+        Helper method which parses a timestamp into year, month, day (as a proleptic Gregorian ordinal)
+        and seconds since midnight. Timezones are ignored - openstack timestamps are in UTC
+        :param timestamp: timestamp string to parse - in format YYYY-MM-DD[THH:MM:SS...]
+        """
+        if timestamp[4] != "-" or timestamp[7] != "-":
+            raise ValueError(f"{timestamp} is not a timestamp")
+        year, month = int(timestamp[0:4]), int(timestamp[5:7])
+        ordinal = date(year, month, int(timestamp[8:10])).toordinal()
+        seconds = 0
+        if len(timestamp) >= 19:
+            seconds = (
+                int(timestamp[11:13]) * 3600
+                + int(timestamp[14:16]) * 60
+                + int(timestamp[17:19])
+            )
+        return year, month, ordinal, seconds
+
+    def _get_bucket(self, timestamp: str) -> int:
+        """
+        Helper method which returns the integer id of the bucket a timestamp falls into
+        :param timestamp: timestamp string
+        """
+        year, month, ordinal, seconds = self._parse_timestamp(timestamp)
+        if self._step:
+            return (ordinal * SECONDS_IN_DAY + seconds) // self._step
+        if self._bucket == "day":
+            return ordinal
+        if self._bucket == "week":
+            # ordinal 1 (0001-01-01) is a monday - so weeks start on monday
+            return (ordinal - 1) // 7
+        return year * 12 + month - 1
+
+    def _get_name(self, bucket: int) -> str:
+        """
+        Helper method which returns the name of a bucket - the start of the bucket as a date (day/week),
+        year and month (month) or timestamp (timedelta)
+        :param bucket: integer id of the bucket
+        """
+        if self._step:
+            days, seconds = divmod(bucket * self._step, SECONDS_IN_DAY)
+            return (datetime.fromordinal(days) + timedelta(seconds=seconds)).strftime(
+                "%Y-%m-%dT%H:%M:%SZ"
+            )
+        if self._bucket == "day":
+            return date.fromordinal(bucket).isoformat()
+        if self._bucket == "week":
+            return date.fromordinal(bucket * 7 + 1).isoformat()
+        year, month = divmod(bucket, 12)
+        return f"{year:04d}-{month + 1:02d}"
+
+    def __call__(self, timestamp: Optional[str]) -> Optional[str]:
+        """
+        returns the name of the bucket a timestamp falls into - or None if there is no timestamp
+        :param timestamp: timestamp string
+        """
+        if timestamp is None:
+            return None
+        try:
+            bucket = self._get_bucket(timestamp)
+        except (ValueError, TypeError, IndexError) as exp:
+            raise ParseQueryError(
+                f"Error: cannot group value {timestamp} into time buckets - it is not a timestamp"
+            ) from exp
+
+        name = self._names.get(bucket)
+        if name is None:
+            name = self._names[bucket] = self._get_name(bucket)
+        return name
+
 
 class QueryGrouper:
     """
     Helper class for implementing grouping on query outputs
     """
 
+    # name of group holding results not found in any group range - if include_missing is set
+    UNGROUPED_GROUP_NAME = "ungrouped results"
+
     def __init__(self, prop_enum_cls):
         self._prop_enum_cls = prop_enum_cls
-        self._group_by = None
-        self._group_mappings = {}
+        self._group_by: Tuple[PropEnum, ...] = ()
+        self._group_names: List[str] = []
+        self._group_ranges: Dict[PropValue, List[str]] = {}
+        self._include_missing = False
+        self._bucket: Optional[Union[str, timedelta]] = None
 
-    def _build_unique_val_groups(
-        self,
-        obj_list: List,
-    ) -> GroupMappings:
-        """
-        helper method to find all unique values for a given property in query results, and then,
-        for each unique value, create a group mapping
-        :param obj_list: A list of openstack objects to build unique groups for
-        """
-        prop_func = self._prop_enum_cls.get_prop_mapping(self._group_by)
-        # ordered dict to mimic ordered set
-        # this is to preserve order we see unique values in - in case a sort has been done already
-        unique_vals = OrderedDict({prop_func(obj): None for obj in obj_list})
-        logger.debug(
-            "unique values found %s - each will become a group",
-            ",".join(f"{val}" for val in unique_vals),
-        )
-        group_mappings = {}
-        # build groups
-        for val in unique_vals.keys():
-            group_key = val
-            group_mappings[group_key] = (
-                lambda obj, test_val=val: prop_func(obj) == test_val
-            )
-        return group_mappings
+    @property
+    def has_group_ranges(self) -> bool:
+        """
+        a getter method which returns True if user-defined group ranges are set
+        i.e. groups are not built from unique values of the group by property
+        """
+        return bool(self._group_names)
 
-    def _add_include_missing_group(self, group_ranges: GroupRanges):
+    @property
+    def has_fixed_order(self) -> bool:
         """
-        Helper method used to add an extra group for group_by which includes
-        all resource values not already included in any defined mappings
-        :param group_ranges: A set of predefined group ranges to check against
+        a getter method which returns True if groups are outputted in a fixed order - the order of user-defined
+        group ranges, or chronological order of time buckets - rather than in the order results are sorted
         """
-        # if ungrouped group wanted - filter for all not in any range specified
-        all_prop_list = set()
-        for prop_list in group_ranges.values():
-            all_prop_list.update(set(prop_list))
+        return self.has_group_ranges or self._bucket is not None
 
-        prop_func = self._prop_enum_cls.get_prop_mapping(self._group_by)
-        logger.debug("creating filter function for ungrouped group")
-        self._group_mappings["ungrouped results"] = (
-            lambda obj: prop_func(obj) not in all_prop_list
+    def _get_group_key_func(self) -> Callable[[Result], PropValue]:
+        """
+        helper method which returns a function that takes a Result and returns the value to group it by.
+        If grouping by multiple properties, the value is a tuple holding the value of each property
+        """
+        prop_funcs = [
+            self._prop_enum_cls.get_prop_mapping(prop) for prop in self._group_by
+        ]
+        if len(prop_funcs) == 1:
+            prop_func = prop_funcs[0]
+            if self._bucket is not None:
+                bucketer = TimeBucketer(self._bucket)
+                return lambda item: bucketer(prop_func(item.as_object()))
+            return lambda item: prop_func(item.as_object())
+        return lambda item: tuple(func(item.as_object()) for func in prop_funcs)
+
+    @property
+    def initial_group_names(self) -> List[str]:
+        """
+        a getter method which returns names of groups that are always outputted - even when empty.
+        These are the user-defined group ranges (and ungrouped results group if include_missing is set)
+        """
+        if not self._group_names:
+            return []
+        if self._include_missing:
+            return [*self._group_names, self.UNGROUPED_GROUP_NAME]
+        return list(self._group_names)
+
+    def get_group_names_func(self) -> Callable[[Result], Tuple[PropValue, ...]]:
+        """
+        method which returns a function that takes a Result and returns the names of groups it belongs to
+        - used when grouping results into nested groups
+        """
+        key_func = self._get_group_key_func()
+        if not self._group_names:
+            return lambda item: (key_func(item),)
+
+        group_ranges = self._group_ranges
+        missing = (self.UNGROUPED_GROUP_NAME,) if self._include_missing else ()
+
+        def _get_group_names(item: Result) -> Tuple[PropValue, ...]:
+            try:
+                group_names = group_ranges.get(key_func(item))
+            except TypeError:
+                # unhashable values can't be in any group range
+                group_names = None
+            return tuple(group_names) if group_names else missing
+
+        return _get_group_names
+
+    def order_groups(self, groups: Dict) -> Dict:
+        """
+        method which returns groups in the order they should be outputted.
+        Time buckets made from unique values are ordered chronologically - results without a timestamp are last.
+        Otherwise, order is unchanged
+        :param groups: dictionary of group name to grouped results
+        """
+        if self._bucket is None or self._group_names:
+            return groups
+        return dict(
+            sorted(groups.items(), key=lambda group: (group[0] is None, group[0] or ""))
         )
 
-    def _parse_group_ranges(self, group_ranges: Optional[Dict[str, List[PropValue]]]):
+    def _parse_group_ranges(self, group_ranges: GroupRanges):
         """
-        helper method for parsing group ranges
+        helper method for parsing group ranges - inverts group ranges into a mapping of each
+        prop value to the name(s) of the group(s) it belongs to, so each result can be grouped with one lookup
         :param group_ranges: a dictionary containing names of the group and list of prop values
         to select for that group
         """
-        logger.debug("creating filter functions for specified group ranges")
-        prop_func = self._prop_enum_cls.get_prop_mapping(self._group_by)
+        logger.debug("inverting group ranges into value to group mappings")
         for name, prop_list in group_ranges.items():
-            group_vals = tuple(prop_list)
-            self._group_mappings[name] = (
-                lambda obj, lst=group_vals: prop_func(obj) in lst
-            )
+            self._group_names.append(name)
+            for val in prop_list:
+                try:
+                    group_names = self._group_ranges.setdefault(val, [])
+                except TypeError as exp:
+                    raise ParseQueryError(
+                        f"Error: Group range value {val} for group {name} cannot be grouped by"
+                    ) from exp
+                if name not in group_names:
+                    group_names.append(name)
 
-    def run_group_by(self, obj_list: List[Result]) -> Dict[str, List[Result]]:
+    def _run_group_by_unique_vals(
+        self, obj_list: List[Result], key_func: Callable[[Result], PropValue]
+    ) -> Dict[PropValue, List[Result]]:
         """
-        method apply a set of group mappings onto a list of openstack objects. Returns a dictionary of grouped
-        values where the key is the group name and value is a list of result objects that belong to that group
+        helper method which makes a group for each unique value of the group by property, in the order each
+        value is first seen - in case a sort has been done already
         :param obj_list: a list of Result objects containing query results to group by
+        :param key_func: function which takes a Result and returns the value to group it by
         """
+        res = {}
+        for item in obj_list:
+            key = key_func(item)
+            group = res.get(key)
+            if group is None:
+                group = res[key] = []
+            group.append(item)
+        logger.debug("unique values found %s - each is a group", len(res))
+        return self.order_groups(res)
 
-        # if group mappings not specified - make a group for each unique value found for prop
-        if not self._group_mappings:
-            logger.info(
-                "no group ranges specified - grouping by unique values of %s property",
-                self._group_by.name,
-            )
-            self._group_mappings = self._build_unique_val_groups(
-                [item.as_object() for item in obj_list]
-            )
+    def _run_group_by_ranges(
+        self, obj_list: List[Result], key_func: Callable[[Result], PropValue]
+    ) -> Dict[str, List[Result]]:
+        """
+        helper method which groups results by the user-defined group ranges
+        :param obj_list: a list of Result objects containing query results to group by
+        :param key_func: function which takes a Result and returns the value to group it by
+        """
+        res = {name: [] for name in self._group_names}
+        ungrouped = None
+        if self._include_missing:
+            ungrouped = res.setdefault(self.UNGROUPED_GROUP_NAME, [])
 
-        res = {}
-        for name, map_func in self._group_mappings.items():
-            res[name] = [item for item in obj_list if map_func(item.as_object())]
+        for item in obj_list:
+            try:
+                group_names = self._group_ranges.get(key_func(item))
+            except TypeError:
+                # unhashable values can't be in any group range
+                group_names = None
+
+            if group_names:
+                for name in group_names:
+                    res[name].append(item)
+            elif ungrouped is not None:
+                ungrouped.append(item)
         return res
 
-    def _parse_group_by_inputs(self, prop: Union[str, PropEnum]) -> PropEnum:
+    def run_group_by(self, obj_list: List[Result]) -> Dict[str, List[Result]]:
         """
-        Converts list of select() 'prop' user inputs into Enums, any string aliases will be converted into Enums
-        :param prop: property to group by
+        method to group a list of results in a single pass. Returns a dictionary of grouped
+        values where the key is the group name and value is a list of result objects that belong to that group
+        :param obj_list: a list of Result objects containing query results to group by
         """
-        if isinstance(prop, str):
-            prop = self._prop_enum_cls.from_string(prop)
-        return prop
+        key_func = self._get_group_key_func()
+        if self._group_names:
+            return self._run_group_by_ranges(obj_list, key_func)
+
+        # if group ranges not specified - make a group for each unique value found for prop
+        logger.info(
+            "no group ranges specified - grouping by unique values of %s",
+            ", ".join(prop.name for prop in self._group_by),
+        )
+        return self._run_group_by_unique_vals(obj_list, key_func)
+
+    def _parse_group_by_inputs(
+        self, group_by: Union[str, PropEnum, Tuple[Union[str, PropEnum], ...]]
+    ) -> Tuple[PropEnum, ...]:
+        """
+        Converts group_by user input into a tuple of Enums, any string aliases will be converted into Enums
+        :param group_by: property to group by - or a tuple/list of properties to group by together
+        """
+        if not isinstance(group_by, (tuple, list)):
+            group_by = (group_by,)
+        if not group_by:
+            raise ParseQueryError("Error: provide at least one property to group by")
+
+        props = []
+        for prop in group_by:
+            if isinstance(prop, str):
+                prop = self._prop_enum_cls.from_string(prop)
+            props.append(prop)
+        return tuple(props)
 
     def parse_group_by(
         self,
-        group_by: Union[str, PropEnum],
+        group_by: Union[str, PropEnum, Tuple[Union[str, PropEnum], ...]],
         group_ranges: Optional[GroupRanges] = None,
         include_missing: Optional[bool] = False,
+        bucket: Optional[Union[str, timedelta]] = None,
     ):
         """
         Public method used to configure grouping results.
-        :param group_by: name of the property to group by
+        :param group_by: name of the property to group by - or a tuple of properties to group by together.
+        If a tuple is given, groups are keyed by a tuple of each property's value
         :param group_ranges: a dictionary containing names of the group and list of prop values
-        to select for that group
+        to select for that group (tuples of prop values if grouping by multiple properties)
         :param include_missing: a flag which, if set, will include an extra grouping for values
         that don't fall into any group specified in group_ranges
+        :param bucket: an optional time bucket - "day", "week", "month" or a timedelta. If given, group_by must
+        be a single timestamp property and results are grouped by the time bucket their timestamp falls into
         """
         group_by = self._parse_group_by_inputs(group_by)
+        if bucket is not None:
+            if len(group_by) > 1:
+                raise ParseQueryError(
+                    "Error: time buckets can only be used when grouping by one property"
+                )
+            # validates bucket
+            TimeBucketer(bucket)
 
-        if group_by not in self._prop_enum_cls:
-            raise ParseQueryError(
-                f"Error: Given property to group by: {group_by.name} is not supported by query"
-            )
+        for prop in group_by:
+            if prop not in self._prop_enum_cls:
+                raise ParseQueryError(
+                    f"Error: Given property to group by: {prop.name} is not supported by query"
+                )
 
         self._group_by = group_by
-        self._group_mappings = {}
+        self._bucket = bucket
+        self._group_names = []
+        self._group_ranges = {}
+        self._include_missing = False
         if group_ranges:
             self._parse_group_ranges(group_ranges)
-
-        if include_missing:
-            self._add_include_missing_group(group_ranges)
+            self._include_missing = bool(include_missing)
@@ -1,14 +1,24 @@
 import csv
+import gzip
 import io
+import itertools
 import json
-from typing import Dict, List, Optional, Set, Type, Union
+import os
+import sqlite3
+from contextlib import contextmanager
+from html import escape
+from typing import IO, Dict, Iterator, List, Optional, Set, Tuple, Type, Union
 
 from tabulate import tabulate
 
 from openstackquery.aliases import PropValue
 from openstackquery.enums.props.prop_enum import PropEnum
 from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.columnar_output import ColumnarOutput
 from openstackquery.query_blocks.results_container import ResultsContainer
+from openstackquery.query_blocks.snapshot_file import SnapshotFile
+from openstackquery.query_blocks.sqlite_output import SqliteOutput
+from openstackquery.query_blocks.table_renderer import TableRenderer
 
 
 class QueryOutput:
@@ -60,15 +70,33 @@ class QueryOutput:
         if not groups:
             return results
 
-        if not isinstance(results, dict):
+        QueryOutput._validate_group_names(
+            list(results.keys()) if isinstance(results, dict) else None, groups
+        )
+        return {group_key: results[group_key] for group_key in groups}
+
+    @staticmethod
+    def _validate_group_names(
+        group_names: Optional[List[PropValue]], groups: Optional[List[str]] = None
+    ):
+        """
+        helper method which checks that each of a given list of groups is a group results are in.
+        Outputs error if:
+            - groups contains a value not in group names
+            - results aren't grouped (group_names is None)
+        :param group_names: names of groups results are in - None if results aren't grouped
+        :param groups: an optional list of groups to check
+        """
+        if not groups:
+            return
+        if group_names is None:
             raise ParseQueryError(
                 f"Result is not grouped - cannot filter by given group(s) {groups}"
             )
-        if not all(group in results.keys() for group in groups):
+        if not all(group in group_names for group in groups):
             raise ParseQueryError(
-                f"Group(s) given are invalid - valid groups {list(results.keys())}"
+                f"Group(s) given are invalid - valid groups {group_names}"
             )
-        return {group_key: results[group_key] for group_key in groups}
 
     def to_objects(
         self, results_container: ResultsContainer, groups: Optional[List[str]] = None
@@ -87,19 +115,42 @@ class QueryOutput:
         results_container: ResultsContainer,
         flatten: bool = False,
         groups: Optional[List[str]] = None,
+        include_group_summaries: bool = False,
     ) -> Union[Dict[str, List], List]:
         """
         return results as selected props
         :param results_container: container object which stores results
         :param flatten: boolean which will flatten results if true
         :param groups: a list of group keys to limit output by
+        :param include_group_summaries: if results are in nested groups, output each group with its
+        summary (count and aggregated values) - ignored if flatten is set
         """
-        results = results_container.to_props(*self.selected_props)
+        if include_group_summaries and not flatten:
+            results = results_container.to_props(
+                *self.selected_props, include_group_summaries=True
+            )
+        else:
+            results = results_container.to_props(*self.selected_props)
         results = self._validate_groups(results, groups)
         if flatten:
             results = self._flatten(results)
         return results
 
+    def to_rows(
+        self,
+        results_container: ResultsContainer,
+        groups: Optional[List[str]] = None,
+        named: bool = False,
+    ) -> Tuple[Tuple[str, ...], Union[Dict[str, List[Tuple]], List[Tuple]]]:
+        """
+        return results as a header of property names and a tuple of selected property values per result
+        :param results_container: container object which stores results
+        :param groups: a list of group keys to limit output by
+        :param named: if True, output each row as a namedtuple
+        """
+        header, rows = results_container.to_rows(*self.selected_props, named=named)
+        return header, self._validate_groups(rows, groups)
+
     def to_string(
         self,
         results_container: ResultsContainer,
@@ -114,28 +165,16 @@ class QueryOutput:
         :param title: an optional title for the table when it gets outputted
         :param groups: a list of groups to limit output by
         :param include_group_titles: include group name as subtitle when printing groups
-        :param kwargs: kwargs to pass to _generate_table method
+        :param kwargs: kwargs to pass to _write_table method
         """
-        results = results_container.to_props(*self.selected_props)
-        results = self._validate_groups(results, groups)
-
-        output = "" if not title else f"{title}:\n"
-
-        if isinstance(results, dict):
-            for group_title in list(results.keys()):
-                output += self._generate_table(
-                    results[group_title],
-                    return_html=False,
-                    title=f"{group_title}:\n" if include_group_titles else None,
-                    **kwargs,
-                )
-                output += "\n\n"
-        else:
-            output += self._generate_table(
-                results, return_html=False, title=None, **kwargs
-            )
-            output += "\n\n"
-        return output
+        return self._generate_tables(
+            results_container,
+            return_html=False,
+            title=title,
+            groups=groups,
+            include_group_titles=include_group_titles,
+            **kwargs,
+        )
 
     def to_html(
         self,
@@ -151,29 +190,64 @@ class QueryOutput:
         :param title: a title for the table(s) when it gets outputted
         :param groups: a list of groups to limit output by
         :param include_group_titles: include group name as subtitle when printing groups
-        :param kwargs: kwargs to pass to generate table
+        :param kwargs: kwargs to pass to _write_table method
+        """
+        return self._generate_tables(
+            results_container,
+            return_html=True,
+            title=title,
+            groups=groups,
+            include_group_titles=include_group_titles,
+            **kwargs,
+        )
+
+    def _generate_tables(
+        self,
+        results_container: ResultsContainer,
+        return_html: bool,
+        title: Optional[str],
+        groups: Optional[List[str]],
+        include_group_titles: bool,
+        **kwargs,
+    ) -> str:
+        """
+        Helper method to output results as one table - or one table per group if results are grouped.
+        Tables are written into a single buffer
+        :param results_container: container object which stores results
+        :param return_html: True if output required in html table format else output plain text table
+        :param title: an optional title for the table(s)
+        :param groups: a list of groups to limit output by
+        :param include_group_titles: include group name as subtitle when printing groups
+        :param kwargs: kwargs to pass to _write_table method
         """
         results = results_container.to_props(*self.selected_props)
         results = self._validate_groups(results, groups)
-        output = "" if not title else f"<b>{title}:</b><br/>"
-
-        if isinstance(results, dict):
-            for group_title in list(results.keys()):
-                output += self._generate_table(
-                    results[group_title],
-                    return_html=True,
-                    title=(
-                        f"<b>{group_title}:</b><br/>" if include_group_titles else None
-                    ),
-                    **kwargs,
-                )
-                output += "<br/><br/>"
-        else:
-            output += self._generate_table(
-                results, return_html=True, title=None, **kwargs
+        line_end, separator = ("<br/>", "<br/><br/>") if return_html else ("\n", "\n\n")
+
+        out = io.StringIO()
+        if title:
+            out.write(f"<b>{title}:</b><br/>" if return_html else f"{title}:\n")
+
+        if self._is_nested(results):
+            self._write_nested_tables(
+                out,
+                results,
+                results_container.get_group_summaries(),
+                return_html=return_html,
+                include_group_titles=include_group_titles,
+                **kwargs,
             )
-            output += "<br/><br/>"
-        return output
+        elif isinstance(results, dict):
+            for group_title, group in results.items():
+                if include_group_titles:
+                    out.write(self._format_group_title(str(group_title), return_html))
+                    out.write(line_end)
+                self._write_table(out, group, return_html, **kwargs)
+                out.write(separator)
+        else:
+            self._write_table(out, results, return_html, **kwargs)
+            out.write(separator)
+        return out.getvalue()
 
     def _parse_select_inputs(self, props):
         """
@@ -210,27 +284,162 @@ class QueryOutput:
         self.selected_props = set(all_props)
 
     @staticmethod
-    def _generate_table(
-        results: List[Dict[str, PropValue]], return_html: bool, title=None, **kwargs
-    ) -> str:
+    def _is_nested(results: Union[List, Dict]) -> bool:
+        """
+        Helper method which returns True if results are in nested groups - i.e. groups hold groups instead of
+        lists of results
+        :param results: results to check
+        """
+        return isinstance(results, dict) and any(
+            isinstance(group, dict) for group in results.values()
+        )
+
+    @staticmethod
+    def _iter_nested_groups(results: Dict, path: Tuple = ()):
+        """
+        Helper method which walks nested groups depth-first - yielding the path of group names to each group
+        and the group itself (a dict of child groups, or a list of results)
+        :param results: nested groups to walk
+        :param path: path of group names to given groups
         """
-        Returns a table from the result of 'self.parse_properties'
-        :param results: dict of query results
+        for name, group in results.items():
+            group_path = (*path, name)
+            yield group_path, group
+            if isinstance(group, dict):
+                yield from QueryOutput._iter_nested_groups(group, group_path)
+
+    @classmethod
+    def _path_to_str(cls, path: Tuple) -> str:
+        """
+        Helper method which converts a path of group names into a string - i.e. "project1 / ACTIVE"
+        :param path: path of group names
+        """
+        return " / ".join(str(cls._group_key_to_str(name)) for name in path)
+
+    @staticmethod
+    def _format_group_title(group_title: str, return_html: bool) -> str:
+        """
+        Helper method to format a group name as a subtitle - html escaped if outputting html
+        :param group_title: group name (or path of group names) to format
+        :param return_html: True if output required in html format
+        """
+        if return_html:
+            return f"<b>{escape(group_title)}:</b>"
+        return f"{group_title}:"
+
+    def _write_nested_tables(
+        self,
+        out: IO,
+        results: Dict,
+        summaries: Dict,
+        return_html: bool,
+        include_group_titles: bool,
+        **kwargs,
+    ):
+        """
+        Helper method to output nested groups as tables - one table per innermost group. Each group's
+        title is the path of group names to it, followed by the group's summary (count and aggregated values)
+        :param out: buffer to write tables to
+        :param results: nested groups of selected props to output
+        :param summaries: group summaries, keyed by path of group names
+        :param return_html: True if output required in html table format else output plain text table
+        :param include_group_titles: include group path and summary as subtitle when printing groups
+        :param kwargs: kwargs to pass to _write_table method
+        """
+        line_end, separator = ("<br/>", "<br/><br/>") if return_html else ("\n", "\n\n")
+        for path, group in self._iter_nested_groups(results):
+            if include_group_titles:
+                out.write(
+                    self._format_group_title(self._path_to_str(path), return_html)
+                )
+                summary = summaries.get(path)
+                if summary:
+                    summary = ", ".join(f"{key}: {val}" for key, val in summary.items())
+                    out.write(line_end)
+                    out.write(escape(summary) if return_html else summary)
+                out.write(line_end)
+
+            if isinstance(group, dict):
+                if include_group_titles:
+                    out.write(line_end)
+                continue
+            self._write_table(out, group, return_html, **kwargs)
+            out.write(separator)
+
+    @staticmethod
+    def _write_table(
+        out: IO,
+        results: List[Dict[str, PropValue]],
+        return_html: bool,
+        *,
+        backend: str = "builtin",
+        max_rows: Optional[int] = None,
+        page: int = 0,
+        max_col_width: Optional[int] = None,
+        **kwargs,
+    ):
+        """
+        Writes a table of selected properties to a buffer
+        :param out: buffer to write table to
+        :param results: rows of selected properties
         :param return_html: True if output required in html table format else output plain text table
+        :param backend: "builtin" to use the built-in table renderer, or "tabulate" to use tabulate.
+        tabulate is always used if any other kwargs are given
+        :param max_rows: an optional maximum number of rows to output - longer tables are split into pages
+        :param page: which page of max_rows rows to output (starting at 0)
+        :param max_col_width: an optional maximum number of characters to output per cell (built-in renderer only)
         :param kwargs: kwargs to pass to tabulate
-        :return: String (html or plaintext table of results)
         """
-        output = "" if not title else f"{title}"
+        if backend not in ("builtin", "tabulate"):
+            raise ParseQueryError(
+                f"Error: table backend {backend} is not supported - use 'builtin' or 'tabulate'"
+            )
+        if not results:
+            out.write("No results found")
+            return
+
+        renderer = TableRenderer(max_rows, page, max_col_width)
+        if backend == "builtin" and not kwargs:
+            if return_html:
+                renderer.write_html(out, results)
+            else:
+                renderer.write_text(out, results)
+            return
 
-        if results:
-            headers = list(results[0].keys())
-            rows = [list(row.values()) for row in results]
-            output += tabulate(
+        headers = list(results[0].keys())
+        rows = [list(row.values()) for row in renderer.get_page(results)]
+        out.write(
+            tabulate(
                 rows, headers, tablefmt="html" if return_html else "grid", **kwargs
             )
-        else:
-            output += "No results found"
-        return output
+        )
+        footer = renderer.get_footer(len(results))
+        if footer:
+            out.write(f"<br/>{footer}" if return_html else f"\n{footer}")
+
+    @staticmethod
+    def _group_key_to_str(group_key: PropValue) -> PropValue:
+        """
+        Helper function to convert a group key made by grouping on multiple properties (a tuple of values)
+        into a string. Other group keys are returned as-is
+        :param group_key: group key to convert
+        """
+        if isinstance(group_key, tuple):
+            return ", ".join(str(val) for val in group_key)
+        return group_key
+
+    @classmethod
+    def _group_keys_to_str(cls, results: Dict) -> Dict:
+        """
+        Helper function to convert group keys into strings - including keys of nested groups
+        :param results: grouped results to convert keys for
+        """
+        return {
+            cls._group_key_to_str(group): (
+                cls._group_keys_to_str(items) if isinstance(items, dict) else items
+            )
+            for group, items in results.items()
+        }
 
     @staticmethod
     def _flatten(data: Union[List, Dict]) -> Optional[Dict]:
@@ -248,6 +457,10 @@ class QueryOutput:
 
         result = {}
         for group_key, values in data.items():
+            if isinstance(values, dict):
+                # nested groups are flattened group by group
+                result[group_key] = QueryOutput._flatten(values) or {}
+                continue
             result[group_key] = QueryOutput._flatten_list(values)
 
         return result
@@ -299,6 +512,14 @@ class QueryOutput:
         results = results_container.to_props(*self.selected_props)
         results = self._validate_groups(results, groups)
 
+        if self._is_nested(results):
+            # nested groups are written by innermost group - named by path of group names
+            results = {
+                self._path_to_str(path): items
+                for path, items in self._iter_nested_groups(results)
+                if isinstance(items, list)
+            }
+
         if flatten_groups and isinstance(results, dict):
             merged_list = []
             for group, items in results.items():
@@ -323,6 +544,7 @@ class QueryOutput:
         groups: Optional[List[str]] = None,
         flatten_groups: bool = False,
         pretty: bool = False,
+        include_group_summaries: bool = False,
     ) -> str:
         """
         Method to return results as a JSON string.
@@ -330,11 +552,25 @@ class QueryOutput:
         :param groups: optional list of group keys to limit output by.
         :param flatten_groups: if True and results are grouped, merge all groups into a single list with group info.
         :param pretty: if True, return pretty-printed JSON.
+        :param include_group_summaries: if True and results are in nested groups, output each group with its
+        summary (count and aggregated values) - ignored if flatten_groups is set
         :return: JSON string representation of results.
         """
-        results = results_container.to_props(*self.selected_props)
+        if include_group_summaries and not flatten_groups:
+            results = results_container.to_props(
+                *self.selected_props, include_group_summaries=True
+            )
+        else:
+            results = results_container.to_props(*self.selected_props)
         results = self._validate_groups(results, groups)
 
+        if flatten_groups and self._is_nested(results):
+            results = {
+                self._path_to_str(path): items
+                for path, items in self._iter_nested_groups(results)
+                if isinstance(items, list)
+            }
+
         if flatten_groups and isinstance(results, dict):
             merged_list = []
             for group, items in results.items():
@@ -344,7 +580,361 @@ class QueryOutput:
                     merged_list.append(item_with_group)
             results = merged_list
 
+        if isinstance(results, dict):
+            # json keys must be strings - i.e. when grouped by multiple properties, groups are keyed by tuples
+            results = self._group_keys_to_str(results)
+
         if pretty:
             return json.dumps(results, indent=4)
 
         return json.dumps(results)
+
+    @staticmethod
+    @contextmanager
+    def _open_sink(fp: Union[str, os.PathLike, IO], compress: bool) -> Iterator[IO]:
+        """
+        Helper method which opens a file path or file object to write text to - gzip compressing it if compress
+        is set. Paths are closed once written, file objects are left open
+        :param fp: a file path - or a file object opened in text mode (binary mode if compress is set)
+        :param compress: if True, gzip compress output
+        """
+        if isinstance(fp, (str, os.PathLike)):
+            opener = gzip.open if compress else open
+            with opener(fp, "wt", encoding="utf-8", newline="") as sink:
+                yield sink
+        elif compress:
+            with gzip.GzipFile(fileobj=fp, mode="wb") as compressed:
+                with io.TextIOWrapper(compressed, encoding="utf-8", newline="") as sink:
+                    yield sink
+        else:
+            yield fp
+
+    @classmethod
+    def _get_group_label(cls, path: Tuple) -> PropValue:
+        """
+        Helper method which returns the name a group is written as - the group name, or path of group names
+        if results are in nested groups
+        :param path: path of group names to the group
+        """
+        if len(path) == 1:
+            return path[0]
+        return cls._path_to_str(path)
+
+    def _iter_rows_with_group(
+        self, results_container: ResultsContainer, groups: Optional[List[str]]
+    ) -> Iterator[Tuple[Optional[PropValue], Dict]]:
+        """
+        Helper method which yields each row of selected properties along with the name of the group it's in
+        (None if results aren't grouped)
+        :param results_container: container object which stores results
+        :param groups: a list of groups to limit output by
+        """
+        for path, rows in results_container.iter_props(
+            *self.selected_props, groups=groups
+        ):
+            if rows is None:
+                continue
+            group = self._get_group_label(path) if path else None
+            for row in rows:
+                yield group, row
+
+    def write_csv(
+        self,
+        results_container: ResultsContainer,
+        fp: Union[str, os.PathLike, IO],
+        groups: Optional[List[str]] = None,
+        flatten_groups: bool = False,
+        compress: bool = False,
+    ):
+        """
+        Method to write results as csv to a file - one row at a time, so that rows are never all held in memory.
+        Output matches to_csv
+        :param results_container: container object which stores results.
+        :param fp: a file path - or a file object opened in text mode (binary mode if compress is set)
+        :param groups: a list of groups to limit output by
+        :param flatten_groups: If True, grouped data is merged into a single CSV with a 'group' column.
+        :param compress: If True, gzip compress output
+        """
+        self._validate_group_names(results_container.group_names, groups)
+        if flatten_groups or results_container.group_names is None:
+            rows = self._iter_rows_with_group(results_container, groups)
+            first = next(rows, None)
+            if not first or not first[1]:
+                raise RuntimeError(
+                    "Error: Could not write to csv: No results found, or no properties selected to output"
+                )
+            fields = list(first[1].keys())
+            if first[0] is not None:
+                fields.append("group")
+            with self._open_sink(fp, compress) as sink:
+                writer = csv.DictWriter(sink, fieldnames=fields)
+                writer.writeheader()
+                for group, row in itertools.chain([first], rows):
+                    writer.writerow(row if group is None else {**row, "group": group})
+            return
+
+        with self._open_sink(fp, compress) as sink:
+            separator = ""
+            for path, rows in results_container.iter_props(
+                *self.selected_props, groups=groups
+            ):
+                if rows is None:
+                    continue
+                sink.write(f"{separator}# Group: {self._get_group_label(path)}\n")
+                separator = "\n"
+                first = next(rows, None)
+                if not first:
+                    continue
+                writer = csv.DictWriter(sink, fieldnames=list(first.keys()))
+                writer.writeheader()
+                writer.writerow(first)
+                writer.writerows(rows)
+
+    @staticmethod
+    def _json_key(group_key: PropValue) -> str:
+        """
+        Helper method which returns a group name as a json object key - converted the same way json.dumps
+        converts dictionary keys
+        :param group_key: group name
+        """
+        group_key = QueryOutput._group_key_to_str(group_key)
+        return json.dumps(
+            group_key if isinstance(group_key, str) else json.dumps(group_key)
+        )
+
+    @staticmethod
+    def _write_json_list(sink: IO, rows: Iterator[Dict]):
+        """
+        Helper method which writes rows as a json list - one row at a time
+        :param sink: file object to write to
+        :param rows: rows to write
+        """
+        sink.write("[")
+        for i, row in enumerate(rows):
+            if i:
+                sink.write(", ")
+            sink.write(json.dumps(row))
+        sink.write("]")
+
+    def write_json(
+        self,
+        results_container: ResultsContainer,
+        fp: Union[str, os.PathLike, IO],
+        groups: Optional[List[str]] = None,
+        flatten_groups: bool = False,
+        compress: bool = False,
+    ):
+        """
+        Method to write results as json to a file - one row at a time, so that rows are never all held in memory.
+        Output matches to_json
+        :param results_container: container object which stores results.
+        :param fp: a file path - or a file object opened in text mode (binary mode if compress is set)
+        :param groups: optional list of group keys to limit output by.
+        :param flatten_groups: if True and results are grouped, merge all groups into a single list with group info.
+        :param compress: If True, gzip compress output
+        """
+        self._validate_group_names(results_container.group_names, groups)
+        with self._open_sink(fp, compress) as sink:
+            if flatten_groups or results_container.group_names is None:
+                self._write_json_list(
+                    sink,
+                    (
+                        row if group is None else {**row, "group": group}
+                        for group, row in self._iter_rows_with_group(
+                            results_container, groups
+                        )
+                    ),
+                )
+                return
+
+            # holds whether the next group written is the first in each open json object
+            first_in_object = [True]
+            sink.write("{")
+            for path, rows in results_container.iter_props(
+                *self.selected_props, groups=groups
+            ):
+                while len(first_in_object) > len(path):
+                    sink.write("}")
+                    first_in_object.pop()
+                if not first_in_object[-1]:
+                    sink.write(", ")
+                first_in_object[-1] = False
+                sink.write(f"{self._json_key(path[-1])}: ")
+                if rows is None:
+                    sink.write("{")
+                    first_in_object.append(True)
+                else:
+                    self._write_json_list(sink, rows)
+            sink.write("}" * len(first_in_object))
+
+    def write_ndjson(
+        self,
+        results_container: ResultsContainer,
+        fp: Union[str, os.PathLike, IO],
+        groups: Optional[List[str]] = None,
+        compress: bool = False,
+    ):
+        """
+        Method to write results as newline-delimited json to a file - one json object per row.
+        If results are grouped, each row includes a "group" field holding the group it's in
+        :param results_container: container object which stores results.
+        :param fp: a file path - or a file object opened in text mode (binary mode if compress is set)
+        :param groups: optional list of group keys to limit output by.
+        :param compress: If True, gzip compress output
+        """
+        self._validate_group_names(results_container.group_names, groups)
+        with self._open_sink(fp, compress) as sink:
+            for group, row in self._iter_rows_with_group(results_container, groups):
+                if group is not None:
+                    row = {**row, "group": group}
+                sink.write(json.dumps(row))
+                sink.write("\n")
+
+    def _get_columns(
+        self, results_container: ResultsContainer, groups: Optional[List[str]]
+    ) -> Tuple[Tuple[str, ...], List[List[PropValue]], Optional[List[str]]]:
+        """
+        Helper method which returns the name and values of each selected property column - and, if results
+        are grouped, the group each row is in (as a group name or path of group names)
+        :param results_container: container object which stores results
+        :param groups: a list of groups to limit output by
+        """
+        self._validate_group_names(results_container.group_names, groups)
+        header, columns, paths = results_container.to_columns(*self.selected_props)
+        if paths is None:
+            return header, columns, None
+        if groups:
+            keep = [path[0] in groups for path in paths]
+            columns = [list(itertools.compress(column, keep)) for column in columns]
+            paths = list(itertools.compress(paths, keep))
+        return header, columns, [self._path_to_str(path) for path in paths]
+
+    def to_arrow(
+        self,
+        results_container: ResultsContainer,
+        groups: Optional[List[str]] = None,
+        dictionary_threshold: float = 0.5,
+    ):
+        """
+        Method to return results as a pyarrow Table - built one column at a time with a typed column per
+        selected property. If results are grouped, a "group" column holds the group each row is in.
+        Requires pyarrow - install with the "arrow" extra
+        :param results_container: container object which stores results.
+        :param groups: optional list of group keys to limit output by.
+        :param dictionary_threshold: string columns with at most this ratio of distinct values to rows
+        are dictionary encoded - set to 0 to disable
+        """
+        columnar = ColumnarOutput(self.DEFAULT_OUT, dictionary_threshold)
+        return columnar.to_arrow(*self._get_columns(results_container, groups))
+
+    def to_pandas(
+        self,
+        results_container: ResultsContainer,
+        groups: Optional[List[str]] = None,
+        dictionary_threshold: float = 0.5,
+    ):
+        """
+        Method to return results as a pandas DataFrame - converted from to_arrow().
+        Requires pyarrow and pandas - install with the "pandas" extra
+        :param results_container: container object which stores results.
+        :param groups: optional list of group keys to limit output by.
+        :param dictionary_threshold: see to_arrow() - dictionary encoded columns become categoricals
+        """
+        table = self.to_arrow(results_container, groups, dictionary_threshold)
+        return ColumnarOutput().to_pandas(table)
+
+    def to_polars(
+        self,
+        results_container: ResultsContainer,
+        groups: Optional[List[str]] = None,
+        dictionary_threshold: float = 0.5,
+    ):
+        """
+        Method to return results as a polars DataFrame - converted from to_arrow().
+        Requires pyarrow and polars - install with the "polars" extra
+        :param results_container: container object which stores results.
+        :param groups: optional list of group keys to limit output by.
+        :param dictionary_threshold: see to_arrow() - dictionary encoded columns become categoricals
+        """
+        table = self.to_arrow(results_container, groups, dictionary_threshold)
+        return ColumnarOutput().to_polars(table)
+
+    def write_parquet(
+        self,
+        results_container: ResultsContainer,
+        fp: Union[str, os.PathLike, IO],
+        groups: Optional[List[str]] = None,
+        compression: str = "snappy",
+    ):
+        """
+        Method to write results to a parquet file - written from to_arrow().
+        Requires pyarrow - install with the "arrow" extra
+        :param results_container: container object which stores results.
+        :param fp: a file path - or a file object opened in binary mode
+        :param groups: optional list of group keys to limit output by.
+        :param compression: compression codec to use - i.e. "snappy", "zstd", "gzip" or "none"
+        """
+        table = self.to_arrow(results_container, groups)
+        ColumnarOutput().write_parquet(table, fp, compression)
+
+    def to_sqlite(
+        self,
+        results_container: ResultsContainer,
+        conn: sqlite3.Connection,
+        table: str,
+        *,
+        groups: Optional[List[str]] = None,
+        index_props: Optional[List[PropEnum]] = None,
+        if_exists: str = "fail",
+    ):
+        """
+        Method to load results into a SQLite table - with a typed column per selected property.
+        If results are grouped, a "group" column holds the group each row is in.
+        :param results_container: container object which stores results.
+        :param conn: sqlite3 connection to load results into
+        :param table: name of table to create
+        :param groups: optional list of group keys to limit output by.
+        :param index_props: properties to create indexes on - ignored if not selected
+        :param if_exists: what to do if the table already exists - "fail", "replace" or "append"
+        """
+        header, columns, group_labels = self._get_columns(results_container, groups)
+        if group_labels is not None:
+            header, columns = (*header, "group"), [*columns, group_labels]
+        SqliteOutput(self.DEFAULT_OUT).load(
+            conn,
+            table,
+            header,
+            columns,
+            index_columns=[prop.name.lower() for prop in index_props or []],
+            if_exists=if_exists,
+        )
+
+    @classmethod
+    def _flatten_objects(cls, results: Union[Dict, List]) -> List:
+        """
+        Helper method which returns every object in (possibly nested) groups of results as one list
+        :param results: a list of objects or a dict of groups
+        """
+        if isinstance(results, list):
+            return results
+        return [
+            obj for group in results.values() for obj in cls._flatten_objects(group)
+        ]
+
+    def write_snapshot(
+        self,
+        results_container: ResultsContainer,
+        fp: Union[str, os.PathLike, IO],
+        resource_type: str,
+        groups: Optional[List[str]] = None,
+    ) -> int:
+        """
+        Method to write result objects to a memory-mappable snapshot file - which can be opened with
+        SnapshotFile and queried with from_subset. Returns the number of bytes written
+        :param results_container: container object which stores results.
+        :param fp: a file path - or a file object opened in binary mode
+        :param resource_type: type of resource written - i.e. "server"
+        :param groups: optional list of group keys to limit output by.
+        """
+        objs = self._flatten_objects(self.to_objects(results_container, groups))
+        return SnapshotFile.write(fp, objs, self._prop_enum_cls, resource_type)
@@ -1,11 +1,17 @@
+from datetime import timedelta
 from typing import List, Dict, Union, Type, Tuple, Optional
 import logging
 
 from openstackquery.aliases import GroupRanges
 
+from openstackquery.enums.aggregate_func import AggregateFunc
 from openstackquery.enums.sort_order import SortOrder
 from openstackquery.enums.props.prop_enum import PropEnum
+from openstackquery.exceptions.parse_query_error import ParseQueryError
 
+from openstackquery.query_blocks.aggregate_result import AggregateResult
+from openstackquery.query_blocks.group_node import GroupNode
+from openstackquery.query_blocks.query_aggregator import QueryAggregator
 from openstackquery.query_blocks.query_grouper import QueryGrouper
 from openstackquery.query_blocks.query_sorter import QuerySorter
 from openstackquery.query_blocks.result import Result
@@ -13,6 +19,7 @@ from openstackquery.query_blocks.result import Result
 logger = logging.getLogger(__name__)
 
 
+# pylint: disable=too-many-instance-attributes
 class QueryParser:
     """
     Helper class for taking query output and parsing it into a format which can then be outputted.
@@ -21,12 +28,91 @@ class QueryParser:
 
     def __init__(self, prop_enum_cls: Type[PropEnum]):
         self.sorter = QuerySorter(prop_enum_cls)
+        self._prop_enum_cls = prop_enum_cls
         self.grouper = QueryGrouper(prop_enum_cls)
+        self.subgroupers: List[QueryGrouper] = []
+        self.aggregator = QueryAggregator(prop_enum_cls)
         self._sort = False
         self._group = False
+        self._aggregate = False
+        self._limit: Optional[int] = None
+        self._offset = 0
+        # incremented whenever sorting/grouping/aggregation/limit change - so parsed results can be reused
+        self._version = 0
 
     def reset_group_by(self):
         self._group = False
+        self._version += 1
+
+    @property
+    def fingerprint(self) -> Tuple[int, int]:
+        """
+        a getter method which returns a value that changes whenever parsing is re-configured (i.e. sort_by or
+        group_by is called) - results parsed with the same fingerprint do not need to be parsed again
+        """
+        return id(self), self._version
+
+    @property
+    def has_aggregations(self) -> bool:
+        """
+        a getter method which returns True if results will be aggregated
+        """
+        return self._aggregate
+
+    @property
+    def limit(self) -> Optional[int]:
+        """
+        a getter method to return maximum number of results to output - None if no limit has been set
+        """
+        return self._limit
+
+    @property
+    def offset(self) -> int:
+        """
+        a getter method to return number of results to skip before outputting
+        """
+        return self._offset
+
+    @property
+    def sort_by(self) -> Dict[PropEnum, bool]:
+        """
+        a getter method to return sort by specs set - empty if no sorting has been set
+        """
+        return self.sorter.sort_by if self._sort else {}
+
+    @property
+    def groupers(self) -> List[QueryGrouper]:
+        """
+        a getter method to return groupers of each level of groups set - empty if no grouping has been set
+        """
+        return [self.grouper, *self.subgroupers] if self._group else []
+
+    def get_fetch_limit(self, sort_pushed_down: bool = False) -> Optional[int]:
+        """
+        method to return the number of results that need to be found when running the query.
+        Returns None if all results must be found - i.e. no limit set, results need to be sorted/grouped
+        before limit can be applied, or results are aggregated (limit is not applied to summarised results)
+        :param sort_pushed_down: True if results will be found in sorted order (sorted by openstack API)
+        """
+        if self._limit is None or self._group or self._aggregate:
+            return None
+        if self._sort and not sort_pushed_down:
+            return None
+        return self._offset + self._limit
+
+    def parse_limit(self, limit: Optional[int], offset: int = 0):
+        """
+        public method to set the maximum number of results to output
+        :param limit: maximum number of results to output (per group if results are grouped) - None for no limit
+        :param offset: number of results to skip before outputting
+        """
+        if (limit is not None and limit < 0) or offset < 0:
+            raise ParseQueryError(
+                f"Error: limit ({limit}) and offset ({offset}) must not be negative"
+            )
+        self._limit = limit
+        self._offset = offset
+        self._version += 1
 
     def parse_sort_by(
         self, *sort_by: Tuple[Union[PropEnum, str], Union[SortOrder, str]]
@@ -37,12 +123,14 @@ class QueryParser:
         """
         self.sorter.parse_sort_by(*sort_by)
         self._sort = True
+        self._version += 1
 
     def parse_group_by(
         self,
-        group_by: Union[str, PropEnum],
+        group_by: Union[str, PropEnum, Tuple[Union[str, PropEnum], ...]],
         group_ranges: Optional[GroupRanges] = None,
         include_missing: Optional[bool] = False,
+        bucket: Optional[Union[str, timedelta]] = None,
     ):
         """
         public method to set grouping parameters. Forwards onto grouper.parse_group_by
@@ -51,9 +139,52 @@ class QueryParser:
         to select for that group
         :param include_missing: a flag which, if set, will include an extra grouping for values
         that don't fall into any group specified in group_ranges
+        :param bucket: an optional time bucket to group timestamps by - "day", "week", "month" or a timedelta
         """
-        self.grouper.parse_group_by(group_by, group_ranges, include_missing)
+        self.grouper.parse_group_by(group_by, group_ranges, include_missing, bucket)
+        self.subgroupers = []
         self._group = True
+        self._version += 1
+
+    def parse_subgroup_by(
+        self,
+        group_by: Union[str, PropEnum, Tuple[Union[str, PropEnum], ...]],
+        group_ranges: Optional[GroupRanges] = None,
+        include_missing: Optional[bool] = False,
+        bucket: Optional[Union[str, timedelta]] = None,
+    ):
+        """
+        public method to add a level of nested groups - each group made so far is split further into groups.
+        Takes the same parameters as parse_group_by
+        :param group_by: property to group by - or a tuple of properties to group by together
+        :param group_ranges: a dictionary containing names of the group and list of prop values
+        to select for that group
+        :param include_missing: a flag which, if set, will include an extra grouping for values
+        that don't fall into any group specified in group_ranges
+        :param bucket: an optional time bucket to group timestamps by - "day", "week", "month" or a timedelta
+        """
+        if not self._group:
+            raise ParseQueryError(
+                "Error: group_by must be set before adding nested groups with subgroup_by"
+            )
+        subgrouper = QueryGrouper(self._prop_enum_cls)
+        subgrouper.parse_group_by(group_by, group_ranges, include_missing, bucket)
+        self.subgroupers.append(subgrouper)
+        self._version += 1
+
+    def parse_aggregate(
+        self,
+        *aggregations: Union[
+            str, AggregateFunc, Tuple[Union[str, AggregateFunc], Union[str, PropEnum]]
+        ],
+    ):
+        """
+        public method to set aggregations. Forwards onto aggregator.parse_aggregate
+        :param aggregations: one or more tuples of aggregate function and property to aggregate
+        """
+        self.aggregator.parse_aggregate(*aggregations)
+        self._aggregate = bool(aggregations)
+        self._version += 1
 
     def run_parser(
         self, obj_list: List[Result]
@@ -63,12 +194,112 @@ class QueryParser:
         :param obj_list: a list of Result objects containing query results to parse
         (runs both sorting and grouping)
         """
+        if self._group and self.subgroupers:
+            return self._run_nested_group_by(obj_list)
+
+        if self._aggregate:
+            return self._run_aggregate(obj_list)
 
-        # we sort first - assuming sorting is commutative to grouping
+        sort_limit = None if self._limit is None else self._offset + self._limit
+        if not self._group:
+            if self._sort:
+                obj_list = self.sorter.run_sort_by(obj_list, limit=sort_limit)
+            return self._apply_limit(obj_list)
+
+        # we group first and then sort within each group - this is cheaper than sorting everything up-front
+        grouped_results = self.grouper.run_group_by(obj_list)
         if self._sort:
-            obj_list = self.sorter.run_sort_by(obj_list)
+            # unique value groups are ordered as if results had been sorted before grouping - unless they are
+            # time buckets, which stay in chronological order
+            grouped_results = self.sorter.run_sort_by_groups(
+                grouped_results,
+                limit=sort_limit,
+                order_groups=not self.grouper.has_fixed_order,
+            )
+        if self._limit is None and not self._offset:
+            return grouped_results
+        return {
+            name: self._apply_limit(group) for name, group in grouped_results.items()
+        }
 
-        if self._group:
-            obj_list = self.grouper.run_group_by(obj_list)
+    def _run_aggregate(
+        self, obj_list: List[Result]
+    ) -> Union[List[AggregateResult], Dict[str, List[AggregateResult]]]:
+        """
+        Helper method to aggregate results - returns one row of aggregated values, or one row per group if
+        results are grouped. Sorting and limit are not applied since results are summarised
+        :param obj_list: a list of Result objects containing query results to aggregate
+        """
+        if not self._group:
+            return [self.aggregator.run_aggregate(obj_list)]
+        return {
+            name: [self.aggregator.run_aggregate(group)]
+            for name, group in self.grouper.run_group_by(obj_list).items()
+        }
+
+    def _run_nested_group_by(self, obj_list: List[Result]) -> GroupNode:
+        """
+        Helper method to group results into a tree of nested groups. All levels are grouped in a single pass -
+        each result's group names are found once per level and counts (and aggregations, if set) are
+        updated for every group the result is in. Results in each leaf group are then sorted/limited -
+        or replaced by one row of aggregated values if results are aggregated
+        :param obj_list: a list of Result objects containing query results to group
+        """
+        groupers = [self.grouper, *self.subgroupers]
+        group_names_funcs = [grouper.get_group_names_func() for grouper in groupers]
+        aggregator = self.aggregator if self._aggregate else None
+        get_values = aggregator.get_values_func() if aggregator else lambda _: None
 
-        return obj_list
+        root = GroupNode(
+            [grouper.initial_group_names for grouper in groupers],
+            aggregator.new_accumulators if aggregator else None,
+        )
+        root.count = len(obj_list)
+        for item in obj_list:
+            values = get_values(item)
+            nodes = [root]
+            for group_names_func in group_names_funcs:
+                nodes = [
+                    node.get_child(name)
+                    for node in nodes
+                    for name in group_names_func(item)
+                ]
+                for node in nodes:
+                    node.count += 1
+                    if aggregator:
+                        aggregator.accumulate(node.accumulators, values)
+            for node in nodes:
+                node.results.append(item)
+
+        sort_limit = None if self._limit is None else self._offset + self._limit
+        for path, node in root.walk():
+            if not path:
+                continue
+            node.summary = {"count": node.count}
+            if aggregator:
+                node.summary.update(aggregator.get_result(node.accumulators))
+
+            if not node.is_leaf:
+                node.children = groupers[len(path)].order_groups(node.children)
+            elif aggregator:
+                node.results = [
+                    AggregateResult(aggregator.get_result(node.accumulators))
+                ]
+            else:
+                if self._sort:
+                    node.results = self.sorter.run_sort_by(
+                        node.results, limit=sort_limit
+                    )
+                node.results = self._apply_limit(node.results)
+
+        root.children = self.grouper.order_groups(root.children)
+        return root
+
+    def _apply_limit(self, obj_list: List[Result]) -> List[Result]:
+        """
+        Helper method to apply offset and limit to a list of results (if set)
+        :param obj_list: a list of (sorted) Result objects
+        """
+        if self._limit is None:
+            return obj_list[self._offset :] if self._offset else obj_list
+        return obj_list[self._offset : self._offset + self._limit]
@@ -1,6 +1,8 @@
-from typing import List, Tuple, Union
+import heapq
 import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+from openstackquery.aliases import OpenstackResourceObj
 from openstackquery.query_blocks.result import Result
 
 from openstackquery.enums.sort_order import SortOrder
@@ -10,6 +12,52 @@ from openstackquery.exceptions.parse_query_error import ParseQueryError
 logger = logging.getLogger(__name__)
 
 
+class SortKey:
+    """
+    Composite sort key for a single result. Holds the value of every sort property (extracted once) and
+    compares them in order - applying the sort direction for each key individually.
+    None values are always placed last (regardless of direction) and values of mixed types that cannot be
+    compared are ordered by type name and then string representation, so sorting never fails
+    """
+
+    __slots__ = ("values", "reverse_flags")
+
+    def __init__(self, values: Tuple, reverse_flags: Tuple[bool, ...]):
+        self.values = values
+        self.reverse_flags = reverse_flags
+
+    @staticmethod
+    def _less_than(val: Any, other: Any) -> bool:
+        """
+        Helper method to compare two (non-None) values that may not be of comparable types
+        :param val: first value to compare
+        :param other: second value to compare
+        """
+        try:
+            return val < other
+        except TypeError:
+            return (type(val).__name__, str(val)) < (type(other).__name__, str(other))
+
+    def __lt__(self, other: "SortKey") -> bool:
+        for val, other_val, reverse in zip(
+            self.values, other.values, self.reverse_flags
+        ):
+            if val == other_val:
+                continue
+            if val is None or other_val is None:
+                # None always goes last
+                return other_val is None
+            if reverse:
+                return self._less_than(other_val, val)
+            return self._less_than(val, other_val)
+        return False
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, SortKey) and self.values == other.values
+
+    __hash__ = None
+
+
 class QuerySorter:
     """
     Helper class for implementing sorting on query outputs
@@ -68,20 +116,101 @@ class QuerySorter:
                 ),
             )
 
-    def run_sort_by(self, obj_list: List[Result]) -> List[Result]:
+    @property
+    def sort_by(self) -> Dict[PropEnum, bool]:
         """
-        method which sorts a list of query results based on a dictionary of sort_by specs
-        :param obj_list: a list of Result objects containing query results to sort
+        a getter method to return sort by specs - property enum mapped to True if sorting in descending order
         """
+        return self._sort_by
+
+    def get_object_key_func(self) -> Callable[[OpenstackResourceObj], SortKey]:
+        """
+        Method which builds a function that extracts a composite SortKey from an openstack resource object.
+        Property functions are looked up once here, so each object only pays for one call per sort property
+        """
+        prop_funcs = tuple(
+            self._prop_enum_cls.get_prop_mapping(prop) for prop in self._sort_by
+        )
+        reverse_flags = tuple(self._sort_by.values())
+
+        def _extract(prop_func, obj):
+            try:
+                return prop_func(obj)
+            except (AttributeError, KeyError):
+                return None
 
-        logger.debug("running multi-sort")
-        sort_num = len(self._sort_by)
-        obj_iter = enumerate(reversed(tuple(self._sort_by.items())), 1)
-        for i, (sort_key, reverse) in obj_iter:
-            logger.debug("running sort %s / %s", i, sort_num)
-            logger.debug("sorting by: %s, reverse=%s", sort_key, reverse)
-            prop_func = self._prop_enum_cls.get_prop_mapping(sort_key)
-            obj_list.sort(
-                key=lambda x, fn=prop_func: fn(x.as_object()), reverse=reverse
+        def _key_func(obj: OpenstackResourceObj) -> SortKey:
+            return SortKey(
+                tuple(_extract(prop_func, obj) for prop_func in prop_funcs),
+                reverse_flags,
             )
+
+        return _key_func
+
+    def _get_key_func(self) -> Callable[[Result], SortKey]:
+        """
+        Helper method which builds a function that extracts a composite SortKey from a Result
+        """
+        obj_key_func = self.get_object_key_func()
+        return lambda item: obj_key_func(item.as_object())
+
+    def run_sort_by(
+        self, obj_list: List[Result], limit: Optional[int] = None
+    ) -> List[Result]:
+        """
+        method which sorts a list of query results based on a dictionary of sort_by specs.
+        A composite key is extracted once per result and a single (stable) sort is done over all sort keys
+        :param obj_list: a list of Result objects containing query results to sort
+        :param limit: an optional number of results to keep - if given, only the first 'limit' results are
+        selected using a heap (top-K) instead of sorting the whole list
+        """
+        logger.debug(
+            "running multi-sort by: %s",
+            ", ".join(
+                f"{prop.name} (reverse={reverse})"
+                for prop, reverse in self._sort_by.items()
+            ),
+        )
+        key_func = self._get_key_func()
+
+        if limit is not None and limit < len(obj_list):
+            logger.debug("selecting top %s results", limit)
+            # heapq.nsmallest is stable - ties keep the original order of the results
+            return heapq.nsmallest(limit, obj_list, key=key_func)
+
+        obj_list.sort(key=key_func)
         return obj_list
+
+    def run_sort_by_groups(
+        self,
+        grouped_results: Dict[str, List[Result]],
+        limit: Optional[int] = None,
+        order_groups: bool = False,
+    ) -> Dict[str, List[Result]]:
+        """
+        method which sorts results within each group of already grouped results
+        :param grouped_results: a dictionary of group names mapped to a list of Result objects
+        :param limit: an optional number of results to keep per group
+        :param order_groups: if True, groups are re-ordered by the sort key of their first result. This gives the
+        same group ordering as sorting all the results first and then grouping them
+        """
+        sorted_groups = {
+            name: self.run_sort_by(group, limit)
+            for name, group in grouped_results.items()
+        }
+        if not order_groups:
+            return sorted_groups
+
+        key_func = self._get_key_func()
+        group_keys = {
+            name: key_func(group[0]) for name, group in sorted_groups.items() if group
+        }
+        return dict(
+            sorted(
+                sorted_groups.items(),
+                key=lambda group: (
+                    group[0] not in group_keys,
+                    group_keys.get(group[0]),
+                ),
+            )
+        )
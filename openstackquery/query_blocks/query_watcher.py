@@ -0,0 +1,86 @@
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from openstackquery.aliases import PropValue
+from openstackquery.runners.runner_cache import RunnerCache
+from openstackquery.structs.change_event import ChangeEvent
+
+
+class QueryWatcher:
+    """
+    Helper class which keeps the rows a query outputted, keyed by marker (i.e. id), and finds which rows were
+    added, changed or removed each time the query is run again. Rows are compared by a hash (fingerprint)
+    of their values, so unchanged rows are skipped without comparing every property
+    """
+
+    ADDED = "added"
+    CHANGED = "changed"
+    REMOVED = "removed"
+
+    def __init__(self):
+        # key -> (fingerprint, row)
+        self._rows: Dict[Hashable, Tuple[int, Dict[str, PropValue]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @staticmethod
+    def fingerprint(row: Dict[str, PropValue]) -> int:
+        """
+        method which returns a hash of a row's values - the same for rows with equal values
+        :param row: a dict of property names to values
+        """
+        return hash(RunnerCache.freeze(row))
+
+    @staticmethod
+    def get_changes(
+        old: Dict[str, PropValue], new: Dict[str, PropValue]
+    ) -> Dict[str, Tuple[PropValue, PropValue]]:
+        """
+        method which returns the (old value, new value) of each property which differs between two rows
+        :param old: a row before it changed
+        :param new: a row after it changed
+        """
+        return {
+            name: (old.get(name), new.get(name))
+            for name in dict.fromkeys([*old, *new])
+            if old.get(name) != new.get(name)
+        }
+
+    def update(
+        self,
+        rows: Dict[Hashable, Dict[str, PropValue]],
+        keys: Optional[Iterable[Hashable]] = None,
+    ) -> List[ChangeEvent]:
+        """
+        method which stores the rows a query outputted and returns events for rows added, changed and removed
+        since the last update - in one pass over the rows
+        :param rows: rows outputted keyed by marker
+        :param keys: if given, only rows with these keys were listed again (i.e. resources listed by
+            changes-since) - rows with these keys missing from rows are removed and other rows are unchanged.
+            If not given, rows holds every row and any row not in it is removed
+        """
+        if keys is None:
+            checked = list(rows)
+            removed = [key for key in self._rows if key not in rows]
+        else:
+            keys = list(dict.fromkeys(keys))
+            checked = [key for key in keys if key in rows]
+            removed = [key for key in keys if key in self._rows and key not in rows]
+
+        events = []
+        for key in checked:
+            row = rows[key]
+            fingerprint = self.fingerprint(row)
+            previous = self._rows.get(key)
+            if previous is None:
+                events.append(ChangeEvent(self.ADDED, key, row))
+            elif previous[0] != fingerprint:
+                events.append(
+                    ChangeEvent(
+                        self.CHANGED, key, row, self.get_changes(previous[1], row)
+                    )
+                )
+            self._rows[key] = (fingerprint, row)
+        for key in removed:
+            events.append(ChangeEvent(self.REMOVED, key, self._rows.pop(key)[1]))
+        return events
@@ -17,6 +17,13 @@ class Result:
     def as_object(self) -> OpenstackResourceObj:
         return self._obj_result
 
+    @property
+    def forwarded_props(self) -> Dict[str, PropValue]:
+        """
+        a getter method to return properties forwarded onto this result from previous queries
+        """
+        return self._forwarded_props
+
     def as_props(self, *props: PropEnum) -> Dict[str, PropValue]:
         """
         return stored result, only outputting the properties given
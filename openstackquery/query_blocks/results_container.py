@@ -1,8 +1,15 @@
-from typing import Union, List, Dict, Callable, Optional
+import logging
+from collections import namedtuple
+from typing import Union, List, Dict, Callable, Hashable, Iterator, Optional, Tuple
 from openstackquery.enums.props.prop_enum import PropEnum
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.aggregate_result import AggregateResult
+from openstackquery.query_blocks.group_node import GroupNode
 from openstackquery.query_blocks.result import Result
 from openstackquery.aliases import OpenstackResourceObj, PropValue
 
+logger = logging.getLogger(__name__)
+
 
 class ResultsContainer:
     """
@@ -14,17 +21,54 @@ class ResultsContainer:
     def __init__(self, prop_enum_cls):
         self._prop_enum_cls = prop_enum_cls
         self._results: List = []
-        self._parsed_results: Union[List, Dict] = []
+        self._parsed_results: Optional[Union[List, Dict, GroupNode]] = None
+        # fingerprint of parser config used to make parsed results
+        self._parsed_fingerprint: Optional[Hashable] = None
+        # selected props (and whether summaries were included) and rows last outputted for them
+        self._cached_props: Optional[Tuple] = None
+        self._cached_rows: Optional[Union[Dict, List]] = None
 
-    def to_props(self, *props: PropEnum) -> Union[Dict, List]:
+    def _get_results(self) -> Union[List, Dict]:
+        """
+        Helper method to return parsed results if results have been parsed, else the results as stored
+        """
+        if self._parsed_results is None:
+            return self._results
+        return self._parsed_results
+
+    def to_props(
+        self, *props: PropEnum, include_group_summaries: bool = False
+    ) -> Union[Dict, List]:
         """
         Output the stored results, only outputting the properties given
         :props: A set of prop enums to select
+        :param include_group_summaries: if results are in nested groups, output each group with its
+        summary (count and aggregated values)
+        """
+        cache_key = (props, include_group_summaries)
+        if self._cached_props != cache_key:
+            self._cached_rows = self._get_props(props, include_group_summaries)
+            self._cached_props = cache_key
+        # rows are copied so that changes made by the caller don't leak into later outputs
+        return self._copy_rows(self._cached_rows)
+
+    def _get_props(
+        self, props: Tuple[PropEnum, ...], include_group_summaries: bool
+    ) -> Union[Dict, List]:
+        """
+        Helper method to get selected properties of each stored result
+        :param props: A set of prop enums to select
+        :param include_group_summaries: if results are in nested groups, output each group with its summary
         """
-        results = self._parsed_results or self._results
+        results = self._get_results()
         if not results:
             return []
 
+        if isinstance(results, GroupNode):
+            return results.to_dict(
+                lambda group: [item.as_props(*props) for item in group],
+                include_group_summaries,
+            )
         if isinstance(results, list):
             return [item.as_props(*props) for item in results]
         return {
@@ -32,15 +76,287 @@ class ResultsContainer:
             for name, group in results.items()
         }
 
+    @staticmethod
+    def _copy_rows(rows: Union[Dict, List]) -> Union[Dict, List]:
+        """
+        Helper method to copy outputted rows - copying each row dict, and each group if results are grouped
+        :param rows: rows to copy
+        """
+        if isinstance(rows, list):
+            return [dict(row) for row in rows]
+        return {
+            name: (
+                ResultsContainer._copy_rows(group)
+                if isinstance(group, (list, dict))
+                else group
+            )
+            for name, group in rows.items()
+        }
+
+    @property
+    def group_names(self) -> Optional[List[PropValue]]:
+        """
+        a getter method which returns names of the (top-level) groups results are in - None if results aren't grouped
+        """
+        results = self._get_results()
+        if not results or isinstance(results, list):
+            return None
+        if isinstance(results, GroupNode):
+            return list(results.children.keys())
+        return list(results.keys())
+
+    def iter_props(
+        self, *props: PropEnum, groups: Optional[List[PropValue]] = None
+    ) -> Iterator[Tuple[Tuple[PropValue, ...], Optional[Iterator[Dict]]]]:
+        """
+        Output the stored results one row at a time, only outputting the properties given - so that
+        results can be written out without holding every row in memory.
+        Yields the path of group names to each group (empty if results aren't grouped) along with an iterator
+        of the group's rows - or None for groups that hold nested groups. Groups are yielded before the groups
+        nested in them
+        :props: A set of prop enums to select
+        :param groups: an optional list of (top-level) group names to output
+        """
+        if self._cached_props == (props, False):
+            # rows already outputted for these props - reuse them instead of getting props again
+            results = self._cached_rows
+            get_rows = iter
+        else:
+            results = self._get_results()
+
+            def get_rows(group: List[Result]) -> Iterator[Dict]:
+                return (item.as_props(*props) for item in group)
+
+        if not results:
+            yield (), iter(())
+            return
+        if isinstance(results, list):
+            yield (), get_rows(results)
+            return
+        if isinstance(results, GroupNode):
+            results = {
+                name: child.results if child.is_leaf else child
+                for name, child in results.children.items()
+            }
+        if groups:
+            results = {name: results[name] for name in groups}
+        yield from self._iter_groups(results, get_rows, ())
+
+    @staticmethod
+    def _iter_groups(
+        results: Dict,
+        get_rows: Callable[[List], Iterator[Dict]],
+        path: Tuple[PropValue, ...],
+    ) -> Iterator[Tuple[Tuple[PropValue, ...], Optional[Iterator[Dict]]]]:
+        """
+        Helper method which walks grouped results depth-first - see iter_props
+        :param results: grouped results - a dict of group name to a list of results or nested groups
+        :param get_rows: function which takes a list of results in a group and returns an iterator of rows
+        :param path: path of group names to given groups
+        """
+        for name, group in results.items():
+            group_path = (*path, name)
+            if isinstance(group, list):
+                yield group_path, get_rows(group)
+                continue
+            yield group_path, None
+            if isinstance(group, GroupNode):
+                group = {
+                    child_name: child.results if child.is_leaf else child
+                    for child_name, child in group.children.items()
+                }
+            yield from ResultsContainer._iter_groups(group, get_rows, group_path)
+
+    def to_rows(
+        self, *props: PropEnum, named: bool = False
+    ) -> Tuple[Tuple[str, ...], Union[Dict, List]]:
+        """
+        Output the stored results as tuples of values, only outputting the properties given - along with a
+        header tuple holding the name of each value. Rows are built by a function made once for the given props,
+        so property names aren't repeated in each row like to_props does
+        :props: A set of prop enums to select
+        :param named: if True, output each row as a namedtuple instead of a tuple
+        """
+        results = self._get_results()
+        first = self._get_first_result(results)
+        if first is None:
+            # grouped results keep their (empty) groups - so output is still a dict
+            header, build_row = tuple(prop.name.lower() for prop in props), None
+        else:
+            header, build_row = self._get_row_builder(props, first)
+        make_row = namedtuple("Row", header, rename=True)._make if named else None
+
+        def _build_rows(group: List) -> List[Tuple]:
+            if build_row is None:
+                return []
+            rows = map(build_row, group)
+            return list(map(make_row, rows) if make_row else rows)
+
+        if isinstance(results, GroupNode):
+            return header, results.to_dict(_build_rows)
+        if isinstance(results, list):
+            return header, _build_rows(results)
+        return header, {name: _build_rows(group) for name, group in results.items()}
+
+    @staticmethod
+    def _get_first_result(results: Union[List, Dict, GroupNode]) -> Optional[Result]:
+        """
+        Helper method which returns the first result stored - or None if there are no results
+        :param results: stored results - either a list, grouped results or nested groups
+        """
+        if isinstance(results, list):
+            return results[0] if results else None
+        if isinstance(results, GroupNode):
+            return next(
+                (node.results[0] for _, node in results.walk() if node.results),
+                None,
+            )
+        return next((group[0] for group in results.values() if group), None)
+
+    def _get_row_builder(
+        self, props: Tuple[PropEnum, ...], first: Union[Result, AggregateResult]
+    ) -> Tuple[Tuple[str, ...], Callable[[Result], Tuple]]:
+        """
+        Helper method which returns a header and a function that converts a result into a row tuple.
+        Property functions are looked up once here rather than once per result. Forwarded properties are added
+        after selected properties - and replace selected properties of the same name - like Result.as_props
+        :param props: A set of prop enums to select
+        :param first: first result stored - used to find aggregated values or forwarded properties to output
+        """
+        if isinstance(first, AggregateResult):
+            return tuple(first.as_props().keys()), lambda item: tuple(
+                item.as_props().values()
+            )
+
+        default_out = self.DEFAULT_OUT
+        names = [prop.name.lower() for prop in props]
+        prop_funcs = []
+        for prop in props:
+            try:
+                prop_funcs.append(self._prop_enum_cls.get_prop_mapping(prop))
+            except (AttributeError, KeyError):
+                prop_funcs.append(lambda _: default_out)
+
+        forwarded_keys = list(first.forwarded_props.keys())
+        replaced = [i for i, name in enumerate(names) if name in forwarded_keys]
+        extra_keys = [key for key in forwarded_keys if key not in names]
+
+        def _build_row(item: Result) -> Tuple:
+            obj = item.as_object()
+            row = []
+            for prop_func in prop_funcs:
+                try:
+                    row.append(prop_func(obj))
+                except (AttributeError, KeyError):
+                    row.append(default_out)
+            if replaced or extra_keys:
+                forwarded = item.forwarded_props
+                for i in replaced:
+                    row[i] = forwarded.get(names[i], default_out)
+                row.extend(forwarded.get(key, default_out) for key in extra_keys)
+            return tuple(row)
+
+        return (*names, *extra_keys), _build_row
+
+    def to_columns(self, *props: PropEnum) -> Tuple[
+        Tuple[str, ...],
+        List[List[PropValue]],
+        Optional[List[Tuple[PropValue, ...]]],
+    ]:
+        """
+        Output the stored results as columns of values, only outputting the properties given. Each column is
+        built in one pass over the results, with property functions looked up once per column.
+        Returns a header tuple holding the name of each column, the columns and - if results are grouped - the
+        path of group names to each result's group (None otherwise)
+        :props: A set of prop enums to select
+        """
+        results = self._get_results()
+        grouped = list(self._iter_result_groups(results))
+        items = [item for _, group in grouped for item in group]
+        paths = (
+            None
+            if isinstance(results, list)
+            else [path for path, group in grouped for _ in group]
+        )
+        if not items:
+            return (
+                tuple(prop.name.lower() for prop in props),
+                [[] for _ in props],
+                paths,
+            )
+
+        if isinstance(items[0], AggregateResult):
+            rows = [item.as_props() for item in items]
+            header = tuple(rows[0].keys())
+            return header, [[row.get(key) for row in rows] for key in header], paths
+
+        names = [prop.name.lower() for prop in props]
+        objs = [item.as_object() for item in items]
+        columns = [self._get_column(prop, objs) for prop in props]
+
+        forwarded = [item.forwarded_props for item in items]
+        for key in forwarded[0].keys():
+            column = [values.get(key, self.DEFAULT_OUT) for values in forwarded]
+            if key in names:
+                columns[names.index(key)] = column
+            else:
+                names.append(key)
+                columns.append(column)
+        return tuple(names), columns, paths
+
+    def _get_column(
+        self, prop: PropEnum, objs: List[OpenstackResourceObj]
+    ) -> List[PropValue]:
+        """
+        Helper method which returns the value of a property for each openstack object - the property function
+        is looked up once for the whole column
+        :param prop: prop enum to get values for
+        :param objs: openstack objects to get values from
+        """
+        default_out = self.DEFAULT_OUT
+        try:
+            prop_func = self._prop_enum_cls.get_prop_mapping(prop)
+        except (AttributeError, KeyError):
+            return [default_out] * len(objs)
+        column = []
+        for obj in objs:
+            try:
+                column.append(prop_func(obj))
+            except (AttributeError, KeyError):
+                column.append(default_out)
+        return column
+
+    @staticmethod
+    def _iter_result_groups(
+        results: Union[List, Dict, GroupNode],
+    ) -> Iterator[Tuple[Tuple[PropValue, ...], List]]:
+        """
+        Helper method which yields each list of results stored along with the path of group names to it
+        (empty if results aren't grouped)
+        :param results: stored results - either a list, grouped results or nested groups
+        """
+        if isinstance(results, list):
+            yield (), results
+            return
+        if isinstance(results, GroupNode):
+            for path, node in results.walk():
+                if node.is_leaf:
+                    yield path, node.results
+            return
+        for name, group in results.items():
+            yield (name,), group
+
     def to_objects(self) -> Union[Dict, List]:
         """
         Output the results stored - as openstack objects
         """
 
-        results = self._parsed_results or self._results
+        results = self._get_results()
         if not results:
             return []
 
+        if isinstance(results, GroupNode):
+            return results.to_dict(lambda group: [item.as_object() for item in group])
         if isinstance(results, list):
             return [item.as_object() for item in results]
         return {
@@ -48,6 +364,41 @@ class ResultsContainer:
             for name, group in results.items()
         }
 
+    def iter_results(self) -> Iterator[Result]:
+        """
+        Iterate over each stored result - ignoring sorting and grouping
+        """
+        return iter(self._results)
+
+    def to_keyed_props(
+        self, key_func: Callable[[Result], Hashable], *props: PropEnum
+    ) -> Dict[Hashable, Dict[str, PropValue]]:
+        """
+        Output the properties given of each stored result (ignoring sorting and grouping) - keyed by
+        the value key_func returns for each result (i.e. its id). Raises an error if two results have the same key
+        :param key_func: function which takes a result and returns its key
+        :props: A set of prop enums to select
+        """
+        keyed = {}
+        for item in self._results:
+            key = key_func(item)
+            if key in keyed:
+                raise ParseQueryError(
+                    f"Error: more than one result has key {key} - key results by a property unique to each result"
+                )
+            keyed[key] = item.as_props(*props)
+        return keyed
+
+    def get_group_summaries(self) -> Dict[Tuple[PropValue, ...], Dict[str, PropValue]]:
+        """
+        Output the summary (count and aggregated values) of each group - keyed by path of group names.
+        Only results in nested groups hold summaries - an empty dict is returned otherwise
+        """
+        results = self._get_results()
+        if not isinstance(results, GroupNode):
+            return {}
+        return results.get_summaries()
+
     def store_query_results(self, query_results: List[OpenstackResourceObj]):
         """
         a setter to set results after running the query with query results
@@ -57,6 +408,16 @@ class ResultsContainer:
             Result(self._prop_enum_cls, item, self.DEFAULT_OUT)
             for item in query_results
         ]
+        self._parsed_results = None
+        self._parsed_fingerprint = None
+        self._clear_cached_rows()
+
+    def _clear_cached_rows(self):
+        """
+        Helper method to remove rows cached by to_props - must be called whenever results change
+        """
+        self._cached_props = None
+        self._cached_rows = None
 
     def apply_forwarded_results(
         self,
@@ -80,6 +441,7 @@ class ResultsContainer:
             # NOTE: This mutates forwarded_results
             forwarded_result = self._get_forwarded_result(prop_val, forwarded_results)
             item.update_forwarded_properties(forwarded_result)
+        self._clear_cached_rows()
 
     def _get_forwarded_result(
         self, prop_val: str, forwarded_results: Dict[str, List]
@@ -118,9 +480,24 @@ class ResultsContainer:
 
         return result_to_attach
 
-    def parse_results(self, parse_func: Callable[[List[Result]], Union[List]]):
+    def parse_results(
+        self,
+        parse_func: Callable[[List[Result]], Union[List, Dict, GroupNode]],
+        fingerprint: Optional[Hashable] = None,
+    ):
         """
         This method applies a pre-set parse function which will sort and/or group the results
         :param parse_func: parse function
+        :param fingerprint: an optional value identifying how parse_func is configured. If results have already
+        been parsed with the same fingerprint, they are not parsed again - and rows already outputted are reused
         """
+        if (
+            fingerprint is not None
+            and self._parsed_results is not None
+            and fingerprint == self._parsed_fingerprint
+        ):
+            logger.debug("results already parsed - reusing parsed results")
+            return
         self._parsed_results = parse_func(self._results)
+        self._parsed_fingerprint = fingerprint
+        self._clear_cached_rows()
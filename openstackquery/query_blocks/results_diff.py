@@ -0,0 +1,148 @@
+from typing import Dict, Hashable, List, Optional, Union
+
+from openstackquery.aliases import PropValue
+from openstackquery.query_blocks.query_watcher import QueryWatcher
+from openstackquery.structs.change_event import ChangeEvent
+
+
+class ResultsDiff:
+    """
+    Class which holds results added, removed or changed between two sets of query results - i.e. yesterday's and
+    today's. Rows on each side are keyed (by id or a given property) and hashed in one pass, so results are
+    compared without comparing every pair of rows.
+    Output methods output one group per kind of difference - "added" and "removed" hold selected properties of
+    each result, "changed" holds one row per property changed with its old and new value
+    """
+
+    def __init__(
+        self,
+        events: List[ChangeEvent],
+        key_name: str,
+        output=None,
+    ):
+        """
+        :param events: results added, removed or changed
+        :param key_name: name of the key results are compared by - output as the first column of each row
+        :param output: QueryOutput used to output differences as tables, csv or json
+        """
+        self._events = events
+        self._key_name = key_name
+        self._output = output
+
+    @classmethod
+    def compute(
+        cls,
+        old: Dict[Hashable, Dict[str, PropValue]],
+        new: Dict[Hashable, Dict[str, PropValue]],
+        key_name: str,
+        output=None,
+    ) -> "ResultsDiff":
+        """
+        method which compares rows before and after - each keyed by the key results are compared by
+        :param old: rows before
+        :param new: rows after
+        :param key_name: name of the key results are compared by
+        :param output: QueryOutput used to output differences
+        """
+        watcher = QueryWatcher()
+        watcher.update(old)
+        return cls(watcher.update(new), key_name, output)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _get_events(self, event: str) -> List[ChangeEvent]:
+        """
+        Helper method which returns events of one kind
+        :param event: kind of event - i.e. "added"
+        """
+        return [item for item in self._events if item.event == event]
+
+    @property
+    def added(self) -> List[ChangeEvent]:
+        """
+        a getter method which returns results only found after
+        """
+        return self._get_events(QueryWatcher.ADDED)
+
+    @property
+    def removed(self) -> List[ChangeEvent]:
+        """
+        a getter method which returns results only found before
+        """
+        return self._get_events(QueryWatcher.REMOVED)
+
+    @property
+    def changed(self) -> List[ChangeEvent]:
+        """
+        a getter method which returns results found before and after with different selected properties
+        """
+        return self._get_events(QueryWatcher.CHANGED)
+
+    # pylint: disable=unused-argument
+    def to_props(
+        self, *props, include_group_summaries: bool = False
+    ) -> Union[Dict[str, List], List]:
+        """
+        Output differences grouped by kind - groups with no differences are left out.
+        Takes the same arguments as ResultsContainer.to_props so QueryOutput can output differences - rows
+        already hold the properties selected when they were compared
+        """
+        results = {
+            QueryWatcher.ADDED: [
+                {self._key_name: item.key, **item.props} for item in self.added
+            ],
+            QueryWatcher.REMOVED: [
+                {self._key_name: item.key, **item.props} for item in self.removed
+            ],
+            QueryWatcher.CHANGED: [
+                {self._key_name: item.key, "property": name, "old": old, "new": new}
+                for item in self.changed
+                for name, (old, new) in item.changes.items()
+            ],
+        }
+        return {name: rows for name, rows in results.items() if rows} or []
+
+    def get_group_summaries(self) -> Dict:
+        """
+        Differences have no group summaries - method is needed so QueryOutput can output differences
+        """
+        return {}
+
+    def _to_output(self, output_func: str, **kwargs) -> str:
+        """
+        Helper method which outputs differences with a QueryOutput method
+        :param output_func: name of QueryOutput method
+        :param kwargs: kwargs to pass to the method
+        """
+        return getattr(self._output, output_func)(self, **kwargs)
+
+    def to_string(self, title: Optional[str] = None, **kwargs) -> str:
+        """
+        method to return differences as tables - one per kind of difference
+        :param title: an optional title for the tables
+        :param kwargs: kwargs to pass to QueryOutput.to_string - i.e. groups, max_rows
+        """
+        return self._to_output("to_string", title=title, **kwargs)
+
+    def to_html(self, title: Optional[str] = None, **kwargs) -> str:
+        """
+        method to return differences as html tables - one per kind of difference
+        :param title: an optional title for the tables
+        :param kwargs: kwargs to pass to QueryOutput.to_html - i.e. groups, max_rows
+        """
+        return self._to_output("to_html", title=title, **kwargs)
+
+    def to_csv(self, **kwargs) -> str:
+        """
+        method to return differences as csv - one section per kind of difference
+        :param kwargs: kwargs to pass to QueryOutput.to_csv - i.e. groups, flatten_groups
+        """
+        return self._to_output("to_csv", **kwargs)
+
+    def to_json(self, **kwargs) -> str:
+        """
+        method to return differences as json - keyed by kind of difference
+        :param kwargs: kwargs to pass to QueryOutput.to_json - i.e. groups, pretty
+        """
+        return self._to_output("to_json", **kwargs)
@@ -0,0 +1,535 @@
+import dataclasses
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from openstackquery.aliases import OpenstackResourceObj
+from openstackquery.enums.props.prop_enum import PropEnum
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.column_types import ColumnType
+
+logger = logging.getLogger(__name__)
+
+# A step taken to read a value from an openstack object - ("item", key) for obj[key] or ("attr", name) for obj.name
+AccessPath = Tuple[Tuple[str, Any], ...]
+
+MAGIC = b"OSQSNAP1"
+# magic followed by the length of the json header
+PREAMBLE = struct.Struct("<8sQ")
+
+# state of each value in a column - if not all values are present
+PRESENT, NULL, MISSING = 0, 1, 2
+
+# array typecodes of fixed-width columns
+NUMERIC_KINDS = {"int": "q", "float": "d", "bool": "B"}
+
+
+def _align(offset: int) -> int:
+    """
+    Helper function which rounds an offset up to a multiple of 8 bytes
+    :param offset: offset to round up
+    """
+    return (offset + 7) // 8 * 8
+
+
+class _PathRecorder:
+    """
+    Stand-in for an openstack object which records the items and attributes a property function reads
+    """
+
+    def __init__(self, path: AccessPath, paths: Set[AccessPath]):
+        self._path = path
+        self._paths = paths
+
+    def _step(self, step: Tuple[str, Any]) -> "_PathRecorder":
+        path = self._path + (step,)
+        self._paths.add(path)
+        return _PathRecorder(path, self._paths)
+
+    def __getitem__(self, key):
+        return self._step(("item", key))
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self._step(("attr", name))
+
+    def __iter__(self):
+        raise TypeError("cannot iterate over recorded value")
+
+
+class SnapshotRow:
+    """
+    A resource stored in a SnapshotFile. Property functions read it like the openstack object it was written
+    from (obj["id"], obj.usage.vcpus_used) - each value is read from the memory-mapped file when it is accessed
+    """
+
+    __slots__ = ("_snapshot", "_row", "_prefix")
+
+    def __init__(self, snapshot: "SnapshotFile", row: int, prefix: AccessPath = ()):
+        self._snapshot = snapshot
+        self._row = row
+        self._prefix = prefix
+
+    @staticmethod
+    def get_resource_type(row: Any) -> Optional[str]:
+        """
+        method which returns the resource type of the snapshot a row was read from - or None if it is
+        not a SnapshotRow
+        :param row: object to check
+        """
+        if not isinstance(row, SnapshotRow):
+            return None
+        # pylint: disable=protected-access
+        return row._snapshot.resource_type
+
+    def _read(self, step: Tuple[str, Any]):
+        # pylint: disable=protected-access
+        return self._snapshot._read(self._row, self._prefix + (step,))
+
+    def __getitem__(self, key):
+        return self._read(("item", key))
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self._read(("attr", name))
+
+    def __iter__(self):
+        raise TypeError("SnapshotRow is not iterable")
+
+    def __repr__(self) -> str:
+        return f"SnapshotRow({self._snapshot.resource_type}, {self._row})"
+
+
+class SnapshotFile:
+    """
+    Compact columnar file of openstack resources - which other processes can memory-map and query with
+    from_subset without deserialising every resource. Several processes on a host share one copy of the file
+    in the page cache instead of each holding their own openstack objects.
+    Only the values property functions read are written - numbers as fixed-width columns and strings as
+    dictionary-encoded columns. Nested values which aren't openstack objects (i.e. addresses) are stored as json
+    """
+
+    def __init__(self, fp: Union[str, os.PathLike]):
+        """
+        :param fp: path of snapshot file to open
+        """
+        with open(fp, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        magic, header_len = PREAMBLE.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise ParseQueryError(f"Error: {fp} is not a snapshot file")
+        header = json.loads(
+            bytes(self._view[PREAMBLE.size : PREAMBLE.size + header_len])
+        )
+        if header["byteorder"] != sys.byteorder:
+            self.close()
+            raise ParseQueryError(
+                f"Error: {fp} was written on a {header['byteorder']}-endian machine"
+            )
+
+        self._resource_type = header["resource_type"]
+        self._prop_enum = header["prop_enum"]
+        self._rows = header["rows"]
+        data_start = _align(PREAMBLE.size + header_len)
+
+        def get_block(block: Optional[List[int]], typecode: str):
+            if block is None:
+                return None
+            offset, nbytes = block
+            start = data_start + offset
+            return self._view[start : start + nbytes].cast(typecode)
+
+        self._columns: Dict[AccessPath, Dict] = {}
+        self._prefixes: Set[AccessPath] = set()
+        for column in header["columns"]:
+            path = tuple((kind, key) for kind, key in column["path"])
+            kind = column["kind"]
+            self._columns[path] = {
+                "kind": kind,
+                "values": get_block(column["values"], NUMERIC_KINDS.get(kind, "i")),
+                "states": get_block(column["states"], "B"),
+                "offsets": get_block(column.get("offsets"), "q"),
+                "strings": get_block(column.get("strings"), "B"),
+                "decoded": {},
+            }
+            self._prefixes.update(path[:depth] for depth in range(1, len(path)))
+
+    @property
+    def resource_type(self) -> str:
+        """
+        a getter method which returns the type of resource stored - i.e. "server"
+        """
+        return self._resource_type
+
+    @property
+    def prop_enum(self) -> str:
+        """
+        a getter method which returns the name of the property enum the snapshot was written for
+        """
+        return self._prop_enum
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(self, row: int) -> SnapshotRow:
+        if row < 0:
+            row += self._rows
+        if not 0 <= row < self._rows:
+            raise IndexError("snapshot row out of range")
+        return SnapshotRow(self, row)
+
+    def __iter__(self) -> Iterator[SnapshotRow]:
+        return (SnapshotRow(self, row) for row in range(self._rows))
+
+    def __enter__(self) -> "SnapshotFile":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        method which unmaps the file - rows read from the snapshot can't be used afterwards
+        """
+        for column in getattr(self, "_columns", {}).values():
+            for block in ("values", "states", "offsets", "strings"):
+                if column[block] is not None:
+                    column[block].release()
+        self._columns = {}
+        self._view.release()
+        self._mmap.close()
+
+    def _read(self, row: int, path: AccessPath):
+        """
+        Helper method which reads the value at a path of a row - or a SnapshotRow to read values nested under it.
+        Raises KeyError (or AttributeError) like the openstack object would if the value wasn't found
+        :param row: index of row
+        :param path: items and attributes read from the row
+        """
+        column = self._columns.get(path)
+        if column is None:
+            if path in self._prefixes:
+                return SnapshotRow(self, row, path)
+            self._raise_missing(path)
+
+        states = column["states"]
+        state = states[row] if states is not None else PRESENT
+        if state == NULL:
+            return None
+        if state == MISSING:
+            self._raise_missing(path)
+
+        kind = column["kind"]
+        value = column["values"][row]
+        if kind in NUMERIC_KINDS:
+            return bool(value) if kind == "bool" else value
+        if kind == "str":
+            decoded = column["decoded"]
+            if value not in decoded:
+                decoded[value] = self._decode(column, value)
+            return decoded[value]
+        # json values are decoded on each read - so callers can't change them for other rows
+        return json.loads(self._decode(column, value))
+
+    @staticmethod
+    def _decode(column: Dict, code: int) -> str:
+        """
+        Helper method which decodes a string from the dictionary of a column
+        :param column: column to decode from
+        :param code: index of string in the dictionary
+        """
+        offsets = column["offsets"]
+        return bytes(column["strings"][offsets[code] : offsets[code + 1]]).decode()
+
+    @staticmethod
+    def _raise_missing(path: AccessPath):
+        """
+        Helper method which raises the error the openstack object would raise when reading a missing value
+        :param path: path of value read
+        """
+        kind, key = path[-1]
+        if kind == "attr":
+            raise AttributeError(key)
+        raise KeyError(key)
+
+    @staticmethod
+    def trace_paths(prop_enum_cls: Type[PropEnum]) -> List[AccessPath]:
+        """
+        method which finds the items and attributes property functions of a property enum read from openstack
+        objects - by running each property function on a stand-in object. Only the longest paths are returned
+        :param prop_enum_cls: property enum to trace
+        """
+        paths: Set[AccessPath] = set()
+        prop_funcs = [prop_enum_cls.get_marker_prop_func()]
+        for prop in prop_enum_cls:
+            try:
+                prop_funcs.append(prop_enum_cls.get_prop_mapping(prop))
+            except Exception:  # pylint: disable=broad-exception-caught
+                # props with no mapping can't be read
+                continue
+        for prop_func in prop_funcs:
+            try:
+                prop_func(_PathRecorder((), paths))
+            except Exception:  # pylint: disable=broad-exception-caught
+                # property functions which do more than read values fail on the stand-in
+                pass
+        return sorted(
+            (
+                path
+                for path in paths
+                if not any(
+                    len(other) > len(path) and other[: len(path)] == path
+                    for other in paths
+                )
+            ),
+            key=str,
+        )
+
+    @staticmethod
+    def _is_leaf(value: Any) -> bool:
+        """
+        Helper method which returns True if a value is stored as it is rather than by the values read from it.
+        Openstack objects are read from - plain values, lists and dicts are stored
+        :param value: value to check
+        """
+        return (
+            value is None
+            or isinstance(value, (str, int, float, bool, list, tuple))
+            or type(value) is dict  # pylint: disable=unidiomatic-typecheck
+        )
+
+    @classmethod
+    def _walk(cls, obj: OpenstackResourceObj, path: AccessPath) -> Tuple[int, Any]:
+        """
+        Helper method which reads the value at a path of an object - stopping early at plain values.
+        Returns the number of steps taken and the value read
+        :param obj: openstack object to read
+        :param path: items and attributes to read
+        """
+        value = obj
+        for depth, (kind, key) in enumerate(path):
+            # the object itself is always read from
+            if depth and cls._is_leaf(value):
+                return depth, value
+            value = value[key] if kind == "item" else getattr(value, key)
+        return len(path), value
+
+    @classmethod
+    def _read_column(
+        cls, objs: List[OpenstackResourceObj], path: AccessPath
+    ) -> Tuple[AccessPath, List[Any], Optional[array]]:
+        """
+        Helper method which reads a column of values at a path from each object. The path is shortened to
+        where the first object has a plain value (i.e. a dict) - so the whole value is stored.
+        Returns the (shortened) path, values and the state of each value (None if all values are present)
+        :param objs: openstack objects to read
+        :param path: items and attributes to read
+        """
+        walked = []
+        for obj in objs:
+            try:
+                walked.append(cls._walk(obj, path))
+            except (AttributeError, KeyError, IndexError, TypeError):
+                walked.append(None)
+        depth = min(
+            (item[0] for item in walked if item and item[1] is not None),
+            default=len(path),
+        )
+        path = path[:depth]
+
+        values, states = [], array("B")
+        for obj, item in zip(objs, walked):
+            value, state = None, MISSING
+            if item and item[0] >= depth:
+                value = cls._walk(obj, path)[1]
+                state = NULL if value is None else PRESENT
+            values.append(value)
+            states.append(state)
+        if all(state == PRESENT for state in states):
+            states = None
+        return path, values, states
+
+    @staticmethod
+    def _get_kind(values: List[Any]) -> str:
+        """
+        Helper method which returns how a column is stored - "int", "float" or "bool" as fixed-width numbers,
+        "str" as dictionary-encoded strings or "json" as dictionary-encoded json
+        :param values: values in the column
+        """
+        found = [value for value in values if value is not None]
+        if any(isinstance(value, (list, tuple, dict)) for value in found):
+            return "json"
+        kind = {
+            ColumnType.INTEGER: "int",
+            ColumnType.FLOAT: "float",
+            ColumnType.BOOLEAN: "bool",
+        }.get(ColumnType.infer(found), "str")
+        if kind == "int" and not all(-(2**63) <= value < 2**63 for value in found):
+            # integers too large for fixed-width columns
+            return "json"
+        if kind == "str" and not all(isinstance(value, str) for value in found):
+            return "json"
+        return kind
+
+    @staticmethod
+    def _to_json(value: Any) -> str:
+        """
+        Helper method which encodes a value as json - openstack objects and dataclasses as dicts
+        :param value: value to encode
+        """
+
+        def default(obj):
+            if dataclasses.is_dataclass(obj):
+                return dataclasses.asdict(obj)
+            return str(obj)
+
+        return json.dumps(value, default=default, sort_keys=True)
+
+    @classmethod
+    def _encode(cls, kind: str, values: List[Any]) -> Dict[str, bytes]:
+        """
+        Helper method which encodes a column of values as blocks of bytes
+        :param kind: how the column is stored - see _get_kind
+        :param values: values in the column
+        """
+        if kind in NUMERIC_KINDS:
+            typecode = NUMERIC_KINDS[kind]
+            zero = 0.0 if kind == "float" else 0
+            encoded = array(
+                typecode,
+                (zero if value is None else value for value in values),
+            )
+            return {"values": encoded.tobytes()}
+
+        codes, offsets, strings, dictionary = array("i"), array("q", [0]), [], {}
+        for value in values:
+            if value is None:
+                codes.append(-1)
+                continue
+            text = value if kind == "str" else cls._to_json(value)
+            if text not in dictionary:
+                encoded = text.encode()
+                dictionary[text] = len(dictionary)
+                strings.append(encoded)
+                offsets.append(offsets[-1] + len(encoded))
+            codes.append(dictionary[text])
+        return {
+            "values": codes.tobytes(),
+            "offsets": offsets.tobytes(),
+            "strings": b"".join(strings),
+        }
+
+    @classmethod
+    def _build_columns(
+        cls, objs: List[OpenstackResourceObj], prop_enum_cls: Type[PropEnum]
+    ) -> Tuple[List[Dict], bytes]:
+        """
+        Helper method which encodes the values property functions read from objects as columns.
+        Returns a description of each column and the blocks of bytes they point to
+        :param objs: openstack objects to write
+        :param prop_enum_cls: property enum of the objects
+        """
+        columns, blocks, offset = [], [], 0
+
+        def add_block(data: Optional[bytes]) -> Optional[List[int]]:
+            nonlocal offset
+            if data is None:
+                return None
+            block = [offset, len(data)]
+            padding = _align(len(data)) - len(data)
+            blocks.append(data + b"\0" * padding)
+            offset += len(data) + padding
+            return block
+
+        written = set()
+        for path in cls.trace_paths(prop_enum_cls):
+            path, values, states = cls._read_column(objs, path)
+            if path in written:
+                continue
+            written.add(path)
+            kind = cls._get_kind(values)
+            encoded = cls._encode(kind, values)
+            columns.append(
+                {
+                    "path": [list(step) for step in path],
+                    "kind": kind,
+                    "values": add_block(encoded["values"]),
+                    "states": add_block(
+                        states.tobytes() if states is not None else None
+                    ),
+                    "offsets": add_block(encoded.get("offsets")),
+                    "strings": add_block(encoded.get("strings")),
+                }
+            )
+        # columns nested under another column are read from it instead
+        columns = [
+            column
+            for column in columns
+            if not any(
+                len(other["path"]) < len(column["path"])
+                and column["path"][: len(other["path"])] == other["path"]
+                for other in columns
+            )
+        ]
+        return columns, b"".join(blocks)
+
+    @classmethod
+    def write(
+        cls,
+        fp: Union[str, os.PathLike, IO],
+        objs: List[OpenstackResourceObj],
+        prop_enum_cls: Type[PropEnum],
+        resource_type: str,
+    ) -> int:
+        """
+        method which writes openstack objects to a snapshot file. Returns the number of bytes written
+        :param fp: a file path - or a file object opened in binary mode
+        :param objs: openstack objects to write
+        :param prop_enum_cls: property enum of the objects - the values its property functions read are written
+        :param resource_type: type of resource written - i.e. "server"
+        """
+        columns, blocks = cls._build_columns(objs, prop_enum_cls)
+        header = json.dumps(
+            {
+                "resource_type": resource_type,
+                "prop_enum": prop_enum_cls.__name__,
+                "rows": len(objs),
+                "byteorder": sys.byteorder,
+                "columns": columns,
+            }
+        ).encode()
+        preamble = PREAMBLE.pack(MAGIC, len(header)) + header
+        data = preamble + b"\0" * (_align(len(preamble)) - len(preamble)) + blocks
+
+        if hasattr(fp, "write"):
+            fp.write(data)
+        else:
+            with open(fp, "wb") as file:
+                file.write(data)
+        logger.debug(
+            "wrote %s %s resources to snapshot (%s bytes)",
+            len(objs),
+            resource_type,
+            len(data),
+        )
+        return len(data)
@@ -0,0 +1,144 @@
+import logging
+import sqlite3
+from typing import Any, Iterable, List, Optional, Tuple
+
+from openstackquery.aliases import PropValue
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.column_types import ColumnType
+
+logger = logging.getLogger(__name__)
+
+
+class SqliteOutput:
+    """
+    Helper class for loading columns of query results into a SQLite table - so results of different queries
+    can be joined with SQL. Each column is given a SQL type inferred from its values and rows are
+    inserted in bulk
+    """
+
+    SQL_TYPES = {
+        ColumnType.INTEGER: "INTEGER",
+        ColumnType.FLOAT: "REAL",
+        ColumnType.BOOLEAN: "INTEGER",
+        ColumnType.TIMESTAMP: "TEXT",
+        ColumnType.STRING: "TEXT",
+    }
+
+    IF_EXISTS_OPTIONS = ("fail", "replace", "append")
+
+    def __init__(self, missing_value: Any = None):
+        """
+        :param missing_value: value outputted when a property is not found - loaded as NULL
+        """
+        self._missing_value = missing_value
+
+    @staticmethod
+    def quote(identifier: str) -> str:
+        """
+        method which quotes a table or column name for use in a SQL statement
+        :param identifier: table or column name to quote
+        """
+        escaped = identifier.replace('"', '""')
+        return f'"{escaped}"'
+
+    def _convert(self, values: List[PropValue]) -> Tuple[str, List[Any]]:
+        """
+        Helper method which finds the SQL type of a column and converts its values to be loaded.
+        Timestamps are loaded as ISO-8601 text - which SQLite date and time functions understand
+        :param values: values in the column
+        """
+        column_type = ColumnType.infer(values, self._missing_value)
+        sql_type = self.SQL_TYPES[column_type]
+        if column_type == ColumnType.TIMESTAMP:
+            # timestamps are kept as text rather than converted to datetimes
+            column_type = ColumnType.STRING
+        return sql_type, column_type.convert(values, self._missing_value)
+
+    def load(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        header: Tuple[str, ...],
+        columns: List[List[PropValue]],
+        *,
+        index_columns: Optional[List[str]] = None,
+        if_exists: str = "fail",
+    ):
+        """
+        method which creates a table holding given columns and loads their values into it with a single
+        executemany in one transaction - then creates an index on each of the given index columns
+        :param conn: sqlite3 connection to load into
+        :param table: name of table to create
+        :param header: name of each column
+        :param columns: values of each column
+        :param index_columns: names of columns to create indexes on - those not in the table are ignored
+        :param if_exists: what to do if the table already exists - "fail" (raise an error), "replace" the table
+        or "append" rows to it
+        """
+        if if_exists not in self.IF_EXISTS_OPTIONS:
+            raise ParseQueryError(
+                f"Error: if_exists ({if_exists}) must be one of {self.IF_EXISTS_OPTIONS}"
+            )
+
+        sql_types, values = [], []
+        for column in columns:
+            sql_type, converted = self._convert(column)
+            sql_types.append(sql_type)
+            values.append(converted)
+
+        with conn:
+            self._create_table(conn, table, zip(header, sql_types), if_exists)
+            self._insert_rows(conn, table, header, zip(*values))
+            for name in index_columns or []:
+                if name in header:
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS {self.quote(f'idx_{table}_{name}')} "
+                        f"ON {self.quote(table)} ({self.quote(name)})"
+                    )
+        logger.debug(
+            "loaded %s rows into table %s", len(values[0]) if values else 0, table
+        )
+
+    def _insert_rows(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        header: Tuple[str, ...],
+        rows: Iterable[Tuple],
+    ):
+        """
+        Helper method which inserts rows into a table with a single executemany
+        :param conn: sqlite3 connection to insert with
+        :param table: name of table to insert into
+        :param header: name of each column
+        :param rows: a tuple of values per row
+        """
+        column_names = ", ".join(self.quote(name) for name in header)
+        placeholders = ", ".join("?" for _ in header)
+        conn.executemany(
+            f"INSERT INTO {self.quote(table)} ({column_names}) VALUES ({placeholders})",
+            rows,
+        )
+
+    def _create_table(
+        self,
+        conn: sqlite3.Connection,
+        table: str,
+        column_defs: Iterable[Tuple[str, str]],
+        if_exists: str,
+    ):
+        """
+        Helper method which creates a table - dropping it first if replacing it
+        :param conn: sqlite3 connection to create table in
+        :param table: name of table to create
+        :param column_defs: name and SQL type of each column
+        :param if_exists: what to do if the table already exists - see load()
+        """
+        quoted_table = self.quote(table)
+        if if_exists == "replace":
+            conn.execute(f"DROP TABLE IF EXISTS {quoted_table}")
+        exists_clause = "IF NOT EXISTS " if if_exists == "append" else ""
+        columns_sql = ", ".join(
+            f"{self.quote(name)} {sql_type}" for name, sql_type in column_defs
+        )
+        conn.execute(f"CREATE TABLE {exists_clause}{quoted_table} ({columns_sql})")
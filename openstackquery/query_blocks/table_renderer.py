@@ -0,0 +1,165 @@
+from html import escape
+from typing import IO, Dict, List, Optional
+
+from openstackquery.aliases import PropValue
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+
+
+class TableRenderer:
+    """
+    Helper class for writing query results as a plain text (grid) or html table.
+    Cells are converted to text and column widths found in a single pass over the rows - and the table is
+    written straight to a buffer or stream. Long tables can be split into pages (or truncated) with max_rows
+    """
+
+    def __init__(
+        self,
+        max_rows: Optional[int] = None,
+        page: int = 0,
+        max_col_width: Optional[int] = None,
+    ):
+        """
+        :param max_rows: an optional maximum number of rows to output - tables with more rows are split into pages
+        :param page: which page of max_rows rows to output (starting at 0) - ignored if max_rows not set
+        :param max_col_width: an optional maximum number of characters to output per cell - longer values are cut
+        """
+        if (max_rows is not None and max_rows < 1) or page < 0:
+            raise ParseQueryError(
+                f"Error: max_rows ({max_rows}) must be positive and page ({page}) must not be negative"
+            )
+        if max_col_width is not None and max_col_width < 1:
+            raise ParseQueryError(
+                f"Error: max_col_width ({max_col_width}) must be positive"
+            )
+        self._max_rows = max_rows
+        self._page = page
+        self._max_col_width = max_col_width
+
+    def get_page(
+        self, results: List[Dict[str, PropValue]]
+    ) -> List[Dict[str, PropValue]]:
+        """
+        method which returns the rows to output - the page of results selected if max_rows is set
+        :param results: rows of selected properties
+        """
+        if self._max_rows is None:
+            return results
+        start = self._page * self._max_rows
+        return results[start : start + self._max_rows]
+
+    def get_footer(self, total_rows: int) -> Optional[str]:
+        """
+        method which returns a note of which rows were outputted - or None if all rows were outputted
+        :param total_rows: number of rows in the table before paging
+        """
+        if self._max_rows is None or total_rows <= self._max_rows:
+            return None
+        start = min(self._page * self._max_rows, total_rows)
+        end = min(start + self._max_rows, total_rows)
+        return f"showing rows {start + 1}-{end} of {total_rows}"
+
+    def _to_text(self, value: PropValue) -> str:
+        """
+        Helper method to convert a cell value to text - missing values are output as empty cells
+        :param value: cell value
+        """
+        text = "" if value is None else str(value).replace("\n", " ")
+        if self._max_col_width is not None and len(text) > self._max_col_width:
+            text = text[: self._max_col_width - 1] + "…"
+        return text
+
+    @staticmethod
+    def _is_number(value: PropValue) -> bool:
+        """
+        Helper method which returns True if a value should be right-aligned as a number
+        :param value: cell value
+        """
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    def _get_cells(self, headers: List[str], rows: List[Dict[str, PropValue]]):
+        """
+        Helper method which converts each cell to text in a single pass over the rows - finding the width of each
+        column and whether each column holds only numbers at the same time
+        :param headers: column names
+        :param rows: rows to convert
+        """
+        widths = [len(header) for header in headers]
+        numeric = [True] * len(headers)
+        cells = []
+        for row in rows:
+            row_cells = []
+            for i, value in enumerate(row.values()):
+                text = self._to_text(value)
+                if len(text) > widths[i]:
+                    widths[i] = len(text)
+                if numeric[i] and value is not None and not self._is_number(value):
+                    numeric[i] = False
+                row_cells.append(text)
+            cells.append(row_cells)
+        return cells, widths, numeric
+
+    def write_text(self, out: IO, results: List[Dict[str, PropValue]]):
+        """
+        method which writes rows as a plain text grid table
+        :param out: buffer or stream to write to
+        :param results: rows of selected properties - each row must hold the same properties
+        """
+        rows = self.get_page(results)
+        headers = [self._to_text(header) for header in results[0].keys()]
+        cells, widths, numeric = self._get_cells(headers, rows)
+
+        border = "+" + "+".join("-" * (width + 2) for width in widths) + "+"
+        columns = list(zip(widths, numeric))
+
+        def _write_row(row_cells: List[str]):
+            out.write("\n| ")
+            out.write(
+                " | ".join(
+                    text.rjust(width) if is_numeric else text.ljust(width)
+                    for text, (width, is_numeric) in zip(row_cells, columns)
+                )
+            )
+            out.write(" |\n")
+
+        out.write(border)
+        _write_row(headers)
+        out.write(border.replace("-", "="))
+        for row_cells in cells:
+            _write_row(row_cells)
+            out.write(border)
+
+        footer = self.get_footer(len(results))
+        if footer:
+            out.write(f"\n{footer}")
+
+    def write_html(self, out: IO, results: List[Dict[str, PropValue]]):
+        """
+        method which writes rows as a html table - cell values are html escaped
+        :param out: buffer or stream to write to
+        :param results: rows of selected properties - each row must hold the same properties
+        """
+        rows = self.get_page(results)
+        headers = [escape(self._to_text(header)) for header in results[0].keys()]
+        cells, _, numeric = self._get_cells(headers, rows)
+        cell_tags = [
+            '<td style="text-align: right;">' if is_numeric else "<td>"
+            for is_numeric in numeric
+        ]
+
+        out.write("<table>\n<thead>\n<tr>")
+        out.write("".join(f"<th>{header}</th>" for header in headers))
+        out.write("</tr>\n</thead>\n<tbody>\n")
+        for row_cells in cells:
+            out.write("<tr>")
+            out.write(
+                "".join(
+                    f"{tag}{escape(text)}</td>"
+                    for tag, text in zip(cell_tags, row_cells)
+                )
+            )
+            out.write("</tr>\n")
+        out.write("</tbody>\n</table>")
+
+        footer = self.get_footer(len(results))
+        if footer:
+            out.write(f"<br/>{footer}")
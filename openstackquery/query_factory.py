@@ -31,6 +31,7 @@ class QueryFactory:
             prop_enum_cls=prop_mapping,
             client_side_handler=mapping_cls.get_client_side_handler(),
             server_side_handler=mapping_cls.get_server_side_handler(),
+            server_side_sort_mappings=mapping_cls.get_server_side_sort_mappings(),
         )
         executor = QueryExecutor(
             prop_enum_cls=prop_mapping, runner_cls=mapping_cls.get_runner_mapping()
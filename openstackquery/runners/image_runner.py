@@ -1,4 +1,4 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterator
 import logging
 
 from openstack.compute.v2.image import Image
@@ -64,6 +64,27 @@ class ImageRunner(RunnerWrapper):
 
         return {"projects": projects}
 
+    @staticmethod
+    def _get_filter_sets(
+        filter_kwargs: Optional[ServerSideFilter], meta_params: Dict
+    ) -> List[ServerSideFilter]:
+        """
+        Helper method which builds the set of filter kwargs to pass to conn.compute.images() - one set of filter
+        kwargs per project if meta-param 'projects' is given, otherwise just one set of filter kwargs
+        :param filter_kwargs: An Optional set of filter kwargs to pass to conn.compute.images()
+        :param meta_params: a set of meta parameters that dictates how the query is run
+        """
+        if not filter_kwargs:
+            filter_kwargs = {}
+
+        if "projects" not in meta_params:
+            return [dict(filter_kwargs)]
+
+        return [
+            {**filter_kwargs, "owner": project_id}
+            for project_id in meta_params["projects"]
+        ]
+
     def run_query(
         self,
         conn: OpenstackConnection,
@@ -81,30 +102,42 @@ class ImageRunner(RunnerWrapper):
             see https://docs.openstack.org/api-ref/image/v2/index.html#list-images
         :param meta_params: a set of meta parameters that dictates how the query is run
         """
-        if not filter_kwargs:
-            filter_kwargs = {}
+        filter_sets = self._get_filter_sets(filter_kwargs, meta_params)
 
-        if "projects" not in meta_params:
-            return RunnerUtils.run_paginated_query(
-                conn.compute.images, self._page_marker_prop_func, dict(filter_kwargs)
-            )
         query_res = []
-        project_num = len(meta_params["projects"])
-        logger.debug("running query on %s projects", project_num)
-        for i, project_id in enumerate(meta_params["projects"], 1):
-            filter_kwargs.update({"owner": project_id})
+        logger.debug("running query on %s projects", len(filter_sets))
+        for i, filter_set in enumerate(filter_sets, 1):
             logger.debug(
-                "running query on project %s / %s (id: %s)", i, project_num, project_id
-            )
-            logger.debug(
-                "running openstacksdk command conn.compute.images (%s)",
-                ", ".join(f"{key}={value}" for key, value in filter_kwargs.items()),
+                "running openstacksdk command %s / %s: conn.compute.images (%s)",
+                i,
+                len(filter_sets),
+                ", ".join(f"{key}={value}" for key, value in filter_set.items()),
             )
             query_res.extend(
                 RunnerUtils.run_paginated_query(
-                    conn.compute.images,
-                    self._page_marker_prop_func,
-                    dict(filter_kwargs),
+                    conn.compute.images, self._page_marker_prop_func, filter_set
                 )
             )
         return query_res
+
+    def iter_query_streams(
+        self,
+        conn: OpenstackConnection,
+        filter_kwargs: Optional[ServerSideFilter] = None,
+        **meta_params,
+    ) -> List[Iterator[Image]]:
+        """
+        Lazy version of run_query - returns one stream of images per project, listed page by page.
+        Projects and pages that are not reached by the caller are never listed
+        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        :param filter_kwargs: An Optional set of filter kwargs to pass to conn.compute.images()
+        :param meta_params: a set of meta parameters that dictates how the query is run
+        """
+        filter_sets = self._get_filter_sets(filter_kwargs, meta_params)
+        logger.debug("streaming query on %s projects", len(filter_sets))
+        return [
+            RunnerUtils.iter_paginated_query(
+                conn.compute.images, self._page_marker_prop_func, filter_set
+            )
+            for filter_set in filter_sets
+        ]
@@ -0,0 +1,345 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from openstackquery.aliases import OpenstackResourceObj
+
+logger = logging.getLogger(__name__)
+
+# A key for a cached listing - (cloud account, resource type, server-side filters, meta-params)
+CacheKey = Tuple[str, str, Hashable, Hashable]
+
+
+# pylint: disable=too-many-instance-attributes
+class RunnerCache:
+    """
+    Cache for openstack resources listed by runners - so repeated queries (i.e. listing flavors for each
+    then("flavor")) don't query openstack again until their listing expires.
+    Each listing is kept for a time-to-live set per resource type. Least recently used listings are evicted
+    when the cache holds more than max_entries listings, or more than (approximately) max_bytes of resources.
+    Listings which can be refreshed incrementally are stored with a high-water mark - these are kept after they
+    expire so get_stale can return them to be refreshed with only the resources changed since.
+    Listings can also be kept fresh from openstack notifications (see NotificationConsumer) - which expire them
+    or remove deleted resources from them.
+    Subclass this to store listings elsewhere - runners only use make_key, get, get_stale and set
+    """
+
+    # seconds to keep listings of each resource type for - reference data changes rarely
+    DEFAULT_TTLS = {
+        "flavor": 3600,
+        "aggregate": 900,
+        "project": 900,
+        "user": 900,
+        "image": 300,
+        "hypervisor": 60,
+        "server": 60,
+    }
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 300,
+        max_entries: Optional[int] = 128,
+        max_bytes: Optional[int] = None,
+        *,
+        size_func: Optional[Callable[[List[OpenstackResourceObj]], int]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param ttls: seconds to keep listings of each resource type for (i.e. {"flavor": 3600}) - merged with
+            DEFAULT_TTLS. A ttl of 0 disables caching for that resource type
+        :param default_ttl: seconds to keep listings of resource types not in ttls for
+        :param max_entries: maximum number of listings to keep - None for no limit
+        :param max_bytes: approximate maximum size of all listings kept - None for no limit
+        :param size_func: function which returns the approximate size of a listing in bytes - used with max_bytes.
+            Defaults to the length of each resource's string representation
+        :param clock: function which returns the current time in seconds
+        """
+        self._ttls = {**self.DEFAULT_TTLS, **(ttls or {})}
+        self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._size_func = size_func or self.estimate_size
+        self._clock = clock
+
+        # cache key -> (expiry time, size, listing, high-water mark) - in least to most recently used order
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def estimate_size(resources: List[OpenstackResourceObj]) -> int:
+        """
+        method which returns the approximate size of a listing in bytes
+        :param resources: openstack resources listed
+        """
+        return sum(len(str(resource)) for resource in resources)
+
+    @classmethod
+    def freeze(cls, value: Any) -> Hashable:
+        """
+        method which converts filters or meta-params into a hashable value - dicts are
+        order-independent
+        :param value: value to convert
+        """
+        if isinstance(value, dict):
+            return tuple(
+                sorted(
+                    ((key, cls.freeze(val)) for key, val in value.items()),
+                    key=lambda item: str(item[0]),
+                )
+            )
+        if isinstance(value, (list, tuple, set, frozenset)):
+            frozen = tuple(cls.freeze(val) for val in value)
+            return (
+                tuple(sorted(frozen, key=str))
+                if isinstance(value, (set, frozenset))
+                else frozen
+            )
+        try:
+            hash(value)
+        except TypeError:
+            return repr(value)
+        return value
+
+    def make_key(
+        self,
+        cloud_account: str,
+        resource_type: str,
+        filter_kwargs: Optional[Dict] = None,
+        meta_params: Optional[Dict] = None,
+    ) -> CacheKey:
+        """
+        method which returns the key a listing is cached under
+        :param cloud_account: name of the cloud account listed from
+        :param resource_type: name of the resource type listed - i.e. "flavor"
+        :param filter_kwargs: server-side filters the listing was run with
+        :param meta_params: parsed meta-params the listing was run with
+        """
+        return (
+            cloud_account,
+            resource_type,
+            self.freeze(filter_kwargs or {}),
+            self.freeze(meta_params or {}),
+        )
+
+    def get_ttl(self, resource_type: str) -> float:
+        """
+        method which returns the number of seconds listings of a resource type are kept for
+        :param resource_type: name of the resource type - i.e. "flavor"
+        """
+        return self._ttls.get(resource_type, self._default_ttl)
+
+    def get(self, key: CacheKey) -> Optional[List[OpenstackResourceObj]]:
+        """
+        method which returns a cached listing - or None if the listing isn't cached or has expired
+        :param key: cache key from make_key()
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                # expired listings with a high-water mark are kept to be refreshed
+                if entry[3] is None:
+                    self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            logger.debug("cache hit for %s listing", key[1])
+            return list(entry[2])
+
+    def get_stale(
+        self, key: CacheKey
+    ) -> Optional[Tuple[List[OpenstackResourceObj], str]]:
+        """
+        method which returns a cached listing - expired or not - and its high-water mark, to be refreshed
+        incrementally. Returns None if the listing isn't cached or has no high-water mark
+        :param key: cache key from make_key()
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[3] is None:
+                return None
+            return list(entry[2]), entry[3]
+
+    def set(
+        self,
+        key: CacheKey,
+        resources: List[OpenstackResourceObj],
+        high_water_mark: Optional[str] = None,
+    ):
+        """
+        method which caches a listing - evicting least recently used listings if the cache is full.
+        Listings of resource types with a ttl of 0, and listings larger than max_bytes, aren't cached
+        :param key: cache key from make_key()
+        :param resources: openstack resources listed
+        :param high_water_mark: an optional timestamp the listing is up-to-date as of - the listing is
+            refreshed with resources changed since then after it expires
+        """
+        ttl = self.get_ttl(key[1])
+        if ttl <= 0:
+            return
+        size = self._size_func(resources) if self._max_bytes is not None else 0
+        if self._max_bytes is not None and size > self._max_bytes:
+            logger.debug("%s listing too large to cache (%s bytes)", key[1], size)
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (
+                self._clock() + ttl,
+                size,
+                list(resources),
+                high_water_mark,
+            )
+            self._bytes += size
+            while self._entries and self._is_full():
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _is_full(self) -> bool:
+        """
+        Helper method which returns True if the cache holds more listings, or more bytes, than allowed
+        """
+        if self._max_entries is not None and len(self._entries) > self._max_entries:
+            return True
+        return self._max_bytes is not None and self._bytes > self._max_bytes
+
+    def _remove(self, key: CacheKey):
+        """
+        Helper method which removes a cached listing
+        :param key: cache key of the listing
+        """
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(
+        self, cloud_account: Optional[str] = None, resource_type: Optional[str] = None
+    ) -> int:
+        """
+        method which removes cached listings - of a cloud account and/or resource type, or every listing if
+        neither are given. Returns the number of listings removed
+        :param cloud_account: an optional cloud account to remove listings for
+        :param resource_type: an optional resource type to remove listings for - i.e. "server"
+        """
+        with self._lock:
+            keys = [
+                key
+                for key in self._entries
+                if self._match(key, cloud_account, resource_type)
+            ]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def _match(
+        self, key: CacheKey, cloud_account: Optional[str], resource_type: Optional[str]
+    ) -> bool:
+        """
+        Helper method which returns True if a cached listing is of a cloud account and resource type - either
+        matches anything if not given
+        :param key: cache key of the listing
+        :param cloud_account: an optional cloud account
+        :param resource_type: an optional resource type - i.e. "server"
+        """
+        return (cloud_account is None or key[0] == cloud_account) and (
+            resource_type is None or key[1] == resource_type
+        )
+
+    def expire(
+        self, cloud_account: Optional[str] = None, resource_type: Optional[str] = None
+    ) -> int:
+        """
+        method which expires cached listings - of a cloud account and/or resource type, or every listing if
+        neither are given. Listings with a high-water mark are kept to be refreshed incrementally, others are
+        removed. Returns the number of listings expired
+        :param cloud_account: an optional cloud account to expire listings for
+        :param resource_type: an optional resource type to expire listings for - i.e. "server"
+        """
+        with self._lock:
+            keys = [
+                key
+                for key in self._entries
+                if self._match(key, cloud_account, resource_type)
+            ]
+            for key in keys:
+                _, size, resources, high_water_mark = self._entries[key]
+                if high_water_mark is None:
+                    self._remove(key)
+                else:
+                    self._entries[key] = (
+                        float("-inf"),
+                        size,
+                        resources,
+                        high_water_mark,
+                    )
+        return len(keys)
+
+    def remove_resources(
+        self,
+        resource_type: str,
+        markers: Iterable[Hashable],
+        marker_func: Callable[[OpenstackResourceObj], Hashable],
+        cloud_account: Optional[str] = None,
+    ) -> int:
+        """
+        method which patches cached listings of a resource type - removing resources with the given markers
+        (i.e. ids) - without changing when listings expire. Returns the number of resources removed
+        :param resource_type: resource type of listings to patch - i.e. "server"
+        :param markers: markers of resources to remove
+        :param marker_func: function which returns the marker of a resource
+        :param cloud_account: an optional cloud account to patch listings for
+        """
+        markers = set(markers)
+        removed = 0
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if not self._match(key, cloud_account, resource_type):
+                    continue
+                expiry, size, resources, high_water_mark = entry
+                kept = [
+                    resource
+                    for resource in resources
+                    if marker_func(resource) not in markers
+                ]
+                if len(kept) == len(resources):
+                    continue
+                removed += len(resources) - len(kept)
+                if self._max_bytes is not None:
+                    self._bytes -= size
+                    size = self._size_func(kept)
+                    self._bytes += size
+                self._entries[key] = (expiry, size, kept, high_water_mark)
+        return removed
+
+    def clear(self):
+        """
+        method which removes every cached listing and resets counters
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        a getter method which returns cache counters - hits, misses, evictions, listings held and their
+        approximate size in bytes (0 if max_bytes is not set)
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
@@ -1,4 +1,4 @@
-from typing import Callable, Optional, List
+from typing import Callable, Iterable, Iterator, Optional, List
 import logging
 
 from openstack.exceptions import ResourceNotFound, ForbiddenException
@@ -40,10 +40,37 @@ class RunnerUtils:
             - this is required to mitigate some bugs where successive paging loops back on itself leading
             to endless calls
         """
+        return list(
+            RunnerUtils.iter_paginated_query(
+                paginated_call,
+                marker_prop_func,
+                server_side_filter_set,
+                page_size,
+                call_limit,
+            )
+        )
+
+    @staticmethod
+    def iter_paginated_query(
+        paginated_call: Callable,
+        marker_prop_func: Callable,
+        server_side_filter_set: Optional[ServerSideFilter] = None,
+        page_size=1000,
+        call_limit=1000,
+    ) -> Iterator:
+        """
+        Generator version of run_paginated_query - yields resources as they are returned so that the caller can
+        stop consuming early. Next page is only requested once all items in the current page have been consumed
+        :param paginated_call: A function which takes a openstacksdk call which allows limit and marker to be set
+        :param marker_prop_func: A function which takes a openstack resource object and return value of a property
+        that can be used as a marker for pagination
+        :param server_side_filter_set: A set of filters to pass to openstacksdk call
+        :param page_size: (Default 1000) how many items are returned by single call
+        :param call_limit: (Default 1000) max number of paging iterations.
+        """
 
         paginated_filters = {"limit": page_size, "marker": None}
-        paginated_filters.update(server_side_filter_set)
-        query_res = []
+        paginated_filters.update(server_side_filter_set or {})
 
         curr_marker = None
         num_calls = 1
@@ -66,7 +93,7 @@ class RunnerUtils:
                     )
                     break
 
-                query_res.append(resource)
+                yield resource
                 # openstacksdk calls break after going over pagination limit
                 if i == page_size - 1:
                     # restart the for loop with marker set
@@ -86,7 +113,6 @@ class RunnerUtils:
                 break
             # set marker as current
             curr_marker = paginated_filters["marker"]
-        return query_res
 
     @staticmethod
     def apply_client_side_filters(items: List, filters: ClientSideFilters):
@@ -101,6 +127,20 @@ class RunnerUtils:
             items = RunnerUtils._apply_client_side_filter(items, client_filter)
         return items
 
+    @staticmethod
+    def iter_client_side_filters(
+        items: Iterable, filters: ClientSideFilters
+    ) -> Iterator:
+        """
+        Lazily yields items which pass all given filter functions. Used instead of apply_client_side_filters
+        when items are streamed so that the caller can stop once enough items have been found
+        :param items: An iterable of items to query e.g. a stream of servers
+        :param filters: filter functions that we can use to limit the results after querying openstacksdk
+        """
+        for item in items:
+            if all(client_filter(item) is True for client_filter in filters):
+                yield item
+
     @staticmethod
     def _apply_client_side_filter(
         items: List, client_filter: ClientSideFilterFunc
@@ -1,13 +1,21 @@
 from abc import abstractmethod
-from typing import Optional, List, Dict
+from datetime import datetime, timedelta, timezone
+import logging
+from typing import Optional, List, Dict, Iterator
 
 from openstackquery.aliases import (
     PropFunc,
+    PropValue,
     ServerSideFilters,
     OpenstackResourceObj,
 )
+from openstackquery.enums.props.prop_enum import PropEnum
 from openstackquery.openstack_connection import OpenstackConnection
 from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.snapshot_file import SnapshotFile, SnapshotRow
+from openstackquery.runners.runner_cache import RunnerCache
+
+logger = logging.getLogger(__name__)
 
 
 class RunnerWrapper:
@@ -18,9 +26,198 @@ class RunnerWrapper:
 
     RESOURCE_TYPE = type(None)
 
+    # cache shared by all runners - None if listings aren't cached
+    _cache: Optional[RunnerCache] = None
+
+    # seconds subtracted from high-water marks - to allow for clocks on different hosts disagreeing
+    CHANGES_SINCE_SKEW = 60
+
     def __init__(self, marker_prop_func: PropFunc):
         self._page_marker_prop_func = marker_prop_func
 
+    @staticmethod
+    def set_cache(cache: Optional[RunnerCache]):
+        """
+        Sets the cache listings from all runners are kept in - or disables caching if None
+        :param cache: a RunnerCache object (or subclass) to use
+        """
+        RunnerWrapper._cache = cache
+
+    @staticmethod
+    def get_cache() -> Optional[RunnerCache]:
+        """
+        Returns the cache listings from all runners are kept in - None if caching is disabled
+        """
+        return RunnerWrapper._cache
+
+    @property
+    def marker_prop_func(self) -> PropFunc:
+        """
+        a getter method which returns the function that gets the marker (i.e. id) of a resource
+        """
+        return self._page_marker_prop_func
+
+    @property
+    def resource_name(self) -> str:
+        """
+        a getter method which returns the name of the resource type this runner lists - i.e. "flavor"
+        """
+        return type(self).__name__.replace("Runner", "").lower()
+
+    def get_cached_query(
+        self,
+        cloud_account: str,
+        filter_kwargs: Optional[ServerSideFilters] = None,
+        **kwargs,
+    ) -> Optional[List[OpenstackResourceObj]]:
+        """
+        This method returns resources cached from a previous run_cached_query with the same cloud account,
+        filter kwargs and meta params - or None if caching is disabled or nothing is cached
+        :param cloud_account: name of the cloud account to list resources from
+        :param filter_kwargs: An Optional set of filter kwargs to limit the results by when querying openstacksdk
+        :param kwargs: An extra set of meta params specific to the resource runner - see run_query
+        """
+        cache = self.get_cache()
+        if cache is None:
+            return None
+        return cache.get(
+            cache.make_key(cloud_account, self.resource_name, filter_kwargs, kwargs)
+        )
+
+    def run_cached_query(
+        self,
+        conn: OpenstackConnection,
+        cloud_account: str,
+        filter_kwargs: Optional[ServerSideFilters] = None,
+        **kwargs,
+    ) -> List[OpenstackResourceObj]:
+        """
+        This method runs run_query - unless the same listing is held in the cache. Listings are added to the
+        cache if caching is enabled (see set_cache)
+        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        :param cloud_account: name of the cloud account conn is connected to
+        :param filter_kwargs: An Optional set of filter kwargs to limit the results by when querying openstacksdk
+        :param kwargs: An extra set of meta params specific to the resource runner - see run_query
+        """
+        cache = self.get_cache()
+        if cache is None:
+            return self.run_query(conn, filter_kwargs, **kwargs)
+
+        key = cache.make_key(cloud_account, self.resource_name, filter_kwargs, kwargs)
+        resources = cache.get(key)
+        if resources is not None:
+            return resources
+
+        high_water_mark = None
+        if self.supports_changes_since(filter_kwargs):
+            high_water_mark = self.get_high_water_mark()
+            stale = cache.get_stale(key)
+            if stale is not None:
+                resources = self.refresh_query(
+                    conn, stale[0], stale[1], filter_kwargs, **kwargs
+                )
+        if resources is None:
+            resources = self.run_query(conn, filter_kwargs, **kwargs)
+        cache.set(key, resources, high_water_mark=high_water_mark)
+        return resources
+
+    # pylint: disable=unused-argument
+    def supports_changes_since(
+        self, filter_kwargs: Optional[ServerSideFilters] = None
+    ) -> bool:
+        """
+        This method returns True if listings run with the given filter kwargs can be refreshed incrementally -
+        by listing only resources changed since a high-water mark (see refresh_query).
+        Resource types which openstack can't list by changes-since return False
+        :param filter_kwargs: filter kwargs the listing is run with
+        """
+        return False
+
+    def get_high_water_mark(self) -> str:
+        """
+        This method returns a timestamp to list changes since, the next time a listing started now is refreshed -
+        less CHANGES_SINCE_SKEW seconds so changes made while listing aren't missed
+        """
+        return (
+            datetime.now(timezone.utc) - timedelta(seconds=self.CHANGES_SINCE_SKEW)
+        ).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def run_changes_query(
+        self,
+        conn: OpenstackConnection,
+        since: str,
+        filter_kwargs: Optional[ServerSideFilters] = None,
+        **kwargs,
+    ) -> List[OpenstackResourceObj]:
+        """
+        This method lists only resources changed (including deleted) since a timestamp.
+        Only implemented by runners which support changes-since
+        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        :param since: timestamp to list changes since - i.e. "2024-01-01T00:00:00Z"
+        :param filter_kwargs: An Optional set of filter kwargs to limit the results by when querying openstacksdk
+        :param kwargs: An extra set of meta params specific to the resource runner - see run_query
+        """
+        raise ParseQueryError(
+            f"{self.resource_name} resources can't be listed by changes-since"
+        )
+
+    # pylint: disable=unused-argument
+    @staticmethod
+    def is_deleted(resource: OpenstackResourceObj) -> bool:
+        """
+        This method returns True if a resource listed by run_changes_query has been deleted
+        :param resource: openstack resource to check
+        """
+        return False
+
+    def merge_changes(
+        self,
+        resources: List[OpenstackResourceObj],
+        changes: List[OpenstackResourceObj],
+    ) -> List[OpenstackResourceObj]:
+        """
+        This method merges changed resources into a listing by their marker prop (i.e. id) - changed resources
+        replace those in the listing, new resources are added and deleted resources are removed
+        :param resources: listing to merge into
+        :param changes: resources listed by run_changes_query
+        """
+        merged = {
+            self._page_marker_prop_func(resource): resource for resource in resources
+        }
+        for change in changes:
+            marker = self._page_marker_prop_func(change)
+            if self.is_deleted(change):
+                merged.pop(marker, None)
+            else:
+                merged[marker] = change
+        return list(merged.values())
+
+    def refresh_query(
+        self,
+        conn: OpenstackConnection,
+        resources: List[OpenstackResourceObj],
+        since: str,
+        filter_kwargs: Optional[ServerSideFilters] = None,
+        **kwargs,
+    ) -> List[OpenstackResourceObj]:
+        """
+        This method refreshes a listing incrementally - listing only resources changed since the listing's
+        high-water mark and merging them in
+        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        :param resources: listing to refresh
+        :param since: high-water mark of the listing - see get_high_water_mark
+        :param filter_kwargs: filter kwargs the listing was run with
+        :param kwargs: meta params the listing was run with
+        """
+        changes = self.run_changes_query(conn, since, filter_kwargs, **kwargs)
+        logger.debug(
+            "merging %s %s resources changed since %s",
+            len(changes),
+            self.resource_name,
+            since,
+        )
+        return self.merge_changes(resources, changes)
+
     def parse_subset(
         self, subset: List[OpenstackResourceObj]
     ) -> List[OpenstackResourceObj]:
@@ -29,8 +226,19 @@ class RunnerWrapper:
         :param subset: A list of openstack objects to parse
         """
 
+        # rows of a snapshot of the same resource type are read like openstack objects
+        if (
+            isinstance(subset, SnapshotFile)
+            and subset.resource_type == self.resource_name
+        ):
+            return subset
+
         # connection object may need to be used if we want to run validation checks
-        if any(not isinstance(i, self.RESOURCE_TYPE) for i in subset):
+        if any(
+            not isinstance(i, self.RESOURCE_TYPE)
+            and SnapshotRow.get_resource_type(i) != self.resource_name
+            for i in subset
+        ):
             raise ParseQueryError(
                 f"'from_subset' only accepts openstack objects of type {self.RESOURCE_TYPE}"
             )
@@ -52,6 +260,62 @@ class RunnerWrapper:
         openstacksdk query is run - these kwargs are specific to the resource runner.
         """
 
+    def iter_query(
+        self,
+        conn: OpenstackConnection,
+        filter_kwargs: Optional[ServerSideFilters] = None,
+        **kwargs,
+    ) -> Iterator[OpenstackResourceObj]:
+        """
+        This method is a lazy version of run_query - it yields openstack resources as they are listed so that
+        the caller can stop early (e.g. when a limit is set) without listing everything.
+        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        :param filter_kwargs: An Optional set of filter kwargs to limit the results by when querying openstacksdk
+        :param kwargs: An extra set of meta params specific to the resource runner - see run_query
+        """
+        for stream in self.iter_query_streams(conn, filter_kwargs, **kwargs):
+            yield from stream
+
+    def iter_query_streams(
+        self,
+        conn: OpenstackConnection,
+        filter_kwargs: Optional[ServerSideFilters] = None,
+        **kwargs,
+    ) -> List[Iterator[OpenstackResourceObj]]:
+        """
+        This method returns one lazy stream of openstack resources for each separate openstacksdk listing the
+        query needs (i.e. one per project). Each stream is listed independently, so if the listing is sorted
+        server-side, each stream is sorted and streams can be merged.
+        By default, this will return a single stream which runs run_query on first iteration - runners that can
+        list resources lazily (i.e. using pagination or per-project fan-out) should override this.
+        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        :param filter_kwargs: An Optional set of filter kwargs to limit the results by when querying openstacksdk
+        :param kwargs: An extra set of meta params specific to the resource runner - see run_query
+        """
+
+        def _stream():
+            yield from self.run_query(conn, filter_kwargs, **kwargs)
+
+        return [_stream()]
+
+    # pylint: disable=unused-argument
+    def run_aggregate_count(
+        self,
+        conn: OpenstackConnection,
+        count_by: PropEnum,
+        **kwargs,
+    ) -> Optional[Dict[PropValue, int]]:
+        """
+        This method returns the number of resources per value of a property using an aggregate source openstack
+        provides (i.e. compute limits or placement usages) - which is much cheaper than listing every resource.
+        By default, no aggregate source exists and None is returned - runners should override this for properties
+        that openstack can count for them.
+        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        :param count_by: property enum to count resources by
+        :param kwargs: An extra set of meta params specific to the resource runner - see run_query
+        """
+        return None
+
     @abstractmethod
     def parse_meta_params(self, conn: OpenstackConnection, **kwargs) -> Dict[str, str]:
         """
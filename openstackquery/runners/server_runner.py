@@ -1,8 +1,10 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterator
 import logging
 
 from openstack.compute.v2.server import Server
 
+from openstackquery.enums.props.prop_enum import PropEnum
+from openstackquery.enums.props.server_properties import ServerProperties
 from openstackquery.openstack_connection import OpenstackConnection
 from openstackquery.runners.runner_utils import RunnerUtils
 from openstackquery.runners.runner_wrapper import RunnerWrapper
@@ -71,20 +73,14 @@ class ServerRunner(RunnerWrapper):
             return {"projects": projects}
         return {"all_tenants": True, "projects": projects}
 
-    def run_query(
-        self,
-        conn: OpenstackConnection,
-        filter_kwargs: Optional[ServerSideFilter] = None,
-        **meta_params,
-    ) -> List[Server]:
+    @staticmethod
+    def _get_filter_sets(
+        filter_kwargs: Optional[ServerSideFilter], meta_params: Dict
+    ) -> List[ServerSideFilter]:
         """
-        This method runs the query by running openstacksdk commands
-
-        For ServerQuery, this command gets all projects available and iteratively finds servers that belong to that
-        project
-        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        Helper method which builds the set of filter kwargs to pass to conn.compute.servers() - one set of filter
+        kwargs per project if meta-param 'projects' is given, otherwise just one set of filter kwargs
         :param filter_kwargs: An Optional set of filter kwargs to pass to conn.compute.servers()
-            to limit the servers being returned. - see https://docs.openstack.org/api-ref/compute/#list-servers
         :param meta_params: a set of meta parameters that dictates how the query is run
         """
         if not filter_kwargs:
@@ -102,31 +98,130 @@ class ServerRunner(RunnerWrapper):
             filter_kwargs["all_tenants"] = meta_params["all_tenants"]
 
         if "projects" not in meta_params:
-            logger.debug(
-                "running openstacksdk command conn.compute.servers (%s)",
-                ", ".join(f"{key}={value}" for key, value in filter_kwargs.items()),
-            )
-            return RunnerUtils.run_paginated_query(
-                conn.compute.servers, self._page_marker_prop_func, dict(filter_kwargs)
-            )
+            return [dict(filter_kwargs)]
+
+        return [
+            {**filter_kwargs, "project_id": project_id}
+            for project_id in meta_params["projects"]
+        ]
+
+    def run_query(
+        self,
+        conn: OpenstackConnection,
+        filter_kwargs: Optional[ServerSideFilter] = None,
+        **meta_params,
+    ) -> List[Server]:
+        """
+        This method runs the query by running openstacksdk commands
+
+        For ServerQuery, this command gets all projects available and iteratively finds servers that belong to that
+        project
+        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        :param filter_kwargs: An Optional set of filter kwargs to pass to conn.compute.servers()
+            to limit the servers being returned. - see https://docs.openstack.org/api-ref/compute/#list-servers
+        :param meta_params: a set of meta parameters that dictates how the query is run
+        """
+        filter_sets = self._get_filter_sets(filter_kwargs, meta_params)
 
         query_res = []
-        project_num = len(meta_params["projects"])
-        logger.debug("running query on %s projects", project_num)
-        for i, project_id in enumerate(meta_params["projects"], 1):
-            filter_kwargs.update({"project_id": project_id})
-            logger.debug(
-                "running query on project %s / %s (id: %s)", i, project_num, project_id
-            )
+        logger.debug("running query on %s projects", len(filter_sets))
+        for i, filter_set in enumerate(filter_sets, 1):
             logger.debug(
-                "running openstacksdk command conn.compute.servers (%s)",
-                ", ".join(f"{key}={value}" for key, value in filter_kwargs.items()),
+                "running openstacksdk command %s / %s: conn.compute.servers (%s)",
+                i,
+                len(filter_sets),
+                ", ".join(f"{key}={value}" for key, value in filter_set.items()),
             )
             query_res.extend(
                 RunnerUtils.run_paginated_query(
-                    conn.compute.servers,
-                    self._page_marker_prop_func,
-                    dict(filter_kwargs),
+                    conn.compute.servers, self._page_marker_prop_func, filter_set
                 )
             )
         return query_res
+
+    def supports_changes_since(
+        self, filter_kwargs: Optional[ServerSideFilter] = None
+    ) -> bool:
+        """
+        Servers can be listed by changes-since - but only listings without filters can be refreshed incrementally,
+        since a filtered listing of changes misses servers which changed to no longer match the filters
+        :param filter_kwargs: filter kwargs the listing is run with
+        """
+        return not filter_kwargs
+
+    def run_changes_query(
+        self,
+        conn: OpenstackConnection,
+        since: str,
+        filter_kwargs: Optional[ServerSideFilter] = None,
+        **meta_params,
+    ) -> List[Server]:
+        """
+        This method lists servers changed since a timestamp - including deleted servers
+        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        :param since: timestamp to list changes since - i.e. "2024-01-01T00:00:00Z"
+        :param filter_kwargs: An Optional set of filter kwargs to pass to conn.compute.servers()
+        :param meta_params: a set of meta parameters that dictates how the query is run
+        """
+        return self.run_query(
+            conn, {**(filter_kwargs or {}), "changes-since": since}, **meta_params
+        )
+
+    @staticmethod
+    def is_deleted(resource: Server) -> bool:
+        """
+        Servers listed by changes-since which have been deleted have status DELETED
+        :param resource: server to check
+        """
+        return resource["status"] == "DELETED"
+
+    def iter_query_streams(
+        self,
+        conn: OpenstackConnection,
+        filter_kwargs: Optional[ServerSideFilter] = None,
+        **meta_params,
+    ) -> List[Iterator[Server]]:
+        """
+        Lazy version of run_query - returns one stream of servers per project, listed page by page.
+        Projects and pages that are not reached by the caller are never listed
+        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        :param filter_kwargs: An Optional set of filter kwargs to pass to conn.compute.servers()
+        :param meta_params: a set of meta parameters that dictates how the query is run
+        """
+        filter_sets = self._get_filter_sets(filter_kwargs, meta_params)
+        logger.debug("streaming query on %s projects", len(filter_sets))
+        return [
+            RunnerUtils.iter_paginated_query(
+                conn.compute.servers, self._page_marker_prop_func, filter_set
+            )
+            for filter_set in filter_sets
+        ]
+
+    def run_aggregate_count(
+        self,
+        conn: OpenstackConnection,
+        count_by: PropEnum,
+        **meta_params,
+    ) -> Optional[Dict[str, int]]:
+        """
+        This method returns number of servers per project using compute limits ('instances_used')
+        - one call per project instead of listing every server.
+        NOTE: this counts all servers the project's quota counts - no filters can be applied
+        :param conn: An OpenstackConnection object - used to connect to openstacksdk
+        :param count_by: property enum to count servers by - only PROJECT_ID is supported
+        :param meta_params: a set of meta parameters that dictates how the query is run
+        """
+        if count_by != ServerProperties.PROJECT_ID:
+            return None
+
+        project_ids = meta_params.get("projects")
+        if project_ids is None:
+            project_ids = [project.id for project in conn.identity.projects()]
+
+        logger.debug("getting compute limits for %s projects", len(project_ids))
+        return {
+            project_id: conn.compute.get_limits(
+                project_id=project_id
+            ).absolute.instances_used
+            for project_id in project_ids
+        }
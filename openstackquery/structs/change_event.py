@@ -0,0 +1,18 @@
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+from openstackquery.aliases import PropValue
+
+
+@dataclass
+class ChangeEvent:
+    """
+    Structured data describing a result added, changed or removed between two runs of a query.
+    key identifies the result (i.e. its id), props holds its selected properties (as they were before it was
+    removed for "removed" events) and changes holds (old value, new value) of each property changed
+    """
+
+    event: str
+    key: PropValue
+    props: Dict[str, PropValue]
+    changes: Dict[str, Tuple[PropValue, PropValue]] = field(default_factory=dict)
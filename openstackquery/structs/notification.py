@@ -0,0 +1,17 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class Notification:
+    """
+    Structured data describing a notification openstack services send when resources change -
+    i.e. "compute.instance.delete.end". payload holds the notification's payload, unwrapped from versioned
+    notification objects
+    """
+
+    event_type: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    publisher_id: Optional[str] = None
+    timestamp: Optional[str] = None
+    message_id: Optional[str] = None
@@ -0,0 +1,583 @@
+import logging
+import os
+import re
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from openstackquery.aliases import OpenstackResourceObj
+from openstackquery.enums.props.hypervisor_properties import HypervisorProperties
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.columnar_output import ColumnarOutput
+
+if TYPE_CHECKING:
+    from openstackquery.api.query_api import QueryAPI
+
+logger = logging.getLogger(__name__)
+
+# usage properties recorded for each hypervisor - in the order they are stored
+METRICS = (
+    HypervisorProperties.VCPUS_USED,
+    HypervisorProperties.MEMORY_MB_USED,
+    HypervisorProperties.DISK_GB_USED,
+)
+
+SEGMENT_PATTERN = re.compile(r"^segment-(\d+)\.npz$")
+
+
+def _import_numpy():
+    """
+    Helper function which imports numpy - raising an ImportError naming the extra to install if it is not installed
+    """
+    return ColumnarOutput.import_optional("numpy", "numpy")
+
+
+def get_query_resources(
+    resources: Union["QueryAPI", Iterable[OpenstackResourceObj]], resource_name: str
+) -> Iterable[OpenstackResourceObj]:
+    """
+    Helper function which returns openstack objects found by a query that has been run - or the objects given
+    :param resources: a query that has been run, or openstack objects
+    :param resource_name: resource type the query must be for - i.e. "hypervisor"
+    """
+    results_container = getattr(resources, "results_container", None)
+    if results_container is None and hasattr(resources, "executor"):
+        raise ParseQueryError("query must be run before its results can be used")
+    if results_container is None:
+        return resources
+    if resources.executor.runner.resource_name != resource_name:
+        raise ParseQueryError(f"expected results of a {resource_name} query")
+    return [result.as_object() for result in results_container.iter_results()]
+
+
+def get_service_host(hypervisor: OpenstackResourceObj) -> Optional[str]:
+    """
+    Helper function which returns the compute service host a hypervisor runs on - aggregates list hosts by this
+    name, which can differ from the hypervisor name (i.e. a short name rather than an FQDN). None if not known
+    :param hypervisor: hypervisor object
+    """
+    try:
+        return hypervisor.hv["service"]["host"]
+    except (KeyError, TypeError):
+        return None
+
+
+def match_hosts(
+    groups: Dict[str, Iterable[str]], service_hosts: Dict[str, Optional[str]]
+) -> Dict[str, List[str]]:
+    """
+    Helper function which matches hosts in each group (i.e. aggregate) to hypervisor names - by service host, by
+    hypervisor name, or by short name (before the first ".") where only one hypervisor has that short name.
+    Hosts which match no hypervisor are logged as a warning
+    :param groups: host names in each group - see UsageHistory.get_aggregate_hosts()
+    :param service_hosts: service host of each hypervisor (None if not known) - by hypervisor name
+    """
+    names, short_names = {}, {}
+    for name, service_host in service_hosts.items():
+        for alias in (name, service_host):
+            if alias:
+                names.setdefault(alias.lower(), name)
+                short_names.setdefault(alias.split(".")[0].lower(), set()).add(name)
+
+    matched = {}
+    for group, hosts in groups.items():
+        matched[group], unmatched = [], []
+        for host in dict.fromkeys(hosts):
+            name = names.get(host.lower())
+            if name is None:
+                candidates = short_names.get(host.split(".")[0].lower(), set())
+                name = next(iter(candidates)) if len(candidates) == 1 else None
+            if name is None:
+                unmatched.append(host)
+            elif name not in matched[group]:
+                matched[group].append(name)
+        if unmatched:
+            logger.warning(
+                "%s hosts in %s match no hypervisor: %s",
+                len(unmatched),
+                group,
+                ", ".join(unmatched),
+            )
+    return matched
+
+
+class _RingBuffer:
+    """
+    Fixed-size buffer holding the latest samples of one hypervisor - oldest samples are overwritten once full
+    """
+
+    __slots__ = ("times", "values", "start", "count")
+
+    def __init__(self, np, capacity: int):
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, len(METRICS)), dtype=np.float32)
+        self.start = 0
+        self.count = 0
+
+    @property
+    def last_time(self) -> Optional[int]:
+        """
+        a getter method which returns the timestamp of the latest sample - or None if the buffer is empty
+        """
+        if not self.count:
+            return None
+        return int(self.times[(self.start + self.count - 1) % len(self.times)])
+
+    def append(self, timestamp: int, values) -> bool:
+        """
+        method which adds a sample - returns False (and ignores it) if it is not newer than the latest sample
+        :param timestamp: time of sample in seconds since the epoch
+        :param values: value of each metric
+        """
+        last_time = self.last_time
+        if last_time is not None and timestamp <= last_time:
+            return False
+        capacity = len(self.times)
+        index = (self.start + self.count) % capacity
+        self.times[index] = timestamp
+        self.values[index] = values
+        if self.count < capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % capacity
+        return True
+
+    def get_samples(self, np, start: Optional[int] = None, end: Optional[int] = None):
+        """
+        method which returns times and values of samples held in time order - between start (inclusive)
+        and end (exclusive) if given
+        :param np: numpy module
+        :param start: earliest time to return samples from
+        :param end: time to return samples before
+        """
+        order = (self.start + np.arange(self.count)) % len(self.times)
+        times = self.times[order]
+        low = 0 if start is None else np.searchsorted(times, start, side="left")
+        high = len(times) if end is None else np.searchsorted(times, end, side="left")
+        return times[low:high], self.values[order[low:high]]
+
+
+# pylint: disable=too-many-instance-attributes
+class UsageHistory:
+    """
+    Class which stores usage (vcpus, memory and disk used) of each hypervisor over time - recorded from each run of
+    a HypervisorQuery. Samples are held in fixed-size numpy ring buffers per hypervisor (20 bytes a sample) and
+    persisted to a directory as compressed binary segments, so weeks of history take kilobytes per hypervisor.
+    Range queries, downsampling and rollups by aggregate are computed with numpy - requires the numpy extra
+
+    history = UsageHistory("/var/lib/openstackquery/usage")
+    history.record(HypervisorQuery().run("prod"))
+    history.downsample(3600, start=time.time() - 7 * 24 * 3600)
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        capacity: int = 8064,
+        max_segments: int = 64,
+    ):
+        """
+        :param directory: an optional directory to persist samples to - samples already persisted there are loaded
+        :param capacity: number of samples held per hypervisor - 4 weeks of samples recorded every 5 minutes
+            by default. Older samples are dropped
+        :param max_segments: number of segments persisted before they are compacted into one
+        """
+        if capacity <= 0:
+            raise ParseQueryError("usage history capacity must be a positive number")
+        self._np = _import_numpy()
+        self._directory = directory
+        self._capacity = capacity
+        self._max_segments = max_segments
+        self._buffers: Dict[str, _RingBuffer] = {}
+        # compute service host of each hypervisor - to match hosts in aggregates with
+        self._service_hosts: Dict[str, Optional[str]] = {}
+        # samples recorded since segments were last written - (hypervisor name, timestamp, values)
+        self._pending: List[Tuple[str, int, Any]] = []
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.load()
+
+    @property
+    def names(self) -> List[str]:
+        """
+        a getter method which returns names of hypervisors with samples held
+        """
+        with self._lock:
+            return sorted(self._buffers)
+
+    @property
+    def metrics(self) -> List[str]:
+        """
+        a getter method which returns names of metrics stored - in the order values are returned
+        """
+        return [metric.name.lower() for metric in METRICS]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(buffer.count for buffer in self._buffers.values())
+
+    def _append(self, name: str, timestamp: int, values) -> bool:
+        """
+        Helper method which adds a sample to a hypervisor's buffer - creating it if needed.
+        Must be called holding the lock
+        :param name: name of hypervisor
+        :param timestamp: time of sample in seconds since the epoch
+        :param values: value of each metric
+        """
+        buffer = self._buffers.get(name)
+        if buffer is None:
+            buffer = self._buffers[name] = _RingBuffer(self._np, self._capacity)
+        return buffer.append(timestamp, values)
+
+    def record(
+        self,
+        hypervisors: Union["QueryAPI", Iterable[OpenstackResourceObj]],
+        timestamp: Optional[float] = None,
+        flush: bool = True,
+    ) -> int:
+        """
+        method which records the usage of each hypervisor - returns the number of samples recorded. Samples that are
+        not newer than a hypervisor's latest sample are ignored. Missing values are stored as NaN
+        :param hypervisors: a HypervisorQuery that has been run, or hypervisor objects
+        :param timestamp: time of samples in seconds since the epoch - now if not given
+        :param flush: if True (default) and the history has a directory, persist samples straight away
+        """
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        name_func = HypervisorProperties.get_prop_mapping(
+            HypervisorProperties.HYPERVISOR_NAME
+        )
+        metric_funcs = [HypervisorProperties.get_prop_mapping(prop) for prop in METRICS]
+        rows = []
+        for hypervisor in get_query_resources(hypervisors, "hypervisor"):
+            values = [func(hypervisor) for func in metric_funcs]
+            rows.append(
+                (
+                    name_func(hypervisor),
+                    get_service_host(hypervisor),
+                    [self._np.nan if value is None else value for value in values],
+                )
+            )
+
+        recorded = 0
+        with self._lock:
+            for name, service_host, values in rows:
+                if service_host is not None:
+                    self._service_hosts[name] = service_host
+                if self._append(name, timestamp, values):
+                    self._pending.append((name, timestamp, values))
+                    recorded += 1
+        logger.debug("recorded usage of %s hypervisors at %s", recorded, timestamp)
+        if flush and self._directory is not None:
+            self.flush()
+        return recorded
+
+    def _get_segments(self) -> List[str]:
+        """
+        Helper method which returns paths of segments in the directory - oldest first
+        """
+        segments = []
+        for file_name in os.listdir(self._directory):
+            match = SEGMENT_PATTERN.match(file_name)
+            if match:
+                segments.append((int(match.group(1)), file_name))
+        return [
+            os.path.join(self._directory, file_name)
+            for _, file_name in sorted(segments)
+        ]
+
+    def _write_segment(self, samples: List[Tuple[str, int, Any]]) -> str:
+        """
+        Helper method which writes samples to a new segment - each hypervisor name (and service host) is stored
+        once and samples hold an index into them. Written to a temporary file first so readers never see partial
+        segments. Must be called holding the lock
+        :param samples: samples to write - (hypervisor name, timestamp, values)
+        """
+        np = self._np
+        segments = self._get_segments()
+        number = (
+            int(SEGMENT_PATTERN.match(os.path.basename(segments[-1])).group(1)) + 1
+            if segments
+            else 0
+        )
+        path = os.path.join(self._directory, f"segment-{number:08d}.npz")
+        names = sorted({name for name, _, _ in samples})
+        indexes = {name: i for i, name in enumerate(names)}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            np.savez_compressed(
+                file,
+                names=np.array(names, dtype=str),
+                service_hosts=np.array(
+                    [self._service_hosts.get(name) or "" for name in names], dtype=str
+                ),
+                name_indexes=np.array(
+                    [indexes[name] for name, _, _ in samples], dtype=np.int32
+                ),
+                times=np.array(
+                    [timestamp for _, timestamp, _ in samples], dtype=np.int64
+                ),
+                values=np.array(
+                    [values for _, _, values in samples], dtype=np.float32
+                ).reshape(-1, len(METRICS)),
+            )
+        os.replace(tmp_path, path)
+        return path
+
+    def flush(self) -> Optional[str]:
+        """
+        method which persists samples recorded since the last flush as a new segment - compacting segments once
+        there are more than max_segments. Returns path of segment written - or None if there was nothing to write
+        """
+        if self._directory is None:
+            raise ParseQueryError("usage history has no directory to persist to")
+        with self._lock:
+            samples, self._pending = self._pending, []
+            if not samples:
+                return None
+            path = self._write_segment(samples)
+            if len(self._get_segments()) > self._max_segments:
+                path = self._compact()
+        return path
+
+    def _compact(self) -> str:
+        """
+        Helper method which replaces every segment with one holding only samples still held in buffers - dropping
+        samples older than the buffers hold. Must be called holding the lock
+        """
+        old_segments = self._get_segments()
+        samples = []
+        for name, buffer in self._buffers.items():
+            times, values = buffer.get_samples(self._np)
+            samples.extend(zip([name] * len(times), times.tolist(), values))
+        # segments are read back in order - so samples must be in time order
+        samples.sort(key=lambda sample: sample[1])
+        path = self._write_segment(samples)
+        for segment in old_segments:
+            os.remove(segment)
+        logger.info("compacted %s usage segments into %s", len(old_segments), path)
+        return path
+
+    def compact(self) -> Optional[str]:
+        """
+        method which persists any samples not yet persisted and replaces every segment with one holding only
+        samples still held. Returns path of segment written - or None if no samples are held
+        """
+        if self._directory is None:
+            raise ParseQueryError("usage history has no directory to persist to")
+        with self._lock:
+            self._pending = []
+            if not self._buffers:
+                return None
+            return self._compact()
+
+    def load(self) -> int:
+        """
+        method which loads samples persisted in the directory into buffers - returns the number of samples loaded
+        """
+        if self._directory is None:
+            raise ParseQueryError("usage history has no directory to load from")
+        loaded = 0
+        with self._lock:
+            for segment in self._get_segments():
+                with self._np.load(segment, allow_pickle=False) as data:
+                    names = data["names"].tolist()
+                    for name, service_host in zip(
+                        names, data["service_hosts"].tolist()
+                    ):
+                        if service_host:
+                            self._service_hosts[name] = service_host
+                    for index, timestamp, values in zip(
+                        data["name_indexes"].tolist(),
+                        data["times"].tolist(),
+                        data["values"],
+                    ):
+                        loaded += self._append(names[index], timestamp, values)
+        logger.debug("loaded %s usage samples from %s", loaded, self._directory)
+        return loaded
+
+    def get_range(
+        self,
+        name: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ):
+        """
+        method which returns samples of one hypervisor between start (inclusive) and end (exclusive) - as an array
+        of timestamps and an array holding a row of metric values (see metrics) for each timestamp
+        :param name: name of hypervisor
+        :param start: an optional time to return samples from - in seconds since the epoch
+        :param end: an optional time to return samples before - in seconds since the epoch
+        """
+        with self._lock:
+            buffer = self._buffers.get(name)
+            if buffer is None:
+                raise ParseQueryError(f"no usage recorded for hypervisor {name}")
+            times, values = buffer.get_samples(self._np, start, end)
+        return times, values
+
+    def _bucket(
+        self,
+        names: List[str],
+        interval: int,
+        start: Optional[float],
+        end: Optional[float],
+        func: str,
+    ):
+        """
+        Helper method which downsamples samples of each hypervisor into buckets of interval seconds - in one
+        vectorised pass over all samples. Returns start time of each bucket and an array of shape
+        (hypervisors, buckets, metrics) - NaN where a bucket holds no samples
+        :param names: names of hypervisors
+        :param interval: width of buckets in seconds
+        :param start: an optional time to start from - buckets are aligned to multiples of interval
+        :param end: an optional time to end before
+        :param func: how samples in a bucket are combined - "mean", "min" or "max"
+        """
+        np = self._np
+        if interval <= 0:
+            raise ParseQueryError("downsample interval must be a positive number")
+        if func not in ("mean", "min", "max"):
+            raise ParseQueryError(
+                f"downsample function {func} not supported - use mean, min or max"
+            )
+        samples = [self.get_range(name, start, end) for name in names]
+        times = np.concatenate(
+            [sample_times for sample_times, _ in samples]
+            or [np.zeros(0, dtype=np.int64)]
+        )
+        if times.size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(
+                (len(names), 0, len(METRICS)), dtype=np.float64
+            )
+        values = np.concatenate([sample_values for _, sample_values in samples]).astype(
+            np.float64
+        )
+        rows = np.repeat(
+            np.arange(len(names)), [len(sample_times) for sample_times, _ in samples]
+        )
+
+        first = int(times.min() if start is None else start) // interval * interval
+        bucket_count = (int(times.max()) - first) // interval + 1
+        combined = self._combine(
+            rows * bucket_count + (times - first) // interval,
+            values,
+            len(names) * bucket_count,
+            func,
+        )
+
+        bucket_times = first + np.arange(bucket_count, dtype=np.int64) * interval
+        return bucket_times, combined.reshape(len(names), bucket_count, len(METRICS))
+
+    def _combine(self, cells, values, cell_count: int, func: str):
+        """
+        Helper method which combines samples in each cell (hypervisor and bucket) with unbuffered ufuncs - missing
+        values are ignored. Returns an array holding a row of metric values for each cell - NaN where a cell holds
+        no values
+        :param cells: index of the cell each sample is in
+        :param values: row of metric values of each sample
+        :param cell_count: number of cells
+        :param func: how samples in a cell are combined - "mean", "min" or "max"
+        """
+        np = self._np
+        shape = (cell_count, len(METRICS))
+        present = ~np.isnan(values)
+        if func == "mean":
+            totals = np.zeros(shape)
+            counts = np.zeros(shape)
+            np.add.at(totals, cells, np.where(present, values, 0))
+            np.add.at(counts, cells, present)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return totals / counts
+        fill, ufunc = (np.inf, np.minimum) if func == "min" else (-np.inf, np.maximum)
+        combined = np.full(shape, fill)
+        ufunc.at(combined, cells, np.where(present, values, fill))
+        combined[np.isinf(combined)] = np.nan
+        return combined
+
+    def downsample(
+        self,
+        interval: int,
+        names: Optional[Iterable[str]] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        func: str = "mean",
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        method which downsamples samples of each hypervisor into buckets of interval seconds. Returns start time of
+        each bucket and an array per hypervisor holding a row of metric values (see metrics) for each bucket -
+        NaN where a bucket holds no samples
+        :param interval: width of buckets in seconds - i.e. 3600 for hourly
+        :param names: an optional list of hypervisor names - every hypervisor if not given
+        :param start: an optional time to start from - buckets are aligned to multiples of interval
+        :param end: an optional time to end before
+        :param func: how samples in a bucket are combined - "mean" (default), "min" or "max"
+        """
+        names = self.names if names is None else list(names)
+        bucket_times, combined = self._bucket(names, interval, start, end, func)
+        return bucket_times, dict(zip(names, combined))
+
+    def rollup(
+        self,
+        groups: Dict[str, Iterable[str]],
+        interval: int,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        func: str = "mean",
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        method which totals downsampled usage of hypervisors in each group (i.e. aggregate). Returns start time of
+        each bucket and an array per group holding a row of metric totals (see metrics) for each bucket -
+        NaN where no hypervisor in the group has samples in a bucket. Hosts are matched to hypervisors by service
+        host, hypervisor name or short name - hosts with no samples recorded are logged as a warning and ignored
+        :param groups: host names in each group - see get_aggregate_hosts()
+        :param interval: width of buckets in seconds - i.e. 3600 for hourly
+        :param start: an optional time to start from - buckets are aligned to multiples of interval
+        :param end: an optional time to end before
+        :param func: how samples of a hypervisor in a bucket are combined before totalling - "mean" (default),
+            "min" or "max"
+        """
+        with self._lock:
+            service_hosts = {
+                name: self._service_hosts.get(name) for name in self._buffers
+            }
+        groups = match_hosts(groups, service_hosts)
+        names = list(dict.fromkeys(name for hosts in groups.values() for name in hosts))
+        bucket_times, combined = self._bucket(names, interval, start, end, func)
+        indexes = {name: i for i, name in enumerate(names)}
+        return bucket_times, {
+            group: self._total(combined[[indexes[name] for name in hosts]])
+            for group, hosts in groups.items()
+        }
+
+    def _total(self, members):
+        """
+        Helper method which totals downsampled usage of hypervisors in a group - NaN where no hypervisor has
+        samples in a bucket
+        :param members: array of shape (hypervisors, buckets, metrics) holding downsampled usage of each hypervisor
+        """
+        total = self._np.nansum(members, axis=0)
+        total[self._np.isnan(members).all(axis=0)] = self._np.nan
+        return total
+
+    @staticmethod
+    def get_aggregate_hosts(
+        aggregates: Iterable[OpenstackResourceObj],
+    ) -> Dict[str, List[str]]:
+        """
+        method which returns names of hosts in each aggregate - for rolling usage up by aggregate
+        :param aggregates: openstack aggregate objects - i.e. from AggregateQuery().run(...).to_objects()
+        """
+        return {
+            aggregate["name"]: list(aggregate["hosts"] or [])
+            for aggregate in aggregates
+        }
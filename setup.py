@@ -15,5 +15,11 @@ setup(
     packages=find_packages(),
     python_requires=">=3.8",
     install_requires=["openstacksdk", "tabulate", "osc-placement"],
+    extras_require={
+        "arrow": ["pyarrow"],
+        "pandas": ["pyarrow", "pandas"],
+        "polars": ["pyarrow", "polars"],
+        "numpy": ["numpy"],
+    },
     keywords=["python, openstack"],
 )
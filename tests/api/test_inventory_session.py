@@ -0,0 +1,216 @@
+import threading
+from unittest.mock import MagicMock, NonCallableMock, patch
+import pytest
+
+from openstackquery.api.inventory_session import InventorySession
+from openstackquery.enums.query_types import QueryTypes
+from openstackquery.runners.flavor_runner import FlavorRunner
+from openstackquery.runners.server_runner import ServerRunner
+
+
+@pytest.fixture(name="mock_connection_cls")
+def mock_connection_cls_fixture():
+    """
+    Returns a mocked OpenstackConnection class
+    """
+    return MagicMock()
+
+
+@pytest.fixture(name="instance")
+def instance_fixture(mock_connection_cls):
+    """
+    Returns an instance with a mocked connection class - closed after the test
+    """
+    session = InventorySession("test-account", connection_cls=mock_connection_cls)
+    yield session
+    session.close()
+
+
+def test_get_active():
+    """
+    Tests get_active returns innermost session entered for given cloud account - or None
+    """
+    assert InventorySession.get_active("cloud1") is None
+    with InventorySession("cloud1") as session1:
+        with InventorySession("cloud2") as session2:
+            assert InventorySession.get_active("cloud1") == session1
+            assert InventorySession.get_active("cloud2") == session2
+            assert InventorySession.get_active(None) is None
+            assert InventorySession.get_active("cloud3") is None
+        assert InventorySession.get_active("cloud1") == session1
+        assert InventorySession.get_active("cloud2") is None
+    assert InventorySession.get_active("cloud1") is None
+
+
+def test_get_resources(instance, mock_connection_cls):
+    """
+    Tests get_resources lists resources with given runner the first time only
+    """
+    mock_runner = MagicMock()
+    mock_runner.run_cached_query.return_value = [1, 2]
+    mock_conn = mock_connection_cls.return_value.__enter__.return_value
+
+    assert instance.get_resources(mock_runner, arg1="val1") == [1, 2]
+    assert instance.get_resources(mock_runner, arg1="val1") == [1, 2]
+
+    mock_connection_cls.assert_called_once_with("test-account")
+    mock_runner.parse_meta_params.assert_called_once_with(mock_conn, arg1="val1")
+    mock_runner.run_cached_query.assert_called_once_with(
+        mock_conn,
+        "test-account",
+        None,
+        **mock_runner.parse_meta_params.return_value,
+    )
+
+
+def test_get_resources_different_kwargs(instance):
+    """
+    Tests get_resources lists resources again when run with different meta params
+    """
+    mock_runner = MagicMock()
+    instance.get_resources(mock_runner, all_projects=True)
+    instance.get_resources(mock_runner, all_projects=False)
+    assert mock_runner.run_cached_query.call_count == 2
+
+
+def test_get_resources_retries_failed_listing(instance):
+    """
+    Tests get_resources lists resources again if listing them failed
+    """
+    mock_runner = MagicMock()
+    mock_runner.run_cached_query.side_effect = [RuntimeError, [1]]
+    with pytest.raises(RuntimeError):
+        instance.get_resources(mock_runner)
+    assert instance.get_resources(mock_runner) == [1]
+
+
+@patch.object(FlavorRunner, "run_cached_query")
+@patch.object(ServerRunner, "run_cached_query")
+@patch.object(ServerRunner, "parse_meta_params")
+def test_load_concurrently(
+    mock_server_meta_params, mock_server_run, mock_flavor_run, instance
+):
+    """
+    Tests load lists each query type given at the same time - and queries with the same runner use
+    the snapshot
+    """
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _list(*_, **__):
+        # both listings must be running at once to pass the barrier
+        barrier.wait()
+        return [NonCallableMock()]
+
+    mock_server_run.side_effect = _list
+    mock_flavor_run.side_effect = _list
+    mock_server_meta_params.return_value = {}
+
+    assert instance.load("server", QueryTypes.FLAVOR_QUERY) == instance
+    server_runner = ServerRunner(NonCallableMock())
+    assert len(instance.get_resources(server_runner)) == 1
+    mock_server_run.assert_called_once()
+
+
+@patch.object(FlavorRunner, "run_cached_query")
+def test_refresh(mock_flavor_run, instance):
+    """
+    Tests refresh drops snapshots of given query types so they are listed again
+    """
+    mock_flavor_run.return_value = []
+    instance.load("flavor")
+    instance.load("flavor")
+    instance.refresh("server")
+    instance.load("flavor")
+    assert mock_flavor_run.call_count == 1
+    instance.refresh("flavor")
+    instance.load("flavor")
+    assert mock_flavor_run.call_count == 2
+    instance.refresh()
+    instance.load("flavor")
+    assert mock_flavor_run.call_count == 3
+
+
+# ignore too-many-arguments warnings
+# pylint: disable=R0913,R0917
+@patch.object(FlavorRunner, "run_cached_query")
+@patch.object(ServerRunner, "refresh_query")
+@patch.object(ServerRunner, "run_cached_query")
+@patch.object(ServerRunner, "parse_meta_params")
+@patch.object(ServerRunner, "get_high_water_mark")
+def test_refresh_incremental(
+    mock_high_water_mark,
+    mock_meta_params,
+    mock_server_run,
+    mock_server_refresh,
+    mock_flavor_run,
+    instance,
+    mock_connection_cls,
+):
+    """
+    Tests incremental refresh merges servers changed since the snapshot was listed - from the high-water mark
+    recorded when it was listed - while snapshots which can't be refreshed incrementally are listed again
+    """
+    mock_high_water_mark.side_effect = ["hwm1", "hwm2"]
+    mock_meta_params.return_value = {"all_tenants": True}
+    mock_server_run.return_value = ["server1"]
+    mock_server_refresh.return_value = ["server1", "server2"]
+    mock_flavor_run.return_value = []
+    mock_conn = mock_connection_cls.return_value.__enter__.return_value
+
+    instance.load("server", "flavor", all_projects=True)
+    instance.refresh(incremental=True)
+    instance.load("server", "flavor", all_projects=True)
+
+    server_runner = ServerRunner(NonCallableMock())
+    assert instance.get_resources(server_runner, all_projects=True) == [
+        "server1",
+        "server2",
+    ]
+    mock_server_run.assert_called_once()
+    mock_server_refresh.assert_called_once_with(
+        mock_conn, ["server1"], "hwm1", None, all_tenants=True
+    )
+    assert mock_flavor_run.call_count == 2
+
+    # next incremental refresh is from when the last refresh started
+    mock_high_water_mark.side_effect = ["hwm3"]
+    instance.refresh("server", incremental=True)
+    instance.load("server", all_projects=True)
+    assert mock_server_refresh.call_args.args[2] == "hwm2"
+
+
+def test_remove_resources(instance):
+    """
+    Tests remove_resources removes resources from loaded snapshots of the resource type - only if the session
+    is for the cloud account given
+    """
+    mock_runner = MagicMock()
+    mock_runner.resource_name = "server"
+    mock_runner.run_cached_query.return_value = [{"id": "a"}, {"id": "b"}]
+    instance.get_resources(mock_runner)
+
+    def _marker(item):
+        return item["id"]
+
+    assert not instance.remove_resources("server", ["a"], _marker, "other-account")
+    assert not instance.remove_resources("flavor", ["a"], _marker)
+    assert instance.remove_resources("server", ["a"], _marker, "test-account") == 1
+    assert instance.get_resources(mock_runner) == [{"id": "b"}]
+    mock_runner.run_cached_query.assert_called_once()
+
+
+@patch.object(FlavorRunner, "run_cached_query")
+def test_expire(mock_flavor_run, instance):
+    """
+    Tests expire refreshes loaded snapshots of the resource type - only if the session is for the cloud
+    account given
+    """
+    mock_flavor_run.return_value = []
+    instance.load("flavor")
+    assert not instance.expire("other-account", "flavor")
+    assert not instance.expire(None, "server")
+    instance.load("flavor")
+    assert mock_flavor_run.call_count == 1
+    assert instance.expire(None, "flavor") == 1
+    instance.load("flavor")
+    assert mock_flavor_run.call_count == 2
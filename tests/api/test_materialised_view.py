@@ -0,0 +1,171 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from openstackquery.api.materialised_view import MaterialisedView
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+
+
+@pytest.fixture(name="mock_query")
+def mock_query_fixture():
+    """
+    Returns a mocked query which can be refreshed incrementally
+    """
+    query = MagicMock()
+    query.builder.server_side_filters = None
+    query.builder.client_side_filters = ["client-filter"]
+    query.builder.server_filter_fallback = ["fallback-filter"]
+    query.executor.runner.supports_changes_since.return_value = True
+    query.executor.runner.get_high_water_mark.side_effect = ["t1", "t2"]
+    return query
+
+
+@pytest.fixture(name="mock_grouper")
+def mock_grouper_fixture():
+    """
+    Returns a mocked IncrementalGrouper class
+    """
+    with patch(
+        "openstackquery.api.materialised_view.IncrementalGrouper"
+    ) as mock_grouper_cls:
+        mock_grouper_cls.return_value.summaries = {("g1",): {"count": 1}}
+        yield mock_grouper_cls
+
+
+@pytest.fixture(name="instance")
+def instance_fixture(mock_query):
+    """
+    Returns a view of the mocked query - stopped after the test
+    """
+    view = MaterialisedView("view", mock_query, "test-account", 0.01, as_admin=True)
+    yield view
+    view.stop(timeout=5)
+
+
+def test_refresh_full(instance, mock_query, mock_grouper):
+    """
+    Tests the first refresh runs the query and computes every group
+    """
+    assert not instance.get_summaries()
+    instance.refresh()
+
+    mock_query.run.assert_called_once_with("test-account", as_admin=True)
+    # pylint: disable=protected-access
+    mock_grouper.assert_called_once_with(mock_query.parser, instance._get_key)
+    mock_grouper.return_value.reset.assert_called_once_with(
+        mock_query.results_container.iter_results.return_value
+    )
+    assert instance.get_summaries() == {("g1",): {"count": 1}}
+    assert instance.get_summary("g1") == {"count": 1}
+    assert instance.get_summary("g2") is None
+    assert instance.last_refresh == "full"
+
+
+def test_refresh_full_ignores_limit(instance, mock_query, mock_grouper):
+    """
+    Tests a full refresh runs the query without the limit and offset set - restoring them after
+    """
+    mock_query.parser.limit, mock_query.parser.offset = 10, 5
+    mock_query.run.side_effect = lambda *args, **kwargs: (
+        mock_query.parser.parse_limit.assert_called_once_with(None)
+    )
+    instance.refresh()
+
+    mock_query.parser.parse_limit.assert_called_with(10, 5)
+    mock_grouper.return_value.reset.assert_called_once()
+
+
+def test_refresh_incremental(instance, mock_query, mock_grouper):
+    """
+    Tests refreshes after the first list changes since the last refresh, and update groups holding
+    changed resources
+    """
+    runner = mock_query.executor.runner
+    mock_query.executor.run_changes_with_openstacksdk.return_value = [
+        {"id": "a"},
+        {"id": "b", "deleted": True},
+    ]
+    runner.is_deleted.side_effect = lambda item: item.get("deleted", False)
+    runner.marker_prop_func.side_effect = lambda item: item["id"]
+
+    instance.refresh()
+    mock_grouper.return_value.summaries = {("g2",): {"count": 2}}
+    instance.refresh()
+
+    mock_query.run.assert_called_once()
+    mock_query.executor.run_changes_with_openstacksdk.assert_called_once_with(
+        "test-account", "t1", as_admin=True
+    )
+    mock_query.executor.get_subset_results.assert_called_once_with(
+        [{"id": "a"}], ["client-filter", "fallback-filter"]
+    )
+    mock_grouper.return_value.update.assert_called_once_with(
+        mock_query.executor.get_subset_results.return_value.iter_results.return_value,
+        ["a", "b"],
+    )
+    assert instance.get_summaries() == {("g2",): {"count": 2}}
+    assert instance.last_refresh == "incremental"
+
+
+def test_refresh_not_incremental(instance, mock_query, mock_grouper):
+    """
+    Tests every refresh runs the query in full when the view can't be refreshed incrementally
+    """
+    mock_query.builder.server_side_filters = [{"filter": "val"}]
+    assert not instance.incremental
+    instance.refresh()
+    instance.refresh()
+    assert mock_query.run.call_count == 2
+    assert mock_grouper.call_count == 2
+    mock_query.executor.runner.get_high_water_mark.assert_not_called()
+
+
+def test_apply_changes(instance, mock_query, mock_grouper):
+    """
+    Tests apply_changes updates groups from changes given - only once the view has been refreshed
+    """
+    mock_query.executor.runner.marker_prop_func.side_effect = lambda item: item["id"]
+    with pytest.raises(ParseQueryError):
+        instance.apply_changes([{"id": "a"}])
+
+    instance.refresh()
+    instance.apply_changes([{"id": "a"}], ["b"])
+    mock_query.executor.get_subset_results.assert_called_once_with(
+        [{"id": "a"}], ["client-filter", "fallback-filter"]
+    )
+    assert mock_grouper.return_value.update.call_args.args[1] == ["a", "b"]
+
+
+# pylint: disable=unused-argument
+def test_start_and_stop(instance, mock_query, mock_grouper):
+    """
+    Tests start refreshes the view in a background thread - and makes it available by name until stopped
+    """
+    refreshed = MagicMock()
+    mock_query.run.side_effect = lambda *_, **__: refreshed()
+    mock_query.executor.runner.supports_changes_since.return_value = False
+
+    with instance:
+        assert MaterialisedView.get("view") == instance
+        assert MaterialisedView.get_names() == ["view"]
+        with pytest.raises(ParseQueryError):
+            MaterialisedView("view", mock_query, "test-account").start()
+        for _ in range(500):
+            if refreshed.call_count >= 2:
+                break
+            instance._stopped.wait(0.01)  # pylint: disable=protected-access
+    assert refreshed.call_count >= 2
+    assert MaterialisedView.get("view") is None
+    assert instance.get_summaries() == {("g1",): {"count": 1}}
+
+
+def test_refresh_failure_keeps_summaries(instance, mock_query, mock_grouper):
+    """
+    Tests that a refresh failing in the background thread leaves summaries of the last refresh readable
+    """
+    instance.refresh(full=True)
+    mock_query.run.side_effect = RuntimeError
+    mock_query.executor.run_changes_with_openstacksdk.side_effect = RuntimeError
+    instance.start()
+    instance.stop(timeout=5)
+    assert instance.get_summaries() == {("g1",): {"count": 1}}
@@ -1,9 +1,12 @@
-from unittest.mock import MagicMock, NonCallableMock, patch
+from unittest.mock import ANY, MagicMock, NonCallableMock, call, patch
 
 import pytest
 
 from openstackquery.api.query_api import QueryAPI
 from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.query_output import QueryOutput
+from openstackquery.query_blocks.query_parser import QueryParser
+from openstackquery.query_blocks.results_container import ResultsContainer
 from tests.mocks.mocked_props import MockProperties
 from tests.mocks.mocked_query_presets import MockQueryPresets
 
@@ -127,13 +130,57 @@ def test_run_from_subset(instance):
 
     res = instance.run(from_subset=mock_subset)
     instance.executor.run_with_subset.assert_called_once_with(
-        subset=mock_subset, client_side_filters=[client_filter, fallback_filter]
+        subset=mock_subset,
+        client_side_filters=[client_filter, fallback_filter],
+        limit=instance.parser.get_fetch_limit.return_value,
     )
 
     instance.executor.apply_forwarded_results.assert_not_called()
     assert res == instance
 
 
+@patch("openstackquery.api.query_api.InventorySession")
+def test_run_in_inventory_session(mock_session_cls, instance):
+    """
+    Tests run method when an inventory session is entered for the cloud account
+    method should run query on resources from session snapshot using executor.run_with_subset
+    """
+    instance.chainer.forwarded_info = None, None
+    instance.builder.client_side_filters = []
+    instance.builder.server_filter_fallback = []
+    instance.run("test-account", arg1="val1")
+
+    mock_session_cls.get_active.assert_called_once_with("test-account")
+    mock_session = mock_session_cls.get_active.return_value
+    mock_session.get_resources.assert_called_once_with(
+        instance.executor.runner, arg1="val1"
+    )
+    instance.executor.run_with_subset.assert_called_once_with(
+        subset=mock_session.get_resources.return_value,
+        client_side_filters=[],
+        limit=instance.parser.get_fetch_limit.return_value,
+    )
+    instance.executor.run_with_openstacksdk.assert_not_called()
+
+
+@patch("openstackquery.api.query_api.InventorySession")
+def test_count_in_inventory_session(mock_session_cls, instance):
+    """
+    Tests count method when an inventory session is entered - resources from session snapshot are counted,
+    even if the snapshot is empty
+    """
+    mock_session = mock_session_cls.get_active.return_value
+    mock_session.get_resources.return_value = []
+    instance.builder.client_side_filters = []
+    instance.builder.server_filter_fallback = []
+    res = instance.count("test-account")
+    mock_session_cls.get_active.assert_called_once_with("test-account")
+    instance.executor.count_with_subset.assert_called_once_with(
+        subset=[], client_side_filters=[], count_by=None
+    )
+    assert res == instance.executor.count_with_subset.return_value
+
+
 @patch("openstackquery.api.query_api.deepcopy")
 def test_run_from_subset_with_chained_values(mock_deepcopy, instance):
     """
@@ -155,7 +202,9 @@ def test_run_from_subset_with_chained_values(mock_deepcopy, instance):
     res = instance.run(from_subset=mock_subset)
 
     instance.executor.run_with_subset.assert_called_once_with(
-        subset=mock_subset, client_side_filters=[client_filter, fallback_filter]
+        subset=mock_subset,
+        client_side_filters=[client_filter, fallback_filter],
+        limit=instance.parser.get_fetch_limit.return_value,
     )
 
     instance.executor.apply_forwarded_results.assert_called_once_with(
@@ -172,6 +221,7 @@ def test_run_with_openstacksdk(instance):
     """
     mock_cloud_account = NonCallableMock()
     mock_kwargs = {"arg1": "val1", "arg2": "val2"}
+    instance.builder.get_server_side_sort.return_value = None
 
     instance.chainer.forwarded_info = None, None
 
@@ -180,12 +230,56 @@ def test_run_with_openstacksdk(instance):
         cloud_account=mock_cloud_account,
         client_side_filters=instance.builder.client_side_filters,
         server_side_filters=instance.builder.server_side_filters,
-        **mock_kwargs
+        limit=instance.parser.get_fetch_limit.return_value,
+        merge_key=None,
+        **mock_kwargs,
     )
     instance.executor.apply_forwarded_results.assert_not_called()
     assert res == instance
 
 
+@pytest.mark.parametrize(
+    "mock_server_side_filters, expected_filters",
+    [
+        ([], [{"sort_key": ["key1"], "sort_dir": ["asc"]}]),
+        (
+            [{"filter1": "val1"}, {"filter2": "val2"}],
+            [
+                {"filter1": "val1", "sort_key": ["key1"], "sort_dir": ["asc"]},
+                {"filter2": "val2", "sort_key": ["key1"], "sort_dir": ["asc"]},
+            ],
+        ),
+    ],
+)
+def test_run_with_openstacksdk_sort_pushed_down(
+    instance, mock_server_side_filters, expected_filters
+):
+    """
+    Tests run method with cloud_account param when sort_by can be done by openstack
+    method should add sort kwargs to each set of server-side filters and pass a merge key to the executor
+    """
+    mock_cloud_account = NonCallableMock()
+    instance.chainer.forwarded_info = None, None
+    instance.builder.server_side_filters = mock_server_side_filters
+    instance.builder.get_server_side_sort.return_value = {
+        "sort_key": ["key1"],
+        "sort_dir": ["asc"],
+    }
+
+    instance.run(cloud_account=mock_cloud_account)
+    instance.builder.get_server_side_sort.assert_called_once_with(
+        instance.parser.sort_by
+    )
+    instance.parser.get_fetch_limit.assert_called_once_with(sort_pushed_down=True)
+    instance.executor.run_with_openstacksdk.assert_called_once_with(
+        cloud_account=mock_cloud_account,
+        client_side_filters=instance.builder.client_side_filters,
+        server_side_filters=expected_filters,
+        limit=instance.parser.get_fetch_limit.return_value,
+        merge_key=instance.parser.sorter.get_object_key_func.return_value,
+    )
+
+
 @patch("openstackquery.api.query_api.deepcopy")
 def test_run_with_openstacksdk_with_chained_values(mock_deepcopy, instance):
     """
@@ -194,6 +288,7 @@ def test_run_with_openstacksdk_with_chained_values(mock_deepcopy, instance):
     """
     mock_cloud_account = NonCallableMock()
     mock_kwargs = {"arg1": "val1", "arg2": "val2"}
+    instance.builder.get_server_side_sort.return_value = None
 
     mock_link_prop = NonCallableMock()
     mock_forwarded_val = NonCallableMock()
@@ -204,7 +299,9 @@ def test_run_with_openstacksdk_with_chained_values(mock_deepcopy, instance):
         cloud_account=mock_cloud_account,
         client_side_filters=instance.builder.client_side_filters,
         server_side_filters=instance.builder.server_side_filters,
-        **mock_kwargs
+        limit=instance.parser.get_fetch_limit.return_value,
+        merge_key=None,
+        **mock_kwargs,
     )
     instance.executor.apply_forwarded_results.assert_called_once_with(
         mock_link_prop, mock_deepcopy.return_value
@@ -223,7 +320,7 @@ def test_to_props(instance):
 
     res = instance.to_props(mock_flatten, mock_groups)
     instance.results_container.parse_results.assert_called_once_with(
-        instance.parser.run_parser
+        instance.parser.run_parser, instance.parser.fingerprint
     )
     instance.output.to_props.assert_called_once_with(
         instance.results_container, mock_flatten, mock_groups
@@ -231,6 +328,33 @@ def test_to_props(instance):
     assert res == instance.output.to_props.return_value
 
 
+def test_to_props_include_group_summaries(instance):
+    """
+    Tests that to_props method forwards include_group_summaries onto output.to_props
+    """
+    res = instance.to_props(include_group_summaries=True)
+    instance.output.to_props.assert_called_once_with(
+        instance.results_container, False, None, include_group_summaries=True
+    )
+    assert res == instance.output.to_props.return_value
+
+
+def test_to_rows(instance):
+    """
+    Tests that to_rows method parses results and forwards onto output.to_rows
+    """
+    mock_groups = NonCallableMock()
+    mock_named = NonCallableMock()
+    res = instance.to_rows(mock_groups, mock_named)
+    instance.results_container.parse_results.assert_called_once_with(
+        instance.parser.run_parser, instance.parser.fingerprint
+    )
+    instance.output.to_rows.assert_called_once_with(
+        instance.results_container, mock_groups, mock_named
+    )
+    assert res == instance.output.to_rows.return_value
+
+
 def test_to_csv(instance):
     """
     Tests to_csv method, method should call results_container.parse_results and forward that result
@@ -241,7 +365,7 @@ def test_to_csv(instance):
 
     res = instance.to_csv(mock_groups, mock_flatten_groups)
     instance.results_container.parse_results.assert_called_once_with(
-        instance.parser.run_parser
+        instance.parser.run_parser, instance.parser.fingerprint
     )
     instance.output.to_csv.assert_called_once_with(
         instance.results_container, mock_groups, mock_flatten_groups
@@ -260,7 +384,7 @@ def test_to_json(instance):
 
     res = instance.to_json(mock_groups, mock_flatten_groups, mock_pretty)
     instance.results_container.parse_results.assert_called_once_with(
-        instance.parser.run_parser
+        instance.parser.run_parser, instance.parser.fingerprint
     )
     instance.output.to_json.assert_called_once_with(
         instance.results_container, mock_groups, mock_flatten_groups, mock_pretty
@@ -268,6 +392,135 @@ def test_to_json(instance):
     assert res == instance.output.to_json.return_value
 
 
+def test_to_json_include_group_summaries(instance):
+    """
+    Tests that to_json method forwards include_group_summaries onto output.to_json
+    """
+    res = instance.to_json(include_group_summaries=True)
+    instance.output.to_json.assert_called_once_with(
+        instance.results_container, None, False, False, include_group_summaries=True
+    )
+    assert res == instance.output.to_json.return_value
+
+
+@pytest.mark.parametrize("output_method", ["write_csv", "write_json"])
+def test_write_csv_and_json(instance, output_method):
+    """
+    Tests write_csv/write_json methods, should call results_container.parse_results and forward onto output
+    """
+    mock_fp = NonCallableMock()
+    mock_groups = NonCallableMock()
+    mock_flatten_groups = NonCallableMock()
+    mock_compress = NonCallableMock()
+    res = getattr(instance, output_method)(
+        mock_fp, mock_groups, mock_flatten_groups, mock_compress
+    )
+    instance.results_container.parse_results.assert_called_once_with(
+        instance.parser.run_parser, instance.parser.fingerprint
+    )
+    getattr(instance.output, output_method).assert_called_once_with(
+        instance.results_container,
+        mock_fp,
+        mock_groups,
+        mock_flatten_groups,
+        mock_compress,
+    )
+    assert res is None
+
+
+def test_write_ndjson(instance):
+    """
+    Tests write_ndjson method, should call results_container.parse_results and forward onto output
+    """
+    mock_fp = NonCallableMock()
+    mock_groups = NonCallableMock()
+    mock_compress = NonCallableMock()
+    instance.write_ndjson(mock_fp, mock_groups, mock_compress)
+    instance.results_container.parse_results.assert_called_once_with(
+        instance.parser.run_parser, instance.parser.fingerprint
+    )
+    instance.output.write_ndjson.assert_called_once_with(
+        instance.results_container, mock_fp, mock_groups, mock_compress
+    )
+
+
+@pytest.mark.parametrize("output_func", ["to_arrow", "to_pandas", "to_polars"])
+def test_to_arrow(instance, output_func):
+    """
+    Tests to_arrow, to_pandas and to_polars methods, should call results_container.parse_results and forward
+    onto output method of the same name
+    """
+    mock_groups = NonCallableMock()
+    mock_dictionary_threshold = NonCallableMock()
+    res = getattr(instance, output_func)(mock_groups, mock_dictionary_threshold)
+    instance.results_container.parse_results.assert_called_once_with(
+        instance.parser.run_parser, instance.parser.fingerprint
+    )
+    mock_output_func = getattr(instance.output, output_func)
+    mock_output_func.assert_called_once_with(
+        instance.results_container, mock_groups, mock_dictionary_threshold
+    )
+    assert res == mock_output_func.return_value
+
+
+def test_write_parquet(instance):
+    """
+    Tests write_parquet method, should call results_container.parse_results and forward onto output
+    """
+    mock_fp = NonCallableMock()
+    mock_groups = NonCallableMock()
+    mock_compression = NonCallableMock()
+    instance.write_parquet(mock_fp, mock_groups, mock_compression)
+    instance.results_container.parse_results.assert_called_once_with(
+        instance.parser.run_parser, instance.parser.fingerprint
+    )
+    instance.output.write_parquet.assert_called_once_with(
+        instance.results_container, mock_fp, mock_groups, mock_compression
+    )
+
+
+def test_to_sqlite(instance):
+    """
+    Tests to_sqlite method, should call results_container.parse_results and forward onto output - with
+    chaining props to index on
+    """
+    mock_conn = NonCallableMock()
+    mock_groups = NonCallableMock()
+    mock_if_exists = NonCallableMock()
+    instance.to_sqlite(mock_conn, "table1", mock_groups, mock_if_exists)
+    instance.results_container.parse_results.assert_called_once_with(
+        instance.parser.run_parser, instance.parser.fingerprint
+    )
+    instance.output.to_sqlite.assert_called_once_with(
+        instance.results_container,
+        mock_conn,
+        "table1",
+        groups=mock_groups,
+        index_props=instance.chainer.get_chaining_props.return_value,
+        if_exists=mock_if_exists,
+    )
+
+
+def test_write_snapshot(instance):
+    """
+    Tests write_snapshot method, should call results_container.parse_results and forward onto output - with
+    the resource type of the runner
+    """
+    instance.executor.has_forwarded_results = False
+    mock_groups = NonCallableMock()
+    res = instance.write_snapshot("out.snap", mock_groups)
+    instance.results_container.parse_results.assert_called_once_with(
+        instance.parser.run_parser, instance.parser.fingerprint
+    )
+    instance.output.write_snapshot.assert_called_once_with(
+        instance.results_container,
+        "out.snap",
+        instance.executor.runner.resource_name,
+        mock_groups,
+    )
+    assert res == instance.output.write_snapshot.return_value
+
+
 def test_to_objects(instance):
     """
     Tests that to_objects method functions expectedly - with no extra params
@@ -279,7 +532,7 @@ def test_to_objects(instance):
 
     res = instance.to_objects(mock_flatten)
     instance.results_container.parse_results.assert_called_once_with(
-        instance.parser.run_parser
+        instance.parser.run_parser, instance.parser.fingerprint
     )
     instance.output.to_objects.assert_called_once_with(
         instance.results_container,
@@ -299,7 +552,7 @@ def test_to_objects_with_forwarded_results(instance):
 
     res = instance.to_objects(mock_flatten)
     instance.results_container.parse_results.assert_called_once_with(
-        instance.parser.run_parser
+        instance.parser.run_parser, instance.parser.fingerprint
     )
     instance.output.to_objects.assert_called_once_with(
         instance.results_container,
@@ -324,14 +577,14 @@ def test_to_string(instance):
         mock_title, mock_groups, mock_include_group_titles, **mock_kwargs
     )
     instance.results_container.parse_results.assert_called_once_with(
-        instance.parser.run_parser
+        instance.parser.run_parser, instance.parser.fingerprint
     )
     instance.output.to_string.assert_called_once_with(
         instance.results_container,
         mock_title,
         mock_groups,
         mock_include_group_titles,
-        **mock_kwargs
+        **mock_kwargs,
     )
     assert res == instance.output.to_string.return_value
 
@@ -350,14 +603,14 @@ def test_to_html(instance):
         mock_title, mock_groups, mock_include_group_titles, **mock_kwargs
     )
     instance.results_container.parse_results.assert_called_once_with(
-        instance.parser.run_parser
+        instance.parser.run_parser, instance.parser.fingerprint
     )
     instance.output.to_html.assert_called_once_with(
         instance.results_container,
         mock_title,
         mock_groups,
         mock_include_group_titles,
-        **mock_kwargs
+        **mock_kwargs,
     )
     assert res == instance.output.to_html.return_value
 
@@ -373,6 +626,123 @@ def test_sort_by(instance):
     assert res == instance
 
 
+def test_aggregate(instance):
+    """
+    Tests that aggregate method functions expectedly
+    method should call QueryParser object parse_aggregate() and return results
+    """
+    mock_aggregations = [("sum", "some-prop-enum"), "count"]
+    res = instance.aggregate(*mock_aggregations)
+    instance.parser.parse_aggregate.assert_called_once_with(*mock_aggregations)
+    assert res == instance
+
+
+def test_limit(instance):
+    """
+    Tests that limit method functions expectedly
+    method should call QueryParser object parse_limit() and return results
+    """
+    res = instance.limit(10, offset=5)
+    instance.parser.parse_limit.assert_called_once_with(10, 5)
+    assert res == instance
+
+
+@pytest.mark.parametrize(
+    "mock_props, expected_out",
+    [([{"prop_1": "a"}, {"prop_1": "b"}], {"prop_1": "a"}), ([], None)],
+)
+def test_first(instance, mock_props, expected_out):
+    """
+    Tests that first method functions expectedly
+    method should run the query with a limit of 1 (keeping offset) and return first result (or None) - then
+    restore the limit and results set before
+    """
+    instance.chainer.forwarded_info = None, None
+    instance.output.to_props.return_value = mock_props
+    instance.builder.get_server_side_sort.return_value = None
+    instance.parser.limit = 3
+    instance.parser.offset = 1
+    mock_results_container = instance.results_container
+    mock_cloud_account = NonCallableMock()
+
+    res = instance.first(mock_cloud_account, arg1="val1")
+    assert instance.parser.parse_limit.call_args_list == [call(1, 1), call(3, 1)]
+    assert instance.results_container == mock_results_container
+    instance.executor.run_with_openstacksdk.assert_called_once_with(
+        cloud_account=mock_cloud_account,
+        client_side_filters=instance.builder.client_side_filters,
+        server_side_filters=instance.builder.server_side_filters,
+        limit=instance.parser.get_fetch_limit.return_value,
+        merge_key=None,
+        arg1="val1",
+    )
+    assert res == expected_out
+
+
+def test_first_grouped(instance):
+    """
+    Tests that first method raises error when results are grouped
+    """
+    instance.chainer.forwarded_info = None, None
+    instance.output.to_props.return_value = {"group1": []}
+    with pytest.raises(ParseQueryError):
+        instance.first(NonCallableMock())
+
+
+def test_first_then_run_again():
+    """
+    Tests that running a query again after first() outputs results with the limit and offset set before
+    """
+    query = QueryAPI(query_components=MagicMock())
+    query.parser = QueryParser(MockProperties)
+    query.output = QueryOutput(MockProperties)
+    query.output.parse_select(MockProperties.PROP_1)
+    query.chainer.forwarded_info = None, None
+    query.builder.client_side_filters = []
+    query.builder.server_filter_fallback = []
+    subset = [{"prop_1": f"val{i}"} for i in range(5)]
+
+    def _run_with_subset(subset, limit, **_):
+        container = ResultsContainer(MockProperties)
+        container.store_query_results(subset[:limit] if limit else subset)
+        query.executor.results_container = container
+
+    query.executor.run_with_subset.side_effect = _run_with_subset
+    query.limit(3, offset=1)
+
+    with patch.object(MockProperties, "get_prop_mapping") as mock_get_prop_mapping:
+        mock_get_prop_mapping.return_value = lambda obj: obj["prop_1"]
+        assert query.first(from_subset=subset) == {"prop_1": "val1"}
+        query.run(from_subset=subset)
+        assert query.to_props() == [
+            {"prop_1": "val1"},
+            {"prop_1": "val2"},
+            {"prop_1": "val3"},
+        ]
+
+
+@pytest.mark.parametrize("mock_objects, expected_out", [(["obj1"], True), ([], False)])
+def test_exists(instance, mock_objects, expected_out):
+    """
+    Tests that exists method functions expectedly
+    method should run the query with a fetch limit of 1 and return True if any results found
+    """
+    instance.chainer.forwarded_info = None, None
+    instance.executor.results_container.to_objects.return_value = mock_objects
+    mock_subset = NonCallableMock()
+
+    mock_results_container = instance.results_container
+
+    res = instance.exists(from_subset=mock_subset)
+    instance.executor.run_with_subset.assert_called_once_with(
+        subset=mock_subset,
+        client_side_filters=ANY,
+        limit=1,
+    )
+    assert res == expected_out
+    assert instance.results_container == mock_results_container
+
+
 def test_group_by(instance):
     """
     Tests that group_by method functions expectedly
@@ -384,10 +754,23 @@ def test_group_by(instance):
     instance.parser.group_by = None
 
     res = instance.group_by(
-        mock_group_by, mock_group_ranges, mock_include_ungrouped_results
+        mock_group_by, mock_group_ranges, mock_include_ungrouped_results, "month"
     )
     instance.parser.parse_group_by.assert_called_once_with(
-        mock_group_by, mock_group_ranges, mock_include_ungrouped_results
+        mock_group_by, mock_group_ranges, mock_include_ungrouped_results, "month"
+    )
+    assert res == instance
+
+
+def test_subgroup_by(instance):
+    """
+    Tests that subgroup_by method functions expectedly
+    method should call QueryParser object parse_subgroup_by() and return results
+    """
+    mock_group_ranges = {"group1": ["val1"]}
+    res = instance.subgroup_by("some-prop-enum", mock_group_ranges, True, "day")
+    instance.parser.parse_subgroup_by.assert_called_once_with(
+        "some-prop-enum", mock_group_ranges, True, "day"
     )
     assert res == instance
 
@@ -434,3 +817,90 @@ def test_append_from(instance):
     )
 
     assert res == instance
+
+
+def test_count_no_account_or_subset(instance):
+    """
+    Tests count method raises error when neither cloud_account nor from_subset given
+    """
+    with pytest.raises(ParseQueryError):
+        instance.count()
+
+
+def test_count_with_openstacksdk(instance):
+    """
+    Tests count method with cloud_account given
+    method should count using executor without running the query or storing results
+    """
+    res = instance.count("test-account", **{"arg1": "val1"})
+    instance.executor.count_with_openstacksdk.assert_called_once_with(
+        cloud_account="test-account",
+        client_side_filters=instance.builder.client_side_filters,
+        server_side_filters=instance.builder.server_side_filters,
+        count_by=None,
+        arg1="val1",
+    )
+    instance.executor.run_with_openstacksdk.assert_not_called()
+    assert res == instance.executor.count_with_openstacksdk.return_value
+
+
+def test_count_by_with_subset(instance):
+    """
+    Tests count_by method with from_subset given
+    method should count subset using client-side filters and server-side filter fallback
+    """
+    mock_subset = NonCallableMock()
+    instance.builder.client_side_filters = ["client-filter"]
+    instance.builder.server_filter_fallback = ["fallback-filter"]
+
+    res = instance.count_by(MockProperties.PROP_1, from_subset=mock_subset)
+    instance.executor.count_with_subset.assert_called_once_with(
+        subset=mock_subset,
+        client_side_filters=["client-filter", "fallback-filter"],
+        count_by=MockProperties.PROP_1,
+    )
+    assert res == instance.executor.count_with_subset.return_value
+
+
+def test_count_by_use_aggregate_source(instance):
+    """
+    Tests count_by method with use_aggregate_source set
+    method should get counts from executor aggregate source without listing resources
+    """
+    instance.builder.client_side_filters = []
+    instance.builder.server_side_filters = None
+
+    res = instance.count_by(
+        MockProperties.PROP_1, "test-account", use_aggregate_source=True, arg1="val1"
+    )
+    instance.executor.count_with_aggregate_source.assert_called_once_with(
+        "test-account", MockProperties.PROP_1, arg1="val1"
+    )
+    instance.executor.count_with_openstacksdk.assert_not_called()
+    assert res == instance.executor.count_with_aggregate_source.return_value
+
+
+def test_count_by_use_aggregate_source_with_where(instance):
+    """
+    Tests count_by method with use_aggregate_source set and where() conditions set
+    method should raise error since aggregate sources can't be filtered
+    """
+    instance.builder.client_side_filters = ["client-filter"]
+    with pytest.raises(ParseQueryError):
+        instance.count_by(
+            MockProperties.PROP_1, "test-account", use_aggregate_source=True
+        )
+
+
+def test_count_by_use_aggregate_source_unsupported(instance):
+    """
+    Tests count_by method with use_aggregate_source set for a property with no aggregate source
+    method should raise error
+    """
+    instance.builder.client_side_filters = []
+    instance.builder.server_side_filters = None
+    instance.executor.count_with_aggregate_source.return_value = None
+    with pytest.raises(ParseQueryError):
+        instance.count_by(
+            MockProperties.PROP_1, "test-account", use_aggregate_source=True
+        )
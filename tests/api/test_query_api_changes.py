@@ -0,0 +1,211 @@
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+
+from openstackquery.api.query_api import QueryAPI
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.results_container import ResultsContainer
+from tests.mocks.mocked_props import MockProperties
+
+
+@pytest.fixture(name="instance")
+def instance_fixture():
+    """
+    Returns an instance to run tests with
+    """
+    res = QueryAPI(query_components=MagicMock())
+    res.results_container = MagicMock()
+    return res
+
+
+@pytest.fixture(name="watch_instance")
+def watch_instance_fixture(instance):
+    """
+    Returns an instance set up to watch - where the runner supports changes-since and each poll outputs
+    a different set of rows
+    """
+    instance.builder.server_side_filters = None
+    instance.executor.runner.supports_changes_since.return_value = True
+    instance.executor.runner.get_high_water_mark.side_effect = ["t1", "t2", "t3"]
+    instance.executor.get_keyed_props.side_effect = [
+        {"a": {"name": "vm-a"}, "b": {"name": "vm-b"}},
+        {"a": {"name": "vm-a2"}},
+        {},
+    ]
+    with patch("openstackquery.api.query_api.time.sleep") as mock_sleep:
+        with patch.object(QueryAPI, "_poll") as mock_poll:
+            mock_poll.side_effect = [None, ["a", "b"], []]
+            yield instance, mock_poll, mock_sleep
+
+
+def test_watch(watch_instance):
+    """
+    Tests watch method - the query should be run in full once then incrementally since the time each poll
+    started, yielding events for changes after the first poll
+    """
+    instance, mock_poll, mock_sleep = watch_instance
+    events = list(instance.watch("test-account", 5, max_polls=3, as_admin=True))
+
+    assert [(event.event, event.key) for event in events] == [
+        ("changed", "a"),
+        ("removed", "b"),
+    ]
+    assert events[0].changes == {"name": ("vm-a", "vm-a2")}
+    mock_poll.assert_has_calls(
+        [
+            call("test-account", None, as_admin=True),
+            call("test-account", "t1", as_admin=True),
+            call("test-account", "t2", as_admin=True),
+        ]
+    )
+    instance.executor.get_keyed_props.assert_called_with(
+        instance.results_container, instance.output.selected_props
+    )
+    assert mock_sleep.call_count == 2
+    mock_sleep.assert_called_with(5)
+
+
+def test_watch_callback(watch_instance):
+    """
+    Tests watch method with a callback and include_initial set - events from every poll should be passed
+    to the callback
+    """
+    instance, _, _ = watch_instance
+    mock_callback = MagicMock()
+    res = instance.watch(
+        "test-account", callback=mock_callback, max_polls=2, include_initial=True
+    )
+    assert res is None
+    assert [c.args[0].event for c in mock_callback.call_args_list] == [
+        "added",
+        "added",
+        "changed",
+        "removed",
+    ]
+
+
+def test_watch_full(watch_instance):
+    """
+    Tests watch method when server-side filters are set - every poll should run the query in full
+    """
+    instance, mock_poll, _ = watch_instance
+    instance.builder.server_side_filters = [{"filter": "val"}]
+    mock_poll.side_effect = None
+    mock_poll.return_value = None
+
+    events = list(instance.watch("test-account", max_polls=2))
+    assert [(event.event, event.key) for event in events] == [
+        ("changed", "a"),
+        ("removed", "b"),
+    ]
+    mock_poll.assert_has_calls([call("test-account", None), call("test-account", None)])
+    instance.executor.runner.get_high_water_mark.assert_not_called()
+
+
+def test_watch_no_cloud_account(instance):
+    """
+    Tests watch method raises error when no cloud account is given
+    """
+    with pytest.raises(ParseQueryError):
+        instance.watch(None)
+
+
+def test_poll_incremental(instance):
+    """
+    Tests _poll method with a timestamp given - should run the query on resources changed since the
+    timestamp which aren't deleted, and return the markers of every changed resource
+    """
+    runner = instance.executor.runner
+    instance.executor.run_changes_with_openstacksdk.return_value = [
+        {"id": "a"},
+        {"id": "b", "deleted": True},
+    ]
+    runner.is_deleted.side_effect = lambda item: item.get("deleted", False)
+    runner.marker_prop_func.side_effect = lambda item: item["id"]
+    instance.builder.client_side_filters = ["client-filter"]
+    instance.builder.server_filter_fallback = ["fallback-filter"]
+    instance.chainer.forwarded_info = (None, None)
+
+    # pylint: disable=protected-access
+    res = instance._poll("test-account", "t1", as_admin=True)
+    instance.executor.run_changes_with_openstacksdk.assert_called_once_with(
+        "test-account", "t1", as_admin=True
+    )
+    instance.executor.run_with_subset.assert_called_once_with(
+        subset=[{"id": "a"}],
+        client_side_filters=["client-filter", "fallback-filter"],
+    )
+    assert instance.results_container == instance.executor.results_container
+    assert res == ["a", "b"]
+
+
+@patch.object(QueryAPI, "_run")
+def test_poll_full(mock_run, instance):
+    """
+    Tests _poll method with no timestamp given - should run the query in full
+    """
+    # pylint: disable=protected-access
+    assert instance._poll("test-account", None, as_admin=True) is None
+    mock_run.assert_called_once_with(
+        "test-account", None, stop_at_first=False, as_admin=True
+    )
+
+
+def test_diff(instance):
+    """
+    Tests diff method - should compare results of a query run before with this query's results by
+    selected properties
+    """
+    mock_old = QueryAPI(query_components=MagicMock())
+    mock_old.results_container = MagicMock()
+    res = instance.diff(mock_old, key="prop_1")
+    instance.executor.diff_results.assert_called_once_with(
+        mock_old.results_container,
+        instance.results_container,
+        instance.output.selected_props,
+        "prop_1",
+        instance.output,
+    )
+    assert res == instance.executor.diff_results.return_value
+
+
+def test_diff_not_run(instance):
+    """
+    Tests diff method raises an error if given a query that hasn't been run
+    """
+    with pytest.raises(ParseQueryError):
+        instance.diff(QueryAPI(query_components=MagicMock()))
+
+
+def test_diff_subsets(instance):
+    """
+    Tests diff method with results containers and openstack objects given - filters of this query should be
+    run on openstack objects
+    """
+    mock_old = ResultsContainer(MockProperties)
+    instance.builder.client_side_filters = ["client-filter"]
+    instance.builder.server_filter_fallback = ["fallback-filter"]
+    instance.diff(mock_old, ["server1"])
+
+    instance.executor.get_subset_results.assert_called_once_with(
+        ["server1"], ["client-filter", "fallback-filter"]
+    )
+    instance.executor.diff_results.assert_called_once_with(
+        mock_old,
+        instance.executor.get_subset_results.return_value,
+        instance.output.selected_props,
+        None,
+        instance.output,
+    )
+
+
+@patch("openstackquery.api.query_api.MaterialisedView")
+def test_materialise(mock_view, instance):
+    """
+    Tests materialise method - should start a view of the query
+    """
+    res = instance.materialise("view", "test-account", 60, as_admin=True)
+    mock_view.assert_called_once_with(
+        "view", instance, "test-account", 60, as_admin=True
+    )
+    assert res == mock_view.return_value.start.return_value
@@ -0,0 +1,34 @@
+import pytest
+
+from openstackquery.enums.aggregate_func import AggregateFunc
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+
+
+@pytest.mark.parametrize(
+    "expected_prop,test_values",
+    [
+        (AggregateFunc.COUNT, ["count"]),
+        (
+            AggregateFunc.COUNT_DISTINCT,
+            ["count_distinct", "distinct", "distinct_count", "nunique"],
+        ),
+        (AggregateFunc.SUM, ["sum", "total"]),
+        (AggregateFunc.AVG, ["avg", "average", "mean"]),
+        (AggregateFunc.MIN, ["min", "minimum"]),
+        (AggregateFunc.MAX, ["max", "maximum"]),
+    ],
+)
+def test_aggregate_func_serialization(
+    expected_prop, test_values, property_variant_generator
+):
+    """Test all aggregate function name formats can be correctly serialized."""
+    for variant in property_variant_generator(test_values):
+        assert AggregateFunc.from_string(variant) is expected_prop
+
+
+def test_get_aggregate_func_from_string_invalid():
+    """
+    Tests that from_string returns error if given an invalid alias
+    """
+    with pytest.raises(ParseQueryError):
+        AggregateFunc.from_string("invalid-alias")
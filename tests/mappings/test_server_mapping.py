@@ -1,5 +1,7 @@
 from unittest.mock import patch
 
+import pytest
+
 from openstackquery.enums.props.flavor_properties import FlavorProperties
 from openstackquery.enums.props.hypervisor_properties import HypervisorProperties
 from openstackquery.enums.props.image_properties import ImageProperties
@@ -171,3 +173,28 @@ def test_get_chain_mappings():
     }
 
     assert set(ServerMapping.get_chain_mappings()) == set(expected_mappings)
+
+
+def test_get_server_side_sort_mappings():
+    """
+    Tests get_server_side_sort_mappings outputs correctly
+    """
+    mappings = ServerMapping.get_server_side_sort_mappings()
+    assert mappings[ServerProperties.SERVER_ID] == "uuid"
+    assert mappings[ServerProperties.SERVER_CREATION_DATE] == "created_at"
+    assert ServerProperties.SERVER_STATUS not in mappings
+
+
+@pytest.mark.parametrize(
+    "prop",
+    [
+        ServerProperties.SERVER_NAME,
+        ServerProperties.SERVER_DESCRIPTION,
+        ServerProperties.HYPERVISOR_NAME,
+    ],
+)
+def test_get_server_side_sort_mappings_collation_unsafe(prop):
+    """
+    Tests properties openstack sorts with database collation or nulls first are not sorted server-side
+    """
+    assert prop not in ServerMapping.get_server_side_sort_mappings()
@@ -0,0 +1,21 @@
+from openstackquery.query_blocks.aggregate_result import AggregateResult
+from tests.mocks.mocked_props import MockProperties
+
+
+def test_as_props():
+    """
+    Tests as_props method - should return aggregated values regardless of props given
+    """
+    instance = AggregateResult({"count": 2, "sum_prop_1": 10})
+    assert instance.as_props(MockProperties.PROP_2) == {"count": 2, "sum_prop_1": 10}
+
+
+def test_as_object():
+    """
+    Tests as_object method - should return a copy of aggregated values
+    """
+    values = {"count": 2}
+    instance = AggregateResult(values)
+    res = instance.as_object()
+    assert res == values
+    assert res is not values
@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+import pytest
+
+from openstackquery.query_blocks.column_types import ColumnType
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        ([1, 2, None], ColumnType.INTEGER),
+        ([1, 2.5], ColumnType.FLOAT),
+        ([True, False, "Not Found"], ColumnType.BOOLEAN),
+        (["2024-01-01T10:00:00Z", "Not Found"], ColumnType.TIMESTAMP),
+        (["ACTIVE", "SHUTOFF"], ColumnType.STRING),
+        (["2024-01-01T10:00:00Z", "ACTIVE"], ColumnType.STRING),
+        ([1, "ACTIVE"], ColumnType.STRING),
+        ([True, 1], ColumnType.STRING),
+        ([["a"], {"b": 1}], ColumnType.STRING),
+        (["Not Found", None], ColumnType.STRING),
+        ([], ColumnType.STRING),
+    ],
+)
+def test_infer(values, expected):
+    """
+    Test infer finds the type of a column from its values - ignoring missing values
+    """
+    assert ColumnType.infer(values, "Not Found") == expected
+
+
+def test_infer_missing_value_not_set():
+    """
+    Test infer treats "Not Found" as a string if no missing value is given
+    """
+    assert ColumnType.infer([1, "Not Found"]) == ColumnType.STRING
+
+
+@pytest.mark.parametrize(
+    "column_type, values, expected",
+    [
+        (ColumnType.INTEGER, [1, "Not Found"], [1, None]),
+        (ColumnType.FLOAT, [1, 2.5, None], [1.0, 2.5, None]),
+        (ColumnType.BOOLEAN, [True, "Not Found"], [True, None]),
+        (
+            ColumnType.TIMESTAMP,
+            ["2024-01-01T10:00:00Z", "Not Found"],
+            [datetime(2024, 1, 1, 10, tzinfo=timezone.utc), None],
+        ),
+        (
+            ColumnType.STRING,
+            ["ACTIVE", 1, ["a"], {"b": 1}, "Not Found"],
+            ["ACTIVE", "1", '["a"]', '{"b": 1}', None],
+        ),
+    ],
+)
+def test_convert(column_type, values, expected):
+    """
+    Test convert converts values in a column to the column type - missing values are converted to None
+    """
+    assert column_type.convert(values, "Not Found") == expected
@@ -0,0 +1,130 @@
+import sys
+from unittest.mock import MagicMock, patch
+import pytest
+
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.columnar_output import ColumnarOutput
+
+
+@pytest.fixture(name="instance")
+def instance_fixture():
+    """
+    Returns an instance of ColumnarOutput - "Not Found" values are exported as null
+    """
+    return ColumnarOutput("Not Found")
+
+
+@pytest.mark.parametrize("dictionary_threshold", [-0.1, 1.5])
+def test_init_invalid_dictionary_threshold(dictionary_threshold):
+    """
+    Test error raised when dictionary_threshold is not a ratio
+    """
+    with pytest.raises(ParseQueryError):
+        ColumnarOutput(dictionary_threshold=dictionary_threshold)
+
+
+def test_import_optional_not_installed():
+    """
+    Test import_optional raises an ImportError naming the extra to install when library isn't installed
+    """
+    with patch.dict(sys.modules, {"pyarrow": None}):
+        with pytest.raises(ImportError, match=r"openstackquery\[arrow\]"):
+            ColumnarOutput.import_optional("pyarrow", "arrow")
+
+
+@patch.object(ColumnarOutput, "import_optional")
+def test_to_arrow(mock_import_optional, instance):
+    """
+    Test to_arrow builds a typed array per column - dictionary encoding low-cardinality string columns,
+    and adding a group column if group labels are given
+    """
+    mock_pa = mock_import_optional.return_value
+    res = instance.to_arrow(
+        ("id", "status", "vcpus"),
+        [["a", "b", "c", "d"], ["ACTIVE"] * 3 + ["Not Found"], [1, 2, 3, 4]],
+        ["group1", "group1", "group2", "group2"],
+    )
+    mock_import_optional.assert_called_once_with("pyarrow", "arrow")
+    assert [args[1]["type"] for args in mock_pa.array.call_args_list] == [
+        mock_pa.string.return_value,
+        mock_pa.string.return_value,
+        mock_pa.int64.return_value,
+        mock_pa.string.return_value,
+    ]
+    assert mock_pa.array.call_args_list[1][0][0] == ["ACTIVE"] * 3 + [None]
+    mock_pa.Table.from_arrays.assert_called_once_with(
+        [
+            mock_pa.array.return_value,
+            mock_pa.array.return_value.dictionary_encode.return_value,
+            mock_pa.array.return_value,
+            mock_pa.array.return_value.dictionary_encode.return_value,
+        ],
+        names=["id", "status", "vcpus", "group"],
+    )
+    assert res == mock_pa.Table.from_arrays.return_value
+
+
+@patch.object(ColumnarOutput, "import_optional")
+def test_to_arrow_dictionary_encoding_disabled(mock_import_optional):
+    """
+    Test to_arrow doesn't dictionary encode string columns when dictionary_threshold is 0
+    """
+    mock_pa = mock_import_optional.return_value
+    ColumnarOutput(dictionary_threshold=0).to_arrow(("status",), [["ACTIVE"] * 4])
+    mock_pa.array.return_value.dictionary_encode.assert_not_called()
+
+
+@patch.object(ColumnarOutput, "import_optional")
+def test_to_pandas(mock_import_optional, instance):
+    """
+    Test to_pandas converts an arrow table using pandas
+    """
+    mock_table = MagicMock()
+    assert instance.to_pandas(mock_table) == mock_table.to_pandas.return_value
+    mock_import_optional.assert_called_once_with("pandas", "pandas")
+
+
+@patch.object(ColumnarOutput, "import_optional")
+def test_to_polars(mock_import_optional, instance):
+    """
+    Test to_polars converts an arrow table using polars
+    """
+    mock_table = MagicMock()
+    res = instance.to_polars(mock_table)
+    mock_import_optional.assert_called_once_with("polars", "polars")
+    mock_import_optional.return_value.from_arrow.assert_called_once_with(mock_table)
+    assert res == mock_import_optional.return_value.from_arrow.return_value
+
+
+@patch.object(ColumnarOutput, "import_optional")
+def test_write_parquet(mock_import_optional, instance):
+    """
+    Test write_parquet writes an arrow table using pyarrow.parquet
+    """
+    mock_table = MagicMock()
+    instance.write_parquet(mock_table, "out.parquet", "zstd")
+    mock_import_optional.assert_called_once_with("pyarrow.parquet", "arrow")
+    mock_import_optional.return_value.write_table.assert_called_once_with(
+        mock_table, "out.parquet", compression="zstd"
+    )
+
+
+def test_to_arrow_pyarrow(instance):
+    """
+    Test to_arrow outputs typed columns when pyarrow is installed
+    """
+    pa = pytest.importorskip("pyarrow")
+    table = instance.to_arrow(
+        ("created_at", "status", "vcpus", "locked"),
+        [
+            ["2024-01-01T10:00:00Z", "Not Found"],
+            ["ACTIVE", "ACTIVE"],
+            [1, "Not Found"],
+            [True, False],
+        ],
+    )
+    assert table.schema.field("created_at").type == pa.timestamp("s", tz="UTC")
+    assert pa.types.is_dictionary(table.schema.field("status").type)
+    assert table.schema.field("vcpus").type == pa.int64()
+    assert table.schema.field("locked").type == pa.bool_()
+    assert table.column("vcpus").to_pylist() == [1, None]
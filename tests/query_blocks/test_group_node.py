@@ -0,0 +1,127 @@
+from unittest.mock import MagicMock
+
+from openstackquery.query_blocks.group_node import GroupNode
+
+
+def test_leaf_node():
+    """
+    Tests a node with no levels below it holds results
+    """
+    node = GroupNode([])
+    assert node.is_leaf
+    assert node.results == []
+    assert node.children is None
+    assert not node
+    node.results.append("result1")
+    assert node
+
+
+def test_inner_node_creates_initial_groups():
+    """
+    Tests that groups given for the first level are always created - and child groups are created
+    for the next level
+    """
+    node = GroupNode([["group1", "group2"], ["subgroup1"]])
+    assert not node.is_leaf
+    assert list(node.children.keys()) == ["group1", "group2"]
+    for child in node.children.values():
+        assert list(child.children.keys()) == ["subgroup1"]
+        assert child.children["subgroup1"].is_leaf
+
+
+def test_get_child():
+    """
+    Tests get_child creates a child group the first time it's requested and reuses it after
+    """
+    node = GroupNode([[], []])
+    child = node.get_child("group1")
+    assert node.get_child("group1") is child
+    assert not child.is_leaf
+    assert child.get_child("subgroup1").is_leaf
+
+
+def test_accumulators():
+    """
+    Tests that each node gets its own set of accumulators
+    """
+    mock_new_accumulators = MagicMock(side_effect=lambda: [MagicMock()])
+    node = GroupNode([[]], mock_new_accumulators)
+    child = node.get_child("group1")
+    assert node.accumulators is not child.accumulators
+    assert mock_new_accumulators.call_count == 2
+
+
+def test_walk():
+    """
+    Tests walk yields each node depth-first with the path of group names to it
+    """
+    node = GroupNode([[], []])
+    node.get_child("group1").get_child("subgroup1")
+    node.get_child("group2").get_child("subgroup2")
+    assert [path for path, _ in node.walk()] == [
+        (),
+        ("group1",),
+        ("group1", "subgroup1"),
+        ("group2",),
+        ("group2", "subgroup2"),
+    ]
+
+
+def test_walk_reorder_children():
+    """
+    Tests that children re-ordered while walking are walked in their new order
+    """
+    node = GroupNode([["group1", "group2"]])
+    paths = []
+    for path, group in node.walk():
+        paths.append(path)
+        if not path:
+            group.children = dict(reversed(group.children.items()))
+    assert paths == [(), ("group2",), ("group1",)]
+
+
+def test_to_dict():
+    """
+    Tests to_dict outputs nested dictionaries - converting leaf results with given function
+    """
+    node = GroupNode([[], []])
+    node.get_child("group1").get_child("subgroup1").results.extend([1, 2])
+    node.get_child("group1").get_child("subgroup2").results.append(3)
+    assert node.to_dict(lambda results: [res * 10 for res in results]) == {
+        "group1": {"subgroup1": [10, 20], "subgroup2": [30]}
+    }
+
+
+def test_to_dict_include_summaries():
+    """
+    Tests to_dict outputs each group with its summary when include_summaries is set
+    """
+    node = GroupNode([[], []])
+    child = node.get_child("group1")
+    child.summary = {"count": 2}
+    leaf = child.get_child("subgroup1")
+    leaf.summary = {"count": 2}
+    leaf.results.extend([1, 2])
+    assert node.to_dict(list, include_summaries=True) == {
+        "group1": {
+            "summary": {"count": 2},
+            "groups": {
+                "subgroup1": {"summary": {"count": 2}, "results": [1, 2]},
+            },
+        }
+    }
+
+
+def test_get_summaries():
+    """
+    Tests get_summaries returns summary of each group keyed by path - root is not included
+    """
+    node = GroupNode([[], []])
+    node.summary = {"count": 3}
+    child = node.get_child("group1")
+    child.summary = {"count": 3}
+    child.get_child("subgroup1").summary = {"count": 3}
+    assert node.get_summaries() == {
+        ("group1",): {"count": 3},
+        ("group1", "subgroup1"): {"count": 3},
+    }
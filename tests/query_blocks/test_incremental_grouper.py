@@ -0,0 +1,166 @@
+from unittest.mock import patch
+
+import pytest
+
+from openstackquery.enums.aggregate_func import AggregateFunc
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.incremental_grouper import IncrementalGrouper
+from openstackquery.query_blocks.query_parser import QueryParser
+from openstackquery.query_blocks.result import Result
+from tests.mocks.mocked_props import MockProperties
+
+
+@pytest.fixture(name="parser")
+def parser_fixture(mock_get_prop_mapping):
+    """
+    Returns a parser grouping by PROP_1 and aggregating PROP_2 - with get_prop_mapping patched
+    """
+    with patch.object(
+        MockProperties, "get_prop_mapping", side_effect=mock_get_prop_mapping
+    ):
+        parser = QueryParser(MockProperties)
+        parser.parse_group_by(MockProperties.PROP_1)
+        parser.parse_aggregate(
+            (AggregateFunc.SUM, MockProperties.PROP_2),
+            (AggregateFunc.MAX, MockProperties.PROP_2),
+            (AggregateFunc.COUNT_DISTINCT, MockProperties.PROP_3),
+        )
+        yield parser
+
+
+@pytest.fixture(name="make_result")
+def make_result_fixture():
+    """
+    Returns a function which makes a result from a dict
+    """
+
+    def _make_result(key, prop_1, prop_2, prop_3="x"):
+        return Result(
+            MockProperties,
+            {"id": key, "prop_1": prop_1, "prop_2": prop_2, "prop_3": prop_3},
+            "Not Found",
+        )
+
+    return _make_result
+
+
+@pytest.fixture(name="instance")
+def instance_fixture(parser, make_result):
+    """
+    Returns an instance holding three results in two groups
+    """
+    grouper = IncrementalGrouper(parser, lambda item: item.as_object()["id"])
+    grouper.reset(
+        [
+            make_result("a", "g1", 1),
+            make_result("b", "g1", 5),
+            make_result("c", "g2", 2),
+        ]
+    )
+    return grouper
+
+
+def test_reset(instance):
+    """
+    Tests reset computes the summary of each group
+    """
+    assert len(instance) == 3
+    assert instance.summaries == {
+        ("g1",): {
+            "count": 2,
+            "sum_prop_2": 6,
+            "max_prop_2": 5,
+            "count_distinct_prop_3": 1,
+        },
+        ("g2",): {
+            "count": 1,
+            "sum_prop_2": 2,
+            "max_prop_2": 2,
+            "count_distinct_prop_3": 1,
+        },
+    }
+
+
+def test_update(instance, make_result):
+    """
+    Tests update moves changed results between groups, removes results given by key only, and only
+    re-computes groups changed - groups left empty are removed
+    """
+    before = instance.summaries
+    res = instance.update([make_result("b", "g3", 4, "y")], ["b", "c"])
+
+    assert res == 3
+    assert instance.summaries == {
+        ("g1",): {
+            "count": 1,
+            "sum_prop_2": 1,
+            "max_prop_2": 1,
+            "count_distinct_prop_3": 1,
+        },
+        ("g3",): {
+            "count": 1,
+            "sum_prop_2": 4,
+            "max_prop_2": 4,
+            "count_distinct_prop_3": 1,
+        },
+    }
+    # summaries read before aren't changed
+    assert before[("g2",)]["count"] == 1
+    assert len(instance) == 2
+
+
+def test_update_unknown_key(instance):
+    """
+    Tests update ignores keys of results not held
+    """
+    before = instance.summaries
+    assert instance.update([], ["z"]) == 0
+    assert instance.summaries == before
+
+
+def test_nested_groups(parser, make_result, mock_get_prop_mapping):
+    """
+    Tests results in nested groups are counted in each parent group too
+    """
+    with patch.object(
+        MockProperties, "get_prop_mapping", side_effect=mock_get_prop_mapping
+    ):
+        parser.parse_subgroup_by(MockProperties.PROP_3)
+        parser.parse_aggregate()
+        instance = IncrementalGrouper(parser, lambda item: item.as_object()["id"])
+        instance.reset([make_result("a", "g1", 1, "x"), make_result("b", "g1", 1, "y")])
+    assert instance.summaries == {
+        ("g1",): {"count": 2},
+        ("g1", "x"): {"count": 1},
+        ("g1", "y"): {"count": 1},
+    }
+
+
+def test_ungrouped_and_group_ranges(parser, make_result, mock_get_prop_mapping):
+    """
+    Tests results not grouped are summarised under () - and group ranges are kept when empty
+    """
+    ungrouped = IncrementalGrouper(QueryParser(MockProperties), lambda item: item)
+    assert ungrouped.summaries == {(): {"count": 0}}
+
+    with patch.object(
+        MockProperties, "get_prop_mapping", side_effect=mock_get_prop_mapping
+    ):
+        parser.parse_group_by(MockProperties.PROP_1, {"group": ["g1"]})
+        instance = IncrementalGrouper(parser, lambda item: item.as_object()["id"])
+        instance.reset([make_result("a", "g1", 1)])
+        instance.update([], ["a"])
+    assert instance.summaries[("group",)] == {
+        "count": 0,
+        "sum_prop_2": 0,
+        "max_prop_2": None,
+        "count_distinct_prop_3": 0,
+    }
+
+
+def test_aggregate_invalid_value(instance, make_result):
+    """
+    Tests that summing a non-numeric value raises an error
+    """
+    with pytest.raises(ParseQueryError):
+        instance.update([make_result("d", "g1", "not a number")], [])
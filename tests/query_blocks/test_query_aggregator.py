@@ -0,0 +1,226 @@
+from unittest.mock import patch
+import pytest
+
+from openstackquery.enums.aggregate_func import AggregateFunc
+from openstackquery.enums.props.server_properties import ServerProperties
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.query_aggregator import QueryAggregator
+from tests.mocks.mocked_props import MockProperties
+
+
+@pytest.fixture(name="instance")
+def instance_fixture():
+    """
+    Returns an instance with mocked prop_enum_cls inject
+    """
+    return QueryAggregator(prop_enum_cls=MockProperties)
+
+
+@pytest.fixture(name="run_aggregate_runner")
+def run_aggregate_runner_fixture(instance, mock_get_prop_mapping):
+    """
+    Fixture which runs run_aggregate with different test cases
+    """
+
+    def _run_aggregate_runner(mock_obj_list, aggregations):
+        """
+        parses aggregations and runs run_aggregate on a list of mock results
+        """
+        instance.parse_aggregate(*aggregations)
+        with patch.object(
+            MockProperties, "get_prop_mapping", wraps=mock_get_prop_mapping
+        ) as mock_get_prop_func:
+            res = instance.run_aggregate(mock_obj_list)
+
+        # each property looked up once - even if aggregated more than once
+        props = {agg[1] for agg in aggregations if isinstance(agg, tuple)}
+        assert mock_get_prop_func.call_count == len(props)
+        return res.as_props()
+
+    return _run_aggregate_runner
+
+
+def test_parse_aggregate(instance):
+    """
+    Tests parse_aggregate with enums and string aliases
+    """
+    instance.parse_aggregate(
+        (AggregateFunc.SUM, MockProperties.PROP_1), ("average", MockProperties.PROP_2)
+    )
+    assert instance.aggregations == [
+        (AggregateFunc.SUM, MockProperties.PROP_1),
+        (AggregateFunc.AVG, MockProperties.PROP_2),
+    ]
+
+
+def test_parse_aggregate_replaces(instance):
+    """
+    Tests parse_aggregate replaces previously set aggregations
+    """
+    instance.parse_aggregate((AggregateFunc.SUM, MockProperties.PROP_1))
+    instance.parse_aggregate("count")
+    assert instance.aggregations == [(AggregateFunc.COUNT, None)]
+
+
+def test_parse_aggregate_invalid_prop(instance):
+    """
+    Tests parse_aggregate when given a property not supported by query
+    should raise error
+    """
+    with pytest.raises(ParseQueryError):
+        instance.parse_aggregate((AggregateFunc.SUM, ServerProperties.SERVER_ID))
+
+
+@pytest.mark.parametrize(
+    "mock_func",
+    [AggregateFunc.SUM, AggregateFunc.AVG, AggregateFunc.MIN, AggregateFunc.MAX],
+)
+def test_parse_aggregate_no_prop(instance, mock_func):
+    """
+    Tests parse_aggregate when given an aggregate function that requires a property without one
+    should raise error
+    """
+    with pytest.raises(ParseQueryError):
+        instance.parse_aggregate(mock_func)
+
+
+def test_run_aggregate(run_aggregate_runner, mock_results_container):
+    """
+    Tests run_aggregate computes all aggregations in one pass
+    """
+    mock_obj_list = mock_results_container(
+        [
+            {"prop_1": 2, "prop_2": "a"},
+            {"prop_1": 4, "prop_2": "b"},
+            {"prop_1": 9, "prop_2": "a"},
+        ]
+    )
+    res = run_aggregate_runner(
+        mock_obj_list,
+        [
+            AggregateFunc.COUNT,
+            (AggregateFunc.SUM, MockProperties.PROP_1),
+            (AggregateFunc.AVG, MockProperties.PROP_1),
+            (AggregateFunc.MIN, MockProperties.PROP_1),
+            (AggregateFunc.MAX, MockProperties.PROP_1),
+            (AggregateFunc.COUNT, MockProperties.PROP_2),
+            (AggregateFunc.COUNT_DISTINCT, MockProperties.PROP_2),
+        ],
+    )
+    assert res == {
+        "count": 3,
+        "sum_prop_1": 15,
+        "avg_prop_1": 5,
+        "min_prop_1": 2,
+        "max_prop_1": 9,
+        "count_prop_2": 3,
+        "count_distinct_prop_2": 2,
+    }
+
+
+def test_run_aggregate_missing_values(run_aggregate_runner, mock_results_container):
+    """
+    Tests run_aggregate skips results missing a property or with value of None
+    """
+    mock_obj_list = mock_results_container([{"prop_1": 2}, {"prop_1": None}, {}])
+    res = run_aggregate_runner(
+        mock_obj_list,
+        [
+            AggregateFunc.COUNT,
+            (AggregateFunc.AVG, MockProperties.PROP_1),
+            (AggregateFunc.COUNT, MockProperties.PROP_1),
+        ],
+    )
+    assert res == {"count": 3, "avg_prop_1": 2, "count_prop_1": 1}
+
+
+def test_run_aggregate_no_results(run_aggregate_runner):
+    """
+    Tests run_aggregate with no results
+    """
+    res = run_aggregate_runner(
+        [],
+        [
+            AggregateFunc.COUNT,
+            (AggregateFunc.SUM, MockProperties.PROP_1),
+            (AggregateFunc.AVG, MockProperties.PROP_1),
+            (AggregateFunc.MAX, MockProperties.PROP_1),
+        ],
+    )
+    assert res == {"count": 0, "sum_prop_1": 0, "avg_prop_1": None, "max_prop_1": None}
+
+
+def test_run_aggregate_non_numeric(
+    instance, mock_get_prop_mapping, mock_results_container
+):
+    """
+    Tests run_aggregate when summing a non-numeric property
+    should raise error
+    """
+    instance.parse_aggregate((AggregateFunc.SUM, MockProperties.PROP_1))
+    with patch.object(MockProperties, "get_prop_mapping", wraps=mock_get_prop_mapping):
+        with pytest.raises(ParseQueryError):
+            instance.run_aggregate(mock_results_container([{"prop_1": "a"}]))
+
+
+def test_accumulate_incrementally(
+    instance, mock_get_prop_mapping, mock_results_container
+):
+    """
+    Tests aggregating results into separate sets of accumulators - values are read once per result
+    """
+    instance.parse_aggregate(
+        AggregateFunc.COUNT,
+        (AggregateFunc.SUM, MockProperties.PROP_1),
+        (AggregateFunc.MAX, MockProperties.PROP_1),
+    )
+    mock_obj_list = mock_results_container(
+        [{"prop_1": 1}, {"prop_1": 5}, {"prop_1": None}]
+    )
+    with patch.object(MockProperties, "get_prop_mapping", wraps=mock_get_prop_mapping):
+        get_values = instance.get_values_func()
+
+    all_accumulators = instance.new_accumulators()
+    first_accumulators = instance.new_accumulators()
+    for i, item in enumerate(mock_obj_list):
+        values = get_values(item)
+        instance.accumulate(all_accumulators, values)
+        if i == 0:
+            instance.accumulate(first_accumulators, values)
+
+    assert instance.get_result(all_accumulators) == {
+        "count": 3,
+        "sum_prop_1": 6,
+        "max_prop_1": 5,
+    }
+    assert instance.get_result(first_accumulators) == {
+        "count": 1,
+        "sum_prop_1": 1,
+        "max_prop_1": 1,
+    }
+
+
+@pytest.mark.parametrize(
+    "mock_func, mock_values, expected_out",
+    [
+        (AggregateFunc.COUNT_DISTINCT, [1, [2], 1, [2], 3], 2),
+        (AggregateFunc.MIN, [[3], [2], [1]], [3]),
+        (AggregateFunc.MAX, ["b", "c", "c", "a"], "c"),
+    ],
+)
+def test_reversible_accumulators(instance, mock_func, mock_values, expected_out):
+    """
+    Tests reversible accumulators give the same results as accumulators which can't be reversed - and give the
+    results of values still held once values are removed
+    """
+    instance.parse_aggregate((mock_func, MockProperties.PROP_1))
+    (accumulator,) = instance.new_accumulators()
+    (reversible,) = instance.new_accumulators(reversible=True)
+    for value in mock_values:
+        accumulator.add(value)
+        reversible.add(value)
+    assert reversible.result() == accumulator.result()
+
+    reversible.remove(mock_values[-1])
+    reversible.remove(mock_values[-2])
+    assert reversible.result() == expected_out
@@ -426,3 +426,33 @@ def test_parse_where_with_string_aliases(
     assert instance.client_side_filters == []
     assert instance.server_side_filters == [{"filter1": "val1"}]
     assert instance.server_filter_fallback == [mock_client_filter_func]
+
+
+@pytest.mark.parametrize(
+    "mock_sort_by, expected_out",
+    [
+        ({}, None),
+        (
+            {MockProperties.PROP_1: False, MockProperties.PROP_2: True},
+            {"sort_key": ["key1", "key2"], "sort_dir": ["asc", "desc"]},
+        ),
+        ({MockProperties.PROP_1: False, MockProperties.PROP_3: False}, None),
+    ],
+)
+def test_get_server_side_sort(
+    mock_client_side_handler, mock_server_side_handler, mock_sort_by, expected_out
+):
+    """
+    Tests get_server_side_sort method
+    should return sort kwargs only if all sort_by properties can be sorted by openstack
+    """
+    instance = QueryBuilder(
+        prop_enum_cls=MockProperties,
+        client_side_handler=mock_client_side_handler,
+        server_side_handler=mock_server_side_handler,
+        server_side_sort_mappings={
+            MockProperties.PROP_1: "key1",
+            MockProperties.PROP_2: "key2",
+        },
+    )
+    assert instance.get_server_side_sort(mock_sort_by) == expected_out
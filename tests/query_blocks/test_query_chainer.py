@@ -43,6 +43,7 @@ def run_parse_then_query_valid_fixture(instance):
         runs a then_query() test case with keep_previous_results being either True or False
         """
         mock_current_query = MagicMock()
+        mock_current_query.parser.has_aggregations = False
         # setting what link props we get
         mock_current_query.chainer.get_link_props.return_value = (
             MockProperties.PROP_1,
@@ -199,6 +200,27 @@ def test_parse_then_no_link_props(instance):
         )
 
 
+def test_parse_then_with_aggregations(instance):
+    """
+    Tests parse_then method - where current query aggregates results
+    should raise error
+    """
+    mock_current_query = MagicMock()
+    mock_current_query.chainer.get_link_props.return_value = (
+        "current-prop",
+        "new-prop",
+    )
+    mock_current_query.parser.has_aggregations = True
+
+    with pytest.raises(QueryChainingError):
+        instance.parse_then(
+            current_query=mock_current_query,
+            query_type=MagicMock(),
+            keep_previous_results=False,
+        )
+    mock_current_query.to_props.assert_not_called()
+
+
 def test_parse_then_no_results(instance):
     """
     Tests parse_then method - where no results found
@@ -209,6 +231,7 @@ def test_parse_then_no_results(instance):
         "current-prop",
         "new-prop",
     )
+    mock_current_query.parser.has_aggregations = False
     mock_current_query.to_props.return_value = None
     mock_query_type = MagicMock()
 
@@ -1,4 +1,4 @@
-from unittest.mock import MagicMock, NonCallableMock, patch, call
+from unittest.mock import ANY, MagicMock, NonCallableMock, patch, call
 import pytest
 
 from openstackquery.query_blocks.query_executor import QueryExecutor
@@ -21,7 +21,12 @@ def instance_fixture(mock_connection_cls):
     mock_prop_enum_cls = MockProperties
     mock_runner_cls = MagicMock()
     with patch("openstackquery.query_blocks.query_executor.ResultsContainer"):
-        return QueryExecutor(mock_prop_enum_cls, mock_runner_cls, mock_connection_cls)
+        instance = QueryExecutor(
+            mock_prop_enum_cls, mock_runner_cls, mock_connection_cls
+        )
+    # nothing held in runner cache
+    instance.runner.get_cached_query.return_value = None
+    return instance
 
 
 def test_client_side_filter_func(instance):
@@ -80,7 +85,7 @@ def run_with_openstacksdk_runner_fixture(instance, mock_connection_cls):
         instance.runner.parse_meta_params.return_value = mock_meta_params
 
         mock_run_query_out = NonCallableMock()
-        instance.runner.run_query.return_value = [mock_run_query_out]
+        instance.runner.run_cached_query.return_value = [mock_run_query_out]
 
         mock_conn = mock_connection_cls.return_value.__enter__.return_value
 
@@ -103,17 +108,17 @@ def run_with_openstacksdk_runner_fixture(instance, mock_connection_cls):
         )
 
         if mock_server_side_filters:
-            instance.runner.run_query.assert_has_calls(
+            instance.runner.run_cached_query.assert_has_calls(
                 [
-                    call(mock_conn, mock_filter, **mock_meta_params)
+                    call(mock_conn, mock_cloud_account, mock_filter, **mock_meta_params)
                     for mock_filter in mock_server_side_filters
                 ]
             )
             query_out = [mock_run_query_out for _ in mock_server_side_filters]
 
         else:
-            instance.runner.run_query.assert_called_once_with(
-                mock_conn, None, **mock_meta_params
+            instance.runner.run_cached_query.assert_called_once_with(
+                mock_conn, mock_cloud_account, None, **mock_meta_params
             )
             query_out = [mock_run_query_out]
 
@@ -197,3 +202,286 @@ def test_with_subset(mock_apply_client_side_filters, instance):
     instance.results_container.store_query_results.assert_called_once_with(
         mock_apply_client_side_filters.return_value
     )
+
+
+@pytest.mark.parametrize(
+    "mock_server_side_filters",
+    [[{"filter1": "val1"}], [{"filter1": "val1"}, {"filter2": "val2"}]],
+)
+def test_run_with_openstacksdk_with_limit(
+    instance, mock_connection_cls, mock_server_side_filters
+):
+    """
+    Tests run_with_openstacksdk with limit set
+    method should stream results using runner.iter_query_streams and stop once enough results pass
+    client-side filters - later streams should not be listed
+    """
+    consumed = []
+
+    def _mock_stream(name):
+        for i in range(10):
+            consumed.append((name, i))
+            yield i
+
+    instance.runner.iter_query_streams.side_effect = lambda _, filters, **__: [
+        _mock_stream(list(filters.keys())[0])
+    ]
+    mock_conn = mock_connection_cls.return_value.__enter__.return_value
+    instance.runner.parse_meta_params.return_value = {"meta-arg1": "val1"}
+
+    instance.run_with_openstacksdk(
+        cloud_account=NonCallableMock(),
+        client_side_filters=[lambda item: item % 2 == 0],
+        server_side_filters=mock_server_side_filters,
+        limit=2,
+    )
+    instance.runner.iter_query_streams.assert_has_calls(
+        [
+            call(mock_conn, mock_filter, **{"meta-arg1": "val1"})
+            for mock_filter in mock_server_side_filters
+        ]
+    )
+    instance.runner.run_cached_query.assert_not_called()
+    # stops listing as soon as second result is found
+    assert consumed == [("filter1", 0), ("filter1", 1), ("filter1", 2)]
+    instance.results_container.store_query_results.assert_called_once_with([0, 2])
+
+
+@pytest.mark.parametrize(
+    "mock_limit, expected_out", [(None, [1, 2, 3, 4, 5]), (3, [1, 2, 3])]
+)
+def test_run_with_openstacksdk_with_merge_key(instance, mock_limit, expected_out):
+    """
+    Tests run_with_openstacksdk with merge_key set
+    method should merge sorted streams from the runner into one sorted listing
+    """
+    instance.runner.iter_query_streams.return_value = [iter([1, 3, 5]), iter([2, 4])]
+    instance.run_with_openstacksdk(
+        cloud_account=NonCallableMock(),
+        server_side_filters=[{"sort_key": ["key1"]}],
+        limit=mock_limit,
+        merge_key=lambda item: item,
+    )
+    instance.runner.run_cached_query.assert_not_called()
+    instance.results_container.store_query_results.assert_called_once_with(expected_out)
+
+
+@pytest.mark.parametrize("mock_merge_key", [None, lambda item: item])
+def test_run_with_openstacksdk_streamed_from_cache(instance, mock_merge_key):
+    """
+    Tests run_with_openstacksdk with limit set when the listing is held in the runner cache
+    method should use the cached listing instead of streaming from openstack - sorted if merging
+    """
+    instance.runner.get_cached_query.return_value = [3, 1, 2]
+    instance.runner.parse_meta_params.return_value = {"meta-arg1": "val1"}
+    instance.run_with_openstacksdk(
+        cloud_account="test-account",
+        server_side_filters=[{"filter1": "val1"}],
+        limit=2,
+        merge_key=mock_merge_key,
+    )
+    instance.runner.get_cached_query.assert_called_once_with(
+        "test-account", {"filter1": "val1"}, **{"meta-arg1": "val1"}
+    )
+    instance.runner.iter_query_streams.assert_not_called()
+    instance.results_container.store_query_results.assert_called_once_with(
+        [1, 2] if mock_merge_key else [3, 1]
+    )
+
+
+def test_with_subset_with_limit(instance):
+    """
+    Tests run_with_subset with limit set
+    method should stop filtering once enough results found
+    """
+    instance.runner.parse_subset.return_value = [1, 2, 3, 4, 5]
+    instance.run_with_subset(NonCallableMock(), [lambda item: item > 1], limit=2)
+    instance.results_container.store_query_results.assert_called_once_with([2, 3])
+
+
+def test_count_with_openstacksdk(instance, mock_connection_cls):
+    """
+    Tests count_with_openstacksdk method
+    method should stream resources from each server-side filter set, apply client-side filters
+    and return the number of resources found without storing results
+    """
+    instance.runner.iter_query_streams.side_effect = [[iter([1, 2, 3])], [iter([4])]]
+    mock_conn = mock_connection_cls.return_value.__enter__.return_value
+    instance.runner.parse_meta_params.return_value = {"meta-arg1": "val1"}
+
+    res = instance.count_with_openstacksdk(
+        cloud_account="test-account",
+        client_side_filters=[lambda item: item > 1],
+        server_side_filters=[{"filter1": "val1"}, {"filter2": "val2"}],
+        from_projects=["project1"],
+    )
+    mock_connection_cls.assert_called_once_with("test-account")
+    instance.runner.parse_meta_params.assert_called_once_with(
+        mock_conn, from_projects=["project1"]
+    )
+    instance.runner.iter_query_streams.assert_has_calls(
+        [
+            call(mock_conn, {"filter1": "val1"}, **{"meta-arg1": "val1"}),
+            call(mock_conn, {"filter2": "val2"}, **{"meta-arg1": "val1"}),
+        ]
+    )
+    instance.runner.run_cached_query.assert_not_called()
+    instance.results_container.store_query_results.assert_not_called()
+    assert res == 3
+
+
+def test_count_with_openstacksdk_count_by(instance):
+    """
+    Tests count_with_openstacksdk method with count_by set
+    method should count resources by value of the given property - resources missing the property
+    should be counted under the default output value
+    """
+    instance.runner.iter_query_streams.return_value = [
+        iter([{"key": "a"}, {"key": "b"}, {"key": "a"}, {}])
+    ]
+    instance.results_container.DEFAULT_OUT = "Not Found"
+    with patch.object(
+        MockProperties, "get_prop_mapping", create=True
+    ) as mock_get_prop_mapping:
+        mock_get_prop_mapping.return_value = lambda obj: obj["key"]
+        res = instance.count_with_openstacksdk(
+            cloud_account=NonCallableMock(), count_by=MockProperties.PROP_1
+        )
+    mock_get_prop_mapping.assert_called_once_with(MockProperties.PROP_1)
+    assert res == {"a": 2, "b": 1, "Not Found": 1}
+
+
+@pytest.mark.parametrize(
+    "mock_count_by, expected_out", [(None, 2), (MockProperties.PROP_1, {1: 2})]
+)
+def test_count_with_subset(instance, mock_count_by, expected_out):
+    """
+    Tests count_with_subset method
+    method should count subset items which pass client-side filters
+    """
+    instance.runner.parse_subset.return_value = [1, 2, 3]
+    with patch.object(
+        MockProperties, "get_prop_mapping", create=True
+    ) as mock_get_prop_mapping:
+        mock_get_prop_mapping.return_value = lambda _: 1
+        res = instance.count_with_subset(
+            NonCallableMock(), [lambda item: item > 1], count_by=mock_count_by
+        )
+    instance.results_container.store_query_results.assert_not_called()
+    assert res == expected_out
+
+
+def test_count_with_aggregate_source(instance, mock_connection_cls):
+    """
+    Tests count_with_aggregate_source method
+    method should forward parsed meta params and prop enum to runner.run_aggregate_count
+    """
+    mock_conn = mock_connection_cls.return_value.__enter__.return_value
+    instance.runner.parse_meta_params.return_value = {"meta-arg1": "val1"}
+
+    res = instance.count_with_aggregate_source(
+        "test-account", MockProperties.PROP_1, all_projects=True
+    )
+    instance.runner.parse_meta_params.assert_called_once_with(
+        mock_conn, all_projects=True
+    )
+    instance.runner.run_aggregate_count.assert_called_once_with(
+        mock_conn, MockProperties.PROP_1, **{"meta-arg1": "val1"}
+    )
+    instance.runner.iter_query_streams.assert_not_called()
+    assert res == instance.runner.run_aggregate_count.return_value
+
+
+def test_run_changes_with_openstacksdk(instance, mock_connection_cls):
+    """
+    Tests run_changes_with_openstacksdk method
+    method should list resources changed since the timestamp given with parsed meta params - without storing
+    results
+    """
+    mock_conn = mock_connection_cls.return_value.__enter__.return_value
+    instance.runner.parse_meta_params.return_value = {"meta-arg1": "val1"}
+
+    res = instance.run_changes_with_openstacksdk(
+        "test-account", "2024-01-01T00:00:00Z", from_projects=["project1"]
+    )
+    mock_connection_cls.assert_called_once_with("test-account")
+    instance.runner.parse_meta_params.assert_called_once_with(
+        mock_conn, from_projects=["project1"]
+    )
+    instance.runner.run_changes_query.assert_called_once_with(
+        mock_conn, "2024-01-01T00:00:00Z", None, **{"meta-arg1": "val1"}
+    )
+    instance.results_container.store_query_results.assert_not_called()
+    assert res == instance.runner.run_changes_query.return_value
+
+
+def test_get_subset_results(instance):
+    """
+    Tests get_subset_results method
+    method should apply client-side filters on a subset and store the results in a new container - leaving
+    the executor's results as they are
+    """
+    instance.runner.parse_subset.side_effect = lambda subset: subset
+    with patch(
+        "openstackquery.query_blocks.query_executor.ResultsContainer"
+    ) as mock_results_container:
+        res = instance.get_subset_results([1, 2, 3], [lambda item: item > 1])
+
+    mock_results_container.assert_called_once_with(MockProperties)
+    res.store_query_results.assert_called_once_with([2, 3])
+    assert res == mock_results_container.return_value
+    instance.results_container.store_query_results.assert_not_called()
+
+
+def test_get_keyed_props_by_marker(instance):
+    """
+    Tests get_keyed_props method with no key given - results should be keyed by marker prop
+    """
+    mock_results_container = MagicMock()
+    mock_result = MagicMock()
+    res = instance.get_keyed_props(mock_results_container, [MockProperties.PROP_1])
+
+    mock_results_container.to_keyed_props.assert_called_once_with(
+        ANY, MockProperties.PROP_1
+    )
+    key_func = mock_results_container.to_keyed_props.call_args.args[0]
+    assert key_func(mock_result) == instance.runner.marker_prop_func.return_value
+    instance.runner.marker_prop_func.assert_called_once_with(
+        mock_result.as_object.return_value
+    )
+    assert res == mock_results_container.to_keyed_props.return_value
+
+
+def test_get_keyed_props_by_prop(instance):
+    """
+    Tests get_keyed_props method with a property given - results should be keyed by that property
+    """
+    mock_results_container = MagicMock()
+    mock_result = MagicMock()
+    instance.get_keyed_props(mock_results_container, [], MockProperties.PROP_2)
+
+    key_func = mock_results_container.to_keyed_props.call_args.args[0]
+    assert key_func(mock_result) == mock_result.get_prop.return_value
+    mock_result.get_prop.assert_called_once_with(MockProperties.PROP_2)
+
+
+@patch("openstackquery.query_blocks.query_executor.ResultsDiff")
+def test_diff_results(mock_results_diff, instance):
+    """
+    Tests diff_results method
+    method should compare results keyed by the given property - naming the key after the property
+    """
+    mock_old, mock_new, mock_output = MagicMock(), MagicMock(), NonCallableMock()
+    res = instance.diff_results(
+        mock_old, mock_new, [MockProperties.PROP_1], MockProperties.PROP_2, mock_output
+    )
+    mock_results_diff.compute.assert_called_once_with(
+        mock_old.to_keyed_props.return_value,
+        mock_new.to_keyed_props.return_value,
+        "prop_2",
+        mock_output,
+    )
+    assert res == mock_results_diff.compute.return_value
+
+    instance.diff_results(mock_old, mock_new, [MockProperties.PROP_1])
+    assert mock_results_diff.compute.call_args.args[2] == "id"
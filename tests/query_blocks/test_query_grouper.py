@@ -1,7 +1,8 @@
-from unittest.mock import call, patch
+from datetime import timedelta
+from unittest.mock import patch
 import pytest
 
-from openstackquery.query_blocks.query_grouper import QueryGrouper
+from openstackquery.query_blocks.query_grouper import QueryGrouper, TimeBucketer
 from openstackquery.enums.props.server_properties import ServerProperties
 
 from openstackquery.exceptions.parse_query_error import ParseQueryError
@@ -42,12 +43,8 @@ def run_group_by_runner_fixture(instance, mock_get_prop_mapping):
                 mock_group_by, mock_group_ranges, mock_include_missing
             )
             res = instance.run_group_by(mock_obj_list)
-            if mock_include_missing:
-                mock_get_prop_func.assert_has_calls(
-                    [call(mock_group_by), call(mock_group_by)]
-                )
-            else:
-                mock_get_prop_func.assert_called_once_with(mock_group_by)
+            # prop function looked up once - not once per group or per item
+            mock_get_prop_func.assert_called_once_with(mock_group_by)
 
         for key, vals in res.items():
             assert key in res.keys()
@@ -162,3 +159,292 @@ def test_run_group_by_with_include_missing(run_group_by_runner, mock_results_con
     run_group_by_runner(
         MockProperties.PROP_1, mock_group_mappings, True, mock_obj_list, expected_out
     )
+
+
+def test_run_group_by_with_overlapping_group_mappings(
+    run_group_by_runner, mock_results_container
+):
+    """
+    Tests run_group_by when given group mappings where a value is in more than one group
+    results with that value should be in each group it belongs to
+    """
+    mock_as_object_vals = [
+        {"prop_1": "a", "prop_2": 1},
+        {"prop_1": "b", "prop_2": 2},
+    ]
+
+    mock_group_mappings = {"mapping_1": ["a", "b"], "mapping_2": ["b"], "empty": ["c"]}
+
+    expected_out = {
+        "mapping_1": [{"prop_1": "a", "prop_2": 1}, {"prop_1": "b", "prop_2": 2}],
+        "mapping_2": [{"prop_1": "b", "prop_2": 2}],
+        "empty": [],
+    }
+
+    mock_obj_list = mock_results_container(mock_as_object_vals)
+
+    run_group_by_runner(
+        MockProperties.PROP_1, mock_group_mappings, False, mock_obj_list, expected_out
+    )
+
+
+def test_run_group_by_include_missing_unhashable_value(
+    instance, mock_get_prop_mapping, mock_results_container
+):
+    """
+    Tests run_group_by when given group mappings and a result has an unhashable value
+    result should be put into ungrouped results
+    """
+    mock_obj_list = mock_results_container([{"prop_1": "a"}, {"prop_1": ["a"]}])
+    with patch.object(MockProperties, "get_prop_mapping", wraps=mock_get_prop_mapping):
+        instance.parse_group_by(MockProperties.PROP_1, {"mapping_1": ["a"]}, True)
+        res = instance.run_group_by(mock_obj_list)
+
+    assert res == {
+        "mapping_1": [mock_obj_list[0]],
+        "ungrouped results": [mock_obj_list[1]],
+    }
+
+
+def test_parse_group_by_unhashable_group_range(instance):
+    """
+    Tests parse_group_by when given group ranges containing an unhashable value
+    should raise error
+    """
+    with pytest.raises(ParseQueryError):
+        instance.parse_group_by(MockProperties.PROP_1, {"mapping_1": [["a"]]})
+
+
+def test_run_group_by_multiple_props(
+    instance, mock_get_prop_mapping, mock_results_container
+):
+    """
+    Tests run_group_by when grouping by a tuple of properties
+    groups should be keyed by a tuple of each property's value, in order first seen
+    """
+    mock_obj_list = mock_results_container(
+        [
+            {"prop_1": "a", "prop_2": 1},
+            {"prop_1": "b", "prop_2": 1},
+            {"prop_1": "a", "prop_2": 1},
+            {"prop_1": "a", "prop_2": 2},
+        ]
+    )
+    with patch.object(MockProperties, "get_prop_mapping", wraps=mock_get_prop_mapping):
+        instance.parse_group_by((MockProperties.PROP_1, MockProperties.PROP_2))
+        res = instance.run_group_by(mock_obj_list)
+
+    assert list(res.keys()) == [("a", 1), ("b", 1), ("a", 2)]
+    assert res[("a", 1)] == [mock_obj_list[0], mock_obj_list[2]]
+    assert res[("b", 1)] == [mock_obj_list[1]]
+    assert res[("a", 2)] == [mock_obj_list[3]]
+
+
+def test_run_group_by_multiple_props_with_group_mappings(
+    instance, mock_get_prop_mapping, mock_results_container
+):
+    """
+    Tests run_group_by when grouping by a tuple of properties with group mappings
+    group mappings should hold tuples of values
+    """
+    mock_obj_list = mock_results_container(
+        [{"prop_1": "a", "prop_2": 1}, {"prop_1": "a", "prop_2": 2}]
+    )
+    with patch.object(MockProperties, "get_prop_mapping", wraps=mock_get_prop_mapping):
+        instance.parse_group_by(
+            [MockProperties.PROP_1, MockProperties.PROP_2],
+            {"mapping_1": [("a", 2)]},
+            True,
+        )
+        res = instance.run_group_by(mock_obj_list)
+
+    assert res == {
+        "mapping_1": [mock_obj_list[1]],
+        "ungrouped results": [mock_obj_list[0]],
+    }
+
+
+def test_parse_group_by_multiple_props_invalid(instance):
+    """
+    Tests parse_group_by - when given a tuple containing an invalid group by prop
+    """
+    with pytest.raises(ParseQueryError):
+        instance.parse_group_by((MockProperties.PROP_1, ServerProperties.SERVER_ID))
+
+
+def test_parse_group_by_empty(instance):
+    """
+    Tests parse_group_by - when given an empty tuple
+    """
+    with pytest.raises(ParseQueryError):
+        instance.parse_group_by(())
+
+
+@pytest.mark.parametrize(
+    "mock_bucket, mock_timestamp, expected_out",
+    [
+        ("day", "2024-05-01T23:59:59Z", "2024-05-01"),
+        ("DAY", "2024-05-01", "2024-05-01"),
+        # 2024-05-01 is a wednesday - week starts on monday
+        ("week", "2024-05-01T12:00:00Z", "2024-04-29"),
+        ("week", "2024-04-29T00:00:00Z", "2024-04-29"),
+        ("month", "2024-05-31T12:00:00Z", "2024-05"),
+        ("month", "2023-12-01T00:00:00.000000", "2023-12"),
+        (timedelta(hours=6), "2024-05-01T13:30:00Z", "2024-05-01T12:00:00Z"),
+        (timedelta(hours=1), "2024-05-01T00:59:59Z", "2024-05-01T00:00:00Z"),
+        ("day", None, None),
+    ],
+)
+def test_time_bucketer(mock_bucket, mock_timestamp, expected_out):
+    """
+    Tests TimeBucketer finds the start of the time bucket a timestamp falls into
+    """
+    assert TimeBucketer(mock_bucket)(mock_timestamp) == expected_out
+
+
+@pytest.mark.parametrize("mock_bucket", ["year", timedelta(0), 5])
+def test_time_bucketer_invalid_bucket(mock_bucket):
+    """
+    Tests TimeBucketer when given an unsupported bucket
+    should raise error
+    """
+    with pytest.raises(ParseQueryError):
+        TimeBucketer(mock_bucket)
+
+
+@pytest.mark.parametrize("mock_timestamp", ["server-name", "2024/05/01", 12])
+def test_time_bucketer_invalid_timestamp(mock_timestamp):
+    """
+    Tests TimeBucketer when given a value that is not a timestamp
+    should raise error
+    """
+    with pytest.raises(ParseQueryError):
+        TimeBucketer("day")(mock_timestamp)
+
+
+def test_run_group_by_with_bucket(
+    instance, mock_get_prop_mapping, mock_results_container
+):
+    """
+    Tests run_group_by when given a time bucket
+    groups should be named by the start of each bucket and ordered chronologically
+    """
+    mock_obj_list = mock_results_container(
+        [
+            {"prop_1": "2024-06-02T10:00:00Z"},
+            {"prop_1": "2024-05-01T10:00:00Z"},
+            {"prop_1": None},
+            {"prop_1": "2024-06-30T10:00:00Z"},
+        ]
+    )
+    with patch.object(MockProperties, "get_prop_mapping", wraps=mock_get_prop_mapping):
+        instance.parse_group_by(MockProperties.PROP_1, bucket="month")
+        res = instance.run_group_by(mock_obj_list)
+
+    assert list(res.keys()) == ["2024-05", "2024-06", None]
+    assert res["2024-05"] == [mock_obj_list[1]]
+    assert res["2024-06"] == [mock_obj_list[0], mock_obj_list[3]]
+    assert res[None] == [mock_obj_list[2]]
+
+
+def test_run_group_by_with_bucket_and_group_mappings(
+    instance, mock_get_prop_mapping, mock_results_container
+):
+    """
+    Tests run_group_by when given a time bucket and group mappings
+    group mappings should hold bucket names
+    """
+    mock_obj_list = mock_results_container(
+        [{"prop_1": "2024-05-01T10:00:00Z"}, {"prop_1": "2024-04-01T10:00:00Z"}]
+    )
+    with patch.object(MockProperties, "get_prop_mapping", wraps=mock_get_prop_mapping):
+        instance.parse_group_by(
+            MockProperties.PROP_1, {"may": ["2024-05"]}, True, bucket="month"
+        )
+        res = instance.run_group_by(mock_obj_list)
+
+    assert res == {"may": [mock_obj_list[0]], "ungrouped results": [mock_obj_list[1]]}
+
+
+@pytest.mark.parametrize(
+    "mock_group_by, mock_bucket",
+    [
+        ((MockProperties.PROP_1, MockProperties.PROP_2), "day"),
+        (MockProperties.PROP_1, "year"),
+    ],
+)
+def test_parse_group_by_invalid_bucket(instance, mock_group_by, mock_bucket):
+    """
+    Tests parse_group_by when given a time bucket with multiple properties or an invalid bucket
+    should raise error
+    """
+    with pytest.raises(ParseQueryError):
+        instance.parse_group_by(mock_group_by, bucket=mock_bucket)
+
+
+def test_initial_group_names(instance):
+    """
+    Tests initial_group_names returns group range names - and ungrouped results group if include_missing set
+    """
+    instance.parse_group_by(MockProperties.PROP_1)
+    assert instance.initial_group_names == []
+    instance.parse_group_by(MockProperties.PROP_1, {"group1": ["val1"]})
+    assert instance.initial_group_names == ["group1"]
+    instance.parse_group_by(MockProperties.PROP_1, {"group1": ["val1"]}, True)
+    assert instance.initial_group_names == ["group1", "ungrouped results"]
+
+
+@pytest.mark.parametrize(
+    "mock_group_args, expected_out",
+    [
+        ((None, False), [("val1",), ("val2",), ([1],)]),
+        (
+            ({"group1": ["val1"], "group2": ["val1", "val2"]}, False),
+            [("group1", "group2"), ("group2",), ()],
+        ),
+        (
+            ({"group1": ["val1"]}, True),
+            [("group1",), ("ungrouped results",), ("ungrouped results",)],
+        ),
+    ],
+)
+def test_get_group_names_func(
+    instance,
+    mock_get_prop_mapping,
+    mock_results_container,
+    mock_group_args,
+    expected_out,
+):
+    """
+    Tests get_group_names_func returns a function which outputs names of all groups a result belongs to
+    """
+    mock_obj_list = mock_results_container(
+        [{"prop_1": "val1"}, {"prop_1": "val2"}, {"prop_1": [1]}]
+    )
+    with patch.object(MockProperties, "get_prop_mapping", wraps=mock_get_prop_mapping):
+        instance.parse_group_by(MockProperties.PROP_1, *mock_group_args)
+        group_names_func = instance.get_group_names_func()
+        assert [group_names_func(item) for item in mock_obj_list] == expected_out
+
+
+def test_order_groups(instance):
+    """
+    Tests order_groups orders time buckets chronologically - other groups are left unchanged
+    """
+    groups = {"2024-06": [], None: [], "2024-05": []}
+    instance.parse_group_by(MockProperties.PROP_1)
+    assert list(instance.order_groups(groups)) == ["2024-06", None, "2024-05"]
+    instance.parse_group_by(MockProperties.PROP_1, bucket="month")
+    assert list(instance.order_groups(groups)) == ["2024-05", "2024-06", None]
+
+
+def test_has_fixed_order(instance):
+    """
+    Tests groups have a fixed order if group ranges or a time bucket is set - but not for unique values
+    """
+    instance.parse_group_by(MockProperties.PROP_1)
+    assert not instance.has_fixed_order
+    instance.parse_group_by(MockProperties.PROP_1, bucket="day")
+    assert instance.has_fixed_order
+    instance.parse_group_by(MockProperties.PROP_1, {"group1": ["val1"]})
+    assert instance.has_fixed_order
@@ -202,7 +202,7 @@ def test_to_html_ungrouped_results(mock_tabulate, instance):
         {"prop1": "val3", "prop2": "val4"},
     ]
     mock_tabulate.return_value = "tabulate-output"
-    res = instance.to_html(mock_results_container)
+    res = instance.to_html(mock_results_container, backend="tabulate")
 
     mock_results_container.to_props.assert_called_once_with(*instance.selected_props)
     mock_tabulate.assert_called_once_with(
@@ -228,7 +228,7 @@ def test_to_html_grouped_results(mock_tabulate, instance):
 
     mock_tabulate.side_effect = ["tabulate-output-group1", "tabulate-output-group2"]
 
-    res = instance.to_html(mock_results_container)
+    res = instance.to_html(mock_results_container, backend="tabulate")
 
     mock_results_container.to_props.assert_called_once_with(*instance.selected_props)
     mock_tabulate.assert_has_calls(
@@ -259,7 +259,9 @@ def test_to_html_with_title(mock_tabulate, instance):
         {"prop1": "val3", "prop2": "val4"},
     ]
     mock_tabulate.return_value = "tabulate-output"
-    res = instance.to_html(mock_results_container, title="mock-title")
+    res = instance.to_html(
+        mock_results_container, title="mock-title", backend="tabulate"
+    )
 
     mock_results_container.to_props.assert_called_once_with(*instance.selected_props)
     mock_tabulate.assert_called_once_with(
@@ -285,7 +287,9 @@ def test_to_html_with_title_grouped_results(mock_tabulate, instance):
 
     mock_tabulate.side_effect = ["tabulate-output-group1", "tabulate-output-group2"]
 
-    res = instance.to_html(mock_results_container, title="mock-title")
+    res = instance.to_html(
+        mock_results_container, title="mock-title", backend="tabulate"
+    )
 
     mock_results_container.to_props.assert_called_once_with(*instance.selected_props)
     mock_tabulate.assert_has_calls(
@@ -323,7 +327,10 @@ def test_to_html_with_title_and_group(mock_tabulate, instance):
     mock_tabulate.side_effect = ["tabulate-output-group2"]
 
     res = instance.to_html(
-        mock_results_container, title="mock-title", groups=["group2"]
+        mock_results_container,
+        title="mock-title",
+        groups=["group2"],
+        backend="tabulate",
     )
 
     mock_results_container.to_props.assert_called_once_with(*instance.selected_props)
@@ -362,7 +369,7 @@ def test_to_string_ungrouped_results(mock_tabulate, instance):
         {"prop1": "val3", "prop2": "val4"},
     ]
     mock_tabulate.return_value = "tabulate-output"
-    res = instance.to_string(mock_results_container)
+    res = instance.to_string(mock_results_container, backend="tabulate")
 
     mock_results_container.to_props.assert_called_once_with(*instance.selected_props)
     mock_tabulate.assert_called_once_with(
@@ -388,7 +395,7 @@ def test_to_string_grouped_results(mock_tabulate, instance):
 
     mock_tabulate.side_effect = ["tabulate-output-group1", "tabulate-output-group2"]
 
-    res = instance.to_string(mock_results_container)
+    res = instance.to_string(mock_results_container, backend="tabulate")
 
     mock_results_container.to_props.assert_called_once_with(*instance.selected_props)
     mock_tabulate.assert_has_calls(
@@ -418,7 +425,9 @@ def test_to_string_with_title(mock_tabulate, instance):
         {"prop1": "val3", "prop2": "val4"},
     ]
     mock_tabulate.return_value = "tabulate-output"
-    res = instance.to_string(mock_results_container, title="mock-title")
+    res = instance.to_string(
+        mock_results_container, title="mock-title", backend="tabulate"
+    )
 
     mock_results_container.to_props.assert_called_once_with(*instance.selected_props)
     mock_tabulate.assert_called_once_with(
@@ -444,7 +453,9 @@ def test_to_string_with_title_grouped_results(mock_tabulate, instance):
 
     mock_tabulate.side_effect = ["tabulate-output-group1", "tabulate-output-group2"]
 
-    res = instance.to_string(mock_results_container, title="mock-title")
+    res = instance.to_string(
+        mock_results_container, title="mock-title", backend="tabulate"
+    )
 
     mock_results_container.to_props.assert_called_once_with(*instance.selected_props)
     mock_tabulate.assert_has_calls(
@@ -482,7 +493,10 @@ def test_to_string_with_title_and_group(mock_tabulate, instance):
     mock_tabulate.side_effect = ["tabulate-output-group2"]
 
     res = instance.to_string(
-        mock_results_container, title="mock-title", groups=["group2"]
+        mock_results_container,
+        title="mock-title",
+        groups=["group2"],
+        backend="tabulate",
     )
 
     mock_results_container.to_props.assert_called_once_with(*instance.selected_props)
@@ -692,6 +706,23 @@ def test_to_json_grouped_results(instance):
     assert parsed["group1"] == grouped_data["group1"]
 
 
+def test_to_json_grouped_by_multiple_props(instance):
+    """
+    Tests to_json with results grouped by multiple properties
+    tuple group keys should be converted to strings
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.to_props.return_value = {
+        ("project1", "ACTIVE"): [{"prop1": "val1"}],
+        ("project1", "ERROR"): [{"prop1": "val2"}],
+    }
+    parsed = json.loads(instance.to_json(mock_results_container))
+    assert parsed == {
+        "project1, ACTIVE": [{"prop1": "val1"}],
+        "project1, ERROR": [{"prop1": "val2"}],
+    }
+
+
 def test_to_json_flatten_groups(instance):
     mock_results_container = MagicMock()
     grouped_data = {
@@ -730,3 +761,194 @@ def test_to_json_with_groups_filter(instance):
     result = instance.to_json(mock_results_container, groups=["group2"])
     parsed = json.loads(result)
     assert set(parsed.keys()) == {"group2"}
+
+
+@pytest.fixture(name="mock_nested_results_container")
+def mock_nested_results_container_fixture():
+    """
+    Returns a mock results container holding results in nested groups
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.to_props.return_value = {
+        "project1": {
+            "ACTIVE": [{"prop1": "val1"}, {"prop1": "val2"}],
+            "ERROR": [{"prop1": "val3"}],
+        },
+        "project2": {"ACTIVE": [{"prop1": "val4"}]},
+    }
+    mock_results_container.get_group_summaries.return_value = {
+        ("project1",): {"count": 3},
+        ("project1", "ACTIVE"): {"count": 2},
+        ("project1", "ERROR"): {"count": 1},
+        ("project2",): {"count": 1},
+        ("project2", "ACTIVE"): {"count": 1},
+    }
+    return mock_results_container
+
+
+@patch("openstackquery.query_blocks.query_output.tabulate")
+def test_to_string_nested_groups(
+    mock_tabulate, instance, mock_nested_results_container
+):
+    """
+    Tests to_string method with results in nested groups
+    should output one table per innermost group - titled by group path and summary
+    """
+    mock_tabulate.side_effect = ["table1", "table2", "table3"]
+    res = instance.to_string(mock_nested_results_container, backend="tabulate")
+    assert mock_tabulate.call_count == 3
+    assert res == (
+        "project1:\ncount: 3\n\n"
+        "project1 / ACTIVE:\ncount: 2\ntable1\n\n"
+        "project1 / ERROR:\ncount: 1\ntable2\n\n"
+        "project2:\ncount: 1\n\n"
+        "project2 / ACTIVE:\ncount: 1\ntable3\n\n"
+    )
+
+
+@patch("openstackquery.query_blocks.query_output.tabulate")
+def test_to_html_nested_groups(mock_tabulate, instance, mock_nested_results_container):
+    """
+    Tests to_html method with results in nested groups and no group titles
+    """
+    mock_tabulate.side_effect = ["table1", "table2", "table3"]
+    res = instance.to_html(
+        mock_nested_results_container,
+        title="title",
+        include_group_titles=False,
+        backend="tabulate",
+    )
+    assert res == "<b>title:</b><br/>table1<br/><br/>table2<br/><br/>table3<br/><br/>"
+
+
+def test_to_csv_nested_groups(instance, mock_nested_results_container):
+    """
+    Tests to_csv method with results in nested groups - should output one csv per innermost group
+    """
+    csv_output = instance.to_csv(mock_nested_results_container)
+    assert "# Group: project1 / ACTIVE" in csv_output
+    assert "# Group: project1 / ERROR" in csv_output
+    assert "# Group: project2 / ACTIVE" in csv_output
+    assert "# Group: project1\n" not in csv_output
+
+    csv_output = instance.to_csv(mock_nested_results_container, flatten_groups=True)
+    assert "val4,project2 / ACTIVE" in csv_output
+
+
+def test_to_json_nested_groups(instance, mock_nested_results_container):
+    """
+    Tests to_json method with results in nested groups
+    """
+    parsed = json.loads(instance.to_json(mock_nested_results_container))
+    assert parsed == mock_nested_results_container.to_props.return_value
+
+    parsed = json.loads(
+        instance.to_json(mock_nested_results_container, flatten_groups=True)
+    )
+    assert parsed[-1] == {"prop1": "val4", "group": "project2 / ACTIVE"}
+
+
+def test_to_json_include_group_summaries(instance):
+    """
+    Tests to_json method with include_group_summaries set - summaries are requested from results container
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.to_props.return_value = {
+        ("project1", "ACTIVE"): {"summary": {"count": 1}, "results": [{"prop1": 1}]}
+    }
+    parsed = json.loads(
+        instance.to_json(mock_results_container, include_group_summaries=True)
+    )
+    mock_results_container.to_props.assert_called_once_with(
+        *instance.selected_props, include_group_summaries=True
+    )
+    assert parsed == {
+        "project1, ACTIVE": {"summary": {"count": 1}, "results": [{"prop1": 1}]}
+    }
+
+
+def test_to_props_nested_groups_with_flatten(instance, mock_nested_results_container):
+    """
+    Tests to_props method with results in nested groups and flatten set
+    """
+    assert instance.to_props(mock_nested_results_container, flatten=True) == {
+        "project1": {
+            "ACTIVE": {"prop1": ["val1", "val2"]},
+            "ERROR": {"prop1": ["val3"]},
+        },
+        "project2": {"ACTIVE": {"prop1": ["val4"]}},
+    }
+
+
+@patch("openstackquery.query_blocks.query_output.tabulate")
+def test_to_string_builtin_renderer(mock_tabulate, instance):
+    """
+    Tests to_string uses the built-in table renderer by default - group titles are written before each table
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.to_props.return_value = {
+        "group1": [{"prop1": "val1"}],
+        "group2": [{"prop1": 2}],
+    }
+    res = instance.to_string(mock_results_container)
+    mock_tabulate.assert_not_called()
+    assert res == (
+        "group1:\n"
+        + "+-------+\n| prop1 |\n+=======+\n| val1  |\n+-------+\n\n"
+        + "group2:\n"
+        + "+-------+\n| prop1 |\n+=======+\n|     2 |\n+-------+\n\n"
+    )
+
+
+@patch("openstackquery.query_blocks.query_output.tabulate")
+def test_to_html_escapes_group_titles(mock_tabulate, instance):
+    """
+    Tests to_html escapes group names and cell values with the built-in table renderer
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.to_props.return_value = {"<group>": [{"prop1": "a&b"}]}
+    res = instance.to_html(mock_results_container)
+    mock_tabulate.assert_not_called()
+    assert res.startswith("<b>&lt;group&gt;:</b><br/><table>")
+    assert "<td>a&amp;b</td>" in res
+
+
+@patch("openstackquery.query_blocks.query_output.tabulate")
+def test_to_string_tabulate_fallback(mock_tabulate, instance):
+    """
+    Tests to_string falls back to tabulate when given tabulate kwargs - paging is still applied
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.to_props.return_value = [{"prop1": 1}, {"prop1": 2}]
+    mock_tabulate.return_value = "tabulate-output"
+    res = instance.to_string(mock_results_container, max_rows=1, floatfmt=".2f")
+    mock_tabulate.assert_called_once_with(
+        [[1]], ["prop1"], tablefmt="grid", floatfmt=".2f"
+    )
+    assert res == "tabulate-output\nshowing rows 1-1 of 2\n\n"
+
+
+def test_to_string_invalid_backend(instance):
+    """
+    Tests to_string raises error when given an unsupported table backend
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.to_props.return_value = [{"prop1": 1}]
+    with pytest.raises(ParseQueryError):
+        instance.to_string(mock_results_container, backend="invalid")
+
+
+def test_to_rows(instance):
+    """
+    Tests to_rows method forwards onto results container and limits output to given groups
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.to_rows.return_value = (
+        ("prop1",),
+        {"group1": [("val1",)], "group2": [("val2",)]},
+    )
+    res = instance.to_rows(mock_results_container, groups=["group2"], named=True)
+    mock_results_container.to_rows.assert_called_once_with(
+        *instance.selected_props, named=True
+    )
+    assert res == (("prop1",), {"group2": [("val2",)]})
@@ -0,0 +1,320 @@
+import gzip
+import io
+import json
+from unittest.mock import MagicMock, NonCallableMock, patch
+
+import pytest
+
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.query_output import QueryOutput
+from tests.mocks.mocked_props import MockProperties
+
+
+@pytest.fixture(name="instance")
+def instance_fixture():
+    """
+    Returns an instance with mocked prop_enum_cls inject
+    """
+    mock_prop_enum_cls = MockProperties
+    return QueryOutput(prop_enum_cls=mock_prop_enum_cls)
+
+
+@pytest.fixture(name="mock_streamed_results_container")
+def mock_streamed_results_container_fixture():
+    """
+    Returns a mock results container which outputs grouped rows one at a time
+    """
+
+    def _mock_streamed_results_container(groups):
+        """
+        sets up a mock results container holding given groups - a dict of group path to rows
+        (None for groups holding nested groups)
+        """
+        mock_results_container = MagicMock()
+        top_level = [path[0] for path in groups if len(path) == 1]
+        mock_results_container.group_names = top_level if top_level else None
+        mock_results_container.iter_props.side_effect = lambda *_, **__: (
+            (path, None if rows is None else iter(rows))
+            for path, rows in groups.items()
+        )
+        return mock_results_container
+
+    return _mock_streamed_results_container
+
+
+def test_write_csv_ungrouped(instance, mock_streamed_results_container):
+    """
+    Tests write_csv writes rows to a file object
+    """
+    mock_results_container = mock_streamed_results_container(
+        {(): [{"prop1": "val1", "prop2": "val2"}, {"prop1": "val3", "prop2": "val4"}]}
+    )
+    fp = io.StringIO()
+    instance.write_csv(mock_results_container, fp)
+    assert fp.getvalue().splitlines() == ["prop1,prop2", "val1,val2", "val3,val4"]
+    mock_results_container.iter_props.assert_called_once_with(
+        *instance.selected_props, groups=None
+    )
+
+
+@pytest.mark.parametrize("mock_rows", [[], [{}]])
+def test_write_csv_no_results(instance, mock_streamed_results_container, mock_rows):
+    """
+    Tests write_csv raises error if there are no results or no properties selected - nothing is written
+    """
+    fp = io.StringIO()
+    with pytest.raises(RuntimeError):
+        instance.write_csv(mock_streamed_results_container({(): mock_rows}), fp)
+    assert fp.getvalue() == ""
+
+
+def test_write_csv_grouped(instance, mock_streamed_results_container):
+    """
+    Tests write_csv writes a csv section for each group - and a single csv if flatten_groups is set
+    """
+    groups = {
+        ("group1",): [{"prop1": "val1"}, {"prop1": "val2"}],
+        ("group2",): [{"prop1": "val3"}],
+    }
+    fp = io.StringIO()
+    instance.write_csv(mock_streamed_results_container(groups), fp)
+    assert fp.getvalue().splitlines() == [
+        "# Group: group1",
+        "prop1",
+        "val1",
+        "val2",
+        "",
+        "# Group: group2",
+        "prop1",
+        "val3",
+    ]
+
+    fp = io.StringIO()
+    instance.write_csv(mock_streamed_results_container(groups), fp, flatten_groups=True)
+    assert fp.getvalue().splitlines() == [
+        "prop1,group",
+        "val1,group1",
+        "val2,group1",
+        "val3,group2",
+    ]
+
+
+def test_write_csv_to_compressed_path(
+    instance, mock_streamed_results_container, tmp_path
+):
+    """
+    Tests write_csv writes gzip compressed output to a file path
+    """
+    path = tmp_path / "out.csv.gz"
+    instance.write_csv(
+        mock_streamed_results_container({(): [{"prop1": "val1"}]}),
+        path,
+        compress=True,
+    )
+    with gzip.open(path, "rt") as f:
+        assert f.read().splitlines() == ["prop1", "val1"]
+
+
+def test_write_csv_invalid_group(instance, mock_streamed_results_container):
+    """
+    Tests write_csv raises error if given groups results aren't in
+    """
+    mock_results_container = mock_streamed_results_container({(): [{"prop1": 1}]})
+    with pytest.raises(ParseQueryError):
+        instance.write_csv(mock_results_container, io.StringIO(), groups=["group1"])
+
+
+def test_write_json_ungrouped(instance, mock_streamed_results_container):
+    """
+    Tests write_json writes the same output as to_json
+    """
+    rows = [{"prop1": "val1"}, {"prop1": "val2"}]
+    fp = io.StringIO()
+    instance.write_json(mock_streamed_results_container({(): rows}), fp)
+    assert fp.getvalue() == json.dumps(rows)
+
+
+def test_write_json_nested_groups(instance, mock_streamed_results_container):
+    """
+    Tests write_json writes nested groups as nested json objects - converting keys like json.dumps
+    """
+    fp = io.StringIO()
+    instance.write_json(
+        mock_streamed_results_container(
+            {
+                ("project1",): None,
+                ("project1", ("ACTIVE", 1)): [{"prop1": "val1"}],
+                ("project1", None): [],
+                ("project2",): None,
+                ("project3",): None,
+                ("project3", True): [{"prop1": "val2"}],
+            }
+        ),
+        fp,
+    )
+    assert fp.getvalue() == json.dumps(
+        {
+            "project1": {"ACTIVE, 1": [{"prop1": "val1"}], None: []},
+            "project2": {},
+            "project3": {True: [{"prop1": "val2"}]},
+        }
+    )
+
+
+def test_write_json_flatten_groups(instance, mock_streamed_results_container):
+    """
+    Tests write_json with flatten_groups writes a single list with the group of each row
+    """
+    fp = io.StringIO()
+    instance.write_json(
+        mock_streamed_results_container(
+            {
+                ("project1",): None,
+                ("project1", "ACTIVE"): [{"prop1": "val1"}],
+            }
+        ),
+        fp,
+        flatten_groups=True,
+    )
+    assert json.loads(fp.getvalue()) == [
+        {"prop1": "val1", "group": "project1 / ACTIVE"}
+    ]
+
+
+def test_write_ndjson(instance, mock_streamed_results_container):
+    """
+    Tests write_ndjson writes one json object per row - with gzip compression to a binary file object
+    """
+    fp = io.BytesIO()
+    instance.write_ndjson(
+        mock_streamed_results_container(
+            {("group1",): [{"prop1": "val1"}], ("group2",): [{"prop1": "val2"}]}
+        ),
+        fp,
+        compress=True,
+    )
+    assert not fp.closed
+    assert gzip.decompress(fp.getvalue()).decode().splitlines() == [
+        '{"prop1": "val1", "group": "group1"}',
+        '{"prop1": "val2", "group": "group2"}',
+    ]
+
+
+@patch("openstackquery.query_blocks.query_output.ColumnarOutput")
+def test_to_arrow(mock_columnar_output, instance):
+    """
+    Tests to_arrow method builds a table from results container columns
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.to_columns.return_value = (("prop1",), [[1, 2]], None)
+    res = instance.to_arrow(mock_results_container, dictionary_threshold=0.2)
+    mock_columnar_output.assert_called_once_with(instance.DEFAULT_OUT, 0.2)
+    mock_results_container.to_columns.assert_called_once_with(*instance.selected_props)
+    mock_to_arrow = mock_columnar_output.return_value.to_arrow
+    mock_to_arrow.assert_called_once_with(("prop1",), [[1, 2]], None)
+    assert res == mock_to_arrow.return_value
+
+
+@patch("openstackquery.query_blocks.query_output.ColumnarOutput")
+def test_to_arrow_grouped(mock_columnar_output, instance):
+    """
+    Tests to_arrow method when results are grouped - adds group labels and limits rows to given groups
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.group_names = ["group1", ("group2", 1)]
+    mock_results_container.to_columns.return_value = (
+        ("prop1",),
+        [[1, 2, 3]],
+        [("group1",), (("group2", 1), "sub1"), (("group2", 1), "sub2")],
+    )
+    instance.to_arrow(mock_results_container, groups=[("group2", 1)])
+    mock_columnar_output.return_value.to_arrow.assert_called_once_with(
+        ("prop1",), [[2, 3]], ["group2, 1 / sub1", "group2, 1 / sub2"]
+    )
+
+
+def test_to_arrow_invalid_groups(instance):
+    """
+    Tests to_arrow method raises error when results aren't grouped but groups given
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.group_names = None
+    with pytest.raises(ParseQueryError):
+        instance.to_arrow(mock_results_container, groups=["group1"])
+
+
+@pytest.mark.parametrize("output_func", ["to_pandas", "to_polars"])
+@patch("openstackquery.query_blocks.query_output.ColumnarOutput")
+@patch.object(QueryOutput, "to_arrow")
+def test_to_dataframe(mock_to_arrow, mock_columnar_output, output_func, instance):
+    """
+    Tests to_pandas and to_polars methods convert the table from to_arrow
+    """
+    mock_results_container = NonCallableMock()
+    res = getattr(instance, output_func)(mock_results_container, ["group1"], 0.2)
+    mock_to_arrow.assert_called_once_with(mock_results_container, ["group1"], 0.2)
+    mock_convert = getattr(mock_columnar_output.return_value, output_func)
+    mock_convert.assert_called_once_with(mock_to_arrow.return_value)
+    assert res == mock_convert.return_value
+
+
+@patch("openstackquery.query_blocks.query_output.ColumnarOutput")
+@patch.object(QueryOutput, "to_arrow")
+def test_write_parquet(mock_to_arrow, mock_columnar_output, instance):
+    """
+    Tests write_parquet method writes the table from to_arrow
+    """
+    mock_results_container = NonCallableMock()
+    instance.write_parquet(mock_results_container, "out.parquet", ["group1"], "zstd")
+    mock_to_arrow.assert_called_once_with(mock_results_container, ["group1"])
+    mock_columnar_output.return_value.write_parquet.assert_called_once_with(
+        mock_to_arrow.return_value, "out.parquet", "zstd"
+    )
+
+
+@patch("openstackquery.query_blocks.query_output.SqliteOutput")
+def test_to_sqlite(mock_sqlite_output, instance):
+    """
+    Tests to_sqlite method loads results container columns into a table - with a group column
+    if results are grouped
+    """
+    mock_results_container = MagicMock()
+    mock_results_container.group_names = ["group1"]
+    mock_results_container.to_columns.return_value = (("prop1",), [[1]], [("group1",)])
+    mock_conn = NonCallableMock()
+    instance.to_sqlite(
+        mock_results_container,
+        mock_conn,
+        "table1",
+        index_props=[MockProperties.PROP_1],
+        if_exists="replace",
+    )
+    mock_sqlite_output.assert_called_once_with(instance.DEFAULT_OUT)
+    mock_sqlite_output.return_value.load.assert_called_once_with(
+        mock_conn,
+        "table1",
+        ("prop1", "group"),
+        [[1], ["group1"]],
+        index_columns=["prop_1"],
+        if_exists="replace",
+    )
+
+
+@patch("openstackquery.query_blocks.query_output.SnapshotFile")
+@patch.object(QueryOutput, "to_objects")
+def test_write_snapshot(mock_to_objects, mock_snapshot_file, instance):
+    """
+    Tests write_snapshot method writes result objects - from every group - to a snapshot file
+    """
+    mock_to_objects.return_value = {"group1": [1, 2], "group2": {"sub": [3]}}
+    mock_results_container = NonCallableMock()
+    res = instance.write_snapshot(
+        mock_results_container, "out.snap", "server", ["group1", "group2"]
+    )
+    mock_to_objects.assert_called_once_with(
+        mock_results_container, ["group1", "group2"]
+    )
+    mock_snapshot_file.write.assert_called_once_with(
+        "out.snap", [1, 2, 3], MockProperties, "server"
+    )
+    assert res == mock_snapshot_file.write.return_value
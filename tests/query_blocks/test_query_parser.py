@@ -1,13 +1,20 @@
-from unittest.mock import patch, NonCallableMock
+from unittest.mock import ANY, call, patch, NonCallableMock
 import pytest
 
+from openstackquery.enums.aggregate_func import AggregateFunc
+from openstackquery.enums.sort_order import SortOrder
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+
+from openstackquery.query_blocks.group_node import GroupNode
 from openstackquery.query_blocks.query_parser import QueryParser
+from tests.mocks.mocked_props import MockProperties
 
 
 @pytest.fixture(name="instance")
+@patch("openstackquery.query_blocks.query_parser.QueryAggregator")
 @patch("openstackquery.query_blocks.query_parser.QueryGrouper")
 @patch("openstackquery.query_blocks.query_parser.QuerySorter")
-def instance_fixture(mock_sorter, mock_grouper):
+def instance_fixture(mock_sorter, mock_grouper, mock_aggregator):
     """
     Returns an instance of QueryParser with mocked injects
     """
@@ -15,6 +22,7 @@ def instance_fixture(mock_sorter, mock_grouper):
     parser = QueryParser(mock_prop_enum_cls)
     mock_sorter.assert_called_once_with(mock_prop_enum_cls)
     mock_grouper.assert_called_once_with(mock_prop_enum_cls)
+    mock_aggregator.assert_called_once_with(mock_prop_enum_cls)
     return parser
 
 
@@ -25,9 +33,12 @@ def test_parse_group_by(instance):
     mock_group_by = NonCallableMock()
     mock_group_ranges = NonCallableMock()
     mock_include_missing = NonCallableMock()
-    instance.parse_group_by(mock_group_by, mock_group_ranges, mock_include_missing)
+    mock_bucket = NonCallableMock()
+    instance.parse_group_by(
+        mock_group_by, mock_group_ranges, mock_include_missing, mock_bucket
+    )
     instance.grouper.parse_group_by.assert_called_once_with(
-        mock_group_by, mock_group_ranges, mock_include_missing
+        mock_group_by, mock_group_ranges, mock_include_missing, mock_bucket
     )
 
 
@@ -47,7 +58,7 @@ def test_run_parser_sort_by_only(instance):
     instance.parse_sort_by(NonCallableMock())
     mock_obj_list = NonCallableMock()
     res = instance.run_parser(mock_obj_list)
-    instance.sorter.run_sort_by.assert_called_once_with(mock_obj_list)
+    instance.sorter.run_sort_by.assert_called_once_with(mock_obj_list, limit=None)
     assert res == instance.sorter.run_sort_by.return_value
 
 
@@ -71,11 +82,14 @@ def test_run_parser_both_group_and_sort(instance):
 
     mock_obj_list = NonCallableMock()
     res = instance.run_parser(mock_obj_list)
-    instance.sorter.run_sort_by.assert_called_once_with(mock_obj_list)
-    instance.grouper.run_group_by.assert_called_once_with(
-        instance.sorter.run_sort_by.return_value
+    instance.grouper.run_group_by.assert_called_once_with(mock_obj_list)
+    instance.sorter.run_sort_by.assert_not_called()
+    instance.sorter.run_sort_by_groups.assert_called_once_with(
+        instance.grouper.run_group_by.return_value,
+        limit=None,
+        order_groups=not instance.grouper.has_fixed_order,
     )
-    assert res == instance.grouper.run_group_by.return_value
+    assert res == instance.sorter.run_sort_by_groups.return_value
 
 
 def test_run_parser_neither_set(instance):
@@ -85,3 +99,314 @@ def test_run_parser_neither_set(instance):
     mock_obj_list = NonCallableMock()
     res = instance.run_parser(mock_obj_list)
     assert res == mock_obj_list
+
+
+@pytest.mark.parametrize(
+    "mock_limit, mock_offset, expected_out",
+    [(2, 0, [1, 2]), (2, 1, [2, 3]), (0, 0, []), (2, 5, [])],
+)
+def test_run_parser_with_limit(instance, mock_limit, mock_offset, expected_out):
+    """
+    Tests run_parser method with only limit being set
+    should output only results between offset and offset + limit
+    """
+    instance.parse_limit(mock_limit, mock_offset)
+    res = instance.run_parser([1, 2, 3, 4])
+    assert res == expected_out
+    assert instance.get_fetch_limit() == mock_offset + mock_limit
+
+
+def test_run_parser_sort_with_limit(instance):
+    """
+    Tests run_parser method with sort_by and limit being set
+    should forward offset + limit onto sorter so only top results are sorted
+    """
+    instance.parse_sort_by(NonCallableMock())
+    instance.parse_limit(2, 1)
+    instance.sorter.run_sort_by.return_value = [1, 2, 3]
+    res = instance.run_parser(NonCallableMock())
+    instance.sorter.run_sort_by.assert_called_once_with(ANY, limit=3)
+    assert res == [2, 3]
+    # all results need to be found first before sorting - unless sorted by openstack API
+    assert instance.get_fetch_limit() is None
+    assert instance.get_fetch_limit(sort_pushed_down=True) == 3
+
+
+def test_run_parser_group_with_limit(instance):
+    """
+    Tests run_parser method with group_by and limit being set
+    should apply limit to each group
+    """
+    instance.parse_group_by(NonCallableMock())
+    instance.parse_limit(1)
+    instance.grouper.run_group_by.return_value = {"a": [1, 2], "b": [3]}
+    res = instance.run_parser(NonCallableMock())
+    assert res == {"a": [1], "b": [3]}
+    assert instance.get_fetch_limit(sort_pushed_down=True) is None
+
+
+def test_run_parser_aggregate_with_limit(instance):
+    """
+    Tests run_parser method with aggregate and limit being set
+    should aggregate every result - so all results need to be found
+    """
+    instance.parse_aggregate(NonCallableMock())
+    instance.parse_limit(2)
+    mock_obj_list = NonCallableMock()
+    res = instance.run_parser(mock_obj_list)
+    instance.aggregator.run_aggregate.assert_called_once_with(mock_obj_list)
+    assert res == [instance.aggregator.run_aggregate.return_value]
+    assert instance.get_fetch_limit() is None
+    assert instance.get_fetch_limit(sort_pushed_down=True) is None
+
+
+def test_parse_limit_invalid(instance):
+    """
+    Tests parse_limit method raises error when given negative values
+    """
+    with pytest.raises(ParseQueryError):
+        instance.parse_limit(-1)
+
+
+def test_parse_limit_none(instance):
+    """
+    Tests parse_limit method removes the limit when given None - keeping offset
+    """
+    instance.parse_limit(3, 1)
+    assert (instance.limit, instance.offset) == (3, 1)
+    instance.parse_limit(None, 1)
+    assert (instance.limit, instance.offset) == (None, 1)
+    assert instance.get_fetch_limit() is None
+
+
+def test_sort_by(instance):
+    """
+    Tests sort_by property returns sorter specs only if sorting has been set
+    """
+    assert instance.sort_by == {}
+    instance.parse_sort_by(NonCallableMock())
+    assert instance.sort_by == instance.sorter.sort_by
+
+
+@patch("openstackquery.query_blocks.query_parser.QueryGrouper")
+def test_groupers(mock_grouper, instance):
+    """
+    Tests groupers property returns a grouper per level of groups - only if grouping has been set
+    """
+    assert instance.groupers == []
+    instance.parse_group_by(NonCallableMock())
+    instance.parse_subgroup_by(NonCallableMock())
+    assert instance.groupers == [instance.grouper, mock_grouper.return_value]
+
+
+def test_parse_aggregate(instance):
+    """
+    Tests parse_aggregate method forwards onto aggregator
+    """
+    mock_aggregation = NonCallableMock()
+    assert not instance.has_aggregations
+    instance.parse_aggregate(mock_aggregation)
+    instance.aggregator.parse_aggregate.assert_called_once_with(mock_aggregation)
+    assert instance.has_aggregations
+
+
+def test_run_parser_aggregate_only(instance):
+    """
+    Tests run_parser method with only aggregate set
+    should return a single row of aggregated results - sort and limit are not applied
+    """
+    instance.parse_aggregate(NonCallableMock())
+    instance.parse_sort_by(NonCallableMock())
+    instance.parse_limit(1)
+    mock_obj_list = NonCallableMock()
+    res = instance.run_parser(mock_obj_list)
+    instance.aggregator.run_aggregate.assert_called_once_with(mock_obj_list)
+    instance.sorter.run_sort_by.assert_not_called()
+    assert res == [instance.aggregator.run_aggregate.return_value]
+
+
+def test_run_parser_aggregate_and_group(instance):
+    """
+    Tests run_parser method with aggregate and group_by set
+    should return one row of aggregated results per group
+    """
+    instance.parse_aggregate(NonCallableMock())
+    instance.parse_group_by(NonCallableMock())
+    instance.grouper.run_group_by.return_value = {"group1": [1, 2], "group2": [3]}
+    instance.aggregator.run_aggregate.side_effect = ["agg1", "agg2"]
+
+    res = instance.run_parser(NonCallableMock())
+    assert res == {"group1": ["agg1"], "group2": ["agg2"]}
+    instance.aggregator.run_aggregate.assert_has_calls([call([1, 2]), call([3])])
+
+
+def test_parse_subgroup_by_no_group_by(instance):
+    """
+    Tests parse_subgroup_by raises error if group_by has not been set
+    """
+    with pytest.raises(ParseQueryError):
+        instance.parse_subgroup_by(NonCallableMock())
+
+
+@patch("openstackquery.query_blocks.query_parser.QueryGrouper")
+def test_parse_subgroup_by(mock_grouper):
+    """
+    Tests parse_subgroup_by adds a new grouper for each level - and parse_group_by resets levels
+    """
+    instance = QueryParser(MockProperties)
+    instance.parse_group_by(NonCallableMock())
+    mock_grouper.reset_mock()
+    mock_group_by = NonCallableMock()
+    mock_group_ranges = NonCallableMock()
+    mock_include_missing = NonCallableMock()
+    mock_bucket = NonCallableMock()
+    instance.parse_subgroup_by(
+        mock_group_by, mock_group_ranges, mock_include_missing, mock_bucket
+    )
+    mock_grouper.assert_called_once_with(MockProperties)
+    mock_grouper.return_value.parse_group_by.assert_called_once_with(
+        mock_group_by, mock_group_ranges, mock_include_missing, mock_bucket
+    )
+    assert instance.subgroupers == [mock_grouper.return_value]
+
+    instance.parse_group_by(NonCallableMock())
+    assert not instance.subgroupers
+
+
+@pytest.fixture(name="run_nested_parser")
+def run_nested_parser_fixture(mock_results_container, mock_get_prop_mapping):
+    """
+    Fixture which runs a QueryParser (without mocked injects) with nested groups set
+    """
+
+    def _run_nested_parser(configure_parser):
+        """
+        configures a parser with given function and runs it on a set of mock results
+        """
+        parser = QueryParser(MockProperties)
+        configure_parser(parser)
+        obj_list = mock_results_container(
+            [
+                {"prop_1": "project1", "prop_2": "ACTIVE", "prop_3": 2},
+                {"prop_1": "project2", "prop_2": "ACTIVE", "prop_3": 4},
+                {"prop_1": "project1", "prop_2": "SHUTOFF", "prop_3": 8},
+                {"prop_1": "project1", "prop_2": "ACTIVE", "prop_3": 1},
+            ]
+        )
+        with patch.object(
+            MockProperties, "get_prop_mapping", wraps=mock_get_prop_mapping
+        ):
+            return obj_list, parser.run_parser(obj_list)
+
+    return _run_nested_parser
+
+
+def test_run_parser_nested_group_by(run_nested_parser):
+    """
+    Tests run_parser with nested groups - should group all levels with counts for each group
+    """
+    obj_list, res = run_nested_parser(
+        lambda parser: (
+            parser.parse_group_by(MockProperties.PROP_1),
+            parser.parse_subgroup_by(MockProperties.PROP_2),
+        )
+    )
+    assert isinstance(res, GroupNode)
+    assert res.count == 4
+    assert res.to_dict(list) == {
+        "project1": {
+            "ACTIVE": [obj_list[0], obj_list[3]],
+            "SHUTOFF": [obj_list[2]],
+        },
+        "project2": {"ACTIVE": [obj_list[1]]},
+    }
+    assert res.get_summaries() == {
+        ("project1",): {"count": 3},
+        ("project1", "ACTIVE"): {"count": 2},
+        ("project1", "SHUTOFF"): {"count": 1},
+        ("project2",): {"count": 1},
+        ("project2", "ACTIVE"): {"count": 1},
+    }
+
+
+def test_run_parser_nested_group_by_ranges(run_nested_parser):
+    """
+    Tests run_parser with nested groups using group ranges - empty groups are always outputted
+    """
+    obj_list, res = run_nested_parser(
+        lambda parser: (
+            parser.parse_group_by(MockProperties.PROP_1),
+            parser.parse_subgroup_by(
+                MockProperties.PROP_2,
+                {"running": ["ACTIVE"], "error": ["ERROR"]},
+                include_missing=True,
+            ),
+        )
+    )
+    assert res.to_dict(list) == {
+        "project1": {
+            "running": [obj_list[0], obj_list[3]],
+            "error": [],
+            "ungrouped results": [obj_list[2]],
+        },
+        "project2": {"running": [obj_list[1]], "error": [], "ungrouped results": []},
+    }
+
+
+def test_run_parser_nested_group_by_sort_and_limit(run_nested_parser):
+    """
+    Tests run_parser with nested groups - sort and limit are applied in each innermost group
+    """
+    obj_list, res = run_nested_parser(
+        lambda parser: (
+            parser.parse_group_by(MockProperties.PROP_1),
+            parser.parse_subgroup_by(MockProperties.PROP_2),
+            parser.parse_sort_by((MockProperties.PROP_3, SortOrder.DESC)),
+            parser.parse_limit(1),
+        )
+    )
+    assert res.to_dict(list) == {
+        "project1": {"ACTIVE": [obj_list[0]], "SHUTOFF": [obj_list[2]]},
+        "project2": {"ACTIVE": [obj_list[1]]},
+    }
+    # counts are not affected by limit
+    assert res.get_summaries()[("project1", "ACTIVE")] == {"count": 2}
+
+
+def test_run_parser_nested_group_by_aggregate(run_nested_parser):
+    """
+    Tests run_parser with nested groups and aggregations - each group's summary holds aggregated values
+    and innermost groups output one row of aggregated values
+    """
+    _, res = run_nested_parser(
+        lambda parser: (
+            parser.parse_group_by(MockProperties.PROP_1),
+            parser.parse_subgroup_by(MockProperties.PROP_2),
+            parser.parse_aggregate((AggregateFunc.SUM, MockProperties.PROP_3)),
+        )
+    )
+    assert res.to_dict(lambda results: [item.as_props() for item in results]) == {
+        "project1": {"ACTIVE": [{"sum_prop_3": 3}], "SHUTOFF": [{"sum_prop_3": 8}]},
+        "project2": {"ACTIVE": [{"sum_prop_3": 4}]},
+    }
+    assert res.get_summaries()[("project1",)] == {"count": 3, "sum_prop_3": 11}
+
+
+@patch("openstackquery.query_blocks.query_parser.QueryGrouper")
+def test_fingerprint(_, instance):
+    """
+    Tests fingerprint changes whenever parsing is re-configured - and only then
+    """
+    fingerprints = [instance.fingerprint]
+    assert instance.fingerprint == fingerprints[-1]
+    for configure in [
+        lambda: instance.parse_sort_by(NonCallableMock()),
+        lambda: instance.parse_group_by(NonCallableMock()),
+        lambda: instance.parse_subgroup_by(NonCallableMock()),
+        lambda: instance.parse_aggregate(NonCallableMock()),
+        lambda: instance.parse_limit(1),
+        instance.reset_group_by,
+    ]:
+        configure()
+        assert instance.fingerprint not in fingerprints
+        fingerprints.append(instance.fingerprint)
@@ -35,7 +35,7 @@ def run_sort_by_runner_fixture(instance, mock_get_prop_mapping):
             res = instance.run_sort_by(obj_list)
             assert [item.as_object() for item in res] == expected_list
             mock_get_prop_func.assert_has_calls(
-                [call(sort_key) for sort_key, _ in reversed(sort_by_specs)]
+                [call(sort_key) for sort_key, _ in sort_by_specs]
             )
 
     return _run_sort_by_runner
@@ -213,3 +213,97 @@ def test_run_sort_with_boolean(
         mock_as_object_vals, key=lambda k: k[mock_prop_name], reverse=reverse
     )
     run_sort_by_runner(mock_obj_list, mock_sort_by_specs, expected_list)
+
+
+@pytest.mark.parametrize(
+    "mock_order, expected_list",
+    [
+        (SortOrder.ASC, [{"prop_1": "a"}, {"prop_1": "b"}, {"prop_1": None}]),
+        (SortOrder.DESC, [{"prop_1": "b"}, {"prop_1": "a"}, {"prop_1": None}]),
+    ],
+)
+def test_run_sort_with_none_values(
+    mock_order, expected_list, run_sort_by_runner, mock_results_container
+):
+    """
+    Tests that run_sort functions expectedly - when some values are None
+    Should not fail and None values should always be placed last
+    """
+    mock_as_object_vals = [{"prop_1": None}, {"prop_1": "b"}, {"prop_1": "a"}]
+    mock_obj_list = mock_results_container(mock_as_object_vals)
+    run_sort_by_runner(
+        mock_obj_list, [(MockProperties.PROP_1, mock_order)], expected_list
+    )
+
+
+def test_run_sort_with_mixed_types(run_sort_by_runner, mock_results_container):
+    """
+    Tests that run_sort functions expectedly - when values are of types that can't be compared
+    Should not fail and should order values by type name first
+    """
+    mock_as_object_vals = [{"prop_1": "b"}, {"prop_1": 2}, {"prop_1": "a"}]
+    mock_obj_list = mock_results_container(mock_as_object_vals)
+    run_sort_by_runner(
+        mock_obj_list,
+        [(MockProperties.PROP_1, SortOrder.ASC)],
+        [{"prop_1": 2}, {"prop_1": "a"}, {"prop_1": "b"}],
+    )
+
+
+def test_run_sort_with_limit(instance, mock_results_container):
+    """
+    Tests that run_sort functions expectedly - when a limit is given
+    Should return only the first 'limit' results in sorted order - keeping ties stable
+    """
+    mock_as_object_vals = [
+        {"prop_1": "c", "prop_2": 1},
+        {"prop_1": "a", "prop_2": 2},
+        {"prop_1": "b", "prop_2": 3},
+        {"prop_1": "a", "prop_2": 4},
+    ]
+    mock_obj_list = mock_results_container(mock_as_object_vals)
+    instance.parse_sort_by((MockProperties.PROP_1, SortOrder.ASC))
+    with patch.object(
+        MockProperties,
+        "get_prop_mapping",
+        return_value=lambda obj: obj["prop_1"],
+    ):
+        res = instance.run_sort_by(mock_obj_list, limit=3)
+    assert [item.as_object() for item in res] == [
+        {"prop_1": "a", "prop_2": 2},
+        {"prop_1": "a", "prop_2": 4},
+        {"prop_1": "b", "prop_2": 3},
+    ]
+
+
+@pytest.mark.parametrize("mock_order_groups", [True, False])
+def test_run_sort_by_groups(instance, mock_order_groups, mock_results_container):
+    """
+    Tests that run_sort_by_groups functions expectedly
+    Should sort within each group and re-order groups by their first result if order_groups is set
+    """
+    group_1 = mock_results_container([{"prop_1": "d"}, {"prop_1": "c"}])
+    group_2 = mock_results_container([{"prop_1": "b"}, {"prop_1": "a"}])
+    instance.parse_sort_by((MockProperties.PROP_1, SortOrder.ASC))
+    with patch.object(
+        MockProperties,
+        "get_prop_mapping",
+        return_value=lambda obj: obj["prop_1"],
+    ):
+        res = instance.run_sort_by_groups(
+            {"group_1": group_1, "group_2": group_2},
+            order_groups=mock_order_groups,
+        )
+
+    expected_order = (
+        ["group_2", "group_1"] if mock_order_groups else ["group_1", "group_2"]
+    )
+    assert list(res.keys()) == expected_order
+    assert [i.as_object() for i in res["group_1"]] == [
+        {"prop_1": "c"},
+        {"prop_1": "d"},
+    ]
+    assert [i.as_object() for i in res["group_2"]] == [
+        {"prop_1": "a"},
+        {"prop_1": "b"},
+    ]
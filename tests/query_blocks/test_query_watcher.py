@@ -0,0 +1,80 @@
+import pytest
+
+from openstackquery.query_blocks.query_watcher import QueryWatcher
+from openstackquery.structs.change_event import ChangeEvent
+
+
+@pytest.fixture(name="instance")
+def instance_fixture():
+    """
+    Returns an instance which has seen two rows
+    """
+    watcher = QueryWatcher()
+    watcher.update({"a": {"name": "vm-a", "status": "ACTIVE"}, "b": {"name": "vm-b"}})
+    return watcher
+
+
+def test_update_first_time():
+    """
+    Tests that every row is added the first time update is called
+    """
+    watcher = QueryWatcher()
+    assert watcher.update({"a": {"name": "vm-a"}}) == [
+        ChangeEvent("added", "a", {"name": "vm-a"})
+    ]
+    assert len(watcher) == 1
+
+
+def test_update_unchanged(instance):
+    """
+    Tests that no events are returned when rows are unchanged - regardless of key order within rows
+    """
+    assert not instance.update(
+        {"a": {"status": "ACTIVE", "name": "vm-a"}, "b": {"name": "vm-b"}}
+    )
+
+
+def test_update_full(instance):
+    """
+    Tests that rows missing from a full update are removed - and changed rows hold old and new values
+    of only the properties changed
+    """
+    events = instance.update(
+        {"a": {"name": "vm-a", "status": "SHUTOFF"}, "c": {"name": "vm-c"}}
+    )
+    assert events == [
+        ChangeEvent(
+            "changed",
+            "a",
+            {"name": "vm-a", "status": "SHUTOFF"},
+            {"status": ("ACTIVE", "SHUTOFF")},
+        ),
+        ChangeEvent("added", "c", {"name": "vm-c"}),
+        ChangeEvent("removed", "b", {"name": "vm-b"}),
+    ]
+    assert len(instance) == 2
+
+
+def test_update_incremental(instance):
+    """
+    Tests that only rows with the keys given are checked when keys are given - keys given but missing
+    from rows are removed, and other rows are kept
+    """
+    events = instance.update({"c": {"name": "vm-c"}}, keys=["b", "c", "d"])
+    assert events == [
+        ChangeEvent("added", "c", {"name": "vm-c"}),
+        ChangeEvent("removed", "b", {"name": "vm-b"}),
+    ]
+    assert len(instance) == 2
+    assert not instance.update({"a": {"name": "vm-a", "status": "ACTIVE"}}, keys=["a"])
+
+
+def test_get_changes():
+    """
+    Tests that get_changes returns properties added, removed or changed
+    """
+    assert QueryWatcher.get_changes({"a": 1, "b": 2}, {"b": 3, "c": 4}) == {
+        "a": (1, None),
+        "b": (2, 3),
+        "c": (None, 4),
+    }
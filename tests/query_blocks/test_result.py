@@ -105,3 +105,12 @@ def test_get_prop_not_found(mock_get_prop_func, instance):
         res = instance.get_prop(MockProperties.PROP_2)
     mock_get_prop_mapping.assert_called_once_with(MockProperties.PROP_2)
     assert res == "Not Found"
+
+
+def test_forwarded_props(instance):
+    """
+    test property getter forwarded_props
+    """
+    assert instance.forwarded_props == {}
+    instance.update_forwarded_properties({"forwarded_prop": "val"})
+    assert instance.forwarded_props == {"forwarded_prop": "val"}
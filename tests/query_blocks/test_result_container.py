@@ -2,7 +2,10 @@ import copy
 from unittest.mock import MagicMock, patch, call, NonCallableMock
 import pytest
 
+from openstackquery.query_blocks.aggregate_result import AggregateResult
+from openstackquery.query_blocks.group_node import GroupNode
 from openstackquery.query_blocks.results_container import ResultsContainer
+from openstackquery.exceptions.parse_query_error import ParseQueryError
 from tests.mocks.mocked_props import MockProperties
 
 
@@ -40,8 +43,8 @@ def test_to_props_not_parsed(setup_instance_with_results):
     """
     Test to_props method when results are not parsed
     """
-    mock_res1 = MagicMock()
-    mock_res2 = MagicMock()
+    mock_res1 = MagicMock(**{"as_props.return_value": {"prop_1": "val1"}})
+    mock_res2 = MagicMock(**{"as_props.return_value": {"prop_1": "val2"}})
 
     instance = setup_instance_with_results([mock_res1, mock_res2])
     res = instance.to_props(MockProperties.PROP_1, MockProperties.PROP_2)
@@ -66,8 +69,8 @@ def test_to_props_parsed_to_list(setup_instance_with_results):
         """a parse func that doesn't do anything"""
         return results
 
-    mock_res1 = MagicMock()
-    mock_res2 = MagicMock()
+    mock_res1 = MagicMock(**{"as_props.return_value": {"prop_1": "val1"}})
+    mock_res2 = MagicMock(**{"as_props.return_value": {"prop_1": "val2"}})
 
     instance = setup_instance_with_results([mock_res1, mock_res2])
     instance.parse_results(mock_parse_func)
@@ -85,6 +88,17 @@ def test_to_props_parsed_to_list(setup_instance_with_results):
     assert res == [mock_res1.as_props.return_value, mock_res2.as_props.return_value]
 
 
+def test_to_props_parsed_to_empty_list(setup_instance_with_results):
+    """
+    Test to_props method when results have been parsed to an empty list (i.e. offset past end of results)
+    should return empty list instead of falling back to unparsed results
+    """
+    mock_results = [MagicMock(), MagicMock()]
+    instance = setup_instance_with_results(mock_results)
+    instance.parse_results(lambda results: [])
+    assert instance.to_props(MockProperties.PROP_1) == []
+
+
 def test_to_props_parsed_and_grouped(setup_instance_with_results):
     """
     Test to_props method when results are parsed into a dict (grouped)
@@ -94,8 +108,8 @@ def test_to_props_parsed_and_grouped(setup_instance_with_results):
         """a parse func that returns a dictionary"""
         return {"group1": [results[0]], "group2": [results[1]]}
 
-    mock_res1 = MagicMock()
-    mock_res2 = MagicMock()
+    mock_res1 = MagicMock(**{"as_props.return_value": {"prop_1": "val1"}})
+    mock_res2 = MagicMock(**{"as_props.return_value": {"prop_1": "val2"}})
 
     instance = setup_instance_with_results([mock_res1, mock_res2])
     instance.parse_results(mock_parse_func)
@@ -129,8 +143,8 @@ def test_to_objects_not_parsed(setup_instance_with_results):
     """
     Test to_objects method when results are not parsed
     """
-    mock_res1 = MagicMock()
-    mock_res2 = MagicMock()
+    mock_res1 = MagicMock(**{"as_props.return_value": {"prop_1": "val1"}})
+    mock_res2 = MagicMock(**{"as_props.return_value": {"prop_1": "val2"}})
 
     instance = setup_instance_with_results([mock_res1, mock_res2])
     res = instance.to_objects()
@@ -151,8 +165,8 @@ def test_to_object_parsed_to_list(setup_instance_with_results):
         """a parse func that doesn't do anything"""
         return results
 
-    mock_res1 = MagicMock()
-    mock_res2 = MagicMock()
+    mock_res1 = MagicMock(**{"as_props.return_value": {"prop_1": "val1"}})
+    mock_res2 = MagicMock(**{"as_props.return_value": {"prop_1": "val2"}})
 
     instance = setup_instance_with_results([mock_res1, mock_res2])
     instance.parse_results(mock_parse_func)
@@ -173,8 +187,8 @@ def test_to_object_parsed_and_grouped(setup_instance_with_results):
         """a parse func that returns a dictionary"""
         return {"group1": [results[0]], "group2": [results[1]]}
 
-    mock_res1 = MagicMock()
-    mock_res2 = MagicMock()
+    mock_res1 = MagicMock(**{"as_props.return_value": {"prop_1": "val1"}})
+    mock_res2 = MagicMock(**{"as_props.return_value": {"prop_1": "val2"}})
 
     instance = setup_instance_with_results([mock_res1, mock_res2])
     instance.parse_results(mock_parse_func)
@@ -189,6 +203,382 @@ def test_to_object_parsed_and_grouped(setup_instance_with_results):
     }
 
 
+@pytest.fixture(name="nested_instance")
+def nested_instance_fixture(setup_instance_with_results):
+    """
+    Fixture which returns a ResultsContainer with results parsed into nested groups
+    """
+
+    def mock_parse_func(results):
+        """a parse func that returns nested groups"""
+        root = GroupNode([[], []])
+        group = root.get_child("group1")
+        group.summary = {"count": 2}
+        for i, name in enumerate(["subgroup1", "subgroup2"]):
+            subgroup = group.get_child(name)
+            subgroup.summary = {"count": 1}
+            subgroup.results.append(results[i])
+        return root
+
+    instance = setup_instance_with_results(
+        [
+            MagicMock(**{"as_props.return_value": {"prop_1": "val1"}}),
+            MagicMock(**{"as_props.return_value": {"prop_1": "val2"}}),
+        ]
+    )
+    instance.parse_results(mock_parse_func)
+    return instance
+
+
+def test_to_props_parsed_to_nested_groups(nested_instance):
+    """
+    Test to_props method when results are parsed into nested groups
+    """
+    res1, res2 = nested_instance.iter_results()
+    assert nested_instance.to_props(MockProperties.PROP_1) == {
+        "group1": {
+            "subgroup1": [res1.as_props.return_value],
+            "subgroup2": [res2.as_props.return_value],
+        }
+    }
+    res1.as_props.assert_called_once_with(MockProperties.PROP_1)
+
+
+def test_to_props_parsed_to_nested_groups_with_summaries(nested_instance):
+    """
+    Test to_props method when results are parsed into nested groups and summaries are requested
+    """
+    res1, res2 = nested_instance.iter_results()
+    assert nested_instance.to_props(
+        MockProperties.PROP_1, include_group_summaries=True
+    ) == {
+        "group1": {
+            "summary": {"count": 2},
+            "groups": {
+                "subgroup1": {
+                    "summary": {"count": 1},
+                    "results": [res1.as_props.return_value],
+                },
+                "subgroup2": {
+                    "summary": {"count": 1},
+                    "results": [res2.as_props.return_value],
+                },
+            },
+        }
+    }
+
+
+def test_to_objects_parsed_to_nested_groups(nested_instance):
+    """
+    Test to_objects method when results are parsed into nested groups
+    """
+    res1, res2 = nested_instance.iter_results()
+    assert nested_instance.to_objects() == {
+        "group1": {
+            "subgroup1": [res1.as_object.return_value],
+            "subgroup2": [res2.as_object.return_value],
+        }
+    }
+
+
+def test_get_group_summaries(nested_instance, setup_instance_with_results):
+    """
+    Test get_group_summaries returns summaries of nested groups - or an empty dict if not nested
+    """
+    assert nested_instance.get_group_summaries() == {
+        ("group1",): {"count": 2},
+        ("group1", "subgroup1"): {"count": 1},
+        ("group1", "subgroup2"): {"count": 1},
+    }
+    assert setup_instance_with_results([MagicMock()]).get_group_summaries() == {}
+
+
+def test_parse_results_with_fingerprint(setup_instance_with_results):
+    """
+    Test parse_results method reuses parsed results when given the same fingerprint
+    """
+    mock_parse_func = MagicMock(side_effect=list)
+    instance = setup_instance_with_results([MagicMock()])
+
+    instance.parse_results(mock_parse_func, "fingerprint1")
+    instance.parse_results(mock_parse_func, "fingerprint1")
+    mock_parse_func.assert_called_once()
+
+    instance.parse_results(mock_parse_func, "fingerprint2")
+    assert mock_parse_func.call_count == 2
+
+    # no fingerprint - always parsed
+    instance.parse_results(mock_parse_func)
+    instance.parse_results(mock_parse_func)
+    assert mock_parse_func.call_count == 4
+
+
+@patch("openstackquery.query_blocks.results_container.Result")
+def test_parse_results_after_store_query_results(mock_result_obj):
+    """
+    Test parse_results method parses again after new results are stored - even with the same fingerprint
+    """
+    mock_parse_func = MagicMock(side_effect=list)
+    instance = ResultsContainer(prop_enum_cls=MockProperties)
+    instance.store_query_results([NonCallableMock()])
+    instance.parse_results(mock_parse_func, "fingerprint1")
+    instance.store_query_results([NonCallableMock()])
+    instance.parse_results(mock_parse_func, "fingerprint1")
+    assert mock_parse_func.call_count == 2
+    assert mock_result_obj.call_count == 2
+
+
+def test_to_props_reuses_rows(setup_instance_with_results):
+    """
+    Test to_props method only gets properties of each result again when selected props or parsed results change
+    - and that rows returned are copies
+    """
+    mock_res = MagicMock(**{"as_props.return_value": {"prop_1": "val1"}})
+    instance = setup_instance_with_results([mock_res])
+    instance.parse_results(lambda results: results, "fingerprint1")
+
+    res = instance.to_props(MockProperties.PROP_1)
+    res[0]["prop_1"] = "changed"
+    assert instance.to_props(MockProperties.PROP_1) == [{"prop_1": "val1"}]
+    mock_res.as_props.assert_called_once_with(MockProperties.PROP_1)
+
+    instance.to_props(MockProperties.PROP_2)
+    assert mock_res.as_props.call_count == 2
+
+    instance.parse_results(lambda results: results, "fingerprint2")
+    instance.to_props(MockProperties.PROP_2)
+    assert mock_res.as_props.call_count == 3
+
+
+def test_iter_props_ungrouped(setup_instance_with_results):
+    """
+    Test iter_props method when results are not grouped - rows are outputted one at a time
+    """
+    mock_res1 = MagicMock(**{"as_props.return_value": {"prop_1": "val1"}})
+    mock_res2 = MagicMock(**{"as_props.return_value": {"prop_1": "val2"}})
+    instance = setup_instance_with_results([mock_res1, mock_res2])
+    assert instance.group_names is None
+
+    ((path, rows),) = list(instance.iter_props(MockProperties.PROP_1))
+    assert path == ()
+    mock_res1.as_props.assert_not_called()
+    assert list(rows) == [{"prop_1": "val1"}, {"prop_1": "val2"}]
+    mock_res1.as_props.assert_called_once_with(MockProperties.PROP_1)
+
+
+def test_iter_props_grouped(setup_instance_with_results):
+    """
+    Test iter_props method when results are grouped - and limited to given groups
+    """
+    mock_res1 = MagicMock(**{"as_props.return_value": {"prop_1": "val1"}})
+    mock_res2 = MagicMock(**{"as_props.return_value": {"prop_1": "val2"}})
+    instance = setup_instance_with_results([mock_res1, mock_res2])
+    instance.parse_results(
+        lambda results: {"group1": [results[0]], "group2": [results[1]]}
+    )
+    assert instance.group_names == ["group1", "group2"]
+    assert [
+        (path, list(rows))
+        for path, rows in instance.iter_props(MockProperties.PROP_1, groups=["group2"])
+    ] == [(("group2",), [{"prop_1": "val2"}])]
+
+
+def test_iter_props_nested_groups(nested_instance):
+    """
+    Test iter_props method when results are in nested groups - groups are outputted before their nested groups
+    """
+    assert nested_instance.group_names == ["group1"]
+    assert [
+        (path, None if rows is None else list(rows))
+        for path, rows in nested_instance.iter_props(MockProperties.PROP_1)
+    ] == [
+        (("group1",), None),
+        (("group1", "subgroup1"), [{"prop_1": "val1"}]),
+        (("group1", "subgroup2"), [{"prop_1": "val2"}]),
+    ]
+
+
+def test_iter_props_reuses_rows(setup_instance_with_results):
+    """
+    Test iter_props method reuses rows already outputted by to_props for the same props
+    """
+    mock_res = MagicMock(**{"as_props.return_value": {"prop_1": "val1"}})
+    instance = setup_instance_with_results([mock_res])
+    instance.to_props(MockProperties.PROP_1)
+    ((_, rows),) = list(instance.iter_props(MockProperties.PROP_1))
+    assert list(rows) == [{"prop_1": "val1"}]
+    mock_res.as_props.assert_called_once()
+
+
+@pytest.fixture(name="rows_instance")
+def rows_instance_fixture(mock_get_prop_mapping):
+    """
+    Returns a ResultsContainer storing real Result objects - with get_prop_mapping patched
+    """
+    instance = ResultsContainer(prop_enum_cls=MockProperties)
+    instance.store_query_results(
+        [{"prop_1": "val1", "prop_2": 1}, {"prop_1": "val2", "prop_2": 2}, {}]
+    )
+    with patch.object(
+        MockProperties, "get_prop_mapping", wraps=mock_get_prop_mapping
+    ) as mock_get_prop_func:
+        yield instance, mock_get_prop_func
+
+
+def test_to_rows(rows_instance):
+    """
+    Test to_rows method outputs a header and a tuple per result - property functions are looked up once
+    """
+    instance, mock_get_prop_func = rows_instance
+    header, rows = instance.to_rows(MockProperties.PROP_1, MockProperties.PROP_2)
+    assert header == ("prop_1", "prop_2")
+    assert rows == [("val1", 1), ("val2", 2), ("Not Found", "Not Found")]
+    assert mock_get_prop_func.call_count == 2
+
+
+def test_to_rows_named(rows_instance):
+    """
+    Test to_rows method outputs namedtuples when named is set
+    """
+    instance, _ = rows_instance
+    _, rows = instance.to_rows(MockProperties.PROP_1, named=True)
+    assert rows[0].prop_1 == "val1"
+    assert rows[0] == ("val1",)
+
+
+def test_to_rows_grouped_with_forwarded_props(rows_instance):
+    """
+    Test to_rows method when results are grouped and have forwarded properties - forwarded properties are
+    added after selected properties, and replace selected properties with the same name
+    """
+    instance, _ = rows_instance
+    for i, item in enumerate(instance.iter_results()):
+        item.update_forwarded_properties({"prop_2": f"fwd{i}", "extra": i})
+    instance.parse_results(
+        lambda results: {"group1": results[:1], "group2": results[1:2]}
+    )
+    header, rows = instance.to_rows(MockProperties.PROP_1, MockProperties.PROP_2)
+    assert header == ("prop_1", "prop_2", "extra")
+    assert rows == {"group1": [("val1", "fwd0", 0)], "group2": [("val2", "fwd1", 1)]}
+    assert rows["group1"][0] == tuple(
+        next(instance.iter_results())
+        .as_props(MockProperties.PROP_1, MockProperties.PROP_2)
+        .values()
+    )
+
+
+def test_to_rows_aggregated(setup_instance_with_results):
+    """
+    Test to_rows method when results are aggregated - header holds aggregated value names
+    """
+    instance = setup_instance_with_results([MagicMock()])
+    instance.parse_results(lambda _: [AggregateResult({"count": 3, "sum_prop_1": 6})])
+    assert instance.to_rows(MockProperties.PROP_1) == (
+        ("count", "sum_prop_1"),
+        [(3, 6)],
+    )
+
+
+def test_to_rows_empty(setup_instance_with_results):
+    """
+    Test to_rows method when there are no results - header holds selected properties
+    """
+    instance = setup_instance_with_results([])
+    assert instance.to_rows(MockProperties.PROP_1) == (("prop_1",), [])
+
+
+def test_to_rows_grouped_empty(setup_instance_with_results):
+    """
+    Test to_rows method when results are grouped but no group holds results - groups are still output as a dict
+    """
+    instance = setup_instance_with_results([])
+    instance.parse_results(lambda _: {})
+    assert instance.to_rows(MockProperties.PROP_1) == (("prop_1",), {})
+    instance.parse_results(lambda _: {"group1": [], "group2": []})
+    assert instance.to_rows(MockProperties.PROP_1) == (
+        ("prop_1",),
+        {"group1": [], "group2": []},
+    )
+
+
+def test_to_columns(rows_instance):
+    """
+    Test to_columns method outputs a header and a list of values per property - property functions are
+    looked up once per column
+    """
+    instance, mock_get_prop_func = rows_instance
+    header, columns, paths = instance.to_columns(
+        MockProperties.PROP_1, MockProperties.PROP_2
+    )
+    assert header == ("prop_1", "prop_2")
+    assert columns == [["val1", "val2", "Not Found"], [1, 2, "Not Found"]]
+    assert paths is None
+    assert mock_get_prop_func.call_count == 2
+
+
+def test_to_columns_grouped_with_forwarded_props(rows_instance):
+    """
+    Test to_columns method when results are grouped and have forwarded properties - outputs the path to
+    each result's group, and forwarded properties are output like to_rows
+    """
+    instance, _ = rows_instance
+    for i, item in enumerate(instance.iter_results()):
+        item.update_forwarded_properties({"prop_2": f"fwd{i}", "extra": i})
+    instance.parse_results(
+        lambda results: {"group1": results[:1], "group2": results[1:2]}
+    )
+    header, columns, paths = instance.to_columns(
+        MockProperties.PROP_1, MockProperties.PROP_2
+    )
+    assert header == ("prop_1", "prop_2", "extra")
+    assert columns == [["val1", "val2"], ["fwd0", "fwd1"], [0, 1]]
+    assert paths == [("group1",), ("group2",)]
+
+
+def test_to_columns_nested_groups(rows_instance):
+    """
+    Test to_columns method when results are in nested groups - outputs the path of group names to each result
+    """
+    instance, _ = rows_instance
+
+    def mock_parse_func(results):
+        """a parse func that returns nested groups"""
+        root = GroupNode([[], []])
+        root.get_child("group1").get_child("subgroup1").results.extend(results[:2])
+        root.get_child("group2").get_child("subgroup2").results.append(results[2])
+        return root
+
+    instance.parse_results(mock_parse_func)
+    _, columns, paths = instance.to_columns(MockProperties.PROP_1)
+    assert columns == [["val1", "val2", "Not Found"]]
+    assert paths == [
+        ("group1", "subgroup1"),
+        ("group1", "subgroup1"),
+        ("group2", "subgroup2"),
+    ]
+
+
+def test_to_columns_aggregated(setup_instance_with_results):
+    """
+    Test to_columns method when results are aggregated - header holds aggregated value names
+    """
+    instance = setup_instance_with_results([MagicMock()])
+    instance.parse_results(lambda _: [AggregateResult({"count": 3, "sum_prop_1": 6})])
+    assert instance.to_columns(MockProperties.PROP_1) == (
+        ("count", "sum_prop_1"),
+        [[3], [6]],
+        None,
+    )
+
+
+def test_to_columns_empty(setup_instance_with_results):
+    """
+    Test to_columns method when there are no results - header holds selected properties
+    """
+    instance = setup_instance_with_results([])
+    assert instance.to_columns(MockProperties.PROP_1) == (("prop_1",), [[]], None)
+
+
 def test_apply_forwarded_result_empty():
     """
     Test apply_forwarded_results when no results set - do nothing
@@ -307,3 +697,41 @@ def test_apply_forwarded_result_not_found(setup_instance_with_results):
 
     result_obj.get_prop.assert_called_once_with(mock_link_prop)
     result_obj.update_forwarded_properties({"prop1": "Not Found"})
+
+
+def test_to_keyed_props(rows_instance):
+    """
+    Test to_keyed_props method outputs selected properties of each result keyed by key_func - ignoring groups
+    """
+    instance, _ = rows_instance
+    instance.parse_results(lambda results: {"group1": results[:1]})
+    res = instance.to_keyed_props(
+        lambda result: result.as_object().get("prop_2", 0), MockProperties.PROP_1
+    )
+    assert res == {
+        1: {"prop_1": "val1"},
+        2: {"prop_1": "val2"},
+        0: {"prop_1": "Not Found"},
+    }
+
+
+def test_to_keyed_props_duplicate_keys(rows_instance):
+    """
+    Test to_keyed_props method raises an error if more than one result has the same key
+    """
+    instance, _ = rows_instance
+    with pytest.raises(ParseQueryError):
+        instance.to_keyed_props(lambda _: "same-key", MockProperties.PROP_1)
+
+
+def test_iter_results(rows_instance):
+    """
+    Test iter_results method yields every stored result - ignoring groups
+    """
+    instance, _ = rows_instance
+    instance.parse_results(lambda results: {"group1": results[:1]})
+    assert [item.as_object() for item in instance.iter_results()] == [
+        {"prop_1": "val1", "prop_2": 1},
+        {"prop_1": "val2", "prop_2": 2},
+        {},
+    ]
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from openstackquery.query_blocks.query_output import QueryOutput
+from openstackquery.query_blocks.results_diff import ResultsDiff
+from tests.mocks.mocked_props import MockProperties
+
+
+@pytest.fixture(name="instance")
+def instance_fixture():
+    """
+    Returns a diff of two sets of rows - one added, one removed, one changed and one unchanged
+    """
+    return ResultsDiff.compute(
+        {
+            "a": {"name": "vm-a", "status": "ACTIVE"},
+            "b": {"name": "vm-b", "status": "ACTIVE"},
+            "c": {"name": "vm-c", "status": "ACTIVE"},
+        },
+        {
+            "a": {"name": "vm-a", "status": "ACTIVE"},
+            "b": {"name": "vm-b2", "status": "SHUTOFF"},
+            "d": {"name": "vm-d", "status": "BUILD"},
+        },
+        "id",
+        QueryOutput(MockProperties),
+    )
+
+
+def test_compute(instance):
+    """
+    Tests that compute finds results added, removed and changed
+    """
+    assert len(instance) == 3
+    assert [item.key for item in instance.added] == ["d"]
+    assert [item.key for item in instance.removed] == ["c"]
+    assert [item.key for item in instance.changed] == ["b"]
+    assert instance.changed[0].changes == {
+        "name": ("vm-b", "vm-b2"),
+        "status": ("ACTIVE", "SHUTOFF"),
+    }
+
+
+def test_to_props(instance):
+    """
+    Tests that to_props outputs one group per kind of difference - with one row per changed property
+    """
+    assert instance.to_props() == {
+        "added": [{"id": "d", "name": "vm-d", "status": "BUILD"}],
+        "removed": [{"id": "c", "name": "vm-c", "status": "ACTIVE"}],
+        "changed": [
+            {"id": "b", "property": "name", "old": "vm-b", "new": "vm-b2"},
+            {"id": "b", "property": "status", "old": "ACTIVE", "new": "SHUTOFF"},
+        ],
+    }
+    assert not instance.get_group_summaries()
+
+
+def test_to_props_no_differences():
+    """
+    Tests that to_props outputs no groups when nothing differs
+    """
+    rows = {"a": {"name": "vm-a"}}
+    instance = ResultsDiff.compute(rows, dict(rows), "id")
+    assert not instance
+    assert instance.to_props() == []
+
+
+def test_to_string(instance):
+    """
+    Tests that to_string outputs a table per kind of difference through QueryOutput
+    """
+    res = instance.to_string(title="drift")
+    assert res.startswith("drift:\n")
+    for line in ("added", "removed", "changed", "vm-b2", "SHUTOFF"):
+        assert line in res
+
+
+def test_to_csv_and_json(instance):
+    """
+    Tests that to_csv and to_json output differences through QueryOutput - and can be limited by group
+    """
+    assert instance.to_csv(groups=["changed"]).startswith(
+        "# Group: changed\nid,property,old,new"
+    )
+    assert json.loads(instance.to_json())["added"] == [
+        {"id": "d", "name": "vm-d", "status": "BUILD"}
+    ]
+    assert "<table>" in instance.to_html()
@@ -0,0 +1,171 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from openstackquery.enums.props.hypervisor_properties import HypervisorProperties
+from openstackquery.enums.props.server_properties import ServerProperties
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.snapshot_file import SnapshotFile, SnapshotRow
+
+
+@pytest.fixture(name="servers")
+def servers_fixture():
+    """
+    Returns servers as plain dicts - like openstack objects, props read them by item
+    """
+    return [
+        {
+            "id": f"server-{i}",
+            "name": f"vm-{i}",
+            "status": "ACTIVE" if i % 2 else "SHUTOFF",
+            "flavor": {"id": "flavor-1"},
+            "addresses": {"net": [{"addr": f"10.0.0.{i}"}]},
+            "location": {"project": {"id": "project-1"}},
+            "created_at": "2024-01-01T00:00:00Z",
+            "description": None,
+        }
+        for i in range(4)
+    ]
+
+
+@pytest.fixture(name="write_snapshot")
+def write_snapshot_fixture(tmp_path):
+    """
+    Returns a function which writes objects to a snapshot file and opens it
+    """
+    opened = []
+
+    def _write_snapshot(objs, prop_enum_cls=ServerProperties, resource_type="server"):
+        path = tmp_path / "snapshot"
+        SnapshotFile.write(path, objs, prop_enum_cls, resource_type)
+        snapshot = SnapshotFile(path)
+        opened.append(snapshot)
+        return snapshot
+
+    yield _write_snapshot
+    for snapshot in opened:
+        snapshot.close()
+
+
+def test_trace_paths():
+    """
+    Tests that trace_paths finds the items property functions read - including nested items
+    """
+    paths = SnapshotFile.trace_paths(ServerProperties)
+    assert (("item", "id"),) in paths
+    assert (("item", "flavor"), ("item", "id")) in paths
+    assert (("item", "flavor"),) not in paths
+
+
+def test_snapshot_props_match_objects(servers, write_snapshot):
+    """
+    Tests that every property read from snapshot rows matches the property read from the objects written
+    """
+    snapshot = write_snapshot(servers)
+    assert len(snapshot) == 4
+    assert snapshot.resource_type == "server"
+    assert snapshot.prop_enum == "ServerProperties"
+
+    for server, row in zip(servers, snapshot):
+        for prop in ServerProperties:
+            prop_func = ServerProperties.get_prop_mapping(prop)
+            try:
+                expected = prop_func(server)
+            except KeyError:
+                with pytest.raises(KeyError):
+                    prop_func(row)
+                continue
+            assert prop_func(row) == expected
+
+
+def test_snapshot_row_reads_nested_values(servers, write_snapshot):
+    """
+    Tests that plain dicts are stored and returned whole
+    """
+    snapshot = write_snapshot(servers)
+    row = snapshot[-1]
+    assert row["location"] == {"project": {"id": "project-1"}}
+    assert row["addresses"] == {"net": [{"addr": "10.0.0.3"}]}
+    assert row["description"] is None
+    with pytest.raises(KeyError):
+        _ = row["not_written"]
+    with pytest.raises(IndexError):
+        _ = snapshot[4]
+
+
+def test_snapshot_hypervisors(write_snapshot):
+    """
+    Tests that attributes are written as fixed-width columns - and values missing from some objects
+    raise AttributeError like the objects would
+    """
+    usage = SimpleNamespace(
+        vcpus=8,
+        vcpus_avail=2,
+        vcpus_used=6,
+        memory_mb_size=1024,
+        memory_mb_avail=512,
+        memory_mb_used=512,
+        disk_gb_size=100,
+        disk_gb_avail=50.5,
+        disk_gb_used=49.5,
+    )
+    hvs = [
+        SimpleNamespace(hv={"id": "hv-1", "name": "hv1"}, usage=usage),
+        SimpleNamespace(hv={"id": "hv-2", "name": "hv2"}, usage=None),
+    ]
+    snapshot = write_snapshot(hvs, HypervisorProperties, "hypervisor")
+    vcpus_used = HypervisorProperties.get_prop_mapping(HypervisorProperties.VCPUS_USED)
+    disk_avail = HypervisorProperties.get_prop_mapping(
+        HypervisorProperties.DISK_GB_AVAIL
+    )
+
+    assert isinstance(snapshot[0].usage, SnapshotRow)
+    assert vcpus_used(snapshot[0]) == 6
+    assert disk_avail(snapshot[0]) == 50.5
+    assert snapshot[1].hv["name"] == "hv2"
+    with pytest.raises(AttributeError):
+        vcpus_used(snapshot[1])
+
+
+def test_snapshot_dictionary_encodes_strings(servers, tmp_path):
+    """
+    Tests that repeated strings are stored once
+    """
+    small = io.BytesIO()
+    large = io.BytesIO()
+    SnapshotFile.write(small, servers[:1], ServerProperties, "server")
+    SnapshotFile.write(large, servers[:1] * 100, ServerProperties, "server")
+    # each extra row only adds fixed-width codes
+    assert len(large.getvalue()) - len(small.getvalue()) < 99 * 100
+
+    path = tmp_path / "snapshot"
+    path.write_bytes(large.getvalue())
+    with SnapshotFile(path) as snapshot:
+        assert snapshot[99]["name"] == "vm-0"
+
+
+def test_snapshot_empty(write_snapshot):
+    """
+    Tests that a snapshot of no objects can be written and opened
+    """
+    assert not list(write_snapshot([]))
+
+
+def test_snapshot_invalid_file(tmp_path):
+    """
+    Tests that opening a file which isn't a snapshot raises an error
+    """
+    path = tmp_path / "not_snapshot"
+    path.write_bytes(b"0" * 64)
+    with pytest.raises(ParseQueryError):
+        SnapshotFile(path)
+
+
+def test_get_resource_type(servers, write_snapshot):
+    """
+    Tests that get_resource_type returns the resource type of snapshot rows only
+    """
+    snapshot = write_snapshot(servers)
+    assert SnapshotRow.get_resource_type(snapshot[0]) == "server"
+    assert SnapshotRow.get_resource_type(servers[0]) is None
@@ -0,0 +1,112 @@
+import sqlite3
+import pytest
+
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.sqlite_output import SqliteOutput
+
+
+@pytest.fixture(name="instance")
+def instance_fixture():
+    """
+    Returns an instance of SqliteOutput - "Not Found" values are loaded as NULL
+    """
+    return SqliteOutput("Not Found")
+
+
+@pytest.fixture(name="conn")
+def conn_fixture():
+    """
+    Returns an in-memory sqlite3 connection
+    """
+    conn = sqlite3.connect(":memory:")
+    yield conn
+    conn.close()
+
+
+def get_schema(conn, name):
+    """
+    Helper function which returns the SQL used to create a table or index
+    """
+    return conn.execute(
+        "SELECT sql FROM sqlite_master WHERE name = ?", (name,)
+    ).fetchone()[0]
+
+
+def test_load(instance, conn):
+    """
+    Test load creates a table with a SQL type per column and loads each row - missing values are NULL
+    """
+    instance.load(
+        conn,
+        "servers",
+        ("id", "vcpus", "ratio", "locked", "created_at", "addresses"),
+        [
+            ["a", "b"],
+            [1, "Not Found"],
+            [1, 0.5],
+            [True, False],
+            ["2024-01-01T10:00:00Z", "2024-01-02T10:00:00Z"],
+            [["1.1.1.1"], None],
+        ],
+    )
+    assert get_schema(conn, "servers") == (
+        'CREATE TABLE "servers" ("id" TEXT, "vcpus" INTEGER, "ratio" REAL, "locked" INTEGER, '
+        '"created_at" TEXT, "addresses" TEXT)'
+    )
+    assert conn.execute("SELECT * FROM servers").fetchall() == [
+        ("a", 1, 1.0, 1, "2024-01-01T10:00:00Z", '["1.1.1.1"]'),
+        ("b", None, 0.5, 0, "2024-01-02T10:00:00Z", None),
+    ]
+
+
+def test_load_indexes(instance, conn):
+    """
+    Test load creates an index on each given index column in the table - other columns are ignored
+    """
+    instance.load(
+        conn,
+        "servers",
+        ("id", "project_id"),
+        [["a"], ["p1"]],
+        index_columns=["project_id", "user_id"],
+    )
+    assert get_schema(conn, "idx_servers_project_id") == (
+        'CREATE INDEX "idx_servers_project_id" ON "servers" ("project_id")'
+    )
+    assert (
+        conn.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'index'"
+        ).fetchone()[0]
+        == 1
+    )
+
+
+def test_load_if_exists(instance, conn):
+    """
+    Test load fails, replaces or appends to a table that already exists
+    """
+    instance.load(conn, "servers", ("id",), [["a"]])
+    with pytest.raises(sqlite3.OperationalError):
+        instance.load(conn, "servers", ("id",), [["b"]])
+    instance.load(conn, "servers", ("id",), [["c"]], if_exists="append")
+    assert conn.execute("SELECT id FROM servers").fetchall() == [("a",), ("c",)]
+    instance.load(conn, "servers", ("id",), [["d"]], if_exists="replace")
+    assert conn.execute("SELECT id FROM servers").fetchall() == [("d",)]
+
+
+def test_load_invalid_if_exists(instance, conn):
+    """
+    Test load raises error if if_exists is not a valid option
+    """
+    with pytest.raises(ParseQueryError):
+        instance.load(conn, "servers", ("id",), [["a"]], if_exists="invalid")
+
+
+def test_load_quotes_names(instance, conn):
+    """
+    Test load quotes table and column names
+    """
+    instance.load(conn, 'my "table"', ("group",), [["ACTIVE"]])
+    assert conn.execute('SELECT "group" FROM "my ""table"""').fetchall() == [
+        ("ACTIVE",)
+    ]
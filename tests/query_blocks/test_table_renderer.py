@@ -0,0 +1,87 @@
+import io
+
+import pytest
+
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.table_renderer import TableRenderer
+
+
+@pytest.fixture(name="mock_rows")
+def mock_rows_fixture():
+    """
+    Returns rows of selected properties to render
+    """
+    return [
+        {"name": "<server1>", "vcpus": 4, "status": None},
+        {"name": "server-two", "vcpus": 16, "status": "ACTIVE"},
+    ]
+
+
+def test_write_text(mock_rows):
+    """
+    Tests write_text writes a grid table - numeric columns are right-aligned and missing values are empty
+    """
+    out = io.StringIO()
+    TableRenderer().write_text(out, mock_rows)
+    assert out.getvalue() == (
+        "+------------+-------+--------+\n"
+        "| name       | vcpus | status |\n"
+        "+============+=======+========+\n"
+        "| <server1>  |     4 |        |\n"
+        "+------------+-------+--------+\n"
+        "| server-two |    16 | ACTIVE |\n"
+        "+------------+-------+--------+"
+    )
+
+
+def test_write_html(mock_rows):
+    """
+    Tests write_html writes a html table - values are escaped
+    """
+    out = io.StringIO()
+    TableRenderer().write_html(out, mock_rows)
+    assert out.getvalue() == (
+        "<table>\n<thead>\n<tr><th>name</th><th>vcpus</th><th>status</th></tr>\n</thead>\n<tbody>\n"
+        '<tr><td>&lt;server1&gt;</td><td style="text-align: right;">4</td><td></td></tr>\n'
+        '<tr><td>server-two</td><td style="text-align: right;">16</td><td>ACTIVE</td></tr>\n'
+        "</tbody>\n</table>"
+    )
+
+
+def test_write_text_with_page(mock_rows):
+    """
+    Tests write_text with max_rows and page set - only rows in the page are outputted, with a footer
+    """
+    out = io.StringIO()
+    TableRenderer(max_rows=1, page=1).write_text(out, mock_rows)
+    assert out.getvalue().splitlines() == [
+        "+------------+-------+--------+",
+        "| name       | vcpus | status |",
+        "+============+=======+========+",
+        "| server-two |    16 | ACTIVE |",
+        "+------------+-------+--------+",
+        "showing rows 2-2 of 2",
+    ]
+
+
+def test_write_html_with_max_col_width(mock_rows):
+    """
+    Tests write_html with max_col_width set - longer values are cut
+    """
+    out = io.StringIO()
+    TableRenderer(max_rows=1, max_col_width=4).write_html(out, mock_rows)
+    assert "<td>&lt;se…</td>" in out.getvalue()
+    assert "<th>vcp…</th>" in out.getvalue()
+    assert out.getvalue().endswith("</table><br/>showing rows 1-1 of 2")
+
+
+@pytest.mark.parametrize(
+    "mock_kwargs",
+    [{"max_rows": 0}, {"page": -1}, {"max_col_width": 0}],
+)
+def test_invalid_options(mock_kwargs):
+    """
+    Tests TableRenderer raises error when given invalid paging/truncation options
+    """
+    with pytest.raises(ParseQueryError):
+        TableRenderer(**mock_kwargs)
@@ -0,0 +1,228 @@
+from unittest.mock import MagicMock
+import pytest
+
+from openstackquery.runners.runner_cache import RunnerCache
+
+
+@pytest.fixture(name="mock_clock")
+def mock_clock_fixture():
+    """
+    Returns a mock clock starting at time 0
+    """
+    return MagicMock(return_value=0)
+
+
+@pytest.fixture(name="instance")
+def instance_fixture(mock_clock):
+    """
+    Returns an instance with a mock clock
+    """
+    return RunnerCache(ttls={"flavor": 10}, default_ttl=5, clock=mock_clock)
+
+
+def test_make_key_order_independent(instance):
+    """
+    Tests make_key returns the same key regardless of filter or meta-param order - and handles unhashable values
+    """
+    key1 = instance.make_key(
+        "cloud", "server", {"a": 1, "b": [1, 2]}, {"projects": ["p1"], "x": {"y": 1}}
+    )
+    key2 = instance.make_key(
+        "cloud", "server", {"b": [1, 2], "a": 1}, {"x": {"y": 1}, "projects": ["p1"]}
+    )
+    assert key1 == key2
+    assert hash(key1) == hash(key2)
+    assert key1 != instance.make_key("cloud", "server", {"a": 2, "b": [1, 2]})
+
+
+def test_get_miss(instance):
+    """
+    Tests get returns None and counts a miss when listing isn't cached
+    """
+    assert instance.get(instance.make_key("cloud", "flavor")) is None
+    assert instance.stats["misses"] == 1
+
+
+def test_set_and_get(instance):
+    """
+    Tests get returns a copy of a cached listing and counts a hit
+    """
+    key = instance.make_key("cloud", "flavor")
+    instance.set(key, [1, 2])
+    res = instance.get(key)
+    assert res == [1, 2]
+    res.append(3)
+    assert instance.get(key) == [1, 2]
+    assert instance.stats["hits"] == 2
+
+
+@pytest.mark.parametrize(
+    "resource_type, time, expected",
+    [("flavor", 9, [1]), ("flavor", 10, None), ("other", 5, None)],
+)
+def test_get_expired(instance, mock_clock, resource_type, time, expected):
+    """
+    Tests listings expire after the ttl of their resource type - or default ttl if not set
+    """
+    key = instance.make_key("cloud", resource_type)
+    instance.set(key, [1])
+    mock_clock.return_value = time
+    assert instance.get(key) == expected
+
+
+def test_get_stale(instance, mock_clock):
+    """
+    Tests expired listings with a high-water mark are kept - and returned by get_stale to be refreshed
+    """
+    key = instance.make_key("cloud", "flavor")
+    other_key = instance.make_key("cloud", "other")
+    instance.set(key, [1], high_water_mark="2024-01-01T00:00:00Z")
+    instance.set(other_key, [2])
+    mock_clock.return_value = 10
+
+    assert instance.get(key) is None
+    assert instance.get(other_key) is None
+    res = instance.get_stale(key)
+    assert res == ([1], "2024-01-01T00:00:00Z")
+    res[0].append(3)
+    assert instance.get_stale(key) == ([1], "2024-01-01T00:00:00Z")
+    assert instance.get_stale(other_key) is None
+    assert instance.stats["entries"] == 1
+
+
+def test_default_ttls():
+    """
+    Tests ttls given are merged with default ttls
+    """
+    instance = RunnerCache(ttls={"server": 0})
+    assert instance.get_ttl("flavor") == RunnerCache.DEFAULT_TTLS["flavor"]
+    assert instance.get_ttl("server") == 0
+
+
+def test_set_ttl_zero(instance):
+    """
+    Tests listings aren't cached when ttl of their resource type is 0
+    """
+    instance = RunnerCache(ttls={"server": 0})
+    key = instance.make_key("cloud", "server")
+    instance.set(key, [1])
+    assert instance.get(key) is None
+
+
+def test_lru_eviction_by_entries():
+    """
+    Tests least recently used listing is evicted when cache holds more than max_entries listings
+    """
+    instance = RunnerCache(max_entries=2)
+    keys = [instance.make_key("cloud", "flavor", {"i": i}) for i in range(3)]
+    instance.set(keys[0], [0])
+    instance.set(keys[1], [1])
+    instance.get(keys[0])
+    instance.set(keys[2], [2])
+    assert instance.get(keys[1]) is None
+    assert instance.get(keys[0]) == [0]
+    assert instance.get(keys[2]) == [2]
+    assert instance.stats["evictions"] == 1
+
+
+def test_lru_eviction_by_bytes():
+    """
+    Tests least recently used listings are evicted when cache holds more than max_bytes - and listings larger
+    than max_bytes aren't cached
+    """
+    instance = RunnerCache(max_entries=None, max_bytes=10, size_func=sum)
+    keys = [instance.make_key("cloud", "flavor", {"i": i}) for i in range(3)]
+    instance.set(keys[0], [4])
+    instance.set(keys[1], [4])
+    instance.set(keys[2], [4])
+    assert instance.stats == {
+        "hits": 0,
+        "misses": 0,
+        "evictions": 1,
+        "entries": 2,
+        "bytes": 8,
+    }
+    instance.set(keys[0], [11])
+    assert instance.get(keys[0]) is None
+
+
+def test_invalidate(instance):
+    """
+    Tests invalidate removes listings for given cloud account and/or resource type
+    """
+    for cloud in ["cloud1", "cloud2"]:
+        for resource_type in ["flavor", "server"]:
+            instance.set(instance.make_key(cloud, resource_type), [1])
+
+    assert instance.invalidate(cloud_account="cloud1", resource_type="flavor") == 1
+    assert instance.invalidate(resource_type="server") == 2
+    assert instance.get(instance.make_key("cloud2", "flavor")) == [1]
+    assert instance.invalidate() == 1
+    assert instance.stats["entries"] == 0
+
+
+def test_clear(instance):
+    """
+    Tests clear removes all listings and resets counters
+    """
+    key = instance.make_key("cloud", "flavor")
+    instance.set(key, [1])
+    instance.get(key)
+    instance.clear()
+    assert instance.stats == {
+        "hits": 0,
+        "misses": 0,
+        "evictions": 0,
+        "entries": 0,
+        "bytes": 0,
+    }
+
+
+def test_estimate_size():
+    """
+    Tests estimate_size returns total length of each resource's string representation
+    """
+    assert RunnerCache.estimate_size(["abc", 12]) == 5
+
+
+def test_expire(instance, mock_clock):
+    """
+    Tests expire removes matching listings - but keeps listings with a high-water mark to be refreshed
+    """
+    server_key = instance.make_key("cloud", "server")
+    flavor_key = instance.make_key("cloud", "flavor")
+    other_key = instance.make_key("other", "server")
+    instance.set(server_key, [1], high_water_mark="t1")
+    instance.set(flavor_key, [2])
+    instance.set(other_key, [3])
+
+    assert instance.expire("cloud") == 2
+    assert instance.get(server_key) is None
+    assert instance.get_stale(server_key) == ([1], "t1")
+    assert instance.get(flavor_key) is None
+    assert instance.stats["entries"] == 2
+    assert instance.get(other_key) == [3]
+    mock_clock.assert_called()
+
+
+def test_remove_resources():
+    """
+    Tests remove_resources removes resources with given markers from matching listings only - keeping when
+    listings expire and their approximate size up-to-date
+    """
+    instance = RunnerCache(max_bytes=100, size_func=len)
+    server_key = instance.make_key("cloud", "server", {"a": 1})
+    other_key = instance.make_key("other", "server")
+    flavor_key = instance.make_key("cloud", "flavor")
+    for key in (server_key, other_key, flavor_key):
+        instance.set(key, [{"id": "a"}, {"id": "b"}])
+
+    res = instance.remove_resources(
+        "server", ["a", "c"], lambda item: item["id"], "cloud"
+    )
+    assert res == 1
+    assert instance.get(server_key) == [{"id": "b"}]
+    assert instance.get(other_key) == [{"id": "a"}, {"id": "b"}]
+    assert instance.get(flavor_key) == [{"id": "a"}, {"id": "b"}]
+    assert instance.stats["bytes"] == 5
+    assert instance.remove_resources("server", ["a"], lambda item: item["id"]) == 1
@@ -50,6 +50,30 @@ def test_run_pagination_query_gt_0():
         run_paginated_query_test(i)
 
 
+def test_iter_paginated_query_stops_early():
+    """
+    tests that iter_paginated_query only requests the next page once current page has been consumed
+    """
+    mock_paginated_call = MagicMock()
+    mock_paginated_call.side_effect = [[{"id": "marker0"}], [{"id": "marker1"}], []]
+
+    res = RunnerUtils.iter_paginated_query(
+        mock_paginated_call, lambda resource: resource["id"], {"arg1": "val1"}, 1, 10
+    )
+    assert next(res) == {"id": "marker0"}
+    mock_paginated_call.assert_called_once_with(limit=1, marker=None, arg1="val1")
+
+
+def test_iter_client_side_filters():
+    """
+    tests that iter_client_side_filters yields only items that pass all filters
+    """
+    res = RunnerUtils.iter_client_side_filters(
+        [1, 2, 3, 4], [lambda item: item > 1, lambda item: item % 2 == 0]
+    )
+    assert list(res) == [2, 4]
+
+
 def test_apply_client_side_filters_one_item_one_filter_passes():
     """
     tests apply_client_side_filters method.
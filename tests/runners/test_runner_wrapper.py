@@ -1,7 +1,10 @@
-from unittest.mock import MagicMock
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, NonCallableMock, patch
 import pytest
 
+from openstackquery.enums.props.server_properties import ServerProperties
 from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.query_blocks.snapshot_file import SnapshotFile
 from openstackquery.runners.runner_wrapper import RunnerWrapper
 
 
@@ -49,3 +52,230 @@ def test_run_with_subset_many_items_invalid(instance):
     invalid = 10
     with pytest.raises(ParseQueryError):
         instance.parse_subset([MagicMock(), MagicMock(), invalid])
+
+
+@pytest.mark.parametrize("resource_type, valid", [("wrapper", True), ("server", False)])
+def test_parse_subset_snapshot(instance, resource_type, valid, tmp_path):
+    """
+    tests parse_subset method accepts a snapshot file - and its rows - only if it stores the same
+    resource type as the runner
+    """
+    instance.RESOURCE_TYPE = int
+    path = tmp_path / "snapshot"
+    SnapshotFile.write(path, [{"id": "a"}], ServerProperties, resource_type)
+    with SnapshotFile(path) as snapshot:
+        rows = list(snapshot)
+        if valid:
+            assert instance.parse_subset(snapshot) is snapshot
+            assert instance.parse_subset(rows) == rows
+        else:
+            with pytest.raises(ParseQueryError):
+                instance.parse_subset(snapshot)
+            with pytest.raises(ParseQueryError):
+                instance.parse_subset(rows)
+
+
+def test_iter_query_streams_default(instance):
+    """
+    Tests iter_query_streams default implementation
+    should return a single stream which only runs run_query once it is iterated over
+    """
+    mock_conn = MagicMock()
+    with patch.object(RunnerWrapper, "run_query", return_value=[1, 2]) as mock_run:
+        res = instance.iter_query_streams(mock_conn, {"arg1": "val1"}, meta="val")
+        mock_run.assert_not_called()
+        assert len(res) == 1
+        assert list(res[0]) == [1, 2]
+        mock_run.assert_called_once_with(mock_conn, {"arg1": "val1"}, meta="val")
+
+
+def test_run_aggregate_count_default(instance):
+    """
+    Tests run_aggregate_count default implementation
+    should return None since no aggregate source exists by default
+    """
+    assert instance.run_aggregate_count(MagicMock(), NonCallableMock()) is None
+
+
+@pytest.fixture(name="mock_cache")
+def mock_cache_fixture():
+    """
+    Sets a mock cache for all runners - and disables caching after the test
+    """
+    mock_cache = MagicMock()
+    RunnerWrapper.set_cache(mock_cache)
+    yield mock_cache
+    RunnerWrapper.set_cache(None)
+
+
+def test_resource_name():
+    """
+    Tests resource_name property returns name of runner class without "Runner"
+    """
+
+    class FlavorRunner(RunnerWrapper):
+        """test runner"""
+
+        def parse_meta_params(self, conn, **kwargs):
+            return kwargs
+
+        def run_query(self, conn, filter_kwargs=None, **kwargs):
+            return []
+
+    assert FlavorRunner(NonCallableMock()).resource_name == "flavor"
+
+
+def test_run_cached_query_no_cache(instance):
+    """
+    Tests run_cached_query runs run_query when caching is disabled
+    """
+    mock_conn = NonCallableMock()
+    with patch.object(RunnerWrapper, "run_query") as mock_run:
+        res = instance.run_cached_query(
+            mock_conn, "test-account", {"filter1": "val1"}, arg1="val1"
+        )
+    mock_run.assert_called_once_with(mock_conn, {"filter1": "val1"}, arg1="val1")
+    assert res == mock_run.return_value
+    assert instance.get_cached_query("test-account") is None
+
+
+def test_run_cached_query_miss(instance, mock_cache):
+    """
+    Tests run_cached_query runs run_query and caches the listing when it isn't cached
+    """
+    mock_conn = NonCallableMock()
+    mock_cache.get.return_value = None
+    with patch.object(RunnerWrapper, "run_query") as mock_run:
+        res = instance.run_cached_query(
+            mock_conn, "test-account", {"filter1": "val1"}, arg1="val1"
+        )
+    mock_cache.make_key.assert_called_once_with(
+        "test-account", "wrapper", {"filter1": "val1"}, {"arg1": "val1"}
+    )
+    mock_cache.get.assert_called_once_with(mock_cache.make_key.return_value)
+    mock_run.assert_called_once_with(mock_conn, {"filter1": "val1"}, arg1="val1")
+    mock_cache.set.assert_called_once_with(
+        mock_cache.make_key.return_value, mock_run.return_value, high_water_mark=None
+    )
+    mock_cache.get_stale.assert_not_called()
+    assert res == mock_run.return_value
+
+
+@pytest.mark.parametrize("stale", [None, (["old"], "2024-01-01T00:00:00Z")])
+def test_run_cached_query_incremental(instance, mock_cache, stale):
+    """
+    Tests run_cached_query refreshes an expired listing incrementally when the runner supports changes-since -
+    or lists every resource if no listing is held - and caches the listing with a new high-water mark
+    """
+    mock_conn = NonCallableMock()
+    mock_cache.get.return_value = None
+    mock_cache.get_stale.return_value = stale
+    with patch.object(RunnerWrapper, "run_query") as mock_run, patch.object(
+        RunnerWrapper, "refresh_query"
+    ) as mock_refresh, patch.object(
+        RunnerWrapper, "supports_changes_since", return_value=True
+    ), patch.object(
+        RunnerWrapper, "get_high_water_mark", return_value="hwm"
+    ):
+        res = instance.run_cached_query(mock_conn, "test-account", None, arg1="val1")
+
+    mock_cache.get_stale.assert_called_once_with(mock_cache.make_key.return_value)
+    if stale:
+        mock_refresh.assert_called_once_with(
+            mock_conn, ["old"], "2024-01-01T00:00:00Z", None, arg1="val1"
+        )
+        mock_run.assert_not_called()
+        expected = mock_refresh.return_value
+    else:
+        mock_run.assert_called_once_with(mock_conn, None, arg1="val1")
+        expected = mock_run.return_value
+    mock_cache.set.assert_called_once_with(
+        mock_cache.make_key.return_value, expected, high_water_mark="hwm"
+    )
+    assert res == expected
+
+
+def test_merge_changes(instance, mock_marker_prop_func):
+    """
+    Tests merge_changes replaces changed resources, adds new ones and removes deleted ones - by marker prop
+    """
+    mock_marker_prop_func.side_effect = lambda resource: resource["id"]
+    resources = [{"id": 1, "v": "a"}, {"id": 2, "v": "b"}, {"id": 3, "v": "c"}]
+    changes = [{"id": 2, "v": "new"}, {"id": 3, "deleted": True}, {"id": 4, "v": "d"}]
+    with patch.object(
+        RunnerWrapper,
+        "is_deleted",
+        side_effect=lambda resource: resource.get("deleted", False),
+    ):
+        res = instance.merge_changes(resources, changes)
+    assert res == [{"id": 1, "v": "a"}, {"id": 2, "v": "new"}, {"id": 4, "v": "d"}]
+
+
+def test_refresh_query(instance):
+    """
+    Tests refresh_query merges resources changed since the high-water mark into the listing
+    """
+    mock_conn = NonCallableMock()
+    with patch.object(RunnerWrapper, "run_changes_query") as mock_changes, patch.object(
+        RunnerWrapper, "merge_changes"
+    ) as mock_merge:
+        res = instance.refresh_query(
+            mock_conn, ["old"], "since", {"filter1": "val1"}, arg1="val1"
+        )
+    mock_changes.assert_called_once_with(
+        mock_conn, "since", {"filter1": "val1"}, arg1="val1"
+    )
+    mock_merge.assert_called_once_with(["old"], mock_changes.return_value)
+    assert res == mock_merge.return_value
+
+
+def test_changes_since_not_supported_by_default(instance):
+    """
+    Tests runners don't support changes-since unless they implement it
+    """
+    assert not instance.supports_changes_since(None)
+    assert not instance.is_deleted(NonCallableMock())
+    with pytest.raises(ParseQueryError):
+        instance.run_changes_query(NonCallableMock(), "since")
+
+
+def test_get_high_water_mark(instance):
+    """
+    Tests get_high_water_mark returns a UTC timestamp CHANGES_SINCE_SKEW seconds ago
+    """
+    with patch("openstackquery.runners.runner_wrapper.datetime") as mock_datetime:
+        mock_datetime.now.return_value = datetime(2024, 1, 1, 12, 0, 0)
+        assert instance.get_high_water_mark() == "2024-01-01T11:59:00Z"
+    mock_datetime.now.assert_called_once_with(timezone.utc)
+
+
+def test_run_cached_query_hit(instance, mock_cache):
+    """
+    Tests run_cached_query returns cached listing without running run_query
+    """
+    with patch.object(RunnerWrapper, "run_query") as mock_run:
+        res = instance.run_cached_query(NonCallableMock(), "test-account")
+    mock_run.assert_not_called()
+    mock_cache.set.assert_not_called()
+    assert res == mock_cache.get.return_value
+
+
+def test_get_cached_query(instance, mock_cache):
+    """
+    Tests get_cached_query returns listing held in cache
+    """
+    res = instance.get_cached_query("test-account", None, arg1="val1")
+    mock_cache.make_key.assert_called_once_with(
+        "test-account", "wrapper", None, {"arg1": "val1"}
+    )
+    assert res == mock_cache.get.return_value
+
+
+def test_marker_prop_func():
+    """
+    Tests marker_prop_func property returns the marker prop function the runner was created with
+    """
+    mock_marker_prop_func = NonCallableMock()
+    assert (
+        RunnerWrapper(mock_marker_prop_func).marker_prop_func == mock_marker_prop_func
+    )
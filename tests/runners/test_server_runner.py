@@ -1,6 +1,7 @@
-from unittest.mock import MagicMock, NonCallableMock, patch
+from unittest.mock import MagicMock, NonCallableMock, call, patch
 import pytest
 
+from openstackquery.enums.props.server_properties import ServerProperties
 from openstackquery.runners.server_runner import ServerRunner
 from openstackquery.exceptions.parse_query_error import ParseQueryError
 
@@ -173,3 +174,130 @@ def test_run_query_with_meta_arg_projects_with_no_server_queries(
         )
 
     assert res == ["server1", "server2", "server3", "server4"]
+
+
+@patch("openstackquery.runners.runner_utils.RunnerUtils.iter_paginated_query")
+def test_iter_query_streams_with_meta_arg_projects(
+    mock_iter_paginated_query, instance, mock_marker_prop_func
+):
+    """
+    Tests iter_query_streams method when meta arg projects given
+    method should return one lazy paginated stream per project
+    """
+    projects = ["project-id1", "project-id2"]
+    mock_connection = MagicMock()
+
+    res = instance.iter_query_streams(
+        mock_connection, filter_kwargs={"arg1": "val1"}, projects=projects
+    )
+    mock_iter_paginated_query.assert_has_calls(
+        [
+            call(
+                mock_connection.compute.servers,
+                mock_marker_prop_func,
+                {"arg1": "val1", "project_id": project},
+            )
+            for project in projects
+        ]
+    )
+    assert res == [mock_iter_paginated_query.return_value] * 2
+
+
+@patch("openstackquery.runners.runner_utils.RunnerUtils.iter_paginated_query")
+def test_iter_query(mock_iter_paginated_query, instance):
+    """
+    Tests iter_query method chains streams from each project together lazily
+    """
+    mock_iter_paginated_query.side_effect = [
+        iter(["server1", "server2"]),
+        iter(["server3"]),
+    ]
+    res = instance.iter_query(
+        MagicMock(), filter_kwargs={}, projects=["project-id1", "project-id2"]
+    )
+    assert list(res) == ["server1", "server2", "server3"]
+
+
+def test_run_aggregate_count_unsupported_prop(instance):
+    """
+    Tests run_aggregate_count method with a property that has no aggregate source
+    method should return None without making any openstack calls
+    """
+    mock_connection = MagicMock()
+    assert (
+        instance.run_aggregate_count(mock_connection, ServerProperties.USER_ID) is None
+    )
+    mock_connection.compute.get_limits.assert_not_called()
+
+
+def test_run_aggregate_count_with_projects(instance):
+    """
+    Tests run_aggregate_count method with meta arg projects given
+    method should get instances used from compute limits for each project
+    """
+    mock_connection = MagicMock()
+    mock_connection.compute.get_limits.side_effect = [
+        MagicMock(absolute=MagicMock(instances_used=3)),
+        MagicMock(absolute=MagicMock(instances_used=0)),
+    ]
+    res = instance.run_aggregate_count(
+        mock_connection,
+        ServerProperties.PROJECT_ID,
+        projects=["project-id1", "project-id2"],
+    )
+    mock_connection.compute.get_limits.assert_has_calls(
+        [call(project_id="project-id1"), call(project_id="project-id2")]
+    )
+    mock_connection.identity.projects.assert_not_called()
+    assert res == {"project-id1": 3, "project-id2": 0}
+
+
+def test_run_aggregate_count_all_projects(instance):
+    """
+    Tests run_aggregate_count method with no projects given (all_projects)
+    method should list all projects and get compute limits for each
+    """
+    mock_connection = MagicMock()
+    mock_connection.identity.projects.return_value = [MagicMock(id="project-id1")]
+    mock_connection.compute.get_limits.return_value.absolute.instances_used = 5
+
+    res = instance.run_aggregate_count(
+        mock_connection, ServerProperties.PROJECT_ID, all_tenants=True
+    )
+    mock_connection.compute.get_limits.assert_called_once_with(project_id="project-id1")
+    assert res == {"project-id1": 5}
+
+
+@pytest.mark.parametrize(
+    "filter_kwargs, expected", [(None, True), ({}, True), ({"status": "ACTIVE"}, False)]
+)
+def test_supports_changes_since(instance, filter_kwargs, expected):
+    """
+    Tests only listings without filters can be refreshed incrementally
+    """
+    assert instance.supports_changes_since(filter_kwargs) == expected
+
+
+@patch.object(ServerRunner, "run_query")
+def test_run_changes_query(mock_run_query, instance):
+    """
+    Tests run_changes_query lists servers with changes-since added to the filters
+    """
+    mock_connection = NonCallableMock()
+    res = instance.run_changes_query(
+        mock_connection, "2024-01-01T00:00:00Z", {"filter1": "val1"}, all_tenants=True
+    )
+    mock_run_query.assert_called_once_with(
+        mock_connection,
+        {"filter1": "val1", "changes-since": "2024-01-01T00:00:00Z"},
+        all_tenants=True,
+    )
+    assert res == mock_run_query.return_value
+
+
+@pytest.mark.parametrize("status, expected", [("DELETED", True), ("ACTIVE", False)])
+def test_is_deleted(instance, status, expected):
+    """
+    Tests servers with status DELETED are deleted
+    """
+    assert instance.is_deleted({"status": status}) == expected
@@ -0,0 +1,153 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from openstackquery.capacity_planner import CapacityPlanner
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+
+np = pytest.importorskip("numpy")
+
+
+def make_hypervisor(
+    name, vcpus_avail, memory_mb_avail, disk_gb_avail, service_host=None
+):
+    """
+    Returns a mocked hypervisor with resources available
+    """
+    hypervisor = MagicMock()
+    hypervisor.hv = {"name": name}
+    if service_host:
+        hypervisor.hv["service"] = {"host": service_host}
+    hypervisor.usage.vcpus_avail = vcpus_avail
+    hypervisor.usage.memory_mb_avail = memory_mb_avail
+    hypervisor.usage.disk_gb_avail = disk_gb_avail
+    return hypervisor
+
+
+def make_flavor(name, vcpus, ram, disk):
+    """
+    Returns a flavor of given size
+    """
+    return {"name": name, "vcpus": vcpus, "ram": ram, "disk": disk}
+
+
+@pytest.fixture(name="instance")
+def instance_fixture():
+    """
+    Returns a planner for 3 hypervisors and 3 flavors
+    """
+    return CapacityPlanner(
+        [
+            make_hypervisor("hv1", 8, 16384, 100),
+            make_hypervisor("hv2", 32, 8192, 1000),
+            make_hypervisor("hv3", -2, 4096, None),
+        ],
+        [
+            make_flavor("small", 1, 2048, 10),
+            make_flavor("large", 8, 8192, 80),
+            make_flavor("volume", 2, 4096, 0),
+        ],
+    )
+
+
+def test_get_fit_matrix(instance):
+    """
+    Tests the fit matrix holds the smallest number of servers that fit by each resource used
+    """
+    assert instance.hypervisor_names == ["hv1", "hv2", "hv3"]
+    assert instance.flavor_names == ["small", "large", "volume"]
+    np.testing.assert_array_equal(
+        instance.get_fit_matrix(), [[8, 1, 4], [4, 1, 2], [0, 0, 0]]
+    )
+
+
+def test_get_fit_matrix_unsized_flavor():
+    """
+    Tests flavors which use no resources fit nowhere
+    """
+    planner = CapacityPlanner(
+        [make_hypervisor("hv1", 8, 16384, 100)], [make_flavor("empty", 0, 0, 0)]
+    )
+    assert planner.get_fit_matrix().tolist() == [[0]]
+
+
+def test_get_fit_matrix_empty():
+    """
+    Tests the fit matrix is empty if there are no hypervisors
+    """
+    planner = CapacityPlanner([], [make_flavor("small", 1, 2048, 10)])
+    assert planner.get_fit_matrix().shape == (0, 1)
+    assert planner.get_totals() == {"small": 0}
+
+
+def test_from_queries():
+    """
+    Tests hypervisors and flavors are read from queries that have been run
+    """
+    hypervisor_query, flavor_query = MagicMock(), MagicMock()
+    hypervisor_query.executor.runner.resource_name = "hypervisor"
+    flavor_query.executor.runner.resource_name = "flavor"
+    hypervisor_query.results_container.iter_results.return_value = [
+        MagicMock(as_object=MagicMock(return_value=make_hypervisor("hv1", 4, 4096, 40)))
+    ]
+    flavor_query.results_container.iter_results.return_value = [
+        MagicMock(as_object=MagicMock(return_value=make_flavor("small", 1, 2048, 10)))
+    ]
+
+    planner = CapacityPlanner(hypervisor_query, flavor_query)
+    assert planner.get_fits("small") == {"hv1": 2}
+
+    with pytest.raises(ParseQueryError):
+        CapacityPlanner(flavor_query, hypervisor_query)
+
+
+def test_get_fits(instance):
+    """
+    Tests get_fits returns how many servers of a flavor fit on each hypervisor
+    """
+    assert instance.get_fits("small") == {"hv1": 8, "hv2": 4, "hv3": 0}
+    with pytest.raises(ParseQueryError):
+        instance.get_fits("missing")
+
+
+def test_get_totals(instance):
+    """
+    Tests get_totals returns how many servers of each flavor fit on all hypervisors
+    """
+    assert instance.get_totals() == {"small": 12, "large": 2, "volume": 6}
+    assert instance.get_totals(["large"]) == {"large": 2}
+
+
+def test_rollup(instance, caplog):
+    """
+    Tests rollup totals fits of hypervisors in each group - warning about and ignoring unknown hosts
+    """
+    groups = {"agg1": ["hv1", "hv2", "hv1"], "agg2": ["hv3", "unknown"], "agg3": []}
+    assert instance.rollup(groups) == {
+        "agg1": {"small": 12, "large": 2, "volume": 6},
+        "agg2": {"small": 0, "large": 0, "volume": 0},
+        "agg3": {"small": 0, "large": 0, "volume": 0},
+    }
+    assert instance.rollup(groups, ["large"]) == {
+        "agg1": {"large": 2},
+        "agg2": {"large": 0},
+        "agg3": {"large": 0},
+    }
+    assert "1 hosts in agg2 match no hypervisor: unknown" in caplog.text
+
+
+def test_rollup_matches_hosts():
+    """
+    Tests rollup matches hosts to hypervisors by service host or short name
+    """
+    planner = CapacityPlanner(
+        [
+            make_hypervisor("hv1.example.com", 8, 16384, 100, service_host="compute1"),
+            make_hypervisor("hv2.example.com", 32, 8192, 1000),
+        ],
+        [make_flavor("small", 1, 2048, 10)],
+    )
+    assert planner.rollup({"agg1": ["compute1"], "agg2": ["hv2"]}) == {
+        "agg1": {"small": 8},
+        "agg2": {"small": 4},
+    }
@@ -0,0 +1,330 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from openstackquery.http_cache import (
+    CACHE_HEADER,
+    CachedResponse,
+    CachingHTTPAdapter,
+    DiskResponseCache,
+)
+
+SERVERS_URL = "https://compute.example.com/v2.1/servers/detail?all_tenants=True"
+
+
+@pytest.fixture(name="clock")
+def clock_fixture():
+    """
+    Returns a mock clock starting at 1000 seconds
+    """
+    clock = MagicMock()
+    clock.return_value = 1000
+    return clock
+
+
+@pytest.fixture(name="cache")
+def cache_fixture(tmp_path, clock):
+    """
+    Returns a DiskResponseCache in a temporary directory
+    """
+    return DiskResponseCache(str(tmp_path), ttl=60, clock=clock)
+
+
+@pytest.fixture(name="make_response")
+def make_response_fixture():
+    """
+    Returns a function which builds a response as if from openstack
+    """
+
+    def _make_response(body, status=200, headers=None, url=SERVERS_URL):
+        response = requests.Response()
+        response.status_code = status
+        response.url = url
+        response.reason = "OK"
+        response.headers.update(headers or {})
+        # pylint: disable=protected-access
+        response._content = json.dumps(body).encode() if body is not None else b""
+        response._content_consumed = True
+        return response
+
+    return _make_response
+
+
+@pytest.fixture(name="session")
+def session_fixture(cache):
+    """
+    Returns a requests session with a CachingHTTPAdapter mounted
+    """
+    session = requests.Session()
+    session.mount("https://", CachingHTTPAdapter(cache, "scope"))
+    return session
+
+
+def test_make_scope_ignores_secrets():
+    """
+    Tests that make_scope changes with the project but not with passwords or tokens
+    """
+    auth = {"auth_url": "url", "project_id": "p1", "password": "a", "token": "b"}
+    scope = DiskResponseCache.make_scope("prod", auth)
+    assert scope == DiskResponseCache.make_scope(
+        "prod", {**auth, "password": "c", "token": "d"}
+    )
+    assert scope != DiskResponseCache.make_scope("prod", {**auth, "project_id": "p2"})
+    assert scope != DiskResponseCache.make_scope("dev", auth)
+
+
+def test_make_key_ignores_param_order(cache):
+    """
+    Tests that urls with the same params in a different order have the same key
+    """
+    assert cache.make_key("s", "get", "https://a/servers?x=1&y=2") == cache.make_key(
+        "s", "GET", "https://A/servers?y=2&x=1"
+    )
+    assert cache.make_key("s", "GET", "https://a/servers") != cache.make_key(
+        "other", "GET", "https://a/servers"
+    )
+    assert cache.make_key("s", "GET", "https://a/servers") != cache.make_key(
+        "s", "GET", "https://a/servers", {"OpenStack-API-Version": "compute 2.1"}
+    )
+
+
+def test_set_and_get_round_trip(cache, tmp_path):
+    """
+    Tests that a stored response is compressed on disk and read back unchanged
+    """
+    body = json.dumps({"servers": [{"id": "a", "name": "x" * 1000}]}).encode()
+    cached = CachedResponse("url", 200, {"ETag": "abc"}, body, 1000)
+    cache.set("abcd", cached)
+
+    assert cache.get("abcd") == cached
+    assert (tmp_path / "ab" / "abcd").stat().st_size < len(body)
+
+
+def test_get_missing_or_corrupt(cache, tmp_path):
+    """
+    Tests that get returns None when nothing is stored or the file can't be read
+    """
+    assert cache.get("abcd") is None
+    (tmp_path / "ab").mkdir()
+    (tmp_path / "ab" / "abcd").write_bytes(b"not compressed")
+    assert cache.get("abcd") is None
+
+
+def test_clear(cache):
+    """
+    Tests that clear removes every stored response
+    """
+    cache.set("abcd", CachedResponse("url", 200, {}, b"{}", 1000))
+    with cache.lock("efgh"):
+        pass
+    assert cache.clear() == 1
+    assert cache.get("abcd") is None
+
+
+def test_cached_response_is_fresh():
+    """
+    Tests that a response is fresh for ttl seconds after it is stored
+    """
+    cached = CachedResponse("url", 200, {"etag": "abc"}, b"", 1000)
+    assert cached.is_fresh(60, 1059)
+    assert not cached.is_fresh(60, 1060)
+    assert cached.etag == "abc"
+    assert cached.last_modified is None
+
+
+@patch("requests.adapters.HTTPAdapter.send")
+def test_adapter_uses_fresh_response(mock_send, session, make_response):
+    """
+    Tests that a second GET within the ttl is answered from the cache
+    """
+    mock_send.return_value = make_response(
+        {"servers": [{"id": "a"}]}, headers={"Content-Encoding": "gzip"}
+    )
+    first = session.get(SERVERS_URL)
+    second = session.get(SERVERS_URL)
+
+    mock_send.assert_called_once()
+    assert first.json() == second.json() == {"servers": [{"id": "a"}]}
+    assert second.headers[CACHE_HEADER] == "hit"
+    assert "Content-Encoding" not in second.headers
+
+
+@patch("requests.adapters.HTTPAdapter.send")
+def test_adapter_does_not_cache_errors_or_posts(mock_send, session, make_response):
+    """
+    Tests that only successful GET responses are stored
+    """
+    mock_send.return_value = make_response({"error": "x"}, status=500)
+    session.get(SERVERS_URL)
+    session.get(SERVERS_URL)
+    mock_send.return_value = make_response({})
+    session.post(SERVERS_URL)
+    session.post(SERVERS_URL)
+    assert mock_send.call_count == 4
+
+
+@patch("requests.adapters.HTTPAdapter.send")
+def test_adapter_revalidates_with_etag(mock_send, session, make_response, clock):
+    """
+    Tests that a stale response is revalidated with If-None-Match - and reused if not modified
+    """
+    url = "https://compute.example.com/v2.1/flavors/detail"
+    mock_send.return_value = make_response(
+        {"flavors": [{"id": "a"}]}, headers={"ETag": "abc"}, url=url
+    )
+    session.get(url)
+
+    clock.return_value = 1100
+    mock_send.return_value = make_response(None, status=304, url=url)
+    response = session.get(url)
+
+    assert mock_send.call_args.args[0].headers["If-None-Match"] == "abc"
+    assert response.status_code == 200
+    assert response.json() == {"flavors": [{"id": "a"}]}
+    assert response.headers[CACHE_HEADER] == "revalidated"
+
+    # revalidated response is fresh again
+    session.get(url)
+    assert mock_send.call_count == 2
+
+
+@patch("requests.adapters.HTTPAdapter.send")
+def test_adapter_refetches_stale_response_without_validators(
+    mock_send, session, make_response, clock
+):
+    """
+    Tests that a stale response with no ETag or Last-Modified is fetched again in full
+    """
+    url = "https://compute.example.com/v2.1/flavors/detail"
+    mock_send.return_value = make_response({"flavors": []}, url=url)
+    session.get(url)
+    clock.return_value = 1100
+    mock_send.return_value = make_response({"flavors": [{"id": "a"}]}, url=url)
+
+    assert session.get(url).json() == {"flavors": [{"id": "a"}]}
+    assert "If-None-Match" not in mock_send.call_args.args[0].headers
+
+
+@patch("requests.adapters.HTTPAdapter.send")
+def test_adapter_merges_server_changes_since(mock_send, session, make_response, clock):
+    """
+    Tests that a stale server listing is revalidated by fetching servers changed since it was stored -
+    changed servers are replaced, new ones added and deleted ones removed
+    """
+    mock_send.return_value = make_response(
+        {"servers": [{"id": "a", "status": "ACTIVE"}, {"id": "b", "status": "ACTIVE"}]},
+        headers={"Date": "Mon, 19 Oct 2026 10:00:00 GMT"},
+    )
+    session.get(SERVERS_URL)
+
+    clock.return_value = 1100
+    mock_send.return_value = make_response(
+        {
+            "servers": [
+                {"id": "a", "status": "SHUTOFF"},
+                {"id": "b", "status": "DELETED"},
+                {"id": "c", "status": "ACTIVE"},
+            ]
+        },
+        headers={"Date": "Mon, 19 Oct 2026 10:05:00 GMT"},
+    )
+    response = session.get(SERVERS_URL)
+
+    delta_url = mock_send.call_args.args[0].url
+    assert "changes-since=2026-10-19T09%3A59%3A00Z" in delta_url
+    assert "all_tenants=True" in delta_url
+    assert response.headers[CACHE_HEADER] == "revalidated"
+    assert response.json() == {
+        "servers": [{"id": "a", "status": "SHUTOFF"}, {"id": "c", "status": "ACTIVE"}]
+    }
+
+    # next delta is from when the changes were fetched
+    clock.return_value = 1200
+    mock_send.return_value = make_response({"servers": []})
+    session.get(SERVERS_URL)
+    assert "changes-since=2026-10-19T10%3A04%3A00Z" in mock_send.call_args.args[0].url
+
+
+@patch("requests.adapters.HTTPAdapter.send")
+def test_adapter_does_not_merge_paginated_listing(
+    mock_send, session, make_response, clock
+):
+    """
+    Tests that a server listing spanning more than one page is fetched again in full
+    """
+    mock_send.return_value = make_response(
+        {"servers": [{"id": "a"}], "servers_links": [{"rel": "next"}]}
+    )
+    session.get(SERVERS_URL)
+    clock.return_value = 1100
+    mock_send.return_value = make_response({"servers": [{"id": "b"}]})
+
+    assert session.get(SERVERS_URL).json() == {"servers": [{"id": "b"}]}
+    assert "changes-since" not in mock_send.call_args.args[0].url
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        f"{SERVERS_URL}&status=ACTIVE",
+        f"{SERVERS_URL}&sort_key=created_at&sort_dir=desc",
+        f"{SERVERS_URL}&marker=a",
+    ],
+)
+@patch("requests.adapters.HTTPAdapter.send")
+def test_adapter_does_not_merge_filtered_or_sorted_listing(
+    mock_send, url, session, make_response, clock
+):
+    """
+    Tests that filtered, sorted or later pages of server listings are fetched again in full - changed servers
+    can't be merged in by id without breaking filters or order
+    """
+    mock_send.return_value = make_response({"servers": [{"id": "a"}]}, url=url)
+    session.get(url)
+    clock.return_value = 1100
+    mock_send.return_value = make_response({"servers": [{"id": "b"}]}, url=url)
+
+    assert session.get(url).json() == {"servers": [{"id": "b"}]}
+    assert "changes-since" not in mock_send.call_args.args[0].url
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        (SERVERS_URL, True),
+        ("https://identity.example.com/v3/projects", True),
+        ("https://image.example.com/v2/images?limit=10", True),
+        ("https://compute.example.com/v2.1/servers/123", False),
+        (
+            "https://identity.example.com/v3/users/0123456789abcdef0123456789abcdef",
+            False,
+        ),
+        (
+            "https://placement.example.com/resource_providers/"
+            "3b1e6f8a-1c2d-4e5f-8a9b-0c1d2e3f4a5b/usages",
+            False,
+        ),
+        ("https://compute.example.com/v2.1/", False),
+    ],
+)
+def test_is_listing(url, expected):
+    """
+    Tests is_listing returns True only for urls listing a collection of resources
+    """
+    assert CachingHTTPAdapter.is_listing(url) == expected
+
+
+@patch("requests.adapters.HTTPAdapter.send")
+def test_adapter_does_not_cache_single_resources(mock_send, session, make_response):
+    """
+    Tests that GET requests for a single resource are always sent to openstack
+    """
+    url = (
+        "https://compute.example.com/v2.1/servers/3b1e6f8a-1c2d-4e5f-8a9b-0c1d2e3f4a5b"
+    )
+    mock_send.return_value = make_response({"server": {"id": "a"}}, url=url)
+    session.get(url)
+    session.get(url)
+    assert mock_send.call_count == 2
@@ -0,0 +1,234 @@
+import json
+import queue
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from openstackquery.notification_consumer import (
+    FileNotificationSource,
+    NotificationConsumer,
+    QueueNotificationSource,
+)
+from openstackquery.runners.runner_cache import RunnerCache
+from openstackquery.structs.notification import Notification
+
+
+@pytest.fixture(name="cache")
+def cache_fixture():
+    """
+    Returns a runner cache set for all runners - with a server and hypervisor listing cached
+    """
+    cache = RunnerCache()
+    cache.set(cache.make_key("prod", "server"), [{"id": "a"}, {"id": "b"}], "t1")
+    cache.set(cache.make_key("prod", "hypervisor"), [MagicMock()])
+    with patch(
+        "openstackquery.notification_consumer.RunnerWrapper.get_cache",
+        return_value=cache,
+    ):
+        yield cache
+
+
+@pytest.fixture(name="instance")
+def instance_fixture():
+    """
+    Returns an instance for one cloud account with the default rules
+    """
+    return NotificationConsumer("prod")
+
+
+def make_notification(event_type, **payload):
+    """
+    Returns a raw notification as oslo.messaging sends it
+    """
+    return json.dumps(
+        {
+            "oslo.version": "2.0",
+            "oslo.message": json.dumps(
+                {
+                    "event_type": event_type,
+                    "payload": payload,
+                    "publisher_id": "compute.host1",
+                    "message_id": "m1",
+                }
+            ),
+        }
+    )
+
+
+def test_parse():
+    """
+    Tests parse unwraps oslo.messaging envelopes
+    """
+    assert NotificationConsumer.parse(
+        make_notification("compute.instance.update", instance_id="a")
+    ) == Notification(
+        "compute.instance.update",
+        {"instance_id": "a"},
+        publisher_id="compute.host1",
+        message_id="m1",
+    )
+
+
+def test_parse_versioned():
+    """
+    Tests parse unwraps payloads of versioned notifications
+    """
+    res = NotificationConsumer.parse(
+        {
+            "event_type": "instance.delete.end",
+            "payload": {"nova_object.data": {"uuid": "a"}},
+        }
+    )
+    assert res.payload == {"uuid": "a"}
+
+
+@pytest.mark.parametrize("message", ["not json", "[]", {"payload": {}}])
+def test_parse_invalid(message):
+    """
+    Tests parse returns None for messages which aren't notifications
+    """
+    assert NotificationConsumer.parse(message) is None
+
+
+@pytest.mark.parametrize(
+    "event_type, expected",
+    [
+        ("compute.instance.delete.end", True),
+        ("compute.instance.soft_delete.end", True),
+        ("identity.project.deleted", True),
+        ("image.delete", True),
+        ("compute.instance.update", False),
+        ("identity.project.created", False),
+    ],
+)
+def test_is_delete(event_type, expected):
+    """
+    Tests is_delete finds notifications about resources being deleted
+    """
+    assert NotificationConsumer.is_delete(event_type) == expected
+
+
+def test_handle_delete(instance, cache):
+    """
+    Tests that a delete notification removes the resource from cached listings by marker - and expires
+    listings of related resource types
+    """
+    with patch(
+        "openstackquery.enums.props.server_properties.ServerProperties.get_marker_prop_func",
+        return_value=lambda item: item["id"],
+    ):
+        assert instance.handle(
+            make_notification("compute.instance.delete.end", instance_id="a")
+        )
+    key = cache.make_key("prod", "server")
+    assert cache.get(key) == [{"id": "b"}]
+    assert cache.get(cache.make_key("prod", "hypervisor")) is None
+    assert instance.handled == 1
+
+
+def test_handle_update(instance, cache):
+    """
+    Tests that an update notification expires cached listings - server listings are kept to be refreshed
+    incrementally
+    """
+    assert instance.handle(
+        make_notification("compute.instance.update", instance_id="a")
+    )
+    key = cache.make_key("prod", "server")
+    assert cache.get(key) is None
+    assert cache.get_stale(key) == ([{"id": "a"}, {"id": "b"}], "t1")
+
+
+def test_handle_other_cloud_account(cache):
+    """
+    Tests that notifications only update listings of the consumer's cloud account
+    """
+    instance = NotificationConsumer("dev")
+    instance.handle(make_notification("compute.instance.update", instance_id="a"))
+    assert cache.get(cache.make_key("prod", "server")) == [{"id": "a"}, {"id": "b"}]
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        make_notification("compute.instance.create.start", instance_id="a"),
+        make_notification("volume.create.end", volume_id="a"),
+        "not json",
+    ],
+)
+def test_handle_ignored(instance, cache, message):
+    """
+    Tests that notifications sent at the start of actions, and notifications with no handler, are ignored
+    """
+    assert not instance.handle(message)
+    assert instance.ignored == 1
+    assert cache.get(cache.make_key("prod", "server")) == [{"id": "a"}, {"id": "b"}]
+
+
+def test_register(instance):
+    """
+    Tests that registered handlers handle notifications - the handler with the longest prefix is used
+    """
+    mock_handler = MagicMock()
+    instance.register("compute.instance.resize.", mock_handler)
+    instance.handle(make_notification("compute.instance.resize.confirm.end"))
+    mock_handler.assert_called_once()
+    assert mock_handler.call_args.args[0] == instance
+    assert instance.get_handler("compute.instance.update") != mock_handler
+
+
+def test_sessions(cache):
+    """
+    Tests that sessions given are updated as well as the runner cache
+    """
+    mock_session = MagicMock()
+    mock_session.expire.return_value = 1
+    instance = NotificationConsumer(sessions=[mock_session], use_default_rules=False)
+    assert instance.expire("flavor") == 1
+    mock_session.expire.assert_called_once_with(None, "flavor")
+    assert instance.get_handler("compute.instance.update") is None
+    assert cache.stats["entries"] == 2
+
+
+def test_consume_file(instance, cache, tmp_path):
+    """
+    Tests consume handles every notification in a file - bad notifications are logged and skipped
+    """
+    path = tmp_path / "notifications.log"
+    path.write_text(
+        "\n".join(
+            [
+                make_notification("compute.instance.update", instance_id="a"),
+                "",
+                make_notification("image.update", id="x"),
+            ]
+        )
+    )
+    with patch.object(instance, "expire", side_effect=[RuntimeError, 0, 0]):
+        assert instance.consume(FileNotificationSource(str(path))) == 1
+    assert cache.stats["entries"] == 2
+
+
+def test_start_and_stop_queue(instance, cache):
+    """
+    Tests start handles notifications from a queue in a background thread until stopped
+    """
+    source = QueueNotificationSource()
+    instance.start(source)
+    with pytest.raises(RuntimeError):
+        instance.start(source)
+    source.put(make_notification("compute.instance.update", instance_id="a"))
+    source.put(make_notification("compute.instance.update", instance_id="b"))
+    instance.stop(timeout=5)
+    assert source.closed
+    assert instance.handled == 2
+    assert cache.get(cache.make_key("prod", "server")) is None
+
+
+def test_queue_source_timeout():
+    """
+    Tests that a queue source stops when no notification arrives in time
+    """
+    notifications = queue.Queue()
+    notifications.put("message")
+    assert list(QueueNotificationSource(notifications, timeout=0.01)) == ["message"]
@@ -1,6 +1,7 @@
-from unittest.mock import patch
+from unittest.mock import NonCallableMock, patch
 
 import pytest
+from openstackquery.http_cache import DiskResponseCache
 from openstackquery.openstack_connection import OpenstackConnection
 
 
@@ -78,3 +79,35 @@ def test_openstack_connection_connects_second_time(patched_connect):
     with OpenstackConnection("a"):
         pass
     assert patched_connect.call_count == 2
+
+
+@patch("openstackquery.openstack_connection.CachingHTTPAdapter")
+@patch("openstackquery.openstack_connection.connect")
+def test_openstack_connection_mounts_http_cache(patched_connect, patched_adapter):
+    """
+    Tests that the on-disk cache is mounted on the connection's session when one is set
+    """
+    mock_cache = NonCallableMock()
+    patched_connect.return_value.config.config = {"auth": {"project_id": "p1"}}
+    OpenstackConnection.set_http_cache(mock_cache)
+    try:
+        with OpenstackConnection("a") as conn:
+            session = conn.session.session
+    finally:
+        OpenstackConnection.set_http_cache(None)
+
+    patched_adapter.assert_called_once_with(
+        mock_cache, DiskResponseCache.make_scope("a", {"project_id": "p1"})
+    )
+    session.mount.assert_any_call("https://", patched_adapter.return_value)
+    session.mount.assert_any_call("http://", patched_adapter.return_value)
+    assert OpenstackConnection.get_http_cache() is None
+
+
+@patch("openstackquery.openstack_connection.connect")
+def test_openstack_connection_no_http_cache(_):
+    """
+    Tests that the connection's session is not changed when no on-disk cache is set
+    """
+    with OpenstackConnection("a") as conn:
+        conn.session.session.mount.assert_not_called()
@@ -41,6 +41,7 @@ def run_build_query_deps_test_case_fixture():
             prop_enum_cls=mock_prop_mapping,
             client_side_handler=mock_mapping_cls.get_client_side_handler.return_value,
             server_side_handler=mock_mapping_cls.get_server_side_handler.return_value,
+            server_side_sort_mappings=mock_mapping_cls.get_server_side_sort_mappings.return_value,
         )
         mock_chainer.assert_called_once_with(
             chain_mappings=mock_mapping_cls.get_chain_mappings.return_value
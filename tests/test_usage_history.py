@@ -0,0 +1,262 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from openstackquery.exceptions.parse_query_error import ParseQueryError
+from openstackquery.usage_history import UsageHistory, match_hosts
+
+np = pytest.importorskip("numpy")
+
+
+def make_hypervisor(
+    name, vcpus_used=1, memory_mb_used=2, disk_gb_used=3, service_host=None
+):
+    """
+    Returns a mocked hypervisor with usage
+    """
+    hypervisor = MagicMock()
+    hypervisor.hv = {"name": name}
+    if service_host:
+        hypervisor.hv["service"] = {"host": service_host}
+    hypervisor.usage.vcpus_used = vcpus_used
+    hypervisor.usage.memory_mb_used = memory_mb_used
+    hypervisor.usage.disk_gb_used = disk_gb_used
+    return hypervisor
+
+
+@pytest.fixture(name="instance")
+def instance_fixture():
+    """
+    Returns a usage history held in memory only
+    """
+    return UsageHistory(capacity=4)
+
+
+def test_record(instance):
+    """
+    Tests record stores usage of each hypervisor - ignoring samples not newer than the latest
+    """
+    assert instance.record([make_hypervisor("hv1"), make_hypervisor("hv2")], 100) == 2
+    assert instance.record([make_hypervisor("hv1", 4, 5, None)], 200) == 1
+    assert instance.record([make_hypervisor("hv1")], 200) == 0
+
+    assert instance.names == ["hv1", "hv2"]
+    assert instance.metrics == ["vcpus_used", "memory_mb_used", "disk_gb_used"]
+    assert len(instance) == 3
+    times, values = instance.get_range("hv1")
+    assert times.tolist() == [100, 200]
+    np.testing.assert_array_equal(values, [[1, 2, 3], [4, 5, np.nan]])
+
+
+def test_record_query(instance):
+    """
+    Tests record reads hypervisors from a HypervisorQuery that has been run
+    """
+    mock_query = MagicMock()
+    mock_query.executor.runner.resource_name = "hypervisor"
+    mock_result = MagicMock()
+    mock_result.as_object.return_value = make_hypervisor("hv1")
+    mock_query.results_container.iter_results.return_value = [mock_result]
+
+    assert instance.record(mock_query, 100) == 1
+    assert instance.names == ["hv1"]
+
+
+def test_record_query_invalid(instance):
+    """
+    Tests record raises an error if a query hasn't been run or isn't a HypervisorQuery
+    """
+    mock_query = MagicMock()
+    mock_query.results_container = None
+    with pytest.raises(ParseQueryError):
+        instance.record(mock_query)
+
+    mock_query.results_container = MagicMock()
+    mock_query.executor.runner.resource_name = "server"
+    with pytest.raises(ParseQueryError):
+        instance.record(mock_query)
+
+
+def test_ring_buffer_drops_oldest(instance):
+    """
+    Tests samples beyond capacity overwrite the oldest samples
+    """
+    for timestamp in range(6):
+        instance.record([make_hypervisor("hv1", timestamp)], timestamp)
+
+    times, values = instance.get_range("hv1")
+    assert times.tolist() == [2, 3, 4, 5]
+    assert values[:, 0].tolist() == [2, 3, 4, 5]
+
+
+def test_get_range(instance):
+    """
+    Tests get_range returns samples from start and before end
+    """
+    for timestamp in (10, 20, 30, 40):
+        instance.record([make_hypervisor("hv1")], timestamp)
+
+    times, _ = instance.get_range("hv1", start=20, end=40)
+    assert times.tolist() == [20, 30]
+    with pytest.raises(ParseQueryError):
+        instance.get_range("hv2")
+
+
+def test_downsample(instance):
+    """
+    Tests downsample combines samples in each bucket - NaN where a bucket has no samples
+    """
+    for timestamp, vcpus in ((100, 1), (110, 3), (250, 5)):
+        instance.record([make_hypervisor("hv1", vcpus)], timestamp)
+
+    bucket_times, values = instance.downsample(100)
+    assert bucket_times.tolist() == [100, 200]
+    assert values["hv1"][:, 0].tolist() == [2, 5]
+
+    _, values = instance.downsample(100, func="max")
+    assert values["hv1"][:, 0].tolist() == [3, 5]
+
+    bucket_times, values = instance.downsample(100, start=0, func="min")
+    assert bucket_times.tolist() == [0, 100, 200]
+    assert np.isnan(values["hv1"][0]).all()
+    assert values["hv1"][1:, 0].tolist() == [1, 5]
+
+
+@pytest.mark.parametrize("kwargs", [{"interval": 0}, {"interval": 10, "func": "sum"}])
+def test_downsample_invalid(instance, kwargs):
+    """
+    Tests downsample raises an error for invalid intervals or functions
+    """
+    instance.record([make_hypervisor("hv1")], 100)
+    with pytest.raises(ParseQueryError):
+        instance.downsample(**kwargs)
+
+
+def test_downsample_empty(instance):
+    """
+    Tests downsample returns no buckets if no samples are held
+    """
+    bucket_times, values = instance.downsample(100)
+    assert bucket_times.tolist() == []
+    assert not values
+
+
+def test_rollup(instance):
+    """
+    Tests rollup totals usage of hypervisors in each group - ignoring hypervisors without samples
+    """
+    instance.record([make_hypervisor("hv1", 1), make_hypervisor("hv2", 2)], 100)
+    instance.record([make_hypervisor("hv1", 3)], 200)
+
+    bucket_times, totals = instance.rollup(
+        {"agg1": ["hv1", "hv2", "hv3"], "agg2": ["hv2"]}, 100
+    )
+    assert bucket_times.tolist() == [100, 200]
+    assert totals["agg1"][:, 0].tolist() == [3, 3]
+    assert totals["agg2"][0, 0] == 2
+    assert np.isnan(totals["agg2"][1]).all()
+
+
+def test_rollup_matches_hosts(instance, caplog):
+    """
+    Tests rollup matches hosts to hypervisors by service host or short name - warning about unmatched hosts
+    """
+    instance.record(
+        [
+            make_hypervisor("hv1.example.com", 1, service_host="compute1"),
+            make_hypervisor("hv2.example.com", 2),
+        ],
+        100,
+    )
+
+    _, totals = instance.rollup({"agg1": ["compute1", "hv2", "hv3"]}, 100)
+    assert totals["agg1"][:, 0].tolist() == [3]
+    assert "1 hosts in agg1 match no hypervisor: hv3" in caplog.text
+
+
+def test_match_hosts(caplog):
+    """
+    Tests match_hosts doesn't match short names shared by more than one hypervisor
+    """
+    service_hosts = {"hv1.a.com": None, "hv1.b.com": None, "hv2.a.com": "hv2"}
+    assert match_hosts({"agg1": ["hv1", "HV1.b.com", "hv2.a"]}, service_hosts) == {
+        "agg1": ["hv1.b.com", "hv2.a.com"]
+    }
+    assert "match no hypervisor: hv1" in caplog.text
+
+
+def test_get_aggregate_hosts():
+    """
+    Tests get_aggregate_hosts returns hosts in each aggregate
+    """
+    aggregates = [{"name": "agg1", "hosts": ["hv1"]}, {"name": "agg2", "hosts": None}]
+    assert UsageHistory.get_aggregate_hosts(aggregates) == {
+        "agg1": ["hv1"],
+        "agg2": [],
+    }
+
+
+def test_persist_and_load(tmp_path):
+    """
+    Tests samples recorded are persisted as segments and loaded by a new history
+    """
+    history = UsageHistory(str(tmp_path), capacity=4)
+    history.record(
+        [make_hypervisor("hv1", 1), make_hypervisor("hv2", 2, service_host="host2")],
+        100,
+    )
+    history.record([make_hypervisor("hv1", 3)], 200)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "segment-00000000.npz",
+        "segment-00000001.npz",
+    ]
+    assert history.flush() is None
+
+    loaded = UsageHistory(str(tmp_path), capacity=4)
+    assert loaded.names == ["hv1", "hv2"]
+    times, values = loaded.get_range("hv1")
+    assert times.tolist() == [100, 200]
+    assert values[:, 0].tolist() == [1, 3]
+    assert loaded.rollup({"agg1": ["host2"]}, 100)[1]["agg1"][0, 0] == 2
+
+
+def test_compact(tmp_path):
+    """
+    Tests segments are compacted into one holding only samples still held once there are too many
+    """
+    history = UsageHistory(str(tmp_path), capacity=2, max_segments=2)
+    for timestamp in range(3):
+        history.record([make_hypervisor("hv1", timestamp)], timestamp)
+
+    assert [path.name for path in tmp_path.iterdir()] == ["segment-00000003.npz"]
+    loaded = UsageHistory(str(tmp_path), capacity=2)
+    assert loaded.get_range("hv1")[0].tolist() == [1, 2]
+
+
+def test_record_without_flush(tmp_path):
+    """
+    Tests samples recorded without flushing are only persisted by flush() or compact()
+    """
+    history = UsageHistory(str(tmp_path))
+    history.record([make_hypervisor("hv1")], 100, flush=False)
+    assert not list(tmp_path.iterdir())
+
+    assert history.compact() == str(tmp_path / "segment-00000000.npz")
+    assert len(UsageHistory(str(tmp_path))) == 1
+
+
+def test_no_directory(instance):
+    """
+    Tests persisting raises an error if the history has no directory
+    """
+    for method in (instance.flush, instance.compact, instance.load):
+        with pytest.raises(ParseQueryError):
+            method()
+
+
+def test_invalid_capacity():
+    """
+    Tests an error is raised if capacity isn't positive
+    """
+    with pytest.raises(ParseQueryError):
+        UsageHistory(capacity=0)